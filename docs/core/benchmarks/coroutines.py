@@ -0,0 +1,88 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Compare the cost of driving chains of functions waiting on one another with
+L{defer.inlineCallbacks} and with L{defer.Deferred.fromCoroutine}.
+
+Each chain is ten functions deep, the innermost one waiting on a
+L{defer.Deferred} which either already has a result or gets one once the
+whole chain is waiting.  This requires Python 3.5 or later.
+"""
+
+from __future__ import print_function
+
+from twisted.internet import defer
+from timer import timeit
+
+DEPTH = 10
+
+
+
+@defer.inlineCallbacks
+def inlineCallbacksChain(depth, waiting):
+    if depth:
+        result = yield inlineCallbacksChain(depth - 1, waiting)
+    else:
+        result = yield waiting
+    defer.returnValue(result + 1)
+
+
+
+async def coroutineChain(depth, waiting):
+    if depth:
+        result = await coroutineChain(depth - 1, waiting)
+    else:
+        result = await waiting
+    return result + 1
+
+
+
+def inlineCallbacksFired():
+    """
+    Run a chain of C{inlineCallbacks} functions ending with a fired
+    L{defer.Deferred}.
+    """
+    inlineCallbacksChain(DEPTH, defer.succeed(0))
+
+
+
+def inlineCallbacksWaiting():
+    """
+    Run a chain of C{inlineCallbacks} functions ending with a
+    L{defer.Deferred} fired once they all wait.
+    """
+    waiting = defer.Deferred()
+    inlineCallbacksChain(DEPTH, waiting)
+    waiting.callback(0)
+
+
+
+def coroutineFired():
+    """
+    Run a chain of coroutines ending with a fired L{defer.Deferred}.
+    """
+    defer.Deferred.fromCoroutine(coroutineChain(DEPTH, defer.succeed(0)))
+
+
+
+def coroutineWaiting():
+    """
+    Run a chain of coroutines ending with a L{defer.Deferred} fired once they
+    all wait.
+    """
+    waiting = defer.Deferred()
+    defer.Deferred.fromCoroutine(coroutineChain(DEPTH, waiting))
+    waiting.callback(0)
+
+
+
+def benchmark():
+    for func in (inlineCallbacksFired, coroutineFired,
+                 inlineCallbacksWaiting, coroutineWaiting):
+        print(func.__name__, timeit(func, 20000))
+
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -4,7 +4,9 @@
 """
 See how fast deferreds are.
 
-This is mainly useful to compare cdefer.Deferred to defer.Deferred
+Run this before and after changing L{twisted.internet.defer} to catch
+regressions of its most common operations: creating L{defer.Deferred}s,
+adding callbacks to them before and after they fire, and chaining them.
 """
 
 from __future__ import print_function
@@ -135,6 +137,59 @@ def pauseUnpause(n):
     d.unpause()
 pauseUnpause = benchmarkNFunc(20, ns)(pauseUnpause)
 
+def succeedAddCallback():
+    """
+    Create an already fired deferred and add a callback to it, which runs
+    immediately.
+    """
+    d = defer.succeed(1)
+    d.addCallback(lambda result: result)
+succeedAddCallback = benchmarkFunc(100000)(succeedAddCallback)
+
+def addCallbackWithArguments(n):
+    """
+    Create a deferred, add the given number of callbacks taking extra
+    positional and keyword arguments to it, and shoot a result through them.
+    """
+    d = defer.Deferred()
+    def f(result, extra, keyword=None):
+        return result
+    for i in range(n):
+        d.addCallback(f, 1, keyword=2)
+    d.callback(1)
+addCallbackWithArguments = benchmarkNFunc(20, ns)(addCallbackWithArguments)
+
+def failureThroughCallbacks(n):
+    """
+    Create a deferred, add the given number of callbacks to it and an
+    errback, and shoot a failure through them: the callbacks are skipped.
+    """
+    d = defer.Deferred()
+    def f(result):
+        return result
+    for i in range(n):
+        d.addCallback(f)
+    d.addErrback(lambda failure: None)
+    d.errback(ZeroDivisionError())
+failureThroughCallbacks = benchmarkNFunc(20, ns)(failureThroughCallbacks)
+
+def chainDeferreds(n):
+    """
+    Create a deferred whose callbacks return the given number of deferreds
+    which are not fired yet, then fire them one at a time.
+    """
+    d = defer.Deferred()
+    waiting = []
+    def f(result):
+        waiting.append(defer.Deferred())
+        return waiting[-1]
+    for i in range(n):
+        d.addCallback(f)
+    d.callback(1)
+    while waiting:
+        waiting.pop(0).callback(1)
+chainDeferreds = benchmarkNFunc(20, ns)(chainDeferreds)
+
 def benchmark():
     """
     Run all of the benchmarks registered in the benchmarkFuncs list
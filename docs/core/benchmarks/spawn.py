@@ -0,0 +1,83 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measure how many short-lived processes per second C{reactor.spawnProcess}
+starts and reaps, while many other processes are alive.
+
+Each run starts C{count} children which exit right away, a few at a time, and
+reports the rate at which they ended.  Children started with
+C{os.posix_spawn} are compared to forked ones (which are forked because they
+run in another directory), and the parent is made bigger to show that only
+forking gets slower with the size of the parent.
+"""
+
+from __future__ import division, print_function
+
+import os
+import sys
+import time
+
+from twisted.internet import defer, protocol, reactor, task
+
+
+
+class Ended(protocol.ProcessProtocol):
+    def __init__(self):
+        self.ended = defer.Deferred()
+
+
+    def processEnded(self, reason):
+        self.ended.callback(None)
+
+
+
+def spawn(path, args=(b"true",)):
+    p = Ended()
+    executable = b"/bin/" + args[0]
+    reactor.spawnProcess(p, executable, [executable] + list(args[1:]),
+                         env={}, path=path, childFDs={})
+    return p.ended
+
+
+
+@defer.inlineCallbacks
+def benchmark(name, path, count, concurrency=16):
+    def spawnAll():
+        for i in range(count):
+            yield spawn(path)
+    before = time.time()
+    yield defer.gatherResults([
+        task.cooperate(spawnAll()).whenDone()
+        for i in range(concurrency)])
+    elapsed = time.time() - before
+    print('%-12s children: %6d elapsed: %.3fs rate: %8.1f/s' % (
+        name, count * concurrency, elapsed, count * concurrency / elapsed))
+
+
+
+@defer.inlineCallbacks
+def main(alive=1000, count=100):
+    sleepers = [Ended() for i in range(alive)]
+    for p in sleepers:
+        reactor.spawnProcess(p, b"/bin/sleep", [b"/bin/sleep", b"3600"],
+                             env={}, childFDs={})
+    print('%d other children alive' % (alive,))
+    ballast = []
+    for size in (0, 512, 2048):
+        ballast.append(b"x" * ((size - sum(map(len, ballast))) * 2 ** 20))
+        print('parent grown by %d MiB' % (size,))
+        yield benchmark('posix_spawn', None, count)
+        yield benchmark('fork', os.getcwd(), count)
+    for p in sleepers:
+        p.transport.signalProcess("KILL")
+    yield defer.gatherResults([p.ended for p in sleepers])
+
+
+
+if __name__ == '__main__':
+    alive = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    d = main(alive)
+    d.addErrback(lambda f: f.printTraceback())
+    d.addBoth(lambda ignored: reactor.stop())
+    reactor.run()
@@ -0,0 +1,81 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Compare the timer queues of L{twisted.internet.timers} with many pending
+timers.
+
+For each queue and number of pending timers, this measures the time taken to
+schedule the timers, to cancel half of them (as connections whose timeouts
+are cancelled would), to move a thousand of the rest sooner, and to expire
+what remains.
+"""
+
+from __future__ import division, print_function
+
+import random
+import time
+
+from twisted.internet.timers import HeapTimerQueue, TimingWheelTimerQueue
+from twisted.internet.base import DelayedCall
+
+
+
+def noop():
+    pass
+
+
+
+def benchmark(name, queue, count):
+    now = [0.0]
+    seconds = lambda: now[0]
+    random.seed(count)
+    delays = [random.uniform(1, 300) for i in range(count)]
+
+    before = time.time()
+    calls = [DelayedCall(delay, noop, (), {}, queue.cancelled,
+                         queue.movedSooner, seconds)
+             for delay in delays]
+    for call in calls:
+        queue.add(call)
+    queue.advance(now[0])
+    scheduled = time.time()
+
+    for call in calls[::2]:
+        call.cancel()
+    cancelled = time.time()
+
+    for call in calls[1:2000:2]:
+        call.reset(0.5)
+    moved = time.time()
+
+    expired = 0
+    while now[0] < 300:
+        now[0] += 0.05
+        queue.advance(now[0])
+        while True:
+            call = queue.popDue(now[0])
+            if call is None:
+                break
+            call.called = 1
+            expired += 1
+        queue.nextTime()
+    after = time.time()
+    assert expired == count // 2, (expired, count)
+
+    print('%-12s timers: %8d schedule: %.3fs cancel: %.3fs move sooner: %.3fs '
+          'expire: %.3fs' % (
+              name, count, scheduled - before, cancelled - scheduled,
+              moved - cancelled, after - moved))
+
+
+
+def main():
+    for count in (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6):
+        benchmark('heap', HeapTimerQueue(), count)
+        benchmark('timing wheel', TimingWheelTimerQueue(), count)
+
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measure the number of datagrams per second which L{twisted.internet.udp.Port}
+can write and receive over the loopback interface.
+
+Writing is measured with one L{udp.Port.write} call per datagram, and with
+L{udp.Port.writeMany}.  Receiving is measured with a batch size of one (a
+C{recvfrom} call per datagram, as before batches), with batches received one
+C{recvfrom} call at a time, and with batches received by C{recvmmsg}.
+"""
+
+from __future__ import division, print_function
+
+import socket
+import time
+
+from twisted.internet import udp
+from twisted.internet.protocol import DatagramProtocol
+
+
+
+class CountingProtocol(DatagramProtocol):
+    """
+    Count the datagrams received.
+    """
+
+    count = 0
+
+    def datagramReceived(self, datagram, addr):
+        self.count += 1
+
+
+
+def makePort(protocol):
+    """
+    Create a port bound to the loopback interface, without a reactor.
+    """
+    port = udp.Port(0, protocol, interface='127.0.0.1')
+    port.socket = port.createInternetSocket()
+    port.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 24)
+    port.socket.bind(('127.0.0.1', 0))
+    return port
+
+
+
+def benchmark(name, batchSize, mmsg, batchWrites, datagrams=100000, size=64):
+    protocol = CountingProtocol()
+    receiver = makePort(protocol)
+    receiver.batchSize = batchSize
+    sender = makePort(DatagramProtocol())
+    address = receiver.socket.getsockname()
+    payload = b'x' * size
+    original = udp._mmsg
+    if not mmsg:
+        udp._mmsg = None
+    try:
+        written = received = 0.0
+        sent = 0
+        while sent < datagrams:
+            # Write no more than the receive buffer holds, then read it all.
+            chunk = min(2000, datagrams - sent)
+            before = time.time()
+            if batchWrites:
+                sender.writeMany([(payload, address)] * chunk)
+            else:
+                for i in range(chunk):
+                    sender.write(payload, address)
+            middle = time.time()
+            while protocol.count < sent + chunk:
+                receiver.doRead()
+            after = time.time()
+            written += middle - before
+            received += after - middle
+            sent += chunk
+    finally:
+        udp._mmsg = original
+        receiver.socket.close()
+        sender.socket.close()
+
+    print('%-22s write: %9d datagrams/s receive: %9d datagrams/s' % (
+        name, datagrams / written, datagrams / received))
+
+
+
+def main():
+    benchmark('one at a time', 1, False, False)
+    if udp._mmsg is None:
+        print('recvmmsg and sendmmsg are not available.')
+    else:
+        benchmark('batched recvfrom', 32, False, False)
+        benchmark('recvmmsg and sendmmsg', 32, True, True)
+
+
+
+if __name__ == '__main__':
+    main()
@@ -22,7 +22,8 @@ from ._team import Team
 from ._threadworker import ThreadWorker
 
 
-def pool(currentLimit, threadFactory=Thread):
+def pool(currentLimit, threadFactory=Thread, idleTimeout=None,
+         currentMinimum=None):
     """
     Construct a L{Team} that spawns threads as a thread pool, with the given
     limiting function.
@@ -44,6 +45,16 @@ def pool(currentLimit, threadFactory=Thread):
         created.
     @type currentLimit: 0-argument callable returning L{int}
 
+    @param idleTimeout: If passed, a callable returning how long, in
+        seconds, a worker may wait for work before it quits, or L{None} to
+        keep it.  Workers only quit this way while the L{Team} has more than
+        C{currentMinimum()} of them.
+    @type idleTimeout: 0-argument callable returning L{float} or L{None}
+
+    @param currentMinimum: a callable that returns the number of workers
+        which should be kept even if they are idle.
+    @type currentMinimum: 0-argument callable returning L{int}
+
     @param reactor: If passed, the L{IReactorFromThreads} / L{IReactorCore} to
         be used to coordinate actions on the L{Team} itself.  Otherwise, a
         L{LockWorker} will be used.
@@ -54,11 +65,14 @@ def pool(currentLimit, threadFactory=Thread):
     def startThread(target):
         return threadFactory(target=target).start()
 
+    def retire(worker):
+        team.retire(worker, currentMinimum() if currentMinimum else 0)
+
     def limitedWorkerCreator():
         stats = team.statistics()
         if stats.busyWorkerCount + stats.idleWorkerCount >= currentLimit():
             return None
-        return ThreadWorker(startThread, Queue())
+        return ThreadWorker(startThread, Queue(), idleTimeout, retire)
 
     team = Team(coordinator=LockWorker(Lock(), LocalStorage()),
                 createWorker=limitedWorkerCreator,
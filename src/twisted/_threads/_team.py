@@ -12,7 +12,7 @@ from __future__ import absolute_import, division, print_function
 from collections import deque
 from zope.interface import implementer
 
-from . import IWorker
+from . import IWorker, AlreadyQuit
 from ._convenience import Quit
 
 
@@ -139,6 +139,34 @@ class Team(object):
         self._coordinator.do(lambda: self._quitIdlers(n))
 
 
+    def retire(self, worker, minimum=0):
+        """
+        Quit a worker if it is still idle, unless that would leave this
+        L{Team} with fewer than C{minimum} workers.
+
+        This lets a worker which had nothing to do for a while give back its
+        resources; unlike L{Team.shrink}, it does nothing when the worker got
+        some work in the meantime.  It does nothing either once this L{Team}
+        has been quit, which stops its idle workers itself.
+
+        @param worker: A worker created by C{createWorker}.
+
+        @param minimum: The number of workers to keep.
+        @type minimum: L{int}
+        """
+        def retireIfIdle():
+            if worker not in self._idle or self._shouldQuitCoordinator:
+                return
+            if len(self._idle) + self._busyCount <= minimum:
+                return
+            self._idle.remove(worker)
+            worker.quit()
+        try:
+            self._coordinator.do(retireIfIdle)
+        except AlreadyQuit:
+            pass
+
+
     def _quitIdlers(self, n=None):
         """
         The implmentation of C{shrink}, performed by the coordinator worker.
@@ -8,6 +8,11 @@ Implementation of an L{IWorker} based on native threads and queues.
 
 from __future__ import absolute_import, division, print_function
 
+try:
+    from Queue import Empty
+except ImportError:
+    from queue import Empty
+
 from zope.interface import implementer
 from ._ithreads import IExclusiveWorker
 from ._convenience import Quit
@@ -25,7 +30,7 @@ class ThreadWorker(object):
     thread.
     """
 
-    def __init__(self, startThread, queue):
+    def __init__(self, startThread, queue, idleTimeout=None, onIdle=None):
         """
         Create a L{ThreadWorker} with a function to start a thread and a queue
         to use to communicate with that thread.
@@ -38,12 +43,38 @@ class ThreadWorker(object):
         @param queue: A L{Queue} to use to give tasks to the thread created by
             C{startThread}.
         @param queue: L{Queue}
+
+        @param idleTimeout: A callable returning how long, in seconds, the
+            thread waits for a task before calling C{onIdle}, or L{None} to
+            wait forever.  It is called every time the thread starts waiting.
+        @type idleTimeout: 0-argument callable returning L{float} or L{None}
+
+        @param onIdle: Called, on the thread, with this L{ThreadWorker} when
+            it waited C{idleTimeout} seconds without getting a task.  It may
+            call L{ThreadWorker.quit} to stop the thread.
+        @type onIdle: 1-argument callable
         """
         self._q = queue
         self._hasQuit = Quit()
-        def work():
-            for task in iter(queue.get, _stop):
-                task()
+        if idleTimeout is None:
+            def work():
+                for task in iter(queue.get, _stop):
+                    task()
+        else:
+            def work():
+                while True:
+                    timeout = idleTimeout()
+                    if timeout is None:
+                        task = queue.get()
+                    else:
+                        try:
+                            task = queue.get(timeout=timeout)
+                        except Empty:
+                            onIdle(self)
+                            continue
+                    if task is _stop:
+                        return
+                    task()
         startThread(work)
 
 
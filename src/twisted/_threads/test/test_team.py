@@ -288,3 +288,57 @@ class TeamTests(SynchronousTestCase):
         self.team.shrink(7)
         self.performAllOutstandingWork()
         self.assertEqual(len(self.allUnquitWorkers), 3)
+
+
+    def test_retireIdleWorker(self):
+        """
+        L{Team.retire} quits the given worker if it is idle.
+        """
+        self.team.grow(2)
+        self.performAllOutstandingWork()
+        worker = self.allUnquitWorkers[0]
+        self.team.retire(worker)
+        self.performAllOutstandingWork()
+        self.assertNotIn(worker, self.allUnquitWorkers)
+        self.assertEqual(self.team.statistics().idleWorkerCount, 1)
+
+
+    def test_retireKeepsMinimum(self):
+        """
+        L{Team.retire} does not quit a worker when that would leave fewer
+        workers than the given minimum.
+        """
+        self.team.grow(2)
+        self.performAllOutstandingWork()
+        self.team.retire(self.allUnquitWorkers[0], 2)
+        self.performAllOutstandingWork()
+        self.assertEqual(len(self.allUnquitWorkers), 2)
+        self.team.retire(self.allUnquitWorkers[0], 1)
+        self.performAllOutstandingWork()
+        self.assertEqual(len(self.allUnquitWorkers), 1)
+
+
+    def test_retireBusyWorker(self):
+        """
+        L{Team.retire} does not quit a worker which is busy.
+        """
+        self.team.do(list)
+        self.coordinate()
+        self.team.retire(self.allUnquitWorkers[0])
+        self.performAllOutstandingWork()
+        self.assertEqual(len(self.allUnquitWorkers), 1)
+        self.assertEqual(self.team.statistics().idleWorkerCount, 1)
+
+
+    def test_retireAfterQuit(self):
+        """
+        L{Team.retire} does nothing once the L{Team} has been quit.
+        """
+        self.team.grow(1)
+        self.performAllOutstandingWork()
+        worker = self.allUnquitWorkers[0]
+        self.team.quit()
+        self.performAllOutstandingWork()
+        self.team.retire(worker)
+        self.performAllOutstandingWork()
+        self.assertEqual(self.failures, [])
@@ -12,6 +12,10 @@ import weakref
 
 from twisted.trial.unittest import SynchronousTestCase
 from threading import ThreadError, local
+try:
+    from Queue import Empty
+except ImportError:
+    from queue import Empty
 
 from .. import ThreadWorker, LockWorker, AlreadyQuit
 
@@ -82,13 +86,19 @@ class FakeQueue(object):
         self.items.append(item)
 
 
-    def get(self):
+    def get(self, timeout=None):
         """
         Get an item.
 
+        @param timeout: If not L{None}, raise L{Empty} instead of
+            L{FakeQueueEmpty} when there is no item, as if no item was put
+            during that many seconds.
+
         @return: an item previously put by C{put}.
         """
         if not self.items:
+            if timeout is not None:
+                raise Empty()
             raise FakeQueueEmpty()
         return self.items.pop(0)
 
@@ -174,6 +184,43 @@ class ThreadWorkerTests(SynchronousTestCase):
         self.assertRaises(AlreadyQuit, self.worker.do, list)
 
 
+    def test_idleTimeout(self):
+        """
+        When given an C{idleTimeout}, the thread of a L{ThreadWorker} calls
+        C{onIdle} with the worker each time it waited that long for a task,
+        and keeps waiting until the worker is quit.
+        """
+        timeouts = []
+        idle = []
+        def idleTimeout():
+            timeouts.append(1.5)
+            return 1.5
+        def onIdle(worker):
+            idle.append(worker)
+            if len(idle) == 2:
+                worker.quit()
+        worker = ThreadWorker(self.fakeThreads.append, FakeQueue(),
+                              idleTimeout, onIdle)
+        done = []
+        worker.do(lambda: done.append(True))
+        self.fakeThreads[-1]()
+        self.assertEqual(done, [True])
+        self.assertEqual(idle, [worker, worker])
+        self.assertEqual(timeouts, [1.5, 1.5, 1.5, 1.5])
+
+
+    def test_noIdleTimeout(self):
+        """
+        When C{idleTimeout} returns L{None}, the thread of a L{ThreadWorker}
+        waits for a task without a timeout.
+        """
+        idle = []
+        ThreadWorker(self.fakeThreads.append, FakeQueue(), lambda: None,
+                     idle.append)
+        self.assertRaises(FakeQueueEmpty, self.fakeThreads[-1])
+        self.assertEqual(idle, [])
+
+
 
 class LockWorkerTests(SynchronousTestCase):
     """
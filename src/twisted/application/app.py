@@ -26,6 +26,9 @@ from twisted.internet.interfaces import _ISupportsExitSignalCapturing
 # Expose the new implementation of installReactor at the old location.
 from twisted.application.reactors import installReactor
 from twisted.application.reactors import NoSuchReactor
+from twisted.application.runner._workers import (
+    workerCount, workerID, becomeWorker, workersService,
+    twistdWorkerArguments)
 
 
 class _BasicProfiler(object):
@@ -436,7 +439,25 @@ class ApplicationRunner(object):
 
         Otherwise, an application will be loaded based on parameters in
         the config.
+
+        If the C{workers} option is set, the application is neither created
+        nor loaded: the returned application runs that many copies of this
+        process instead, which share their TCP and UDP ports.
         """
+        if workerID() is not None:
+            # This process is one of the workers started below by another
+            # twistd: share its ports.
+            from twisted.internet import reactor
+            becomeWorker(reactor)
+        elif self.config.get('workers'):
+            # Run the application in worker processes instead of in this one.
+            from twisted.internet import reactor
+            application = service.Application("twistd")
+            workersService(
+                self.config['workers'], twistdWorkerArguments(sys.argv),
+                reactor, cwd=os.getcwd()).setServiceParent(application)
+            return application
+
         if self.config.subCommand:
             # If a subcommand was given, it's our responsibility to create
             # the application, instead of load it from a file.
@@ -585,7 +606,11 @@ class ServerOptions(usage.Options, ReactorSelectionMixin):
                      ['source', 's', None,
                       "Read an application from a .tas file (AOT format)."],
                      ['rundir', 'd', '.',
-                      'Change to a supplied directory before running']]
+                      'Change to a supplied directory before running'],
+                     ['workers', None, None,
+                      "Run the application in this many worker processes, "
+                      "which share its TCP ports, and restart them when "
+                      "they exit.", workerCount]]
 
     compData = usage.Completions(
         mutuallyExclusive=[("file", "python", "source")],
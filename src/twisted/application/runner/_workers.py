@@ -0,0 +1,156 @@
+# -*- test-case-name: twisted.application.runner.test.test_workers -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Worker processes sharing the listening ports of an application.
+
+A runner started with several workers does not run its application itself:
+it starts one process per worker, each running the same command line, and
+restarts them when they die.  The workers listen with C{SO_REUSEPORT}, so
+that the kernel balances incoming TCP connections and UDP datagrams between
+them.
+"""
+
+import os
+import sys
+
+
+
+WORKER_ID_ENVIRONMENT_VARIABLE = "TWISTED_WORKER_ID"
+
+
+
+def workerCount(value):
+    """
+    Convert a command line value to a number of workers.
+
+    @param value: The value given on the command line.
+    @type value: L{str}
+
+    @return: The number of workers.
+    @rtype: L{int}
+
+    @raise ValueError: If C{value} is not a positive integer.
+    """
+    count = int(value)
+    if count < 1:
+        raise ValueError("Number of workers must be positive: {}"
+                         .format(value))
+    return count
+
+workerCount.coerceDoc = "Must be a positive integer."
+
+
+
+def workerID(environ=os.environ):
+    """
+    Find out which worker the current process is.
+
+    @param environ: The environment of the current process.
+    @type environ: L{dict}
+
+    @return: The number of the worker, or L{None} if the current process is
+        not a worker.
+    @rtype: L{int} or L{None}
+    """
+    value = environ.get(WORKER_ID_ENVIRONMENT_VARIABLE)
+    if value is None:
+        return None
+    return int(value)
+
+
+
+def becomeWorker(reactor):
+    """
+    Make the TCP and UDP ports of a reactor listen with C{SO_REUSEPORT}
+    unless told otherwise, so that they can share their port number with the
+    other workers.
+
+    @param reactor: The reactor of the current process.
+    @type reactor: L{twisted.internet.posixbase.PosixReactorBase}
+    """
+    reactor.reusePortByDefault = True
+
+
+
+def workersService(count, args, reactor, environ=os.environ, cwd=None):
+    """
+    Create a service running worker processes.
+
+    @param count: The number of workers.
+    @type count: L{int}
+
+    @param args: The command line of each worker, starting with the
+        executable.
+    @type args: L{list} of L{str}
+
+    @param reactor: The reactor used to start the workers.
+    @type reactor: L{twisted.internet.interfaces.IReactorProcess}
+
+    @param environ: The environment of the workers, to which their number is
+        added.
+    @type environ: L{dict}
+
+    @param cwd: The working directory of the workers, or L{None} for the
+        current one.
+    @type cwd: L{str} or L{None}
+
+    @return: A service which starts the workers when it is started, restarts
+        them when they exit, and stops them when it is stopped.
+    @rtype: L{twisted.runner.procmon.ProcessMonitor}
+    """
+    # Imported here, as procmon imports the global reactor, which must have
+    # been selected beforehand.
+    from twisted.runner.procmon import ProcessMonitor
+
+    class WorkersMonitor(ProcessMonitor):
+        """
+        A L{ProcessMonitor} which also starts its processes when it is
+        started with privileges, so that workers can bind privileged ports
+        before shedding their privileges.
+        """
+
+        def privilegedStartService(self):
+            ProcessMonitor.privilegedStartService(self)
+            for name in sorted(self._processes):
+                self.startProcess(name)
+
+    monitor = WorkersMonitor(reactor=reactor)
+    for i in range(count):
+        env = dict(environ)
+        env[WORKER_ID_ENVIRONMENT_VARIABLE] = str(i)
+        monitor.addProcess("worker-{}".format(i), list(args), env=env,
+                           cwd=cwd)
+    return monitor
+
+
+
+def twistWorkerArguments(argv):
+    """
+    Build the command line of a C{twist} worker.
+
+    @param argv: The command line of the supervising C{twist} process.
+    @type argv: L{list} of L{str}
+
+    @return: The command line of its workers.
+    @rtype: L{list} of L{str}
+    """
+    return [sys.executable, "-c",
+            "from twisted.application.twist._twist import Twist; "
+            "Twist.main()"] + list(argv[1:])
+
+
+
+def twistdWorkerArguments(argv):
+    """
+    Build the command line of a C{twistd} worker.
+
+    @param argv: The command line of the supervising C{twistd} process.
+    @type argv: L{list} of L{str}
+
+    @return: The command line of its workers.
+    @rtype: L{list} of L{str}
+    """
+    return [sys.executable, "-c",
+            "from twisted.scripts.twistd import run; run()"] + list(argv[1:])
@@ -0,0 +1,147 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.application.runner._workers}.
+"""
+
+import sys
+
+from twisted.test.proto_helpers import MemoryReactor
+from twisted.runner.test.test_procmon import DummyProcessReactor
+from .._workers import (
+    WORKER_ID_ENVIRONMENT_VARIABLE, workerCount, workerID, becomeWorker,
+    workersService, twistWorkerArguments, twistdWorkerArguments,
+)
+
+import twisted.trial.unittest
+
+
+
+class WorkerCountTests(twisted.trial.unittest.TestCase):
+    """
+    Tests for L{workerCount}.
+    """
+
+    def test_positive(self):
+        """
+        L{workerCount} converts a positive integer.
+        """
+        self.assertEqual(workerCount("8"), 8)
+
+
+    def test_invalid(self):
+        """
+        L{workerCount} raises L{ValueError} for values which are not positive
+        integers.
+        """
+        for value in ("0", "-2", "two"):
+            self.assertRaises(ValueError, workerCount, value)
+
+
+
+class WorkerIDTests(twisted.trial.unittest.TestCase):
+    """
+    Tests for L{workerID} and L{becomeWorker}.
+    """
+
+    def test_notWorker(self):
+        """
+        L{workerID} returns L{None} if the worker environment variable is not
+        set.
+        """
+        self.assertIsNone(workerID({}))
+
+
+    def test_worker(self):
+        """
+        L{workerID} returns the number of the worker from the environment.
+        """
+        self.assertEqual(workerID({WORKER_ID_ENVIRONMENT_VARIABLE: "3"}), 3)
+
+
+    def test_becomeWorker(self):
+        """
+        L{becomeWorker} makes the TCP and UDP ports of the reactor listen
+        with C{SO_REUSEPORT} by default.
+        """
+        reactor = MemoryReactor()
+        becomeWorker(reactor)
+        self.assertTrue(reactor.reusePortByDefault)
+
+
+
+class WorkersServiceTests(twisted.trial.unittest.TestCase):
+    """
+    Tests for L{workersService}.
+    """
+
+    def setUp(self):
+        self.reactor = DummyProcessReactor()
+        self.service = workersService(
+            2, ["python", "-m", "twisted", "web"], self.reactor,
+            environ={"HOME": "/home/user"}, cwd="/srv")
+
+
+    def test_processes(self):
+        """
+        L{workersService} starts one process per worker, each with its
+        number in its environment, when it is started.
+        """
+        self.service.startService()
+        processes = self.reactor.spawnedProcesses
+        self.assertEqual(
+            sorted(process._environment[WORKER_ID_ENVIRONMENT_VARIABLE]
+                   for process in processes),
+            ["0", "1"])
+        for process in processes:
+            self.assertEqual(process._environment["HOME"], "/home/user")
+            self.assertEqual(process._args, ["python", "-m", "twisted", "web"])
+            self.assertEqual(process._path, "/srv")
+
+
+    def test_restart(self):
+        """
+        L{workersService} restarts workers which exit.
+        """
+        self.service.startService()
+        self.reactor.advance(self.service.threshold)
+        self.service.protocols["worker-1"].transport.processEnded(0)
+        self.reactor.advance(0)
+        self.assertEqual(len(self.reactor.spawnedProcesses), 3)
+        self.assertIn("worker-1", self.service.protocols)
+
+
+    def test_privilegedStart(self):
+        """
+        L{workersService} starts its workers when it is started with
+        privileges, and does not start them again when it is started.
+        """
+        self.service.privilegedStartService()
+        self.assertEqual(len(self.reactor.spawnedProcesses), 2)
+        self.service.startService()
+        self.assertEqual(len(self.reactor.spawnedProcesses), 2)
+
+
+
+class WorkerArgumentsTests(twisted.trial.unittest.TestCase):
+    """
+    Tests for L{twistWorkerArguments} and L{twistdWorkerArguments}.
+    """
+
+    def test_twist(self):
+        """
+        L{twistWorkerArguments} runs C{twist} with the same arguments.
+        """
+        args = twistWorkerArguments(["twist", "--workers=2", "web"])
+        self.assertEqual(args[0], sys.executable)
+        self.assertEqual(args[-2:], ["--workers=2", "web"])
+
+
+    def test_twistd(self):
+        """
+        L{twistdWorkerArguments} runs C{twistd} with the same arguments.
+        """
+        args = twistdWorkerArguments(["twistd", "--workers=2", "dns"])
+        self.assertEqual(args[0], sys.executable)
+        self.assertEqual(args[-2:], ["--workers=2", "dns"])
@@ -19,6 +19,7 @@ from twisted.plugin import getPlugins
 
 from ..reactors import installReactor, NoSuchReactor, getReactorTypes
 from ..runner._exit import exit, ExitStatus
+from ..runner._workers import workerCount
 from ..service import IServiceMaker
 
 openFile = open
@@ -146,6 +147,19 @@ class TwistOptions(Options):
     opt_log_format.__doc__ = dedent(opt_log_format.__doc__)
 
 
+    def opt_workers(self, count):
+        """
+        Run the plugin in this many worker processes, which share its TCP
+        ports, and restart them when they exit.
+        """
+        try:
+            self["workers"] = workerCount(count)
+        except ValueError:
+            raise UsageError("Invalid number of workers: {}".format(count))
+
+    opt_workers.__doc__ = dedent(opt_workers.__doc__)
+
+
     def selectDefaultLogObserver(self):
         """
         Set C{fileLogObserverFactory} to the default appropriate for the
@@ -6,12 +6,16 @@
 Run a Twisted application.
 """
 
+import os
 import sys
 
 from twisted.python.usage import UsageError
 from ..service import Application, IService
 from ..runner._exit import exit, ExitStatus
 from ..runner._runner import Runner
+from ..runner._workers import (
+    workerID, becomeWorker, workersService, twistWorkerArguments,
+)
 from ._options import TwistOptions
 from twisted.application.app import _exitWithSignal
 from twisted.internet.interfaces import _ISupportsExitSignalCapturing
@@ -66,6 +70,32 @@ class Twist(object):
         return IService(application)
 
 
+    @staticmethod
+    def workersService(reactor, count, argv):
+        """
+        Create a service running the application in worker processes.
+
+        @param reactor: The reactor used to start the workers.
+        @type reactor: L{twisted.internet.interfaces.IReactorProcess}
+
+        @param count: The number of workers.
+        @type count: L{int}
+
+        @param argv: Command line arguments, which the workers are started
+            with.
+        @type argv: L{list}
+
+        @return: The created service.
+        @rtype: L{IService}
+        """
+        application = Application("twist")
+        workersService(
+            count, twistWorkerArguments(argv), reactor, cwd=os.getcwd()
+        ).setServiceParent(application)
+
+        return IService(application)
+
+
     @staticmethod
     def startService(reactor, service):
         """
@@ -119,10 +149,15 @@ class Twist(object):
         options = cls.options(argv)
 
         reactor = options["reactor"]
-        service = cls.service(
-            plugin=options.plugins[options.subCommand],
-            options=options.subOptions,
-        )
+        if "workers" in options and workerID() is None:
+            service = cls.workersService(reactor, options["workers"], argv)
+        else:
+            if workerID() is not None:
+                becomeWorker(reactor)
+            service = cls.service(
+                plugin=options.plugins[options.subCommand],
+                options=options.subOptions,
+            )
 
         cls.startService(reactor, service)
         cls.run(options)
@@ -163,6 +163,27 @@ class OptionsTests(twisted.trial.unittest.TestCase):
         self.assertRaises(UsageError, options.opt_log_level, "cheese")
 
 
+    def test_workers(self):
+        """
+        L{TwistOptions.opt_workers} sets the number of workers.
+        """
+        options = TwistOptions()
+        options.opt_workers("4")
+
+        self.assertEqual(options["workers"], 4)
+
+
+    def test_workersInvalid(self):
+        """
+        L{TwistOptions.opt_workers} with a value which is not a positive
+        integer raises UsageError.
+        """
+        options = TwistOptions()
+
+        self.assertRaises(UsageError, options.opt_workers, "0")
+        self.assertRaises(UsageError, options.opt_workers, "many")
+
+
     def _testLogFile(self, name, expectedStream):
         """
         Set log file name and check the selected output stream.
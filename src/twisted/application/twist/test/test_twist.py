@@ -12,6 +12,7 @@ from twisted.test.proto_helpers import MemoryReactor
 from ...service import IService, MultiService
 from ...runner._exit import ExitStatus
 from ...runner._runner import Runner
+from ...runner._workers import twistWorkerArguments
 from ...runner.test.test_runner import DummyExit
 from ...twist import _twist
 from .._options import TwistOptions
@@ -194,6 +195,58 @@ class TwistTests(twisted.trial.unittest.TestCase):
         self.assertEqual(runners[0].runs, 1)
 
 
+    def test_mainWorkers(self):
+        """
+        L{Twist.main} given C{--workers} starts a service running that many
+        workers instead of the plugin's service.
+        """
+        self.patchStartService()
+        self.patch(_twist, "workerID", lambda: None)
+        self.patch(_twist, "Runner", lambda **kwargs: MemoryRunner())
+
+        Twist.main(["twist", "--workers=3", "web", "--port=tcp:8080"])
+
+        [service] = self.serviceStarts
+        self.assertEqual(service.name, "twist")
+        [monitor] = list(service)
+        self.assertEqual(
+            sorted(monitor._processes),
+            ["worker-0", "worker-1", "worker-2"])
+        self.assertEqual(
+            monitor._processes["worker-0"].args,
+            twistWorkerArguments(
+                ["twist", "--workers=3", "web", "--port=tcp:8080"]))
+
+
+    def test_mainWorker(self):
+        """
+        L{Twist.main} in a worker process runs the plugin's service, and the
+        ports of its reactor listen with C{SO_REUSEPORT}.
+        """
+        self.patchInstallReactor()
+        self.patchStartService()
+        self.patch(_twist, "workerID", lambda: 1)
+        self.patch(_twist, "Runner", lambda **kwargs: MemoryRunner())
+        becameWorker = []
+        self.patch(_twist, "becomeWorker", becameWorker.append)
+
+        Twist.main(["twist", "--reactor=default", "--workers=3", "web"])
+
+        [service] = self.serviceStarts
+        self.assertEqual(service.name, "web")
+        self.assertEqual(becameWorker, [self.installedReactors["default"]])
+
+
+
+class MemoryRunner(object):
+    """
+    A runner which does not run anything.
+    """
+
+    def run(self):
+        pass
+
+
 
 class TwistExitTests(twisted.trial.unittest.TestCase):
     """
@@ -0,0 +1,145 @@
+# -*- test-case-name: twisted.internet.test.test_buffers -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Reusable receive buffers for stream transports.
+
+A reactor whose C{receiveBufferPool} is a L{ReceiveBufferPool} makes its TCP
+connections read with C{recv_into} into buffers borrowed from the pool,
+instead of allocating a new string for every read.  Each connection sizes
+its reads with an L{AdaptiveReadSize}, so that connections which only ever
+receive small messages only borrow small buffers.
+
+@see: L{twisted.internet.interfaces.IBufferReceiver}
+"""
+
+from __future__ import division, absolute_import
+
+
+
+class ReceiveBufferPool(object):
+    """
+    A pool of L{bytearray}s, sorted in size classes which are powers of two.
+
+    @ivar minimumSize: The size of the smallest buffers handed out.
+    @type minimumSize: L{int}
+
+    @ivar maximumFree: The largest number of unused buffers kept for each
+        size class.
+    @type maximumFree: L{int}
+
+    @ivar allocated: The number of buffers allocated so far.
+    @type allocated: L{int}
+
+    @ivar reused: The number of times a buffer was taken from the pool
+        instead of being allocated.
+    @type reused: L{int}
+
+    @ivar _free: Maps each size class to a L{list} of its unused buffers.
+    @type _free: L{dict}
+    """
+
+    def __init__(self, minimumSize=2048, maximumFree=16):
+        """
+        @param minimumSize: The size of the smallest buffers handed out,
+            which is rounded up to a power of two.
+        @type minimumSize: L{int}
+
+        @param maximumFree: The largest number of unused buffers kept for
+            each size class.
+        @type maximumFree: L{int}
+        """
+        self.minimumSize = 1 << (minimumSize - 1).bit_length()
+        self.maximumFree = maximumFree
+        self.allocated = 0
+        self.reused = 0
+        self._free = {}
+
+
+    def acquire(self, size):
+        """
+        Borrow a buffer.
+
+        @param size: The number of bytes the buffer must hold at least.
+        @type size: L{int}
+
+        @return: A buffer, which should be given back to L{release} once it
+            is not used anymore.
+        @rtype: L{bytearray}
+        """
+        size = max(1 << (size - 1).bit_length(), self.minimumSize)
+        free = self._free.get(size)
+        if free:
+            self.reused += 1
+            return free.pop()
+        self.allocated += 1
+        return bytearray(size)
+
+
+    def release(self, buffer):
+        """
+        Give back a buffer returned by L{acquire}.
+
+        @param buffer: The buffer, which must not be used after this call.
+        @type buffer: L{bytearray}
+        """
+        free = self._free.setdefault(len(buffer), [])
+        if len(free) < self.maximumFree:
+            free.append(buffer)
+
+
+
+class AdaptiveReadSize(object):
+    """
+    Choose how many bytes a connection should try to read next, from the
+    number of bytes it read recently.
+
+    The read size doubles as soon as a read fills the whole requested size,
+    and halves after two consecutive reads which would have fit in half of
+    it.
+
+    @ivar size: The number of bytes to read next.
+    @type size: L{int}
+    """
+
+    __slots__ = ('size', '_minimum', '_maximum', '_shrink')
+
+    def __init__(self, minimum, maximum, initial=None):
+        """
+        @param minimum: The smallest read size.
+        @type minimum: L{int}
+
+        @param maximum: The largest read size.
+        @type maximum: L{int}
+
+        @param initial: The first read size, C{minimum} by default.
+        @type initial: L{int} or L{None}
+        """
+        self._minimum = minimum
+        self._maximum = maximum
+        self._shrink = False
+        if initial is None:
+            initial = minimum
+        self.size = min(max(initial, minimum), maximum)
+
+
+    def record(self, received):
+        """
+        Record the result of a read of C{self.size} bytes.
+
+        @param received: The number of bytes which were read.
+        @type received: L{int}
+        """
+        size = self.size
+        if received >= size:
+            self.size = min(size * 2, self._maximum)
+            self._shrink = False
+        elif received <= size // 2 and size > self._minimum:
+            if self._shrink:
+                self.size = max(size // 2, self._minimum)
+                self._shrink = False
+            else:
+                self._shrink = True
+        else:
+            self._shrink = False
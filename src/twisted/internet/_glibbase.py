@@ -312,6 +312,16 @@ class GlibReactorBase(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
         return result
 
 
+    def callSoon(self, *args, **kwargs):
+        """
+        Schedule a call for the next iteration.
+        """
+        result = posixbase.PosixReactorBase.callSoon(self, *args, **kwargs)
+        # Make sure we'll get woken up to run this new call:
+        self._reschedule()
+        return result
+
+
     def _reschedule(self):
         """
         Schedule a glib timeout for C{_simulate}.
@@ -0,0 +1,186 @@
+# -*- test-case-name: twisted.internet.test.test_instrumentation -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measurements of how long the reactor spends running application code.
+
+A L{ReactorInstrumentation} installed with
+L{twisted.internet.base.ReactorBase.installInstrumentation} times every
+callback the reactor runs (delayed calls, calls made with C{callSoon} or
+C{callFromThread}, and the C{doRead}/C{doWrite} calls of the poll-based
+reactors), measures how late delayed calls run, and logs the callbacks
+slower than a threshold.  It only keeps counters and fixed-size histograms,
+so that it is cheap enough to leave installed in production; its
+L{ReactorInstrumentation.snapshot} can be polled to export them.
+
+@see: L{twisted.internet.base.ReactorBase.installInstrumentation}
+"""
+
+from __future__ import division, absolute_import
+
+from twisted.logger import Logger
+from twisted.python import reflect
+from twisted.python._histogram import DEFAULT_BOUNDS, Histogram
+from twisted.python.runtime import seconds as runtimeSeconds
+
+
+
+def describe(subject):
+    """
+    Describe what the reactor called, for the log message about a slow
+    callback.
+
+    @param subject: A L{twisted.internet.base.DelayedCall}, whose string
+        includes the stack where it was created if its C{debug} is set, an
+        object with a C{logPrefix} method such as a file descriptor, or a
+        callable.
+
+    @rtype: L{str}
+    """
+    logPrefix = getattr(subject, "logPrefix", None)
+    if logPrefix is not None:
+        try:
+            prefix = logPrefix()
+        except:
+            prefix = "?"
+        return "%s (%s)" % (reflect.safe_str(prefix),
+                            reflect.safe_repr(subject))
+    if callable(subject):
+        return reflect.safe_repr(subject)
+    return reflect.safe_str(subject)
+
+
+
+class ReactorInstrumentation(object):
+    """
+    Statistics about the time spent by a reactor in the callbacks it runs.
+
+    @ivar slowCallbackThreshold: Callbacks which take longer than this
+        number of seconds are logged.  L{None} disables these messages.
+    @type slowCallbackThreshold: L{float} or L{None}
+
+    @ivar iterations: The number of reactor iterations completed.
+    @type iterations: L{int}
+
+    @ivar iterationTimes: The time spent in callbacks by each reactor
+        iteration, excluding the time spent waiting for events.
+    @type iterationTimes: L{Histogram}
+
+    @ivar lags: How late, in seconds, each delayed call was run compared to
+        the time it was scheduled for.
+    @type lags: L{Histogram}
+
+    @ivar callbackTimes: The duration of each callback.
+    @type callbackTimes: L{Histogram}
+
+    @ivar slowCallbacks: The number of callbacks slower than
+        C{slowCallbackThreshold}.
+    @type slowCallbacks: L{int}
+
+    @ivar _clock: Returns the current time, in seconds.
+    @type _clock: 0-argument callable returning L{float}
+
+    @ivar _iterationTime: The time spent in callbacks by the current
+        iteration so far.
+    @type _iterationTime: L{float}
+    """
+
+    _log = Logger()
+
+    def __init__(self, slowCallbackThreshold=0.1, bounds=DEFAULT_BOUNDS,
+                 clock=runtimeSeconds):
+        """
+        @param slowCallbackThreshold: See
+            L{ReactorInstrumentation.slowCallbackThreshold}.
+
+        @param bounds: The bounds of the buckets of the histograms.
+        @type bounds: See L{Histogram.bounds}.
+
+        @param clock: See L{ReactorInstrumentation._clock}.
+        """
+        self.slowCallbackThreshold = slowCallbackThreshold
+        self._clock = clock
+        self.iterationTimes = Histogram(bounds)
+        self.lags = Histogram(bounds)
+        self.callbackTimes = Histogram(bounds)
+        self.reset()
+
+
+    def reset(self):
+        """
+        Forget all the measurements.
+        """
+        self.iterations = 0
+        self.slowCallbacks = 0
+        self._iterationTime = 0.0
+        self.iterationTimes.reset()
+        self.lags.reset()
+        self.callbackTimes.reset()
+
+
+    def run(self, _subject, _f, *args, **kwargs):
+        """
+        Run a callback and record how long it took.
+
+        @param _subject: What the reactor is calling, which
+            L{describe} describes if the callback is slow.
+
+        @param _f: The callable to call.
+        @param args: The positional arguments to pass to C{_f}.
+        @param kwargs: The keyword arguments to pass to C{_f}.
+
+        @return: The result of C{_f}, whose exceptions are propagated.
+        """
+        clock = self._clock
+        start = clock()
+        try:
+            return _f(*args, **kwargs)
+        finally:
+            duration = clock() - start
+            self.callbackTimes.add(duration)
+            self._iterationTime += duration
+            threshold = self.slowCallbackThreshold
+            if threshold is not None and duration > threshold:
+                self.slowCallbacks += 1
+                self._log.warn(
+                    "Reactor callback took {duration:.3f} seconds: "
+                    "{description}",
+                    duration=duration, description=describe(_subject))
+
+
+    def delayedCallRun(self, lag):
+        """
+        Record that a delayed call is being run.
+
+        @param lag: How late it is, in seconds.
+        @type lag: L{float}
+        """
+        self.lags.add(max(lag, 0.0))
+
+
+    def iterationFinished(self):
+        """
+        Record the end of a reactor iteration.
+        """
+        self.iterations += 1
+        self.iterationTimes.add(self._iterationTime)
+        self._iterationTime = 0.0
+
+
+    def snapshot(self):
+        """
+        Get all the measurements made so far.
+
+        @return: A L{dict} with the number of C{iterations} and
+            C{slowCallbacks}, and the L{Histogram.snapshot} of
+            C{iterationTimes}, C{lags} and C{callbackTimes}.
+        @rtype: L{dict}
+        """
+        return {
+            "iterations": self.iterations,
+            "slowCallbacks": self.slowCallbacks,
+            "iterationTimes": self.iterationTimes.snapshot(),
+            "lags": self.lags.snapshot(),
+            "callbackTimes": self.callbackTimes.snapshot(),
+        }
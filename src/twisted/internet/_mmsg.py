@@ -0,0 +1,373 @@
+# -*- test-case-name: twisted.internet.test.test_udp_internals -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Very low-level ctypes-based interface to the C{recvmmsg(2)} and
+C{sendmmsg(2)} system calls of Linux, which receive and send several
+datagrams at once.
+
+ctypes and a version of libc which provides these system calls are
+required; L{ImportError} is raised otherwise.
+"""
+
+from __future__ import division, absolute_import
+
+import ctypes
+import os
+import socket
+import struct
+
+from twisted.python.runtime import platform
+
+if not platform.isLinux():
+    raise ImportError("recvmmsg and sendmmsg are only available on Linux.")
+
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [
+        ("iov_base", ctypes.c_void_p),
+        ("iov_len", ctypes.c_size_t),
+    ]
+
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_hdr", _MsgHdr),
+        ("msg_len", ctypes.c_uint),
+    ]
+
+
+
+# The size of struct sockaddr_storage.
+_SOCKADDR_SIZE = 128
+
+
+
+def _structFormat(fields, size):
+    """
+    Build a native L{struct} format matching the layout of a C structure.
+
+    @param fields: The C{(offset, format)} pairs of the fields of the
+        structure, in order.
+    @type fields: L{list} of L{tuple}
+
+    @param size: The size of the structure.
+    @type size: L{int}
+
+    @rtype: L{str}
+    """
+    result = "@"
+    position = 0
+    for offset, fieldFormat in fields:
+        if offset > position:
+            result += "%dx" % (offset - position,)
+        result += fieldFormat
+        position = offset + struct.calcsize("@" + fieldFormat)
+    if size > position:
+        result += "%dx" % (size - position,)
+    return result
+
+
+
+def _unsignedFormat(size):
+    """
+    Find the native L{struct} format of an unsigned integer of a given size.
+
+    The C{"N"} format of C{size_t} is not available on Python 2.
+
+    @param size: The size of the integer, in bytes.
+    @type size: L{int}
+
+    @rtype: L{str}
+    """
+    for code in "ILQ":
+        if struct.calcsize("@" + code) == size:
+            return code
+    raise ImportError("No struct format for %d-byte integers" % (size,))
+
+
+
+# Packing the structures given to the system calls with struct is much
+# faster than setting the fields of ctypes structures one at a time.
+_SIZE_T = _unsignedFormat(ctypes.sizeof(ctypes.c_size_t))
+_iovec = struct.Struct(_structFormat(
+    [(_IOVec.iov_base.offset, "P"), (_IOVec.iov_len.offset, _SIZE_T)],
+    ctypes.sizeof(_IOVec)))
+_mmsghdr = struct.Struct(_structFormat(
+    [(_MsgHdr.msg_name.offset, "P"), (_MsgHdr.msg_namelen.offset, "I"),
+     (_MsgHdr.msg_iov.offset, "P"), (_MsgHdr.msg_iovlen.offset, _SIZE_T),
+     (_MsgHdr.msg_control.offset, "P"),
+     (_MsgHdr.msg_controllen.offset, _SIZE_T),
+     (_MsgHdr.msg_flags.offset, "i"), (_MMsgHdr.msg_len.offset, "I")],
+    ctypes.sizeof(_MMsgHdr)))
+_msgLen = struct.Struct("@I")
+_msgLenOffset = _MMsgHdr.msg_len.offset
+
+
+
+def _error():
+    """
+    Create the exception for a failed system call.
+
+    @rtype: L{socket.error}
+    """
+    errno = ctypes.get_errno()
+    return socket.error(errno, os.strerror(errno))
+
+
+
+def _address(data):
+    """
+    Get the address of the contents of a L{bytes} object, which must be kept
+    alive while the address is used.
+
+    @type data: L{bytes}
+    @rtype: L{int}
+    """
+    return ctypes.cast(ctypes.c_char_p(data), ctypes.c_void_p).value
+
+
+
+def decodeAddress(name, offset):
+    """
+    Decode an IPv4 or IPv6 socket address.
+
+    @param name: A buffer containing the address, as a C{struct sockaddr}.
+    @param offset: The position of the address in C{name}.
+    @type offset: L{int}
+
+    @return: The C{(host, port)} pair for the address, as returned by
+        L{socket.socket.recvfrom} without flow information and scope ID.
+    @rtype: L{tuple}
+    """
+    (family,) = struct.unpack_from("=H", name, offset)
+    (port,) = struct.unpack_from("!H", name, offset + 2)
+    if family == socket.AF_INET:
+        host = socket.inet_ntop(
+            socket.AF_INET, name[offset + 4:offset + 8].tobytes())
+    else:
+        host = socket.inet_ntop(
+            socket.AF_INET6, name[offset + 8:offset + 24].tobytes())
+    return (host, port)
+
+
+
+def encodeAddress(family, addr):
+    """
+    Encode an IPv4 or IPv6 socket address.
+
+    @param family: L{socket.AF_INET} or L{socket.AF_INET6}.
+    @param addr: A C{(host, port)} pair, whose host is an IP address or, for
+        IPv4, C{"<broadcast>"}.
+    @type addr: L{tuple}
+
+    @return: The address, as a C{struct sockaddr}.
+    @rtype: L{bytes}
+
+    @raise ValueError: If the address cannot be encoded, for instance if it
+        includes a scope ID.
+    """
+    host, port = addr[:2]
+    if family == socket.AF_INET:
+        if host == "<broadcast>":
+            host = "255.255.255.255"
+        try:
+            packed = socket.inet_pton(socket.AF_INET, host)
+        except (socket.error, TypeError):
+            raise ValueError("Cannot encode IPv4 address %r" % (host,))
+        return (struct.pack("=H", family) + struct.pack("!H", port) +
+                packed + b"\0" * 8)
+    try:
+        packed = socket.inet_pton(socket.AF_INET6, host)
+    except (socket.error, TypeError):
+        raise ValueError("Cannot encode IPv6 address %r" % (host,))
+    return (struct.pack("=H", family) + struct.pack("!HI", port, 0) +
+            packed + struct.pack("=I", 0))
+
+
+
+class Receiver(object):
+    """
+    Receive batches of datagrams from sockets with C{recvmmsg(2)}, into
+    buffers allocated once.
+
+    @ivar count: The largest number of datagrams received at once.
+    @type count: L{int}
+
+    @ivar size: The largest number of bytes received for each datagram.
+        Longer datagrams are truncated.
+    @type size: L{int}
+
+    @ivar _addresses: Maps the encoded addresses which datagrams were
+        recently received from to their decoded form.
+    @type _addresses: L{dict}
+    """
+
+    _maximumAddresses = 1024
+
+    def __init__(self, count, size):
+        """
+        @param count: See L{Receiver.count}.
+        @param size: See L{Receiver.size}.
+        """
+        self.count = count
+        self.size = size
+        self._data = ctypes.create_string_buffer(count * size)
+        self._names = ctypes.create_string_buffer(count * _SOCKADDR_SIZE)
+        self._iovecs = ctypes.create_string_buffer(count * _iovec.size)
+        self._messages = ctypes.create_string_buffer(count * _mmsghdr.size)
+        data = ctypes.addressof(self._data)
+        names = ctypes.addressof(self._names)
+        iovecs = ctypes.addressof(self._iovecs)
+        for i in range(count):
+            _iovec.pack_into(self._iovecs, i * _iovec.size, data + i * size,
+                             size)
+            # The kernel sets the length of each name to that of the address
+            # it receives, which is the same for all the datagrams received
+            # by a socket: there is no need to reset it.
+            _mmsghdr.pack_into(
+                self._messages, i * _mmsghdr.size,
+                names + i * _SOCKADDR_SIZE, _SOCKADDR_SIZE,
+                iovecs + i * _iovec.size, 1, 0, 0, 0, 0)
+        self._dataView = memoryview(self._data)
+        self._namesView = memoryview(self._names)
+        self._messagesView = memoryview(self._messages)
+        self._addresses = {}
+
+
+    def receive(self, fileno):
+        """
+        Receive as many datagrams as are available, up to C{self.count}.
+
+        @param fileno: The file descriptor of a non-blocking IPv4 or IPv6
+            datagram socket.
+        @type fileno: L{int}
+
+        @return: The received datagrams, as C{(datagram, (host, port))}
+            pairs.
+        @rtype: L{list} of L{tuple}
+
+        @raise socket.error: If no datagram could be received.
+        """
+        received = _recvmmsg(fileno, self._messages, self.count, 0, None)
+        if received < 0:
+            raise _error()
+
+        size = self.size
+        dataView = self._dataView
+        names = self._namesView
+        messages = self._messagesView
+        addresses = self._addresses
+        unpackLength = _msgLen.unpack_from
+        datagrams = []
+        for i in range(received):
+            start = i * size
+            (length,) = unpackLength(
+                messages, i * _mmsghdr.size + _msgLenOffset)
+            nameStart = i * _SOCKADDR_SIZE
+            # The family, port, flow information and address: enough to
+            # tell IPv4 and IPv6 addresses apart.
+            name = names[nameStart:nameStart + 24].tobytes()
+            addr = addresses.get(name)
+            if addr is None:
+                if len(addresses) >= self._maximumAddresses:
+                    addresses.clear()
+                addr = addresses[name] = decodeAddress(names, nameStart)
+            datagrams.append((dataView[start:start + length].tobytes(), addr))
+        return datagrams
+
+
+
+def send(fileno, datagrams):
+    """
+    Send several datagrams with C{sendmmsg(2)}.
+
+    @param fileno: The file descriptor of a non-blocking datagram socket.
+    @type fileno: L{int}
+
+    @param datagrams: The datagrams to send, as C{(datagram, name)} pairs
+        where C{datagram} is L{bytes} and C{name} is an address encoded by
+        L{encodeAddress}, or L{None} for a connected socket.
+    @type datagrams: L{list} of L{tuple}
+
+    @return: The number of datagrams sent, from the start of C{datagrams}.
+    @rtype: L{int}
+
+    @raise socket.error: If the first datagram could not be sent.
+    """
+    # The contents of all the datagrams and names are gathered in two
+    # buffers, which the iovecs and messages point into.
+    data = b"".join([datagram for datagram, name in datagrams])
+    names = b"".join([name for datagram, name in datagrams if name])
+    dataAddress = _address(data)
+    namesAddress = _address(names)
+    iovecs = []
+    position = 0
+    for datagram, name in datagrams:
+        iovecs.append(_iovec.pack(dataAddress + position, len(datagram)))
+        position += len(datagram)
+    iovecs = b"".join(iovecs)
+    iovecsAddress = _address(iovecs)
+
+    messages = []
+    position = 0
+    for i, (datagram, name) in enumerate(datagrams):
+        iovec = iovecsAddress + i * _iovec.size
+        if name:
+            messages.append(_mmsghdr.pack(
+                namesAddress + position, len(name), iovec, 1, 0, 0, 0, 0))
+            position += len(name)
+        else:
+            messages.append(_mmsghdr.pack(0, 0, iovec, 1, 0, 0, 0, 0))
+    # The kernel writes the length of each datagram sent into the messages.
+    messages = ctypes.create_string_buffer(b"".join(messages))
+
+    sent = _sendmmsg(fileno, messages, len(datagrams), 0)
+    if sent < 0:
+        raise _error()
+    return sent
+
+
+
+def initializeModule(libc):
+    """
+    Initialize the module, checking if the expected APIs exist and setting
+    the argtypes and restype of C{recvmmsg} and C{sendmmsg}.
+
+    @return: The C{recvmmsg} and C{sendmmsg} functions.
+    """
+    for function in ("recvmmsg", "sendmmsg"):
+        if getattr(libc, function, None) is None:
+            raise ImportError("libc with %s needed" % (function,))
+    libc.recvmmsg.argtypes = [
+        ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+        ctypes.c_void_p]
+    libc.recvmmsg.restype = ctypes.c_int
+    libc.sendmmsg.argtypes = [
+        ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int]
+    libc.sendmmsg.restype = ctypes.c_int
+    return libc.recvmmsg, libc.sendmmsg
+
+
+
+# The C library is already loaded by the Python interpreter: look its symbols
+# up in the interpreter rather than searching for it with
+# ctypes.util.find_library, which runs external programs.
+libc = ctypes.CDLL(None, use_errno=True)
+_recvmmsg, _sendmmsg = initializeModule(libc)
@@ -72,6 +72,20 @@ class _BypassTLS(object):
         return self._base.loseConnection(self._connection, *args, **kwargs)
 
 
+    def cork(self):
+        """
+        Hold back the bytes written directly to the connection.
+        """
+        return self._base.cork(self._connection)
+
+
+    def uncork(self):
+        """
+        Release the bytes written directly to the connection.
+        """
+        return self._base.uncork(self._connection)
+
+
     def registerProducer(self, producer, streaming):
         """
         Register a producer with the underlying connection.
@@ -217,6 +231,29 @@ class ConnectionMixin(object):
             FileDescriptor.loseConnection(self)
 
 
+    def cork(self):
+        """
+        Hold back the data written to this connection, in the TLS layer if
+        TLS has been started, so that it is encrypted into as few records as
+        possible.
+        """
+        if self.TLS:
+            self.protocol.cork()
+        else:
+            FileDescriptor.cork(self)
+
+
+    def uncork(self):
+        """
+        Undo one call to L{cork}.  A call made before TLS was started is
+        undone first.
+        """
+        if self._corked:
+            FileDescriptor.uncork(self)
+        elif self.TLS:
+            self.protocol.uncork()
+
+
     def registerProducer(self, producer, streaming):
         """
         Register a producer.
@@ -0,0 +1,90 @@
+# -*- test-case-name: twisted.internet.test.test_processpool -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+The program run by the worker processes of a
+L{twisted.internet.processpool.ProcessPool}.
+
+It answers the calls sent by the pool on its standard input, on its standard
+output, and exits when its standard input is closed.  Anything the functions
+it runs print goes to its standard error, which the pool logs.
+"""
+
+from __future__ import division, absolute_import
+
+import os
+import pickle
+
+from twisted.internet.processpool import _Call, RemoteCallError
+from twisted.internet.protocol import FileWrapper
+from twisted.protocols.amp import AMP
+from twisted.python import reflect, util
+from twisted.python.failure import Failure
+
+
+
+class WorkerProtocol(AMP):
+    """
+    The worker side of the protocol of a process pool.
+    """
+
+    def call(self, call):
+        """
+        Run a function.
+
+        @param call: The pickle of the function and its arguments.
+        @type call: L{bytes}
+
+        @return: The response of L{_Call}.
+        """
+        try:
+            f, args, kwargs = pickle.loads(call)
+            outcome = (True, f(*args, **kwargs))
+        except BaseException:
+            failure = Failure()
+            outcome = (False, failure.value)
+        try:
+            data = pickle.dumps(outcome, pickle.HIGHEST_PROTOCOL)
+            if not outcome[0]:
+                # Many exceptions can be pickled but not unpickled.
+                pickle.loads(data)
+        except Exception:
+            if outcome[0]:
+                failure = Failure()
+            data = pickle.dumps((False, RemoteCallError(
+                reflect.qual(failure.type), reflect.safe_str(failure.value),
+                failure.getTraceback())), pickle.HIGHEST_PROTOCOL)
+        return {"outcome": data}
+
+    _Call.responder(call)
+
+
+
+def main(stdin=0, stdout=1):
+    """
+    Answer the calls sent on a file descriptor until it is closed.
+
+    @param stdin: The file descriptor the calls are read from.
+    @type stdin: L{int}
+
+    @param stdout: The file descriptor the answers are written to, which is
+        made to point to the standard error so that the output of the
+        functions does not get mixed with the answers.
+    @type stdout: L{int}
+    """
+    output = os.fdopen(os.dup(stdout), "wb")
+    os.dup2(2, stdout)
+    protocol = WorkerProtocol()
+    protocol.makeConnection(FileWrapper(output))
+    while True:
+        data = util.untilConcludes(os.read, stdin, 65536)
+        if not data:
+            break
+        protocol.dataReceived(data)
+        output.flush()
+
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ from __future__ import division, absolute_import
 
 __metaclass__ = type
 
+from collections import OrderedDict
 from socket import (getaddrinfo, AF_INET, AF_INET6, AF_UNSPEC, SOCK_STREAM,
                     SOCK_DGRAM, gaierror)
 
@@ -203,6 +204,251 @@ class SimpleResolverComplexifier(object):
 
 
 
+@implementer(IResolutionReceiver)
+class _LookupReceiver(object):
+    """
+    An L{IResolutionReceiver} which collects the addresses of a lookup made by
+    a L{CachingHostResolver}.
+    """
+
+    def __init__(self, cachingResolver, key):
+        """
+        @param cachingResolver: The resolver which made the lookup.
+        @type cachingResolver: L{CachingHostResolver}
+
+        @param key: The cache key of the lookup.
+        @type key: L{tuple}
+        """
+        self._cachingResolver = cachingResolver
+        self._key = key
+        self._addresses = []
+
+
+    def resolutionBegan(self, resolution):
+        """
+        See L{IResolutionReceiver.resolutionBegan}
+
+        @param resolution: See L{IResolutionReceiver.resolutionBegan}
+        """
+
+
+    def addressResolved(self, address):
+        """
+        See L{IResolutionReceiver.addressResolved}
+
+        @param address: See L{IResolutionReceiver.addressResolved}
+        """
+        self._addresses.append(address)
+
+
+    def resolutionComplete(self):
+        """
+        See L{IResolutionReceiver.resolutionComplete}
+        """
+        self._cachingResolver._lookupComplete(self._key, self._addresses)
+
+
+
+class _CacheEntry(object):
+    """
+    The remembered result of a lookup.
+
+    @ivar addresses: The addresses found, empty if the lookup failed.
+    @type addresses: L{list} of L{IAddress}
+
+    @ivar expires: When the entry stops being used, in seconds since the
+        epoch.
+    @type expires: L{float}
+    """
+
+    def __init__(self, addresses, expires):
+        self.addresses = addresses
+        self.expires = expires
+
+
+
+@implementer(IHostnameResolver)
+class CachingHostResolver(object):
+    """
+    An L{IHostnameResolver} which remembers the results of another one.
+
+    Found addresses are remembered for C{positiveTTL} seconds and failed
+    lookups for C{negativeTTL} seconds; a TTL of C{0} disables that part of
+    the cache.  Resolutions of a name already being looked up wait for that
+    lookup rather than starting another.  An entry used less than
+    C{refreshBefore} seconds before it expires is looked up again in the
+    background, so that names in constant use do not wait for a lookup once
+    their entry expired; a failed refresh leaves the entry as it was.
+
+    The addresses are cached for a hostname, port number, set of address
+    types and transport semantics together, as the wrapped resolver gets all
+    of them.  Only the C{maxSize} most recently used entries are kept.
+
+    @ivar hits: The number of resolutions answered from the cache.
+    @type hits: L{int}
+
+    @ivar misses: The number of resolutions which waited for a lookup.
+    @type misses: L{int}
+
+    @ivar lookups: The number of lookups given to the wrapped resolver,
+        background refreshes included.
+    @type lookups: L{int}
+    """
+
+    def __init__(self, resolver, reactor, positiveTTL=60.0, negativeTTL=5.0,
+                 maxSize=1000, refreshBefore=10.0):
+        """
+        @param resolver: The resolver doing the lookups, such as a
+            L{GAIResolver} or a L{SimpleResolverComplexifier}.
+        @type resolver: L{IHostnameResolver}
+
+        @param reactor: The reactor used to tell the time.
+        @type reactor: L{IReactorTime}
+
+        @param positiveTTL: How long found addresses are remembered, in
+            seconds.
+        @type positiveTTL: L{float}
+
+        @param negativeTTL: How long failed lookups are remembered, in
+            seconds.
+        @type negativeTTL: L{float}
+
+        @param maxSize: The maximum number of entries.
+        @type maxSize: L{int}
+
+        @param refreshBefore: How long before its expiry an entry in use is
+            looked up again, in seconds, or C{0} to never refresh entries.
+        @type refreshBefore: L{float}
+        """
+        if maxSize < 1:
+            raise ValueError("maxSize must be at least 1, not %r" % (maxSize,))
+        self._resolver = resolver
+        self._reactor = reactor
+        self._positiveTTL = positiveTTL
+        self._negativeTTL = negativeTTL
+        self._maxSize = maxSize
+        self._refreshBefore = refreshBefore
+        # Entries from the least to the most recently used.
+        self._cache = OrderedDict()
+        # Keys of the lookups in progress to the receivers waiting for them,
+        # with their resolutions.
+        self._waiting = {}
+        self.hits = 0
+        self.misses = 0
+        self.lookups = 0
+
+
+    def resolveHostName(self, resolutionReceiver, hostName, portNumber=0,
+                        addressTypes=None, transportSemantics='TCP'):
+        """
+        See L{IHostnameResolver.resolveHostName}
+
+        @param resolutionReceiver: see interface
+
+        @param hostName: see interface
+
+        @param portNumber: see interface
+
+        @param addressTypes: see interface
+
+        @param transportSemantics: see interface
+
+        @return: see interface
+        """
+        key = (hostName, portNumber,
+               _any if addressTypes is None else frozenset(addressTypes),
+               transportSemantics)
+        resolution = HostResolution(hostName)
+        resolutionReceiver.resolutionBegan(resolution)
+        entry = self._cache.get(key)
+        now = self._reactor.seconds()
+        if entry is not None:
+            if entry.expires > now:
+                self.hits += 1
+                # Make it the most recently used.
+                self._cache[key] = self._cache.pop(key)
+                if (entry.addresses and key not in self._waiting and
+                        entry.expires - now <= self._refreshBefore):
+                    self._lookup(key)
+                _deliver(resolutionReceiver, entry.addresses)
+                return resolution
+            del self._cache[key]
+        self.misses += 1
+        if key in self._waiting:
+            self._waiting[key].append(resolutionReceiver)
+        else:
+            self._lookup(key, resolutionReceiver)
+        return resolution
+
+
+    def _lookup(self, key, resolutionReceiver=None):
+        """
+        Look a name up with the wrapped resolver.
+
+        @param key: The cache key of the lookup.
+        @type key: L{tuple}
+
+        @param resolutionReceiver: The first receiver waiting for the lookup,
+            or L{None} for a background refresh.
+        @type resolutionReceiver: L{IResolutionReceiver}
+        """
+        self.lookups += 1
+        self._waiting[key] = [] if resolutionReceiver is None else [
+            resolutionReceiver]
+        hostName, portNumber, addressTypes, transportSemantics = key
+        try:
+            self._resolver.resolveHostName(
+                _LookupReceiver(self, key), hostName, portNumber,
+                addressTypes, transportSemantics)
+        except:
+            self._waiting.pop(key, None)
+            raise
+
+
+    def _lookupComplete(self, key, addresses):
+        """
+        Remember the result of a lookup, and give it to the receivers waiting
+        for it.
+
+        @param key: The cache key of the lookup.
+        @type key: L{tuple}
+
+        @param addresses: The addresses found.
+        @type addresses: L{list} of L{IAddress}
+        """
+        receivers = self._waiting.pop(key, [])
+        ttl = self._positiveTTL if addresses else self._negativeTTL
+        previous = self._cache.get(key)
+        now = self._reactor.seconds()
+        if not addresses and previous is not None and previous.expires > now:
+            # A failed refresh: keep what was found before.
+            pass
+        elif ttl > 0:
+            self._cache.pop(key, None)
+            self._cache[key] = _CacheEntry(addresses, now + ttl)
+            while len(self._cache) > self._maxSize:
+                self._cache.popitem(last=False)
+        for receiver in receivers:
+            _deliver(receiver, addresses)
+
+
+
+def _deliver(resolutionReceiver, addresses):
+    """
+    Give addresses to a receiver, and tell it the resolution is complete.
+
+    @param resolutionReceiver: The receiver.
+    @type resolutionReceiver: L{IResolutionReceiver}
+
+    @param addresses: The addresses.
+    @type addresses: L{list} of L{IAddress}
+    """
+    for address in addresses:
+        resolutionReceiver.addressResolved(address)
+    resolutionReceiver.resolutionComplete()
+
+
+
 @implementer(IResolutionReceiver)
 class FirstOneWins(object):
     """
@@ -109,6 +109,11 @@ class ThreadedSelectReactor(posixbase.PosixReactorBase):
         self.wakeUp()
         return tple
 
+    def callSoon(self, *args, **kw):
+        call = posixbase.PosixReactorBase.callSoon(self, *args, **kw)
+        self.wakeUp()
+        return call
+
     def _sendToMain(self, msg, *args):
         self.toMainThread.put((msg, args))
         if self.mainWaker is not None:
@@ -16,6 +16,8 @@ from zope.interface import implementer
 from twisted.python.compat import unicode, lazyByteSlice, _PY3
 from twisted.python import reflect, failure
 from twisted.internet import interfaces, main
+from twisted.internet.defer import Deferred, succeed, fail
+from twisted.internet.error import ConnectionDone
 
 if _PY3:
     # Python 3.4+ can join bytes and memoryviews; using a
@@ -31,6 +33,68 @@ else:
         return buffer(bObj, offset) + b"".join(bArray)
 
 
+# The largest number of buffers a single scatter-gather write may be given.
+try:
+    from os import sysconf
+    _IOV_MAX = sysconf('SC_IOV_MAX')
+except (ImportError, ValueError, OSError):
+    _IOV_MAX = 1024
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024
+
+
+
+def _callAtIterationEnd(reactor, f):
+    """
+    Call a function once the current iteration of a reactor ends.
+
+    @param reactor: The reactor.  Its C{callSoon} is used if it provides
+        L{interfaces.IReactorCallSoon}, otherwise a C{callLater} of no delay
+        if it provides L{interfaces.IReactorTime}.
+
+    @param f: The function to call, with no arguments.
+
+    @return: The call, with a C{cancel} method, or L{None} if the reactor
+        provides neither interface.
+    """
+    if interfaces.IReactorCallSoon.providedBy(reactor):
+        return reactor.callSoon(f)
+    if interfaces.IReactorTime.providedBy(reactor):
+        return reactor.callLater(0, f)
+    return None
+
+
+
+class _FileSegment(object):
+    """
+    Part of a file being written by L{FileDescriptor.sendFile}.
+
+    @ivar fileObject: The file to write from.
+
+    @ivar offset: The position in the file of the next byte to write.
+    @type offset: L{int}
+
+    @ivar remaining: The number of bytes left to write.
+    @type remaining: L{int}
+
+    @ivar deferred: The L{Deferred} returned by L{FileDescriptor.sendFile}.
+
+    @ivar copy: Whether the rest of the segment must be read into memory and
+        written as regular data, because the descriptor cannot write it
+        directly from the file.
+    @type copy: L{bool}
+    """
+
+    __slots__ = ('fileObject', 'offset', 'remaining', 'deferred', 'copy')
+
+    def __init__(self, fileObject, offset, remaining, deferred):
+        self.fileObject = fileObject
+        self.offset = offset
+        self.remaining = remaining
+        self.deferred = deferred
+        self.copy = False
+
+
 
 class _ConsumerMixin(object):
     """
@@ -157,7 +221,7 @@ class _LogOwner(object):
 @implementer(
     interfaces.IPushProducer, interfaces.IReadWriteDescriptor,
     interfaces.IConsumer, interfaces.ITransport,
-    interfaces.IHalfCloseableDescriptor)
+    interfaces.ICorkableTransport, interfaces.IHalfCloseableDescriptor)
 class FileDescriptor(_ConsumerMixin, _LogOwner):
     """
     An object which can be operated on by select().
@@ -165,6 +229,18 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
     This is an abstract superclass of all objects which may be notified when
     they are readable or writable; e.g. they have a file-descriptor that is
     valid to be passed to select(2).
+
+    @ivar _statistics: If not L{None}, an object whose C{bytesSent},
+        C{bytesReceived}, C{bufferedBytes} and C{connections} counters are
+        kept up to date with the activity of this descriptor, such as the
+        L{twisted.internet.tcp.Port} which accepted it.
+
+    @ivar _corked: How many more times L{uncork} must be called before the
+        data written is sent.
+    @type _corked: L{int}
+
+    @ivar _uncorkCall: The call releasing the data held back by L{cork} at
+        the end of the reactor iteration, or L{None}.
     """
     connected = 0
     disconnected = 0
@@ -173,6 +249,10 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
     _writeDisconnected = False
     dataBuffer = b""
     offset = 0
+    _sendFileSegment = None
+    _statistics = None
+    _corked = 0
+    _uncorkCall = None
 
     SEND_LIMIT = 128*1024
 
@@ -201,9 +281,23 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
         """
         self.disconnected = 1
         self.connected = 0
+        statistics = self._statistics
+        if statistics is not None:
+            self._statistics = None
+            statistics.connections -= 1
+            statistics.bufferedBytes -= (
+                len(self.dataBuffer) - self.offset + self._tempDataLen)
         if self.producer is not None:
             self.producer.stopProducing()
             self.producer = None
+        segment = self._sendFileSegment
+        if segment is not None:
+            self._sendFileSegment = None
+            segment.deferred.errback(reason)
+        self._corked = 0
+        if self._uncorkCall is not None:
+            self._uncorkCall.cancel()
+            self._uncorkCall = None
         self.stopReading()
         self.stopWriting()
 
@@ -263,10 +357,101 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
         if isinstance(l, Exception) or l < 0:
             return l
         self.offset += l
+        self._countSent(l, l)
+        return self._postWrite()
+
+
+    def _doWriteSequence(self, writeSomeDataSequence):
+        """
+        Implement L{doWrite} for subclasses which can write several buffers
+        with a single system call, such as C{sendmsg(2)} (C{writev(2)}).
+
+        Unlike L{doWrite}, this never concatenates the buffered chunks: up to
+        C{self.SEND_LIMIT} bytes of them are handed to
+        C{writeSomeDataSequence} as they were given to L{write} and
+        L{writeSequence}.
+
+        @param writeSomeDataSequence: A one-argument callable which is given a
+            L{list} of buffers and which behaves like L{writeSomeData} for
+            their concatenation.
+
+        @return: See L{doWrite}.
+        """
+        dataBuffer = self.dataBuffer
+        remaining = len(dataBuffer) - self.offset
+        chunks = []
+        if remaining:
+            chunks.append(lazyByteSlice(dataBuffer, self.offset))
+        size = remaining
+        tempDataBuffer = self._tempDataBuffer
+        for chunk in tempDataBuffer:
+            if size >= self.SEND_LIMIT or len(chunks) >= _IOV_MAX:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+
+        if chunks:
+            l = writeSomeDataSequence(chunks)
+            if isinstance(l, Exception) or l < 0:
+                return l
+            self._countSent(l, l)
+        else:
+            l = 0
+
+        if l < remaining:
+            self.offset += l
+        else:
+            # Drop the chunks which were entirely written.  The first one
+            # which was not becomes the new dataBuffer.
+            l -= remaining
+            index = 0
+            count = len(tempDataBuffer)
+            while index < count and len(tempDataBuffer[index]) <= l:
+                l -= len(tempDataBuffer[index])
+                self._tempDataLen -= len(tempDataBuffer[index])
+                index += 1
+            if l:
+                self.dataBuffer = tempDataBuffer[index]
+                self._tempDataLen -= len(self.dataBuffer)
+                index += 1
+            else:
+                self.dataBuffer = b""
+            self.offset = l
+            del tempDataBuffer[:index]
+        return self._postWrite()
+
+
+    def _countSent(self, sent, unbuffered):
+        """
+        Update the counters of C{self._statistics}, if any, after writing
+        some data.
+
+        @param sent: The number of bytes written.
+        @type sent: L{int}
+
+        @param unbuffered: How many of them were taken from the send buffer.
+        @type unbuffered: L{int}
+        """
+        statistics = self._statistics
+        if statistics is not None:
+            statistics.bytesSent += sent
+            statistics.bufferedBytes -= unbuffered
+
+
+    def _postWrite(self):
+        """
+        Update the state of this descriptor after some buffered data has been
+        written by L{doWrite}.
+
+        @return: See L{doWrite}.
+        """
         # If there is nothing left to send,
         if self.offset == len(self.dataBuffer) and not self._tempDataLen:
             self.dataBuffer = b""
             self.offset = 0
+            # but a file is being sent, go on sending it.
+            if self._sendFileSegment is not None:
+                return self._doSendFile()
             # stop writing.
             self.stopWriting()
             # If I've got a producer who is supposed to supply me with data,
@@ -289,6 +474,101 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
                 return result
         return None
 
+    def sendFile(self, fileObject, offset, count):
+        """
+        Write part of a file, after the data already buffered.
+
+        The bytes are written with L{_writeSomeFileData} where possible, and
+        otherwise read into memory in chunks of C{self.bufferSize} bytes and
+        written like regular data.
+
+        @see: L{twisted.internet.interfaces.ISendFileTransport.sendFile}
+
+        @raise RuntimeError: If another file is still being sent.
+        """
+        if self._sendFileSegment is not None:
+            raise RuntimeError(
+                "Cannot send a file while another one is being sent.")
+        if not self.connected or self._writeDisconnected:
+            return fail(ConnectionDone())
+        if not count:
+            return succeed(None)
+        deferred = Deferred()
+        self._sendFileSegment = _FileSegment(
+            fileObject, offset, count, deferred)
+        self.startWriting()
+        return deferred
+
+
+    def _writeSomeFileData(self, fileObject, offset, count):
+        """
+        Write as much as possible of part of a file, immediately, without
+        reading it into memory.
+
+        This is called by L{sendFile} once no other data is buffered.
+        Subclasses may override it to use a system call such as
+        C{sendfile(2)}.  This implementation always returns L{None}.
+
+        @param fileObject: The file to write from.
+        @param offset: The position in the file of the first byte to write.
+        @type offset: L{int}
+        @param count: The largest number of bytes to write.
+        @type count: L{int}
+
+        @return: The number of bytes written, an exception if the connection
+            was lost, or L{None} if the file cannot be written this way (or
+            has ended), in which case its bytes are read into memory
+            instead.
+        """
+        return None
+
+
+    def _doSendFile(self):
+        """
+        Write some more of the file being sent by L{sendFile}, now that no
+        other data is buffered.
+
+        @return: See L{doWrite}.
+        """
+        segment = self._sendFileSegment
+        if not segment.copy:
+            l = self._writeSomeFileData(
+                segment.fileObject, segment.offset, segment.remaining)
+            if l is None:
+                segment.copy = True
+            elif isinstance(l, Exception) or l < 0:
+                return l
+            else:
+                self._countSent(l, 0)
+        if segment.copy:
+            try:
+                segment.fileObject.seek(segment.offset)
+                data = segment.fileObject.read(
+                    min(self.bufferSize, segment.remaining))
+            except:
+                self._sendFileSegment = None
+                segment.deferred.errback()
+                return self._postWrite()
+            if not data:
+                self._sendFileSegment = None
+                segment.deferred.errback(EOFError(
+                    "File ended with %d bytes left to send." % (
+                        segment.remaining,)))
+                return self._postWrite()
+            l = len(data)
+            # Buffer the data and let the next call of doWrite write it,
+            # possibly through a TLS layer provided by a subclass.
+            self.write(data)
+
+        segment.offset += l
+        segment.remaining -= l
+        if not segment.remaining:
+            self._sendFileSegment = None
+            segment.deferred.callback(None)
+            return self._postWrite()
+        return None
+
+
     def _postLoseConnection(self):
         """Called after a loseConnection(), when all data has been written.
 
@@ -352,8 +632,11 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
         if data:
             self._tempDataBuffer.append(data)
             self._tempDataLen += len(data)
+            if self._statistics is not None:
+                self._statistics.bufferedBytes += len(data)
             self._maybePauseProducer()
-            self.startWriting()
+            if not self._corked:
+                self.startWriting()
 
 
     def writeSequence(self, iovec):
@@ -378,10 +661,55 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
         if not self.connected or not iovec or self._writeDisconnected:
             return
         self._tempDataBuffer.extend(iovec)
+        size = 0
         for i in iovec:
-            self._tempDataLen += len(i)
+            size += len(i)
+        self._tempDataLen += size
+        if self._statistics is not None:
+            self._statistics.bufferedBytes += size
         self._maybePauseProducer()
-        self.startWriting()
+        if not self._corked:
+            self.startWriting()
+
+
+    def cork(self):
+        """
+        Hold back the data written from now on, so that the writes making up
+        a message are sent together.
+
+        @see: L{twisted.internet.interfaces.ICorkableTransport.cork}
+        """
+        self._corked += 1
+        if self._uncorkCall is None:
+            self._uncorkCall = _callAtIterationEnd(
+                self.reactor, self._releaseCorked)
+
+
+    def uncork(self):
+        """
+        Undo one call to L{cork}, and write the data held back once all of
+        them are undone.
+
+        @see: L{twisted.internet.interfaces.ICorkableTransport.uncork}
+        """
+        if self._corked:
+            self._corked -= 1
+            if not self._corked:
+                if self._uncorkCall is not None:
+                    self._uncorkCall.cancel()
+                self._releaseCorked()
+
+
+    def _releaseCorked(self):
+        """
+        Write the data held back by L{cork}, either because it was undone or
+        because the reactor iteration in which it was called ended.
+        """
+        self._corked = 0
+        self._uncorkCall = None
+        if self.connected and (self._tempDataLen or
+                               self.offset < len(self.dataBuffer)):
+            self.startWriting()
 
 
     def loseConnection(self, _connDone=failure.Failure(main.CONNECTION_DONE)):
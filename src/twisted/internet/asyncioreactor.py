@@ -304,6 +304,16 @@ class AsyncioSelectorReactor(PosixReactorBase):
         return dc
 
 
+    def callSoon(self, f, *args, **kwargs):
+        """
+        See L{twisted.internet.base.ReactorBase.callSoon}.
+
+        The asyncio event loop runs L{DelayedCall}s itself, so this is simply
+        C{callLater(0, f, *args, **kwargs)}.
+        """
+        return self.callLater(0, f, *args, **kwargs)
+
+
     def callFromThread(self, f, *args, **kwargs):
         g = lambda: self.callLater(0, f, *args, **kwargs)
         self._asyncioEventloop.call_soon_threadsafe(g)
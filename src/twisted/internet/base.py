@@ -13,14 +13,14 @@ from zope.interface import implementer, classImplements
 
 import sys
 import warnings
-from heapq import heappush, heappop, heapify
+from collections import deque
 
 import traceback
 
 from twisted.internet.interfaces import (
-    IReactorCore, IReactorTime, IReactorThreads, IResolverSimple,
-    IReactorPluggableResolver, IReactorPluggableNameResolver, IConnector,
-    IDelayedCall, _ISupportsExitSignalCapturing
+    IReactorCore, IReactorTime, IReactorCallSoon, IReactorThreads,
+    IResolverSimple, IReactorPluggableResolver, IReactorPluggableNameResolver,
+    IConnector, IDelayedCall, _ISupportsExitSignalCapturing
 )
 
 from twisted.internet import fdesc, main, error, abstract, defer, threads
@@ -29,6 +29,7 @@ from twisted.internet._resolver import (
     ComplexResolverSimplifier as _ComplexResolverSimplifier,
     SimpleResolverComplexifier as _SimpleResolverComplexifier,
 )
+from twisted.internet.timers import ITimerQueue, HeapTimerQueue
 from twisted.python import log, failure, reflect
 from twisted.python.compat import unicode, iteritems
 from twisted.python.runtime import seconds as runtimeSeconds, platform
@@ -47,7 +48,12 @@ class DelayedCall:
     # enable .debug to record creator call stack, and it will be logged if
     # an exception occurs while the function is being run
     debug = False
-    _str = None
+
+    # A reactor may hold a very large number of these at once; avoid giving
+    # each of them an instance dictionary.
+    __slots__ = ('time', 'func', 'args', 'kw', 'resetter', 'canceller',
+                 'seconds', 'cancelled', 'called', 'delayed_time', 'creator',
+                 '_str')
 
     def __init__(self, time, func, args, kw, cancel, reset,
                  seconds=runtimeSeconds):
@@ -73,6 +79,7 @@ class DelayedCall:
         self.seconds = seconds
         self.cancelled = self.called = 0
         self.delayed_time = 0
+        self._str = None
         if self.debug:
             self.creator = traceback.format_stack()[:-2]
 
@@ -220,6 +227,63 @@ class DelayedCall:
 
 
 
+@_oldStyle
+class _SoonCall:
+    """
+    A call scheduled with L{ReactorBase.callSoon}.
+
+    @ivar func: The callable to call.
+    @ivar args: The positional arguments to pass to the callable.
+    @ivar kw: The keyword arguments to pass to the callable.
+    @ivar cancelled: True once this call has been cancelled.
+    @ivar called: True once this call has been made.
+    """
+
+    __slots__ = ('func', 'args', 'kw', 'cancelled', 'called')
+
+    def __init__(self, func, args, kw):
+        self.func, self.args, self.kw = func, args, kw
+        self.cancelled = self.called = False
+
+
+    def cancel(self):
+        """
+        Unschedule this call.
+
+        @raise AlreadyCancelled: Raised if this call has already been
+            unscheduled.
+
+        @raise AlreadyCalled: Raised if this call has already been made.
+        """
+        if self.cancelled:
+            raise error.AlreadyCancelled
+        elif self.called:
+            raise error.AlreadyCalled
+        self.cancelled = True
+        del self.func, self.args, self.kw
+
+
+    def active(self):
+        """
+        Determine whether this call is still pending.
+
+        @rtype: L{bool}
+        @return: True if this call has not yet been made or cancelled,
+            False otherwise.
+        """
+        return not (self.cancelled or self.called)
+
+
+    def __repr__(self):
+        if self.cancelled:
+            func = None
+        else:
+            func = reflect.safe_repr(self.func)
+        return "<_SoonCall 0x%x called=%s cancelled=%s %s>" % (
+            id(self), self.called, self.cancelled, func)
+
+
+
 @implementer(IResolverSimple)
 class ThreadedResolver(object):
     """
@@ -444,8 +508,27 @@ class _ThreePhaseEvent(object):
 
 
 
-@implementer(IReactorCore, IReactorTime, IReactorPluggableResolver,
-             IReactorPluggableNameResolver, _ISupportsExitSignalCapturing)
+def _overrides(cls, base, name):
+    """
+    Determine whether a class overrides a method of one of its bases.
+
+    @param cls: The class.
+    @param base: The base class of C{cls} defining the method.
+    @param name: The name of the method.
+
+    @rtype: L{bool}
+    """
+    method, baseMethod = getattr(cls, name), getattr(base, name)
+    # Methods looked up on a class are unbound method objects, created anew
+    # for each lookup, on Python 2.
+    return (getattr(method, "__func__", method) is not
+            getattr(baseMethod, "__func__", baseMethod))
+
+
+
+@implementer(IReactorCore, IReactorTime, IReactorCallSoon,
+             IReactorPluggableResolver, IReactorPluggableNameResolver,
+             _ISupportsExitSignalCapturing)
 class ReactorBase(object):
     """
     Default base class for Reactors.
@@ -475,6 +558,52 @@ class ReactorBase(object):
         If C{True}, registration will be done, otherwise it will not be.
 
     @ivar _exitSignal: See L{_ISupportsExitSignalCapturing._exitSignal}
+
+    @ivar _timerQueue: The L{ITimerQueue} storing the L{DelayedCall}s created
+        by L{callLater}.  See L{installTimerQueue}.
+
+    @ivar _soonCalls: The L{_SoonCall}s created by L{callSoon} which have not
+        been run yet, in the order they were created.
+    @type _soonCalls: L{collections.deque}
+
+    @ivar _callSoonLater: Whether L{callSoon} uses C{callLater(0, ...)}.  It
+        does for subclasses which override L{callLater}, to drive another
+        event loop for instance, but not L{callSoon}: they would not wake up
+        for the calls in C{_soonCalls}.
+    @type _callSoonLater: L{bool}
+
+    @ivar receiveBufferPool: If not L{None}, TCP connections of this reactor
+        read into buffers borrowed from this pool instead of allocating new
+        strings, and give protocols providing
+        L{twisted.internet.interfaces.IBufferReceiver} a L{memoryview} of
+        the data received.
+    @type receiveBufferPool: L{twisted.internet._buffers.ReceiveBufferPool}
+        or L{None}
+
+    @ivar _instrumentation: The instrumentation timing the callbacks run by
+        this reactor, if any.  See L{installInstrumentation}.
+    @type _instrumentation:
+        L{twisted.internet._instrumentation.ReactorInstrumentation} or
+        L{None}
+
+    @ivar threadCallQueue: The functions, with their arguments, passed to
+        C{callFromThread} which have not been run yet.
+    @type threadCallQueue: L{collections.deque} of L{tuple}
+
+    @ivar threadCalls: The number of functions passed to C{callFromThread}
+        which have been run.
+    @type threadCalls: L{int}
+
+    @ivar threadCallWakeUps: The number of times C{callFromThread} woke up
+        the reactor.  It only does when no wake-up is pending, the reactor
+        running all the functions queued since in one batch, so this is
+        usually much lower than C{threadCalls} when many threads call it.
+    @type threadCallWakeUps: L{int}
+
+    @ivar _threadCallWakeUpPending: Whether C{callFromThread} woke up the
+        reactor since C{runUntilCurrent} last started running
+        C{threadCallQueue}.
+    @type _threadCallWakeUpPending: L{bool}
     """
 
     _registerAsIOThread = True
@@ -484,15 +613,22 @@ class ReactorBase(object):
     usingThreads = False
     resolver = BlockingResolver()
     _exitSignal = None
+    receiveBufferPool = None
+    _instrumentation = None
+    _threadCallWakeUpPending = False
 
     __name__ = "twisted.internet.reactor"
 
     def __init__(self):
-        self.threadCallQueue = []
+        self.threadCallQueue = deque()
+        self.threadCalls = 0
+        self.threadCallWakeUps = 0
         self._eventTriggers = {}
-        self._pendingTimedCalls = []
-        self._newTimedCalls = []
-        self._cancellations = 0
+        self._timerQueue = HeapTimerQueue()
+        self._soonCalls = deque()
+        self._callSoonLater = (
+            _overrides(self.__class__, ReactorBase, "callLater") and
+            not _overrides(self.__class__, ReactorBase, "callSoon"))
         self.running = False
         self._started = False
         self._justStopped = False
@@ -561,6 +697,96 @@ class ReactorBase(object):
         return self._nameResolver
 
 
+    def installTimerQueue(self, timerQueue):
+        """
+        Set the storage used for the calls scheduled with L{callLater}.
+
+        By default, calls are kept in a
+        L{twisted.internet.timers.HeapTimerQueue}.  Reactors managing a very
+        large number of timeouts may prefer a
+        L{twisted.internet.timers.TimingWheelTimerQueue}, which adds and
+        cancels calls in constant time.  Calls already scheduled are moved to
+        the new queue.  For instance::
+
+            from twisted.internet.timers import TimingWheelTimerQueue
+            reactor.installTimerQueue(TimingWheelTimerQueue())
+
+        @param timerQueue: The new timer queue.
+        @type timerQueue: L{twisted.internet.timers.ITimerQueue} provider
+
+        @return: The previously installed timer queue.
+        @rtype: L{twisted.internet.timers.ITimerQueue} provider
+        """
+        assert ITimerQueue.providedBy(timerQueue)
+        previousTimerQueue = self._timerQueue
+        for call in previousTimerQueue.getDelayedCalls():
+            timerQueue.add(call)
+        self._timerQueue = timerQueue
+        return previousTimerQueue
+
+
+    @property
+    def timerQueue(self):
+        """
+        The L{twisted.internet.timers.ITimerQueue} provider set by
+        L{installTimerQueue}.
+        """
+        return self._timerQueue
+
+
+    def installInstrumentation(self, instrumentation):
+        """
+        Start (or stop) measuring the time spent in the callbacks run by this
+        reactor.
+
+        Once installed, the instrumentation times every delayed call, every
+        call made with L{callSoon} or C{callFromThread} and, for the
+        reactors based on C{select}, C{poll}, C{epoll} and C{kqueue}, every
+        C{doRead} and C{doWrite} call; it also records how late delayed calls
+        run and how long each reactor iteration spends in callbacks.  A
+        reactor without instrumentation does none of this work.
+
+        @param instrumentation: The instrumentation, or L{None} to stop
+            measuring.
+        @type instrumentation:
+            L{twisted.internet._instrumentation.ReactorInstrumentation} or
+            L{None}
+
+        @return: The previously installed instrumentation, or L{None}.
+        """
+        previousInstrumentation = self._instrumentation
+        self._instrumentation = instrumentation
+        return previousInstrumentation
+
+
+    @property
+    def instrumentation(self):
+        """
+        The instrumentation set by L{installInstrumentation}, or L{None}.
+        """
+        return self._instrumentation
+
+
+    def _instrumented(self, dispatch):
+        """
+        Make the function which dispatches I/O events to a selectable report
+        to the installed instrumentation, if any.
+
+        @param dispatch: A callable whose first argument is the selectable
+            it dispatches an event to.
+
+        @return: C{dispatch} if no instrumentation is installed, or a
+            callable timing it otherwise.
+        """
+        instrumentation = self._instrumentation
+        if instrumentation is None:
+            return dispatch
+        run = instrumentation.run
+        def instrumentedDispatch(selectable, *args):
+            return run(selectable, dispatch, selectable, *args)
+        return instrumentedDispatch
+
+
     def wakeUp(self):
         """
         Wake up the event loop.
@@ -694,6 +920,8 @@ class ReactorBase(object):
         """
         self.runUntilCurrent()
         self.doIteration(delay)
+        if self._instrumentation is not None:
+            self._instrumentation.iterationFinished()
 
 
     def fireSystemEvent(self, eventType):
@@ -774,31 +1002,43 @@ class ReactorBase(object):
                            self._cancelCallLater,
                            self._moveCallLaterSooner,
                            seconds=self.seconds)
-        self._newTimedCalls.append(tple)
+        self._timerQueue.add(tple)
         return tple
 
+
+    def callSoon(self, _f, *args, **kw):
+        """
+        Call a function on the next iteration of the reactor.
+
+        This is like C{callLater(0, _f, *args, **kw)}, but much cheaper: calls
+        are kept in a simple queue instead of being scheduled with the
+        L{DelayedCall}s, and they are run in the order they were made, before
+        any L{DelayedCall}.  Subclasses which override L{callLater} but not
+        this method get C{callLater(0, _f, *args, **kw)} instead.
+
+        @param _f: The callable to call.
+        @param args: The positional arguments to pass to the callable.
+        @param kw: The keyword arguments to pass to the callable.
+
+        @return: An object with C{cancel} and C{active} methods behaving like
+            those of L{IDelayedCall}.
+
+        @see: L{IReactorCallSoon.callSoon}
+        """
+        assert callable(_f), "%s is not callable" % (_f,)
+        if self._callSoonLater:
+            return self.callLater(0, _f, *args, **kw)
+        call = _SoonCall(_f, args, kw)
+        self._soonCalls.append(call)
+        return call
+
+
     def _moveCallLaterSooner(self, tple):
-        # Linear time find: slow.
-        heap = self._pendingTimedCalls
-        try:
-            pos = heap.index(tple)
-
-            # Move elt up the heap until it rests at the right place.
-            elt = heap[pos]
-            while pos != 0:
-                parent = (pos-1) // 2
-                if heap[parent] <= elt:
-                    break
-                # move parent down
-                heap[pos] = heap[parent]
-                pos = parent
-            heap[pos] = elt
-        except ValueError:
-            # element was not found in heap - oh well...
-            pass
+        self._timerQueue.movedSooner(tple)
+
 
     def _cancelCallLater(self, tple):
-        self._cancellations+=1
+        self._timerQueue.cancelled(tple)
 
 
     def getDelayedCalls(self):
@@ -811,17 +1051,7 @@ class ReactorBase(object):
         @return: A list of outstanding delayed calls.
         @type: L{list} of L{DelayedCall}
         """
-        return [x for x in (self._pendingTimedCalls + self._newTimedCalls) if not x.cancelled]
-
-
-    def _insertNewDelayedCalls(self):
-        for call in self._newTimedCalls:
-            if call.cancelled:
-                self._cancellations-=1
-            else:
-                call.activate_delay()
-                heappush(self._pendingTimedCalls, call)
-        self._newTimedCalls = []
+        return self._timerQueue.getDelayedCalls()
 
 
     def timeout(self):
@@ -833,13 +1063,14 @@ class ReactorBase(object):
         @return: The maximum number of seconds the reactor may sleep.
         @rtype: L{float}
         """
-        # insert new delayed calls to make sure to include them in timeout value
-        self._insertNewDelayedCalls()
+        if self._soonCalls:
+            return 0
 
-        if not self._pendingTimedCalls:
+        nextTime = self._timerQueue.nextTime()
+        if nextTime is None:
             return None
 
-        delay = self._pendingTimedCalls[0].time - self.seconds()
+        delay = nextTime - self.seconds()
 
         # Pick a somewhat arbitrary maximum possible value for the timeout.
         # This value is 2 ** 31 / 1000, which is the number of seconds which can
@@ -858,42 +1089,63 @@ class ReactorBase(object):
         """
         Run all pending timed calls.
         """
-        if self.threadCallQueue:
-            # Keep track of how many calls we actually make, as we're
-            # making them, in case another call is added to the queue
-            # while we're in this loop.
-            count = 0
-            total = len(self.threadCallQueue)
-            for (f, a, kw) in self.threadCallQueue:
+        instrumentation = self._instrumentation
+        # Clear the flag before looking at the queue: a call queued after
+        # this is either run below or wakes up the reactor again.  Clearing
+        # it afterwards could miss a call queued by a thread which saw the
+        # flag still set.
+        self._threadCallWakeUpPending = False
+        threadCallQueue = self.threadCallQueue
+        if threadCallQueue:
+            # Only run the calls queued before this iteration, in case
+            # another call is added to the queue while we're in this loop.
+            total = len(threadCallQueue)
+            for i in range(total):
+                f, a, kw = threadCallQueue.popleft()
                 try:
-                    f(*a, **kw)
+                    if instrumentation is None:
+                        f(*a, **kw)
+                    else:
+                        instrumentation.run(f, f, *a, **kw)
+                except:
+                    log.err()
+            self.threadCalls += total
+
+        if self._soonCalls:
+            # Only run the calls made before this iteration, so that a call
+            # scheduling another one cannot starve the reactor.
+            soonCalls = self._soonCalls
+            for i in range(len(soonCalls)):
+                call = soonCalls.popleft()
+                if call.cancelled:
+                    continue
+                call.called = True
+                try:
+                    if instrumentation is None:
+                        call.func(*call.args, **call.kw)
+                    else:
+                        instrumentation.run(
+                            call.func, call.func, *call.args, **call.kw)
                 except:
                     log.err()
-                count += 1
-                if count == total:
-                    break
-            del self.threadCallQueue[:count]
-            if self.threadCallQueue:
-                self.wakeUp()
-
-        # insert new delayed calls now
-        self._insertNewDelayedCalls()
 
+        # make the delayed calls which are due available now
+        timerQueue = self._timerQueue
         now = self.seconds()
-        while self._pendingTimedCalls and (self._pendingTimedCalls[0].time <= now):
-            call = heappop(self._pendingTimedCalls)
-            if call.cancelled:
-                self._cancellations-=1
-                continue
-
-            if call.delayed_time > 0:
-                call.activate_delay()
-                heappush(self._pendingTimedCalls, call)
-                continue
+        timerQueue.advance(now)
+        while True:
+            call = timerQueue.popDue(now)
+            if call is None:
+                break
 
             try:
                 call.called = 1
-                call.func(*call.args, **call.kw)
+                if instrumentation is None:
+                    call.func(*call.args, **call.kw)
+                else:
+                    instrumentation.delayedCallRun(now - call.time)
+                    instrumentation.run(
+                        call, call.func, *call.args, **call.kw)
             except:
                 log.deferr()
                 if hasattr(call, "creator"):
@@ -905,14 +1157,6 @@ class ReactorBase(object):
                     e += "\n"
                     log.msg(e)
 
-
-        if (self._cancellations > 50 and
-             self._cancellations > len(self._pendingTimedCalls) >> 1):
-            self._cancellations = 0
-            self._pendingTimedCalls = [x for x in self._pendingTimedCalls
-                                       if not x.cancelled]
-            heapify(self._pendingTimedCalls)
-
         if self._justStopped:
             self._justStopped = False
             self.fireSystemEvent("shutdown")
@@ -996,6 +1240,12 @@ class ReactorBase(object):
         _threadpoolStartupID = None
         # ID of the trigger stopping the threadpool
         threadpoolShutdownID = None
+        # The pools returned by getThreadPool(name), by name, with the IDs
+        # of the triggers starting and stopping them.
+        _namedThreadPools = None
+        # How long the threads of the pools created by the reactor may stay
+        # idle before they stop.
+        threadPoolIdleTimeout = 60.0
 
         def _initThreads(self):
             self.installNameResolver(_GAIResolver(self, self.getThreadPool))
@@ -1008,11 +1258,16 @@ class ReactorBase(object):
             L{twisted.internet.interfaces.IReactorFromThreads.callFromThread}.
             """
             assert callable(f), "%s is not callable" % (f,)
-            # lists are thread-safe in CPython, but not in Jython
-            # this is probably a bug in Jython, but until fixed this code
-            # won't work in Jython.
             self.threadCallQueue.append((f, args, kw))
-            self.wakeUp()
+            # Only wake up the reactor if no wake-up is pending: it runs all
+            # the calls queued so far when it wakes up.  The call must be
+            # queued before the flag is checked, see runUntilCurrent.  Two
+            # threads may both see the flag cleared, which only wakes up the
+            # reactor twice.
+            if not self._threadCallWakeUpPending:
+                self._threadCallWakeUpPending = True
+                self.threadCallWakeUps += 1
+                self.wakeUp()
 
         def _initThreadPool(self):
             """
@@ -1020,7 +1275,8 @@ class ReactorBase(object):
             """
             from twisted.python import threadpool
             self.threadpool = threadpool.ThreadPool(
-                0, 10, 'twisted.internet.reactor')
+                0, 10, 'twisted.internet.reactor',
+                idleTimeout=self.threadPoolIdleTimeout)
             self._threadpoolStartupID = self.callWhenRunning(
                 self.threadpool.start)
             self.threadpoolShutdownID = self.addSystemEventTrigger(
@@ -1048,15 +1304,76 @@ class ReactorBase(object):
             self.threadpool = None
 
 
-        def getThreadPool(self):
+        def getThreadPool(self, name=None):
             """
             See L{twisted.internet.interfaces.IReactorThreads.getThreadPool}.
             """
+            if name is not None:
+                return self._getNamedThreadPool(name)
             if self.threadpool is None:
                 self._initThreadPool()
             return self.threadpool
 
 
+        def getThreadPools(self):
+            """
+            Get the thread pools created by this reactor so far.
+
+            @return: The pools by name, the one used by C{callInThread}
+                having the name L{None}.
+            @rtype: L{dict} of L{twisted.python.threadpool.ThreadPool}
+            """
+            pools = {}
+            if self.threadpool is not None:
+                pools[None] = self.threadpool
+            for name, (pool, triggers) in (
+                    self._namedThreadPools or {}).items():
+                pools[name] = pool
+            return pools
+
+
+        def _getNamedThreadPool(self, name):
+            """
+            Get the thread pool with the given name, creating it first if
+            necessary.  It is started with the reactor and stopped when it
+            shuts down, like the one created by L{_initThreadPool}.
+
+            @param name: The name of the pool.
+            @type name: native L{str}
+
+            @rtype: L{twisted.python.threadpool.ThreadPool}
+            """
+            if self._namedThreadPools is None:
+                self._namedThreadPools = {}
+            if name not in self._namedThreadPools:
+                from twisted.python import threadpool
+                pool = threadpool.ThreadPool(
+                    0, 10, name, idleTimeout=self.threadPoolIdleTimeout)
+                triggers = [self.callWhenRunning(pool.start),
+                            self.addSystemEventTrigger(
+                                'during', 'shutdown',
+                                self._stopNamedThreadPool, name)]
+                self._namedThreadPools[name] = (pool, triggers)
+            return self._namedThreadPools[name][0]
+
+
+        def _stopNamedThreadPool(self, name):
+            """
+            Stop a thread pool created by L{_getNamedThreadPool}, and forget
+            it.
+
+            @param name: The name of the pool.
+            @type name: native L{str}
+            """
+            pool, triggers = self._namedThreadPools.pop(name)
+            for trigger in filter(None, triggers):
+                try:
+                    self.removeSystemEventTrigger(trigger)
+                except ValueError:
+                    pass
+            pool.stop()
+
+
         def callInThread(self, _callable, *args, **kwargs):
             """
             See L{twisted.internet.interfaces.IReactorInThreads.callInThread}.
@@ -1271,6 +1588,8 @@ class _SignalReactorMixin(object):
                     t2 = self.timeout()
                     t = self.running and t2
                     self.doIteration(t)
+                    if self._instrumentation is not None:
+                        self._instrumentation.iterationFinished()
             except:
                 log.msg("Unexpected error in main loop.")
                 log.err()
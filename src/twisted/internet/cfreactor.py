@@ -433,6 +433,15 @@ class CFReactor(PosixReactorBase):
         return delayedCall
 
 
+    def callSoon(self, _f, *args, **kw):
+        """
+        Implement L{IReactorCallSoon.callSoon}.
+        """
+        call = PosixReactorBase.callSoon(self, _f, *args, **kw)
+        self._scheduleSimulate()
+        return call
+
+
     def stop(self):
         """
         Implement L{IReactorCore.stop}.
@@ -0,0 +1,710 @@
+# -*- test-case-name: twisted.internet.test.test_connectionpool -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Share client connections between the users of a protocol.
+
+A L{ConnectionPool} connects to the endpoints it is given with a protocol
+factory, and lends out the resulting protocols: L{ConnectionPool.acquire}
+returns an idle connection to an endpoint or makes a new one, and
+L{ConnectionPool.release} gives it back to be used again.  This works with
+any protocol which can be used for one request after another, such as a
+memcache client, an L{AMP <twisted.protocols.amp.AMP>} connection or a line
+protocol, without the pool knowing anything about it.
+
+@since: 18.7
+"""
+
+from __future__ import division, absolute_import
+
+from collections import deque
+
+from twisted.internet import defer
+from twisted.logger import Logger
+from twisted.protocols.policies import WrappingFactory
+from twisted.python._histogram import Histogram
+from twisted.python.failure import Failure
+
+__all__ = ["ConnectionPool"]
+
+
+
+class _Connection(object):
+    """
+    A connection made by a L{ConnectionPool}.
+
+    @ivar state: The connections of the same key.
+    @type state: L{_KeyState}
+
+    @ivar wrapper: The protocol the pool connected with, which wraps
+        C{protocol} to tell the pool when the connection is lost.
+    @type wrapper: L{twisted.protocols.policies.ProtocolWrapper}
+
+    @ivar protocol: The protocol lent to the users of the pool.
+    @type protocol: L{twisted.internet.interfaces.IProtocol}
+
+    @ivar connected: Whether the connection was not lost yet.
+    @type connected: L{bool}
+
+    @ivar idleTimeout: The call closing the connection once it stayed idle
+        too long, if it is idle.
+    @type idleTimeout: L{twisted.internet.interfaces.IDelayedCall} or
+        L{None}
+    """
+
+    def __init__(self, state, wrapper):
+        self.state = state
+        self.wrapper = wrapper
+        self.protocol = wrapper.wrappedProtocol
+        self.connected = True
+        self.idleTimeout = None
+
+
+    def cancelIdleTimeout(self):
+        """
+        Cancel the idle timeout, if there is one.
+        """
+        if self.idleTimeout is not None:
+            self.idleTimeout.cancel()
+            self.idleTimeout = None
+
+
+    def disconnect(self):
+        """
+        Close the connection.
+        """
+        self.cancelIdleTimeout()
+        self.wrapper.transport.loseConnection()
+
+
+
+class _PoolingFactory(WrappingFactory):
+    """
+    The factory a L{ConnectionPool} connects with, which tells it when a
+    connection is lost.
+    """
+
+    def __init__(self, pool, wrappedFactory):
+        """
+        @param pool: The pool to tell.
+        @type pool: L{ConnectionPool}
+
+        @param wrappedFactory: The factory building the protocols lent by the
+            pool.
+        @type wrappedFactory: L{twisted.internet.interfaces.IProtocolFactory}
+        """
+        WrappingFactory.__init__(self, wrappedFactory)
+        self._pool = pool
+
+
+    def unregisterProtocol(self, p):
+        """
+        Tell the pool the connection of C{p} was lost.
+
+        @param p: The wrapping protocol.
+        @type p: L{twisted.protocols.policies.ProtocolWrapper}
+        """
+        WrappingFactory.unregisterProtocol(self, p)
+        self._pool._connectionLost(p)
+
+
+
+class _Waiter(object):
+    """
+    A call to L{ConnectionPool.acquire} waiting for a connection.
+
+    @ivar queued: When the call was made, in seconds since the epoch.
+    @type queued: L{float}
+
+    @ivar deferred: The L{defer.Deferred} returned by the call.
+    """
+
+    def __init__(self, queued, cancel):
+        """
+        @param queued: See L{_Waiter.queued}.
+
+        @param cancel: Called with the L{_Waiter} when its C{deferred} is
+            cancelled.
+        """
+        self.queued = queued
+        self.deferred = defer.Deferred(lambda d: cancel(self))
+
+
+
+class _KeyState(object):
+    """
+    The connections of a L{ConnectionPool} for one key.
+
+    @ivar key: The key.
+
+    @ivar endpoint: The endpoint new connections are made to.
+    @type endpoint: L{twisted.internet.interfaces.IStreamClientEndpoint}
+
+    @ivar idle: The idle connections, from the least to the most recently
+        used.
+    @type idle: L{list} of L{_Connection}
+
+    @ivar active: The connections lent out.
+    @type active: L{set} of L{_Connection}
+
+    @ivar connecting: The number of connections being made.
+    @type connecting: L{int}
+
+    @ivar checking: The number of idle connections being checked before being
+        lent out.
+    @type checking: L{int}
+
+    @ivar waiting: The calls to L{ConnectionPool.acquire} waiting for a
+        connection.
+    @type waiting: L{collections.deque} of L{_Waiter}
+    """
+
+    def __init__(self, key, endpoint):
+        self.key = key
+        self.endpoint = endpoint
+        self.idle = []
+        self.active = set()
+        self.connecting = 0
+        self.checking = 0
+        self.waiting = deque()
+
+
+    @property
+    def size(self):
+        """
+        The number of connections, made or being made.
+
+        @rtype: L{int}
+        """
+        return (len(self.idle) + len(self.active) + self.connecting +
+                self.checking)
+
+
+
+class ConnectionPool(object):
+    """
+    A pool of client connections, kept for each key, usually an endpoint.
+
+    For each key, the pool holds up to C{maxSize} connections, and keeps at
+    least C{minSize} of them open once the key was used.  The calls to
+    L{ConnectionPool.acquire} made while all of them are lent out wait in a
+    queue, which holds at most C{maxWaiting} calls.  Connections which stay
+    idle for C{idleTimeout} seconds are closed.
+
+    @ivar minSize: The number of connections kept open for each key.
+    @type minSize: L{int}
+
+    @ivar maxSize: The maximum number of connections for each key.
+    @type maxSize: L{int}
+
+    @ivar idleTimeout: How long a connection may stay idle, in seconds, or
+        L{None} to keep idle connections open.
+    @type idleTimeout: L{float} or L{None}
+
+    @ivar maxWaiting: The maximum number of calls to
+        L{ConnectionPool.acquire} waiting for a connection for each key, or
+        L{None} for no limit.
+    @type maxWaiting: L{int} or L{None}
+
+    @ivar waitTimeout: How long a call to L{ConnectionPool.acquire} may wait
+        for a connection, in seconds, or L{None} for no limit.
+    @type waitTimeout: L{float} or L{None}
+
+    @ivar healthCheck: Called with the protocol of an idle connection before
+        it is lent out, returning a true value (or a L{defer.Deferred} firing
+        with one) if the connection can be used.  A connection for which it
+        returns a false value, or fails, is closed.  L{None} to lend idle
+        connections unchecked.
+    @type healthCheck: callable or L{None}
+
+    @ivar waitTimes: How long the calls to L{ConnectionPool.acquire} waited
+        for their connection, in seconds.
+    @type waitTimes: L{Histogram
+        <twisted.python._histogram.Histogram>}
+
+    @ivar connectionsMade: The number of connections made.
+    @type connectionsMade: L{int}
+
+    @ivar reused: The number of times an idle connection was lent out.
+    @type reused: L{int}
+
+    @ivar evicted: The number of connections closed because they stayed idle
+        too long.
+    @type evicted: L{int}
+
+    @ivar healthCheckFailures: The number of connections closed because
+        C{healthCheck} did not accept them.
+    @type healthCheckFailures: L{int}
+
+    @ivar waitTimeouts: The number of calls to L{ConnectionPool.acquire}
+        which waited more than C{waitTimeout}.
+    @type waitTimeouts: L{int}
+
+    @ivar _factory: The factory connections are made with.
+    @type _factory: L{_PoolingFactory}
+
+    @ivar _reactor: The reactor used to tell the time.
+    @type _reactor: L{twisted.internet.interfaces.IReactorTime}
+
+    @ivar _states: The connections of each key.  A key is forgotten once it
+        has no connection and no call waiting for one, so that keys used
+        once, such as endpoints created for each call, do not accumulate.
+    @type _states: L{dict} of L{_KeyState}
+
+    @ivar _connections: The connections made, by the protocol lent out.
+    @type _connections: L{dict} of L{_Connection}
+
+    @ivar _closed: Whether L{ConnectionPool.close} was called.
+    @type _closed: L{bool}
+
+    @ivar _whenClosed: The L{defer.Deferred}s returned by
+        L{ConnectionPool.close} which have not fired yet.
+    @type _whenClosed: L{list}
+    """
+
+    _log = Logger()
+
+    def __init__(self, factory, reactor=None, minSize=0, maxSize=10,
+                 idleTimeout=60.0, maxWaiting=None, waitTimeout=None,
+                 healthCheck=None):
+        """
+        @param factory: The factory building the protocols lent out by the
+            pool.
+        @type factory: L{twisted.internet.interfaces.IProtocolFactory}
+
+        @param reactor: See L{ConnectionPool._reactor}, by default the global
+            reactor.
+
+        @param minSize: See L{ConnectionPool.minSize}.
+
+        @param maxSize: See L{ConnectionPool.maxSize}.
+
+        @param idleTimeout: See L{ConnectionPool.idleTimeout}.
+
+        @param maxWaiting: See L{ConnectionPool.maxWaiting}.
+
+        @param waitTimeout: See L{ConnectionPool.waitTimeout}.
+
+        @param healthCheck: See L{ConnectionPool.healthCheck}.
+
+        @raise ValueError: If C{maxSize} is lower than 1 or than C{minSize}.
+        """
+        if maxSize < 1 or maxSize < minSize:
+            raise ValueError(
+                "maxSize must be at least 1 and minSize, not %r" % (maxSize,))
+        if reactor is None:
+            from twisted.internet import reactor
+        self.minSize = minSize
+        self.maxSize = maxSize
+        self.idleTimeout = idleTimeout
+        self.maxWaiting = maxWaiting
+        self.waitTimeout = waitTimeout
+        self.healthCheck = healthCheck
+        self.waitTimes = Histogram()
+        self.connectionsMade = 0
+        self.reused = 0
+        self.evicted = 0
+        self.healthCheckFailures = 0
+        self.waitTimeouts = 0
+        self._factory = _PoolingFactory(self, factory)
+        self._reactor = reactor
+        self._states = {}
+        self._connections = {}
+        self._closed = False
+        self._whenClosed = []
+
+
+    def acquire(self, endpoint, key=None):
+        """
+        Borrow a connection to an endpoint, to give back with
+        L{ConnectionPool.release} once done with it.
+
+        @param endpoint: The endpoint to connect to.
+        @type endpoint: L{twisted.internet.interfaces.IStreamClientEndpoint}
+
+        @param key: The connections which can be used in place of each other
+            share a key, which is C{endpoint} by default.  A key must be
+            given when the same server is reached through endpoints created
+            for each call.
+
+        @return: A L{defer.Deferred} which fires with the protocol of the
+            connection, or fails with the reason connecting failed, with
+            L{defer.QueueOverflow} if C{maxWaiting} calls already wait for a
+            connection to this key, with L{defer.TimeoutError} if no
+            connection was available within C{waitTimeout} seconds, or with
+            L{defer.CancelledError} if the pool is closed.  Cancelling it
+            removes the call from the queue.
+        """
+        if self._closed:
+            return defer.fail(defer.CancelledError())
+        if key is None:
+            key = endpoint
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _KeyState(key, endpoint)
+        if (self.maxWaiting is not None and
+                len(state.waiting) >= self.maxWaiting):
+            return defer.fail(defer.QueueOverflow())
+        waiter = _Waiter(self._reactor.seconds(),
+                         lambda waiter: self._cancel(state, waiter))
+        state.waiting.append(waiter)
+        d = waiter.deferred
+        if self.waitTimeout is not None:
+            d.addTimeout(self.waitTimeout, self._reactor,
+                         onTimeoutCancel=self._timedOut)
+        self._dispatch(state)
+        self._maintain(state)
+        return d
+
+
+    def release(self, protocol, reuse=True):
+        """
+        Give back a connection returned by L{ConnectionPool.acquire}.
+
+        @param protocol: The protocol of the connection.
+
+        @param reuse: Whether the connection can be lent out again.  If
+            C{False}, it is closed; this is what to do with a connection
+            left in an unknown state, for example by a request which failed.
+        @type reuse: L{bool}
+
+        @raise ValueError: If the connection is open but not lent out.
+        """
+        connection = self._connections.get(protocol)
+        if connection is None:
+            # The connection was lost, and forgotten then.
+            return
+        state = connection.state
+        if connection not in state.active:
+            raise ValueError("%r is not lent out by %r" % (protocol, self))
+        state.active.remove(connection)
+        if reuse and not self._closed:
+            self._give(state, connection)
+        else:
+            self._disconnect(connection)
+            self._dispatch(state)
+            self._maintain(state)
+            self._forgetUnused(state)
+
+
+    def withConnection(self, endpoint, f, *args, **kwargs):
+        """
+        Call a function with a connection to an endpoint, and give the
+        connection back once the result of the function is known.
+
+        A connection with which the function failed is closed rather than
+        reused, as it may be in an unknown state.
+
+        @param endpoint: See L{ConnectionPool.acquire}.
+        @type endpoint: L{twisted.internet.interfaces.IStreamClientEndpoint}
+
+        @param f: The function, called with the protocol of the connection
+            followed by C{args} and C{kwargs}.
+
+        @return: A L{defer.Deferred} which fires with the result of C{f}, or
+            fails like the one returned by L{ConnectionPool.acquire}.
+        """
+        def borrowed(protocol):
+            d = defer.maybeDeferred(f, protocol, *args, **kwargs)
+            def done(result):
+                self.release(protocol,
+                             reuse=not isinstance(result, Failure))
+                return result
+            return d.addBoth(done)
+        return self.acquire(endpoint).addCallback(borrowed)
+
+
+    def close(self):
+        """
+        Close the pool: fail the calls waiting for a connection with
+        L{defer.CancelledError}, close the idle connections, and close the
+        others once they are given back.
+
+        @return: A L{defer.Deferred} which fires when all the connections
+            are closed.
+        """
+        self._closed = True
+        for state in list(self._states.values()):
+            waiting, state.waiting = state.waiting, deque()
+            for waiter in waiting:
+                waiter.deferred.errback(defer.CancelledError())
+            idle, state.idle = state.idle, []
+            for connection in idle:
+                self._disconnect(connection)
+        d = defer.Deferred()
+        self._whenClosed.append(d)
+        self._checkClosed()
+        return d
+
+
+    def statistics(self):
+        """
+        Describe the current activity of this pool, and how long the calls to
+        L{ConnectionPool.acquire} waited for a connection.
+
+        @return: A L{dict} with the numbers of C{idle} and C{active}
+            connections, of connections being made or checked as
+            C{connecting}, of calls waiting for a connection as C{waiting},
+            the counters C{connectionsMade}, C{reused}, C{evicted},
+            C{healthCheckFailures} and C{waitTimeouts}, and the
+            L{Histogram.snapshot
+            <twisted.python._histogram.Histogram.snapshot>} of
+            C{waitTimes}.
+        @rtype: L{dict}
+        """
+        states = list(self._states.values())
+        return {
+            "idle": sum(len(state.idle) for state in states),
+            "active": sum(len(state.active) for state in states),
+            "connecting": sum(state.connecting + state.checking
+                              for state in states),
+            "waiting": sum(len(state.waiting) for state in states),
+            "connectionsMade": self.connectionsMade,
+            "reused": self.reused,
+            "evicted": self.evicted,
+            "healthCheckFailures": self.healthCheckFailures,
+            "waitTimeouts": self.waitTimeouts,
+            "waitTimes": self.waitTimes.snapshot(),
+        }
+
+
+    def _dispatch(self, state):
+        """
+        Give the idle connections of a key to the calls waiting for one, and
+        make new connections for the others if possible.
+
+        @param state: The connections of the key.
+        @type state: L{_KeyState}
+        """
+        while len(state.waiting) > state.checking and state.idle:
+            connection = state.idle.pop()
+            connection.cancelIdleTimeout()
+            state.checking += 1
+            if self.healthCheck is None:
+                d = defer.succeed(True)
+            else:
+                d = defer.maybeDeferred(self.healthCheck, connection.protocol)
+                d.addErrback(lambda reason: False)
+            d.addCallback(self._checked, state, connection)
+        missing = len(state.waiting) - state.connecting - state.checking
+        while missing > 0 and state.size < self.maxSize:
+            self._connect(state)
+            missing -= 1
+
+
+    def _maintain(self, state):
+        """
+        Make new connections until a key has C{minSize} of them.
+
+        @param state: The connections of the key.
+        @type state: L{_KeyState}
+        """
+        while not self._closed and state.size < self.minSize:
+            self._connect(state)
+
+
+    def _checked(self, healthy, state, connection):
+        """
+        Lend out a connection which was checked, or close it if it is not
+        healthy.
+
+        @param healthy: The result of C{healthCheck}.
+
+        @param state: The connections of the key.
+        @type state: L{_KeyState}
+
+        @param connection: The connection.
+        @type connection: L{_Connection}
+        """
+        state.checking -= 1
+        if not connection.connected:
+            self._dispatch(state)
+            self._forgetUnused(state)
+        elif not healthy:
+            self.healthCheckFailures += 1
+            self._disconnect(connection)
+            self._dispatch(state)
+            self._maintain(state)
+            self._forgetUnused(state)
+        else:
+            self.reused += 1
+            self._give(state, connection)
+
+
+    def _give(self, state, connection):
+        """
+        Lend out a connection to the first call waiting for one, or keep it
+        idle if there is none.
+
+        @param state: The connections of the key.
+        @type state: L{_KeyState}
+
+        @param connection: The connection.
+        @type connection: L{_Connection}
+        """
+        if self._closed:
+            self._disconnect(connection)
+        elif state.waiting:
+            waiter = state.waiting.popleft()
+            state.active.add(connection)
+            self.waitTimes.add(self._reactor.seconds() - waiter.queued)
+            waiter.deferred.callback(connection.protocol)
+        else:
+            state.idle.append(connection)
+            if self.idleTimeout is not None:
+                connection.idleTimeout = self._reactor.callLater(
+                    self.idleTimeout, self._evict, state, connection)
+
+
+    def _evict(self, state, connection):
+        """
+        Close a connection which stayed idle too long, unless the key would
+        be left with less than C{minSize} connections.
+
+        @param state: The connections of the key.
+        @type state: L{_KeyState}
+
+        @param connection: The connection.
+        @type connection: L{_Connection}
+        """
+        connection.idleTimeout = None
+        if state.size > self.minSize:
+            state.idle.remove(connection)
+            self.evicted += 1
+            self._disconnect(connection)
+            self._forgetUnused(state)
+
+
+    def _connect(self, state):
+        """
+        Make a new connection for a key.
+
+        @param state: The connections of the key.
+        @type state: L{_KeyState}
+        """
+        state.connecting += 1
+        d = state.endpoint.connect(self._factory)
+        d.addCallbacks(self._connected, self._connectionFailed,
+                       callbackArgs=(state,), errbackArgs=(state,))
+
+
+    def _connected(self, wrapper, state):
+        """
+        Lend out or keep a new connection.
+
+        @param wrapper: The protocol of the connection.
+        @type wrapper: L{twisted.protocols.policies.ProtocolWrapper}
+
+        @param state: The connections of the key.
+        @type state: L{_KeyState}
+        """
+        state.connecting -= 1
+        self.connectionsMade += 1
+        connection = _Connection(state, wrapper)
+        self._connections[connection.protocol] = connection
+        self._give(state, connection)
+
+
+    def _connectionFailed(self, reason, state):
+        """
+        Fail the first call waiting for a connection, if any, with the reason
+        a connection could not be made.
+
+        @param reason: The reason.
+        @type reason: L{twisted.python.failure.Failure}
+
+        @param state: The connections of the key.
+        @type state: L{_KeyState}
+        """
+        state.connecting -= 1
+        if state.waiting:
+            state.waiting.popleft().deferred.errback(reason)
+            self._dispatch(state)
+        else:
+            self._log.failure("While connecting to {endpoint}", reason,
+                              endpoint=state.endpoint)
+        self._forgetUnused(state)
+        self._checkClosed()
+
+
+    def _connectionLost(self, wrapper):
+        """
+        Forget a connection which was lost.
+
+        @param wrapper: The protocol of the connection.
+        @type wrapper: L{twisted.protocols.policies.ProtocolWrapper}
+        """
+        connection = self._connections.pop(wrapper.wrappedProtocol, None)
+        if connection is not None:
+            connection.connected = False
+            connection.cancelIdleTimeout()
+            state = connection.state
+            if connection in state.idle:
+                state.idle.remove(connection)
+            state.active.discard(connection)
+            self._dispatch(state)
+            self._maintain(state)
+            self._forgetUnused(state)
+        self._checkClosed()
+
+
+    def _forgetUnused(self, state):
+        """
+        Forget a key which has no connection, made or being made, and no
+        call waiting for one.
+
+        @param state: The connections of the key.
+        @type state: L{_KeyState}
+        """
+        if (not state.size and not state.waiting and
+                self._states.get(state.key) is state):
+            del self._states[state.key]
+
+
+    def _disconnect(self, connection):
+        """
+        Close a connection, which is forgotten once it is lost.
+
+        @param connection: The connection.
+        @type connection: L{_Connection}
+        """
+        connection.disconnect()
+
+
+    def _cancel(self, state, waiter):
+        """
+        Remove a call from the queue of those waiting for a connection.
+
+        @param state: The connections of the key.
+        @type state: L{_KeyState}
+
+        @param waiter: The call.
+        @type waiter: L{_Waiter}
+        """
+        state.waiting.remove(waiter)
+        self._forgetUnused(state)
+
+
+    def _timedOut(self, result, timeout):
+        """
+        Count a call to L{ConnectionPool.acquire} which waited too long.
+
+        @see: L{defer.Deferred.addTimeout}
+        """
+        self.waitTimeouts += 1
+        return defer._cancelledToTimedOutError(result, timeout)
+
+
+    def _checkClosed(self):
+        """
+        Fire the L{defer.Deferred}s returned by L{ConnectionPool.close} if
+        all the connections are closed.
+        """
+        if not self._closed or self._connections:
+            return
+        if any(state.connecting for state in self._states.values()):
+            return
+        whenClosed, self._whenClosed = self._whenClosed, []
+        for d in whenClosed:
+            d.callback(None)
@@ -150,7 +150,9 @@ def maybeDeferred(f, *args, **kw):
     try:
         result = f(*args, **kw)
     except:
-        return fail(failure.Failure(captureVars=Deferred.debug))
+        d = Deferred()
+        d.errback(failure.Failure(captureVars=d.debug))
+        return d
 
     if isinstance(result, Deferred):
         return result
@@ -173,14 +175,33 @@ def passthru(arg):
 
 
 
-def setDebugging(on):
+def setDebugging(on, sampleInterval=1):
     """
     Enable or disable L{Deferred} debugging.
 
     When debugging is on, the call stacks from creation and invocation are
-    recorded, and added to any L{AlreadyCalledError}s we raise.
+    recorded, and added to any L{AlreadyCalledError}s we raise, and the
+    L{failure.Failure}s created when callbacks raise exceptions capture the
+    variables of their frames.
+
+    This is expensive: to keep some of this information on a busy process,
+    debugging can be limited to a sample of the L{Deferred}s.  The others
+    behave as if debugging was off.
+
+    @param on: Whether to enable debugging.
+    @type on: L{bool}
+
+    @param sampleInterval: Debug one L{Deferred} out of this number of
+        L{Deferred}s created.
+    @type sampleInterval: L{int}
     """
-    Deferred.debug=bool(on)
+    if sampleInterval < 1:
+        raise ValueError(
+            "sampleInterval must be at least 1, not %r" % (sampleInterval,))
+    _DebugFlag.enabled = bool(on)
+    _DebugFlag.sampleInterval = _DebugFlag.countdown = sampleInterval
+    # Undo any assignment to Deferred.debug.
+    Deferred.debug = _debugFlag
 
 
 
@@ -188,13 +209,76 @@ def getDebugging():
     """
     Determine whether L{Deferred} debugging is enabled.
     """
-    return Deferred.debug
+    flag = _deferredAttributes['debug']
+    if flag is _debugFlag:
+        return _DebugFlag.enabled
+    return bool(flag)
 
 
 # See module docstring.
 _NO_RESULT = object()
 _CONTINUE = object()
 
+# The errback of the callbacks added without one.
+_PASSTHRU = (passthru, None, None)
+
+
+
+class _DebugFlag(object):
+    """
+    The C{debug} attribute of L{Deferred}: a flag shared by all the
+    L{Deferred}s, which each of them can override.
+
+    Code written for older versions of Twisted may still enable debugging by
+    assigning C{Deferred.debug}, which replaces this descriptor with a plain
+    class attribute until L{setDebugging} is called.
+
+    @cvar enabled: The value of the flag for the L{Deferred}s which do not
+        override it, set by L{setDebugging}.
+    @type enabled: L{bool}
+
+    @cvar sampleInterval: When C{enabled}, one L{Deferred} out of this
+        number is debugged, the other ones override the flag.
+    @type sampleInterval: L{int}
+
+    @cvar countdown: The number of L{Deferred}s to create until the next one
+        debugged.
+    @type countdown: L{int}
+    """
+
+    enabled = False
+    sampleInterval = countdown = 1
+
+    @classmethod
+    def sample(cls):
+        """
+        Determine whether to debug a new L{Deferred}, when C{enabled}.
+
+        @rtype: L{bool}
+        """
+        cls.countdown -= 1
+        if cls.countdown > 0:
+            return False
+        cls.countdown = cls.sampleInterval
+        return True
+
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return _DebugFlag.enabled
+        debug = instance._debug
+        if debug is None:
+            return _DebugFlag.enabled
+        return debug
+
+
+    def __set__(self, instance, value):
+        instance._debug = value
+
+
+
+_debugFlag = _DebugFlag()
+
 
 
 @_oldStyle
@@ -241,23 +325,31 @@ class Deferred:
     @ivar _chainedTo: If this L{Deferred} is waiting for the result of another
         L{Deferred}, this is a reference to the other Deferred.  Otherwise,
         L{None}.
-    """
 
-    called = False
-    paused = False
-    _debugInfo = None
-    _suppressAlreadyCalled = False
-
-    # Are we currently running a user-installed callback?  Meant to prevent
-    # recursive running of callbacks when a reentrant call to add a callback is
-    # used.
-    _runningCallbacks = False
+    @ivar debug: Whether to record the call stacks from creation and
+        invocation of this L{Deferred}, and to capture the local variables of
+        the frames of its L{Failure}s.  Unless it is set on an instance, this
+        is the value set by L{setDebugging}, or L{False} for the L{Deferred}s
+        left out of its sample.
+    @type debug: L{bool}
+
+    @ivar callbacks: The callbacks not run yet.  Callbacks added without an
+        errback nor arguments are stored as is, other ones as a pair of
+        C{(callable, args, kwargs)} tuples, for the success and failure
+        cases.
+    @type callbacks: L{list}
+    """
 
-    # Keep this class attribute for now, for compatibility with code that
-    # sets it directly.
-    debug = False
+    # Deferreds are created by the thousand: their own attributes are slots,
+    # which are faster to access.  This means that all of them have to be
+    # initialized in __init__, except for the result which is only set once
+    # called.  The instance dictionary is kept for the attributes other code
+    # sets on Deferreds; it is only allocated when first used.
+    __slots__ = ('callbacks', 'result', 'called', 'paused', '_canceller',
+                 '_debug', '_debugInfo', '_suppressAlreadyCalled',
+                 '_runningCallbacks', '_chainedTo', '__dict__', '__weakref__')
 
-    _chainedTo = None
+    debug = _debugFlag
 
     def __init__(self, canceller=None):
         """
@@ -284,10 +376,28 @@ class Deferred:
             return result is ignored.
         """
         self.callbacks = []
+        self.called = False
+        self.paused = 0
         self._canceller = canceller
-        if self.debug:
-            self._debugInfo = DebugInfo()
-            self._debugInfo.creator = traceback.format_stack()[:-1]
+        self._debug = None
+        self._suppressAlreadyCalled = False
+        # Are we currently running a user-installed callback?  Meant to
+        # prevent recursive running of callbacks when a reentrant call to add
+        # a callback is used.
+        self._runningCallbacks = False
+        self._chainedTo = None
+        self._debugInfo = None
+        if _DebugFlag.enabled:
+            if _DebugFlag.sample():
+                self._debugInfo = DebugInfo()
+                self._debugInfo.creator = traceback.format_stack()[:-1]
+            else:
+                self._debug = False
+        elif _deferredAttributes['debug'] is not _debugFlag:
+            # Deferred.debug was assigned directly.
+            if _deferredAttributes['debug']:
+                self._debugInfo = DebugInfo()
+                self._debugInfo.creator = traceback.format_stack()[:-1]
 
 
     def addCallbacks(self, callback, errback=None,
@@ -303,9 +413,12 @@ class Deferred:
         """
         assert callable(callback)
         assert errback is None or callable(errback)
-        cbs = ((callback, callbackArgs, callbackKeywords),
-               (errback or (passthru), errbackArgs, errbackKeywords))
-        self.callbacks.append(cbs)
+        if errback is None and not callbackArgs and not callbackKeywords:
+            self.callbacks.append(callback)
+        else:
+            self.callbacks.append(
+                ((callback, callbackArgs, callbackKeywords),
+                 (errback or passthru, errbackArgs, errbackKeywords)))
 
         if self.called:
             self._runCallbacks()
@@ -318,8 +431,15 @@ class Deferred:
 
         See L{addCallbacks}.
         """
-        return self.addCallbacks(callback, callbackArgs=args,
-                                 callbackKeywords=kw)
+        assert callable(callback)
+        if args or kw:
+            self.callbacks.append(((callback, args, kw), _PASSTHRU))
+        else:
+            self.callbacks.append(callback)
+
+        if self.called:
+            self._runCallbacks()
+        return self
 
 
     def addErrback(self, errback, *args, **kw):
@@ -328,9 +448,12 @@ class Deferred:
 
         See L{addCallbacks}.
         """
-        return self.addCallbacks(passthru, errback,
-                                 errbackArgs=args,
-                                 errbackKeywords=kw)
+        assert callable(errback)
+        self.callbacks.append((_PASSTHRU, (errback, args, kw)))
+
+        if self.called:
+            self._runCallbacks()
+        return self
 
 
     def addBoth(self, callback, *args, **kw):
@@ -340,9 +463,13 @@ class Deferred:
 
         See L{addCallbacks}.
         """
-        return self.addCallbacks(callback, callback,
-                                 callbackArgs=args, errbackArgs=args,
-                                 callbackKeywords=kw, errbackKeywords=kw)
+        assert callable(callback)
+        both = (callback, args, kw)
+        self.callbacks.append((both, both))
+
+        if self.called:
+            self._runCallbacks()
+        return self
 
 
     def addTimeout(self, timeout, clock, onTimeoutCancel=None):
@@ -565,7 +692,14 @@ class Deferred:
             self._debugInfo.invoker = traceback.format_stack()[:-2]
         self.called = True
         self.result = result
-        self._runCallbacks()
+        if (self.callbacks or self.paused or
+                isinstance(result, failure.Failure)):
+            self._runCallbacks()
+        else:
+            # Nothing to run: this is all _runCallbacks would do.
+            self._chainedTo = None
+            if self._debugInfo is not None:
+                self._debugInfo.failResult = None
 
 
     def _continuation(self):
@@ -624,69 +758,97 @@ class Deferred:
 
             finished = True
             current._chainedTo = None
-            while current.callbacks:
-                item = current.callbacks.pop(0)
-                callback, args, kw = item[
-                    isinstance(current.result, failure.Failure)]
-                args = args or ()
-                kw = kw or {}
-
-                # Avoid recursion if we can.
-                if callback is _CONTINUE:
-                    # Give the waiting Deferred our current result and then
-                    # forget about that result ourselves.
-                    chainee = args[0]
-                    chainee.result = current.result
-                    current.result = None
-                    # Making sure to update _debugInfo
-                    if current._debugInfo is not None:
-                        current._debugInfo.failResult = None
-                    chainee.paused -= 1
-                    chain.append(chainee)
-                    # Delay cleaning this Deferred and popping it from the chain
-                    # until after we've dealt with chainee.
-                    finished = False
-                    break
+            # Callbacks can be added to the list while it is being run: walk
+            # it by index, and remove the ones which ran once done, rather
+            # than shifting the whole list after each of them.
+            callbacks = current.callbacks
+            index = 0
+            try:
+                while index < len(callbacks):
+                    item = callbacks[index]
+                    index += 1
+                    isFailure = isinstance(current.result, failure.Failure)
+                    if item.__class__ is tuple:
+                        callback, args, kw = item[isFailure]
+                        if callback is passthru:
+                            continue
+                    elif isFailure:
+                        # A callback added without an errback.
+                        continue
+                    else:
+                        callback = item
+                        args = kw = None
+
+                    # Avoid recursion if we can.
+                    if callback is _CONTINUE:
+                        # Give the waiting Deferred our current result and
+                        # then forget about that result ourselves.
+                        chainee = args[0]
+                        chainee.result = current.result
+                        current.result = None
+                        # Making sure to update _debugInfo
+                        if current._debugInfo is not None:
+                            current._debugInfo.failResult = None
+                        chainee.paused -= 1
+                        chain.append(chainee)
+                        # Delay cleaning this Deferred and popping it from the
+                        # chain until after we've dealt with chainee.
+                        finished = False
+                        break
 
-                try:
-                    current._runningCallbacks = True
                     try:
-                        current.result = callback(current.result, *args, **kw)
-                        if current.result is current:
-                            warnAboutFunction(
-                                callback,
-                                "Callback returned the Deferred "
-                                "it was attached to; this breaks the "
-                                "callback chain and will raise an "
-                                "exception in the future.")
-                    finally:
-                        current._runningCallbacks = False
-                except:
-                    # Including full frame information in the Failure is quite
-                    # expensive, so we avoid it unless self.debug is set.
-                    current.result = failure.Failure(captureVars=self.debug)
-                else:
-                    if isinstance(current.result, Deferred):
-                        # The result is another Deferred.  If it has a result,
-                        # we can take it and keep going.
-                        resultResult = getattr(current.result, 'result', _NO_RESULT)
-                        if resultResult is _NO_RESULT or isinstance(resultResult, Deferred) or current.result.paused:
-                            # Nope, it didn't.  Pause and chain.
-                            current.pause()
-                            current._chainedTo = current.result
-                            # Note: current.result has no result, so it's not
-                            # running its callbacks right now.  Therefore we can
-                            # append to the callbacks list directly instead of
-                            # using addCallbacks.
-                            current.result.callbacks.append(current._continuation())
-                            break
-                        else:
-                            # Yep, it did.  Steal it.
-                            current.result.result = None
-                            # Make sure _debugInfo's failure state is updated.
-                            if current.result._debugInfo is not None:
-                                current.result._debugInfo.failResult = None
-                            current.result = resultResult
+                        current._runningCallbacks = True
+                        try:
+                            if args or kw:
+                                current.result = callback(
+                                    current.result, *(args or ()),
+                                    **(kw or {}))
+                            else:
+                                current.result = callback(current.result)
+                            if current.result is current:
+                                warnAboutFunction(
+                                    callback,
+                                    "Callback returned the Deferred "
+                                    "it was attached to; this breaks the "
+                                    "callback chain and will raise an "
+                                    "exception in the future.")
+                        finally:
+                            current._runningCallbacks = False
+                    except:
+                        # Including full frame information in the Failure is
+                        # quite expensive, so we avoid it unless self.debug is
+                        # set.
+                        current.result = failure.Failure(
+                            captureVars=self.debug)
+                    else:
+                        if isinstance(current.result, Deferred):
+                            # The result is another Deferred.  If it has a
+                            # result, we can take it and keep going.
+                            resultResult = getattr(
+                                current.result, 'result', _NO_RESULT)
+                            if (resultResult is _NO_RESULT or
+                                    isinstance(resultResult, Deferred) or
+                                    current.result.paused):
+                                # Nope, it didn't.  Pause and chain.
+                                current.pause()
+                                current._chainedTo = current.result
+                                # Note: current.result has no result, so it's
+                                # not running its callbacks right now.
+                                # Therefore we can append to the callbacks list
+                                # directly instead of using addCallbacks.
+                                current.result.callbacks.append(
+                                    current._continuation())
+                                break
+                            else:
+                                # Yep, it did.  Steal it.
+                                current.result.result = None
+                                # Make sure _debugInfo's failure state is
+                                # updated.
+                                if current.result._debugInfo is not None:
+                                    current.result._debugInfo.failResult = None
+                                current.result = resultResult
+            finally:
+                del callbacks[:index]
 
             if finished:
                 # As much of the callback chain - perhaps all of it - as can be
@@ -841,6 +1003,46 @@ class Deferred:
         return self
 
 
+    @classmethod
+    def fromCoroutine(cls, coro):
+        """
+        Schedule the execution of a coroutine that awaits on L{Deferred}s,
+        wrapping it in a L{Deferred} that will fire on success/failure of the
+        coroutine.
+
+        Unlike L{inlineCallbacks}, the coroutine is driven without creating
+        any L{Deferred} or closure for each C{await}: awaiting a L{Deferred}
+        which already has a result resumes the coroutine immediately, and a
+        L{Deferred} firing while the coroutine is being run resumes it in
+        the same loop rather than recursively.
+
+        Cancelling the returned L{Deferred} cancels the L{Deferred} the
+        coroutine is waiting on; the coroutine can catch the resulting
+        L{CancelledError} and keep going, in which case the returned
+        L{Deferred} fires with its eventual result.
+
+        @param coro: The coroutine object to schedule.
+        @type coro: A Python 3.5+ C{async def} C{coroutine} or a Python 3.4+
+            C{yield from} using L{types.GeneratorType}.
+
+        @raise ValueError: If C{coro} is not a coroutine.
+
+        @rtype: L{Deferred}
+        """
+        if not _isCoroutine(coro):
+            raise ValueError("%r is not a coroutine" % (coro,))
+        driver = _CoroutineDriver(coro)
+        driver.deferred = cls(driver.cancel)
+        driver.run(None)
+        return driver.deferred
+
+
+
+# A live view of the attributes of Deferred, to find out cheaply whether
+# Deferred.debug was assigned directly.
+_deferredAttributes = Deferred.__dict__
+
+
 
 def _cancelledToTimedOutError(value, timeout):
     """
@@ -902,13 +1104,8 @@ def ensureDeferred(coro):
 
     @rtype: L{Deferred}
     """
-    from types import GeneratorType
-
-    if version_info >= (3, 4, 0):
-        from asyncio import iscoroutine
-
-        if iscoroutine(coro) or isinstance(coro, GeneratorType):
-            return _cancellableInlineCallbacks(coro)
+    if _isCoroutine(coro):
+        return Deferred.fromCoroutine(coro)
 
     if not isinstance(coro, Deferred):
         raise ValueError("%r is not a coroutine or a Deferred" % (coro,))
@@ -918,6 +1115,139 @@ def ensureDeferred(coro):
 
 
 
+# Checked before asking asyncio, which is slower and imported lazily.
+_coroutineTypes = tuple(
+    getattr(types, name)
+    for name in ("CoroutineType", "GeneratorType") if hasattr(types, name))
+
+
+
+def _isCoroutine(coro):
+    """
+    Determine whether an object is a coroutine which L{Deferred.fromCoroutine}
+    can drive.
+
+    @rtype: L{bool}
+    """
+    if isinstance(coro, _coroutineTypes):
+        return version_info >= (3, 4, 0)
+    if version_info < (3, 4, 0):
+        return False
+    from asyncio import iscoroutine
+    return iscoroutine(coro)
+
+
+
+class _CoroutineDriver(object):
+    """
+    Run a coroutine for L{Deferred.fromCoroutine}, sending it the results of
+    the L{Deferred}s it awaits.
+
+    @ivar deferred: The L{Deferred} to fire with the result of the coroutine.
+    @type deferred: L{Deferred}
+
+    @ivar _coro: The coroutine.
+
+    @ivar _waitingOn: The L{Deferred} the coroutine is waiting on, if any.
+    @type _waitingOn: L{Deferred} or L{None}
+
+    @ivar _running: Whether L{_CoroutineDriver.run} is running the
+        coroutine: a L{Deferred} firing meanwhile leaves its result in
+        C{_ready} instead of resuming the coroutine recursively.
+    @type _running: L{bool}
+
+    @ivar _ready: The result of the last L{Deferred} awaited, if it fired
+        while C{_running}, otherwise L{_NO_RESULT}.
+
+    """
+
+    deferred = None
+
+    def __init__(self, coro):
+        self._coro = coro
+        self._waitingOn = None
+        self._running = False
+        self._ready = _NO_RESULT
+
+
+    @failure._extraneous
+    def run(self, result):
+        """
+        Send a result to the coroutine, and keep running it as long as the
+        L{Deferred}s it awaits have a result.
+
+        @param result: The result of the last L{Deferred} awaited, which is
+            thrown into the coroutine if it is a L{failure.Failure}.
+        """
+        coro = self._coro
+        self._running = True
+        while True:
+            try:
+                if isinstance(result, failure.Failure):
+                    awaited = result.throwExceptionIntoGenerator(coro)
+                else:
+                    awaited = coro.send(result)
+            except StopIteration as e:
+                self._running = False
+                self.deferred.callback(getattr(e, "value", None))
+                return
+            except:
+                self._running = False
+                self.deferred.errback()
+                return
+
+            if not isinstance(awaited, Deferred):
+                # Like inlineCallbacks, give back anything else yielded.
+                result = awaited
+                continue
+
+            resume = self.resume
+            awaited.addCallbacks(resume, resume)
+            result = self._ready
+            if result is _NO_RESULT:
+                self._waitingOn = awaited
+                self._running = False
+                return
+            self._ready = _NO_RESULT
+
+
+    def resume(self, result):
+        """
+        Resume the coroutine with the result of the L{Deferred} it awaits.
+
+        @param result: The result of the L{Deferred}.
+
+        @return: L{None}: the result is consumed by the coroutine.
+        """
+        if self._running:
+            self._ready = result
+        else:
+            self._waitingOn = None
+            self.run(result)
+
+
+    def cancel(self, deferred):
+        """
+        Cancel the L{Deferred} the coroutine is waiting on.
+
+        The coroutine may handle the cancellation and keep going: so that
+        L{Deferred.cancel} does not errback C{deferred} in that case, it is
+        fired right away with a new L{Deferred}, fired in turn with the
+        result of the coroutine.
+
+        @param deferred: The L{Deferred} being cancelled.
+        @type deferred: L{Deferred}
+        """
+        awaited = self._waitingOn
+        if awaited is None:
+            return
+        self.deferred = replacement = Deferred(self.cancel)
+        deferred.callbacks.insert(0, lambda ignored: replacement)
+        deferred.callback(None)
+        awaited.cancel()
+
+
+
 
 @_oldStyle
 class DebugInfo:
@@ -1883,6 +2213,268 @@ class DeferredQueue(object):
 
 
 
+class ConcurrentMap(object):
+    """
+    The results of calling a function on each item of an iterable, with at
+    most a given number of these results not consumed yet.
+
+    The function is called on new items as results are consumed with
+    L{ConcurrentMap.get} or with C{async for}, so that the iterable can be
+    much larger than what fits in memory.  These calls are made by a task of
+    a L{twisted.internet.task.Cooperator}, which shares the time of the
+    reactor with the other tasks of this L{Cooperator
+    <twisted.internet.task.Cooperator>} when the iterable is long and the
+    results come quickly.
+
+    @see: L{concurrentMap}
+
+    @ivar limit: The maximum number of results, whether waited for or not
+        consumed yet, at any time.
+    @type limit: L{int}
+
+    @ivar ordered: If C{True}, the results are given in the order of the
+        items of the iterable, otherwise in the order they are ready.
+    @type ordered: L{bool}
+
+    @ivar _f: The function called on each item.
+
+    @ivar _waiting: The L{Deferred}s returned by L{ConcurrentMap.get} which
+        have not been given a result yet.
+    @type _waiting: L{list} of L{Deferred}
+
+    @ivar _results: The results ready and not consumed, by their position in
+        the order they are given in.
+    @type _results: L{dict} of L{int} to results or L{failure.Failure}s
+
+    @ivar _calls: The number of results expected so far: the number of
+        calls made, plus one if the iterable raised an exception.
+    @type _calls: L{int}
+
+    @ivar _ready: The number of calls which have returned a result.
+    @type _ready: L{int}
+
+    @ivar _nextIndex: The position of the next result to give.
+    @type _nextIndex: L{int}
+
+    @ivar _slotFreed: The L{Deferred} the task making the calls waits on
+        when C{limit} results are not consumed, or L{None}.
+    @type _slotFreed: L{Deferred} or L{None}
+
+    @ivar _stopped: Whether L{ConcurrentMap.stop} was called.
+    @type _stopped: L{bool}
+
+    @ivar _fedAll: Whether the task making the calls has finished.
+    @type _fedAll: L{bool}
+    """
+
+    def __init__(self, f, iterable, limit, ordered, cooperator):
+        """
+        A private constructor: to create a new L{ConcurrentMap}, see
+        L{concurrentMap}.
+        """
+        if limit < 1:
+            raise ValueError("concurrentMap requires limit >= 1")
+        self._f = f
+        self.limit = limit
+        self.ordered = ordered
+        self._waiting = []
+        self._results = {}
+        self._calls = 0
+        self._ready = 0
+        self._nextIndex = 0
+        self._slotFreed = None
+        self._stopped = False
+        self._fedAll = False
+        if cooperator is None:
+            from twisted.internet.task import cooperate
+        else:
+            cooperate = cooperator.cooperate
+        self._task = cooperate(self._feed(iter(iterable)))
+        self._task.whenDone().addBoth(self._fed)
+
+
+    def _feed(self, iterator):
+        """
+        Call the function on the items of an iterator, waiting for results to
+        be consumed when C{limit} of them are not.
+
+        @param iterator: The iterator over the items.
+
+        @return: An iterator for a L{twisted.internet.task.CooperativeTask}.
+        """
+        while True:
+            while self._calls - self._nextIndex >= self.limit:
+                self._slotFreed = Deferred()
+                yield self._slotFreed
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            index = self._calls
+            self._calls += 1
+            maybeDeferred(self._f, item).addBoth(self._called, index)
+            yield None
+
+
+    def _called(self, result, index):
+        """
+        Keep the result of a call until it is consumed.
+
+        @param result: The result, or a L{failure.Failure}.
+
+        @param index: The position of the item in the iterable.
+        @type index: L{int}
+        """
+        if not self.ordered:
+            index = self._ready
+        self._ready += 1
+        self._results[index] = result
+        self._deliver()
+
+
+    def _fed(self, result):
+        """
+        Take note that the task making the calls has finished.
+
+        @param result: The result of the task: a L{failure.Failure} if the
+            iterable raised an exception, if the task was stopped or if its
+            L{Cooperator<twisted.internet.task.Cooperator>} was.  Unless the
+            task was stopped by L{ConcurrentMap.stop}, this failure is given
+            after the last result.
+        """
+        self._fedAll = True
+        if isinstance(result, failure.Failure) and not self._stopped:
+            self._results[self._calls] = result
+            self._calls += 1
+        self._deliver()
+
+
+    def _deliver(self):
+        """
+        Give the results ready to the L{Deferred}s waiting for them, and let
+        the task making the calls go on if fewer than C{limit} results are
+        not consumed.
+        """
+        while self._waiting:
+            if self._nextIndex in self._results:
+                result = self._results.pop(self._nextIndex)
+                self._nextIndex += 1
+                self._waiting.pop(0).callback(result)
+            elif self._fedAll and self._nextIndex == self._calls:
+                self._waiting.pop(0).errback(StopIteration())
+            else:
+                break
+        slotFreed = self._slotFreed
+        if (slotFreed is not None and
+                self._calls - self._nextIndex < self.limit):
+            self._slotFreed = None
+            slotFreed.callback(None)
+
+
+    def _cancelGet(self, d):
+        """
+        Stop waiting for a result, as the L{Deferred} waiting for it has been
+        cancelled.
+
+        @param d: The cancelled L{Deferred}.
+        """
+        self._waiting.remove(d)
+
+
+    def get(self):
+        """
+        Consume the next result.
+
+        @return: A L{Deferred} which fires with the next result, or fails
+            with the exception raised by the function for this item.  Once
+            all the results are consumed, it fails with the exception raised
+            by the iterable, if any, and then with L{StopIteration}.
+        @rtype: L{Deferred}
+        """
+        d = Deferred(self._cancelGet)
+        self._waiting.append(d)
+        self._deliver()
+        return d
+
+
+    def stop(self):
+        """
+        Stop calling the function on new items.  The results of the calls
+        already made are still given, and then L{ConcurrentMap.get} fails with
+        L{StopIteration}.
+        """
+        if not self._fedAll and not self._stopped:
+            self._stopped = True
+            self._task.stop()
+
+
+    def __aiter__(self):
+        """
+        Iterate over the results with C{async for}.
+
+        @return: This L{ConcurrentMap}.
+        """
+        return self
+
+
+    def __anext__(self):
+        """
+        Consume the next result, for C{async for}.
+
+        @return: A L{Deferred} like the ones of L{ConcurrentMap.get}, failing
+            with C{StopAsyncIteration} instead of L{StopIteration}.
+        """
+        return self.get().addErrback(self._stopAsyncIteration)
+
+
+    @staticmethod
+    def _stopAsyncIteration(reason):
+        """
+        Replace L{StopIteration} with C{StopAsyncIteration}.
+        """
+        reason.trap(StopIteration)
+        raise StopAsyncIteration()
+
+
+
+def concurrentMap(f, iterable, limit, ordered=True, cooperator=None):
+    """
+    Call a function on each item of an iterable, with a bounded number of
+    calls and results in memory at once.
+
+    Unlike L{gatherResults}, this takes the items from the iterable one at a
+    time, as results are consumed: at most C{limit} calls are waited for or
+    have results not consumed yet.  For instance, to make many requests a
+    hundred at a time::
+
+        async def fetchAll(urls):
+            async for response in concurrentMap(fetch, urls, 100):
+                await handle(response)
+
+    @param f: The function to call, with an item as its only argument.  It
+        may return a L{Deferred}.
+
+    @param iterable: The items, which may be a generator of any length.
+
+    @param limit: See L{ConcurrentMap.limit}.
+    @type limit: L{int}
+
+    @param ordered: See L{ConcurrentMap.ordered}.
+    @type ordered: L{bool}
+
+    @param cooperator: The L{twisted.internet.task.Cooperator} making the
+        calls, the global one by default.
+
+    @return: The results, to consume with L{ConcurrentMap.get} or with
+        C{async for}.
+    @rtype: L{ConcurrentMap}
+
+    @raise ValueError: If C{limit} is lower than 1.
+    """
+    return ConcurrentMap(f, iterable, limit, ordered, cooperator)
+
+
+
 class AlreadyTryingToLockError(Exception):
     """
     Raised when L{DeferredFilesystemLock.deferUntilLocked} is called twice on a
@@ -1999,6 +2591,7 @@ __all__ = ["Deferred", "DeferredList", "succeed", "fail", "FAILURE", "SUCCESS",
            "waitForDeferred", "deferredGenerator", "inlineCallbacks",
            "returnValue",
            "DeferredLock", "DeferredSemaphore", "DeferredQueue",
+           "ConcurrentMap", "concurrentMap",
            "DeferredFilesystemLock", "AlreadyTryingToLockError",
            "CancelledError",
           ]
@@ -40,6 +40,7 @@ from twisted.internet.protocol import ClientFactory, Factory
 from twisted.internet.protocol import ProcessProtocol, Protocol
 from twisted.internet.stdio import StandardIO, PipeAddress
 from twisted.internet.task import LoopingCall
+from twisted.internet.tcp import _tcpSocketOptions
 from twisted.internet._resolver import HostResolution
 from twisted.logger import Logger
 from twisted.plugin import IPlugin, getPlugins
@@ -457,7 +458,9 @@ class _TCPServerEndpoint(object):
     A TCP server endpoint interface
     """
 
-    def __init__(self, reactor, port, backlog, interface):
+    def __init__(self, reactor, port, backlog, interface, reusePort=False,
+                 fastOpen=None, deferAccept=None, userTimeout=None,
+                 quickAck=False, busyPoll=None, socketOptions=()):
         """
         @param reactor: An L{IReactorTCP} provider.
 
@@ -469,11 +472,47 @@ class _TCPServerEndpoint(object):
 
         @param interface: The hostname to bind to
         @type interface: str
+
+        @param reusePort: Whether to listen with C{SO_REUSEPORT}, so that
+            several processes can listen on the same port.  The reactor's
+            C{listenTCP} must then accept a C{reusePort} argument.
+        @type reusePort: bool
+
+        @param fastOpen: The number of pending TCP Fast Open connections to
+            allow, whose first data arrives with the I{SYN} (C{TCP_FASTOPEN}).
+        @type fastOpen: int
+
+        @param deferAccept: The number of seconds to wait for the first data
+            of a connection before accepting it (C{TCP_DEFER_ACCEPT}).
+        @type deferAccept: int
+
+        @param userTimeout: The number of seconds written data may stay
+            unacknowledged before the connection is dropped
+            (C{TCP_USER_TIMEOUT}).
+        @type userTimeout: float
+
+        @param quickAck: Whether to acknowledge received data right away
+            (C{TCP_QUICKACK}).
+        @type quickAck: bool
+
+        @param busyPoll: The number of microseconds to busy poll for data
+            when reading (C{SO_BUSY_POLL}).
+        @type busyPoll: int
+
+        @param socketOptions: C{(level, option, value)} tuples of further
+            options to set on the listening socket.  If any of these
+            options are given, the reactor's C{listenTCP} must accept a
+            C{socketOptions} argument.
+        @type socketOptions: iterable of tuple
         """
         self._reactor = reactor
         self._port = port
         self._backlog = backlog
         self._interface = interface
+        self._reusePort = reusePort
+        self._socketOptions = tuple(socketOptions) + tuple(_tcpSocketOptions(
+            True, fastOpen=fastOpen, deferAccept=deferAccept,
+            userTimeout=userTimeout, quickAck=quickAck, busyPoll=busyPoll))
 
 
     def listen(self, protocolFactory):
@@ -481,11 +520,17 @@ class _TCPServerEndpoint(object):
         Implement L{IStreamServerEndpoint.listen} to listen on a TCP
         socket
         """
+        kwargs = {}
+        if self._reusePort:
+            kwargs['reusePort'] = True
+        if self._socketOptions:
+            kwargs['socketOptions'] = self._socketOptions
         return defer.execute(self._reactor.listenTCP,
                              self._port,
                              protocolFactory,
                              backlog=self._backlog,
-                             interface=self._interface)
+                             interface=self._interface,
+                             **kwargs)
 
 
 
@@ -493,7 +538,8 @@ class TCP4ServerEndpoint(_TCPServerEndpoint):
     """
     Implements TCP server endpoint with an IPv4 configuration
     """
-    def __init__(self, reactor, port, backlog=50, interface=''):
+    def __init__(self, reactor, port, backlog=50, interface='',
+                 reusePort=False, **options):
         """
         @param reactor: An L{IReactorTCP} provider.
 
@@ -505,8 +551,16 @@ class TCP4ServerEndpoint(_TCPServerEndpoint):
 
         @param interface: The hostname to bind to, defaults to '' (all)
         @type interface: str
+
+        @param reusePort: Whether to listen with C{SO_REUSEPORT}.
+        @type reusePort: bool
+
+        @param options: The C{fastOpen}, C{deferAccept}, C{userTimeout},
+            C{quickAck}, C{busyPoll} and C{socketOptions} arguments of
+            L{_TCPServerEndpoint}, which tune the listening socket.
         """
-        _TCPServerEndpoint.__init__(self, reactor, port, backlog, interface)
+        _TCPServerEndpoint.__init__(
+            self, reactor, port, backlog, interface, reusePort, **options)
 
 
 
@@ -514,7 +568,8 @@ class TCP6ServerEndpoint(_TCPServerEndpoint):
     """
     Implements TCP server endpoint with an IPv6 configuration
     """
-    def __init__(self, reactor, port, backlog=50, interface='::'):
+    def __init__(self, reactor, port, backlog=50, interface='::',
+                 reusePort=False, **options):
         """
         @param reactor: An L{IReactorTCP} provider.
 
@@ -526,8 +581,16 @@ class TCP6ServerEndpoint(_TCPServerEndpoint):
 
         @param interface: The hostname to bind to, defaults to C{::} (all)
         @type interface: str
+
+        @param reusePort: Whether to listen with C{SO_REUSEPORT}.
+        @type reusePort: bool
+
+        @param options: The C{fastOpen}, C{deferAccept}, C{userTimeout},
+            C{quickAck}, C{busyPoll} and C{socketOptions} arguments of
+            L{_TCPServerEndpoint}, which tune the listening socket.
         """
-        _TCPServerEndpoint.__init__(self, reactor, port, backlog, interface)
+        _TCPServerEndpoint.__init__(
+            self, reactor, port, backlog, interface, reusePort, **options)
 
 
 
@@ -537,7 +600,9 @@ class TCP4ClientEndpoint(object):
     TCP client endpoint with an IPv4 configuration.
     """
 
-    def __init__(self, reactor, host, port, timeout=30, bindAddress=None):
+    def __init__(self, reactor, host, port, timeout=30, bindAddress=None,
+                 fastOpen=False, userTimeout=None, quickAck=False,
+                 busyPoll=None, socketOptions=()):
         """
         @param reactor: An L{IReactorTCP} provider
 
@@ -554,23 +619,54 @@ class TCP4ClientEndpoint(object):
         @param bindAddress: A (host, port) tuple of local address to bind to,
             or None.
         @type bindAddress: tuple
+
+        @param fastOpen: Whether to use TCP Fast Open, so that the first data
+            written once connected is sent with the I{SYN}
+            (C{TCP_FASTOPEN_CONNECT}).
+        @type fastOpen: L{bool}
+
+        @param userTimeout: The number of seconds written data may stay
+            unacknowledged before the connection is dropped
+            (C{TCP_USER_TIMEOUT}).
+        @type userTimeout: L{float} or L{None}
+
+        @param quickAck: Whether to acknowledge received data right away
+            (C{TCP_QUICKACK}).
+        @type quickAck: L{bool}
+
+        @param busyPoll: The number of microseconds to busy poll for data
+            when reading (C{SO_BUSY_POLL}).
+        @type busyPoll: L{int} or L{None}
+
+        @param socketOptions: C{(level, option, value)} tuples of further
+            options to set on the socket.  If any of these options are given,
+            the reactor's C{connectTCP} must accept a C{socketOptions}
+            argument.
+        @type socketOptions: iterable of L{tuple}
         """
         self._reactor = reactor
         self._host = host
         self._port = port
         self._timeout = timeout
         self._bindAddress = bindAddress
+        self._socketOptions = tuple(socketOptions) + tuple(_tcpSocketOptions(
+            False, fastOpen=fastOpen, userTimeout=userTimeout,
+            quickAck=quickAck, busyPoll=busyPoll))
 
 
     def connect(self, protocolFactory):
         """
         Implement L{IStreamClientEndpoint.connect} to connect via TCP.
         """
+        kwargs = {}
+        if self._socketOptions:
+            kwargs['socketOptions'] = self._socketOptions
         try:
             wf = _WrappingFactory(protocolFactory)
             self._reactor.connectTCP(
                 self._host, self._port, wf,
-                timeout=self._timeout, bindAddress=self._bindAddress)
+                timeout=self._timeout, bindAddress=self._bindAddress,
+                **kwargs)
             return wf._onConnection
         except:
             return defer.fail()
@@ -598,11 +694,19 @@ class TCP6ClientEndpoint(object):
     _GAI_ADDRESS = 4
     _GAI_ADDRESS_HOST = 0
 
-    def __init__(self, reactor, host, port, timeout=30, bindAddress=None):
+    def __init__(self, reactor, host, port, timeout=30, bindAddress=None,
+                 fastOpen=False, userTimeout=None, quickAck=False,
+                 busyPoll=None, socketOptions=()):
         """
         @param host: An IPv6 address literal or a hostname with an
             IPv6 address
 
+        @param fastOpen: See L{TCP4ClientEndpoint.__init__}.
+        @param userTimeout: See L{TCP4ClientEndpoint.__init__}.
+        @param quickAck: See L{TCP4ClientEndpoint.__init__}.
+        @param busyPoll: See L{TCP4ClientEndpoint.__init__}.
+        @param socketOptions: See L{TCP4ClientEndpoint.__init__}.
+
         @see: L{twisted.internet.interfaces.IReactorTCP.connectTCP}
         """
         self._reactor = reactor
@@ -610,6 +714,9 @@ class TCP6ClientEndpoint(object):
         self._port = port
         self._timeout = timeout
         self._bindAddress = bindAddress
+        self._socketOptions = tuple(socketOptions) + tuple(_tcpSocketOptions(
+            False, fastOpen=fastOpen, userTimeout=userTimeout,
+            quickAck=quickAck, busyPoll=busyPoll))
 
 
     def connect(self, protocolFactory):
@@ -640,10 +747,14 @@ class TCP6ClientEndpoint(object):
         """
         Connect to the server using the resolved hostname.
         """
+        kwargs = {}
+        if self._socketOptions:
+            kwargs['socketOptions'] = self._socketOptions
         try:
             wf = _WrappingFactory(protocolFactory)
             self._reactor.connectTCP(resolvedHost, self._port, wf,
-                timeout=self._timeout, bindAddress=self._bindAddress)
+                timeout=self._timeout, bindAddress=self._bindAddress,
+                **kwargs)
             return wf._onConnection
         except:
             return defer.fail()
@@ -1263,7 +1374,8 @@ class AdoptedStreamServerEndpoint(object):
 
 
 
-def _parseTCP(factory, port, interface="", backlog=50):
+def _parseTCP(factory, port, interface="", backlog=50, reusePort='0',
+              **options):
     """
     Internal parser function for L{_parseServer} to convert the string
     arguments for a TCP(IPv4) stream endpoint into the structured arguments.
@@ -1281,12 +1393,55 @@ def _parseTCP(factory, port, interface="", backlog=50):
     @param backlog: the length of the listen queue
     @type backlog: C{str}
 
+    @param reusePort: A string '0' or '1', mapping to False and True
+        respectively.  See the C{reusePort} argument to
+        L{TCP4ServerEndpoint}.
+    @type reusePort: C{str}
+
+    @param options: The C{fastOpen}, C{deferAccept}, C{userTimeout},
+        C{quickAck} and C{busyPoll} options of the listening socket, as
+        strings.  See L{_parseTCPOptions}.
+
     @return: a 2-tuple of (args, kwargs), describing  the parameters to
         L{IReactorTCP.listenTCP} (or, modulo argument 2, the factory, arguments
         to L{TCP4ServerEndpoint}.
     """
-    return (int(port), factory), {'interface': interface,
-                                  'backlog': int(backlog)}
+    kwargs = {'interface': interface, 'backlog': int(backlog)}
+    if int(reusePort):
+        kwargs['reusePort'] = True
+    socketOptions = _tcpSocketOptions(True, **_parseTCPOptions(options))
+    if socketOptions:
+        kwargs['socketOptions'] = socketOptions
+    return (int(port), factory), kwargs
+
+
+
+def _parseTCPOptions(options):
+    """
+    Convert the TCP tuning options of a strports description to the values
+    which the TCP endpoints accept.
+
+    @param options: The C{fastOpen}, C{deferAccept}, C{userTimeout},
+        C{quickAck} and C{busyPoll} options, as strings.  C{fastOpen} and
+        C{deferAccept} are integers, C{userTimeout} a number of seconds,
+        C{busyPoll} a number of microseconds, and C{quickAck} C{'0'} or
+        C{'1'}.
+    @type options: L{dict}
+
+    @return: The converted options.
+    @rtype: L{dict}
+
+    @raise TypeError: If an option is not known.
+    """
+    converters = {'fastOpen': int, 'deferAccept': int,
+                  'userTimeout': float, 'quickAck': lambda v: bool(int(v)),
+                  'busyPoll': int}
+    parsed = {}
+    for name, value in options.items():
+        if name not in converters:
+            raise TypeError("Unknown TCP option %r" % (name,))
+        parsed[name] = converters[name](value)
+    return parsed
 
 
 
@@ -1494,7 +1649,8 @@ class _TCP6ServerParser(object):
     """
     prefix = "tcp6"     # Used in _parseServer to identify the plugin with the endpoint type
 
-    def _parseServer(self, reactor, port, backlog=50, interface='::'):
+    def _parseServer(self, reactor, port, backlog=50, interface='::',
+                     reusePort='0', **options):
         """
         Internal parser function for L{_parseServer} to convert the string
         arguments into structured arguments for the L{TCP6ServerEndpoint}
@@ -1509,10 +1665,19 @@ class _TCP6ServerParser(object):
 
         @param interface: The hostname to bind to
         @type interface: str
+
+        @param reusePort: '1' to listen with C{SO_REUSEPORT}, '0' otherwise.
+        @type reusePort: str
+
+        @param options: The C{fastOpen}, C{deferAccept}, C{userTimeout},
+            C{quickAck} and C{busyPoll} options, as strings.  See
+            L{_parseTCPOptions}.
         """
         port = int(port)
         backlog = int(backlog)
-        return TCP6ServerEndpoint(reactor, port, backlog, interface)
+        return TCP6ServerEndpoint(reactor, port, backlog, interface,
+                                  bool(int(reusePort)),
+                                  **_parseTCPOptions(options))
 
 
     def parseStreamServer(self, reactor, *args, **kwargs):
@@ -1678,6 +1843,18 @@ def serverFromString(reactor, description):
 
         serverFromString(reactor, "tcp:80:interface=127.0.0.1")
 
+    Several processes may listen on the same TCP port, with the kernel
+    balancing connections between them, if they all set C{reusePort}::
+
+        serverFromString(reactor, "tcp:80:reusePort=1")
+
+    The listening socket of a TCP server endpoint may be tuned with the
+    C{fastOpen} (the number of pending TCP Fast Open connections),
+    C{deferAccept} (seconds), C{userTimeout} (seconds), C{quickAck} (C{0} or
+    C{1}) and C{busyPoll} (microseconds) arguments::
+
+        serverFromString(reactor, "tcp:80:fastOpen=256:deferAccept=5")
+
     SSL server endpoints may be specified with the 'ssl' prefix, and the
     private key and certificate files may be specified by the C{privateKey} and
     C{certKey} arguments::
@@ -1776,7 +1953,8 @@ def _parseClientTCP(*args, **kwargs):
     Valid positional arguments to this function are host and port.
 
     Valid keyword arguments to this function are all L{IReactorTCP.connectTCP}
-    arguments.
+    arguments, and the C{fastOpen}, C{userTimeout}, C{quickAck} and
+    C{busyPoll} arguments of L{TCP4ClientEndpoint}.
 
     @return: The coerced values as a C{dict}.
     """
@@ -1805,6 +1983,13 @@ def _parseClientTCP(*args, **kwargs):
     except KeyError:
         pass
 
+    if 'fastOpen' in kwargs:
+        kwargs['fastOpen'] = bool(int(kwargs['fastOpen']))
+    kwargs.update(_parseTCPOptions(dict(
+        (name, kwargs.pop(name))
+        for name in ('userTimeout', 'quickAck', 'busyPoll')
+        if name in kwargs)))
+
     return kwargs
 
 
@@ -2028,6 +2213,13 @@ def clientFromString(reactor, description):
     client endpoints. The client socket will always use an ephemeral
     port assigned by the operating system
 
+    TCP client endpoint description strings can set C{fastOpen} to C{1}, so
+    that the first data written is sent with the I{SYN}, and tune the socket
+    with the C{userTimeout} (seconds), C{quickAck} (C{0} or C{1}) and
+    C{busyPoll} (microseconds) arguments::
+
+        clientFromString(reactor, "tcp:www.example.com:80:fastOpen=1")
+
     You can create a UNIX client endpoint with the 'path' argument and optional
     'lockfile' and 'timeout' arguments::
 
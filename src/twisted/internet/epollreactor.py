@@ -13,12 +13,13 @@ listeners or connectors are added)::
 
 from __future__ import division, absolute_import
 
-from select import epoll, EPOLLHUP, EPOLLERR, EPOLLIN, EPOLLOUT
+from select import epoll, EPOLLHUP, EPOLLERR, EPOLLIN, EPOLLOUT, EPOLLET
 import errno
 
 from zope.interface import implementer
 
-from twisted.internet.interfaces import IReactorFDSet
+from twisted.internet.interfaces import (
+    IReactorFDSet, _IEdgeTriggeredDescriptor)
 
 from twisted.python import log
 from twisted.internet import posixbase
@@ -51,6 +52,34 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
     @ivar _continuousPolling: A L{_ContinuousPolling} instance, used to handle
         file descriptors (e.g. filesystem files) that are not supported by
         C{epoll(7)}.
+
+    @ivar edgeTriggered: Whether descriptors providing
+        L{_IEdgeTriggeredDescriptor}, such as TCP connections, are registered
+        with C{_poller} only once, for both read and write readiness
+        notifications in edge-triggered mode.  Starting and stopping reading
+        or writing them then only changes C{_reads} and C{_writes}, instead of
+        calling C{epoll_ctl(2)}.  Since C{_poller} reports them only when
+        they become ready, they are read from and written to once per
+        iteration until they report that they would block.  Other
+        descriptors are always registered in level-triggered mode.
+    @type edgeTriggered: L{bool}
+
+    @ivar _edgeTriggeredFDs: A set containing the integer file descriptors
+        registered with C{_poller} in edge-triggered mode.
+
+    @ivar _readable: A set containing the integer file descriptors in
+        C{_edgeTriggeredFDs} which may have data to read: they were reported
+        readable by C{_poller} since their last C{doRead} found that they
+        would block.
+
+    @ivar _writable: A set containing the integer file descriptors in
+        C{_edgeTriggeredFDs} which may be written to: they were reported
+        writable by C{_poller} since their last C{doWrite} found that they
+        would block.
+
+    @ivar controlCalls: The number of C{epoll_ctl(2)} calls made so far, which
+        may be sampled periodically to measure their rate.
+    @type controlCalls: L{int}
     """
 
     # Attributes for _PollLikeMixin
@@ -58,11 +87,20 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
     _POLL_IN = EPOLLIN
     _POLL_OUT = EPOLLOUT
 
-    def __init__(self):
+    edgeTriggered = False
+    controlCalls = 0
+
+    def __init__(self, edgeTriggered=None):
         """
         Initialize epoll object, file descriptor tracking dictionaries, and the
         base class.
+
+        @param edgeTriggered: If not L{None}, overrides
+            L{EPollReactor.edgeTriggered}.
+        @type edgeTriggered: L{bool} or L{None}
         """
+        if edgeTriggered is not None:
+            self.edgeTriggered = edgeTriggered
         # Create the poller we're going to use.  The 1024 here is just a hint
         # to the kernel, it is not a hard maximum.  After Linux 2.6.8, the size
         # argument is completely ignored.
@@ -70,6 +108,9 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
         self._reads = set()
         self._writes = set()
         self._selectables = {}
+        self._edgeTriggeredFDs = set()
+        self._readable = set()
+        self._writable = set()
         self._continuousPolling = posixbase._ContinuousPolling(self)
         posixbase.PosixReactorBase.__init__(self)
 
@@ -79,7 +120,9 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
         Private method for adding a descriptor from the event loop.
 
         It takes care of adding it if  new or modifying it if already added
-        for another state (read -> read/write for example).
+        for another state (read -> read/write for example).  Descriptors
+        registered in edge-triggered mode are already registered for both
+        states, so only the tracking state is updated for them.
         """
         fd = xer.fileno()
         if fd not in primary:
@@ -90,9 +133,17 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
             # something.  We'll do the same thing for every other call to
             # this method in this file.
             if fd in other:
-                flags |= antievent
-                self._poller.modify(fd, flags)
+                if fd not in self._edgeTriggeredFDs:
+                    flags |= antievent
+                    self.controlCalls += 1
+                    self._poller.modify(fd, flags)
+            elif (self.edgeTriggered and
+                  _IEdgeTriggeredDescriptor.providedBy(xer)):
+                self.controlCalls += 1
+                self._poller.register(fd, EPOLLIN | EPOLLOUT | EPOLLET)
+                self._edgeTriggeredFDs.add(fd)
             else:
+                self.controlCalls += 1
                 self._poller.register(fd, flags)
 
             # Update our own tracking state *only* after the epoll call has
@@ -151,13 +202,19 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
                 return
         if fd in primary:
             if fd in other:
-                flags = antievent
-                # See comment above modify call in _add.
-                self._poller.modify(fd, flags)
+                if fd not in self._edgeTriggeredFDs:
+                    flags = antievent
+                    # See comment above modify call in _add.
+                    self.controlCalls += 1
+                    self._poller.modify(fd, flags)
             else:
                 del selectables[fd]
                 # See comment above _control call in _add.
+                self.controlCalls += 1
                 self._poller.unregister(fd)
+                self._edgeTriggeredFDs.discard(fd)
+                self._readable.discard(fd)
+                self._writable.discard(fd)
             primary.remove(fd)
 
 
@@ -209,6 +266,11 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
         """
         if timeout is None:
             timeout = -1  # Wait indefinitely.
+        if (not self._readable.isdisjoint(self._reads) or
+                not self._writable.isdisjoint(self._writes)):
+            # Some descriptors are still known to be ready, and will not be
+            # reported again: don't wait before handling them.
+            timeout = 0
 
         try:
             # Limit the number of events to the number of io objects we're
@@ -225,8 +287,16 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
             # loudly.
             raise
 
-        _drdw = self._doReadOrWrite
+        _drdw = self._instrumented(self._doReadOrWrite)
+        edgeTriggeredFDs = self._edgeTriggeredFDs
         for fd, event in l:
+            if fd in edgeTriggeredFDs:
+                # Errors and hangups are found by the next doRead or doWrite.
+                if event & (EPOLLIN | EPOLLHUP | EPOLLERR):
+                    self._readable.add(fd)
+                if event & (EPOLLOUT | EPOLLHUP | EPOLLERR):
+                    self._writable.add(fd)
+                continue
             try:
                 selectable = self._selectables[fd]
             except KeyError:
@@ -234,14 +304,50 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
             else:
                 log.callWithLogger(selectable, _drdw, selectable, fd, event)
 
+        if edgeTriggeredFDs:
+            self._doReadyEdgeTriggered()
+
     doIteration = doPoll
 
 
-def install():
+    def _doReadyEdgeTriggered(self):
+        """
+        Call C{doRead} or C{doWrite} once on each descriptor registered in
+        edge-triggered mode which is ready for them, and forget about its
+        readiness if it reports that it would block.
+        """
+        readable = self._readable
+        writable = self._writable
+        reads = self._reads
+        writes = self._writes
+        _drdw = self._instrumented(self._doReadOrWrite)
+        for fd in (readable & reads) | (writable & writes):
+            # Earlier calls may have stopped reading or writing this one.
+            event = 0
+            if fd in readable and fd in reads:
+                event |= EPOLLIN
+            if fd in writable and fd in writes:
+                event |= EPOLLOUT
+            if not event:
+                continue
+            selectable = self._selectables[fd]
+            selectable._readWouldBlock = selectable._writeWouldBlock = False
+            log.callWithLogger(selectable, _drdw, selectable, fd, event)
+            if self._selectables.get(fd) is selectable:
+                if event & EPOLLIN and selectable._readWouldBlock:
+                    readable.discard(fd)
+                if event & EPOLLOUT and selectable._writeWouldBlock:
+                    writable.discard(fd)
+
+
+def install(edgeTriggered=False):
     """
     Install the epoll() reactor.
+
+    @param edgeTriggered: See L{EPollReactor.edgeTriggered}.
+    @type edgeTriggered: L{bool}
     """
-    p = EPollReactor()
+    p = EPollReactor(edgeTriggered)
     from twisted.internet.main import installReactor
     installReactor(p)
 
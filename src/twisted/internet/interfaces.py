@@ -1273,6 +1273,33 @@ class IReactorTime(Interface):
         """
 
 
+
+class IReactorCallSoon(Interface):
+    """
+    A reactor which can cheaply call a function on its next iteration.
+    """
+
+    def callSoon(callable, *args, **kw):
+        """
+        Call a function on the next iteration of the reactor.
+
+        This behaves like C{callLater(0, callable, *args, **kw)}, but may be
+        implemented without the cost of scheduling a timed call.  Calls are
+        made in the order they were scheduled.  A call scheduled while the
+        reactor is running the calls of an iteration waits for the next one.
+
+        @param callable: the callable object to call.
+
+        @param args: the arguments to call it with.
+
+        @param kw: the keyword arguments to call it with.
+
+        @return: An object with C{cancel()} and C{active()} methods behaving
+            like those of L{IDelayedCall}.
+        """
+
+
+
 class IDelayedCall(Interface):
     """
     A scheduled call.
@@ -1379,10 +1406,21 @@ class IReactorThreads(IReactorFromThreads, IReactorInThreads):
     Internally, this should use a thread pool and dispatch methods to them.
     """
 
-    def getThreadPool():
+    def getThreadPool(name=None):
         """
-        Return the threadpool used by L{IReactorInThreads.callInThread}.
-        Create it first if necessary.
+        Return the threadpool used by L{IReactorInThreads.callInThread}, or
+        a separate threadpool with the given name.  Create it first if
+        necessary.
+
+        Separate pools let kinds of blocking work, such as name resolution,
+        database queries or computations, each have their own threads, so
+        that one of them using all of its threads does not delay the others.
+        Pass the pool to L{twisted.internet.threads.deferToThreadPool} to use
+        it.
+
+        @param name: The name of the pool, or L{None} for the one used by
+            L{IReactorInThreads.callInThread}.
+        @type name: native L{str} or L{None}
 
         @rtype: L{twisted.python.threadpool.ThreadPool}
         """
@@ -1818,6 +1856,35 @@ class IHalfCloseableDescriptor(Interface):
         """
 
 
+
+class _IEdgeTriggeredDescriptor(IReadWriteDescriptor):
+    """
+    A descriptor which reports when reading from or writing to it would
+    block, so that a reactor can be notified of its readiness only when it
+    changes (edge-triggered), rather than whenever it is ready
+    (level-triggered).
+
+    Before calling C{doRead} or C{doWrite}, the reactor sets the
+    corresponding attribute below to C{False}; the descriptor sets it to
+    C{True} if the call found that the descriptor would block.  Until then,
+    the reactor keeps calling C{doRead} or C{doWrite}, once per iteration.
+    """
+
+    _readWouldBlock = Attribute(
+        """
+        C{bool}, whether the last C{doRead} found no more data to read.
+        """
+    )
+
+    _writeWouldBlock = Attribute(
+        """
+        C{bool}, whether the last C{doWrite} found that no more data could be
+        written.
+        """
+    )
+
+
+
 class ISystemHandle(Interface):
     """
     An object that wraps a networking OS-specific handle.
@@ -2095,6 +2162,20 @@ class IHalfCloseableProtocol(Interface):
 
 
 
+class IBufferReceiver(Interface):
+    """
+    Implemented by an L{IProtocol} to indicate that its C{dataReceived} method
+    accepts a L{memoryview} as well as L{bytes}.
+
+    Transports which read into a reusable buffer, such as TCP connections of a
+    reactor with a C{receiveBufferPool}, may then give the protocol a view of
+    that buffer instead of a copy of the data.  The view is only valid until
+    C{dataReceived} returns: a protocol which needs the data later must copy
+    it, for instance with C{view.tobytes()}.
+    """
+
+
+
 class IHandshakeListener(Interface):
     """
     An interface implemented by a L{IProtocol} to indicate that it would like
@@ -2238,6 +2319,70 @@ class ITransport(Interface):
         """
 
 
+class ISendFileTransport(ITransport):
+    """
+    A transport which can write the contents of a file without copying them
+    through the Python process, for instance with C{sendfile(2)}.
+    """
+
+    def sendFile(fileObject, offset, count):
+        """
+        Write part of a file to the transport, after any data previously
+        written to it.
+
+        Nothing else may be written to the transport until the returned
+        L{Deferred} fires.  The position of C{fileObject} may be changed.
+
+        @param fileObject: The file to write from.  It is not closed.
+        @type fileObject: A L{file}-like object with a C{fileno} method, or
+            at least C{seek} and C{read} methods.
+
+        @param offset: The position in the file of the first byte to write.
+        @type offset: L{int}
+
+        @param count: The number of bytes to write.
+        @type count: L{int}
+
+        @return: A L{Deferred} which fires with L{None} once all the bytes
+            have been written, or fails if the connection is lost first, or
+            with L{EOFError} if the file ends first, or with the exception
+            raised while reading the file.
+        @rtype: L{Deferred}
+        """
+
+
+
+class ICorkableTransport(ITransport):
+    """
+    A transport which can hold back the data written to it for a while, so
+    that the many small writes making up a message are sent together, with as
+    few system calls, segments and TLS records as possible.
+    """
+
+    def cork():
+        """
+        Hold back the data written from now on until L{uncork} has been
+        called as many times as C{cork}, or until the current iteration of
+        the reactor ends, whichever comes first.
+
+        The end of the iteration is found with the C{callSoon} of a reactor
+        providing L{IReactorCallSoon}, or else with a C{callLater} of no
+        delay.  A transport which has no reactor only sends the data held
+        back once uncorked.
+
+        Data which the transport was already writing may still be written.
+        """
+
+
+    def uncork():
+        """
+        Undo one call to L{cork}, sending the held data once every call has
+        been undone.  Extra calls, for instance after the end of the reactor
+        iteration released the data, do nothing.
+        """
+
+
+
 class ITCPTransport(ITransport):
     """
     A TCP based transport.
@@ -2680,6 +2825,26 @@ class IUDPTransport(Interface):
         """
 
 
+class IBatchUDPTransport(IUDPTransport):
+    """
+    A UDP transport which can write several datagrams at once, for instance
+    with a single C{sendmmsg(2)} call.
+    """
+
+    def writeMany(datagrams):
+        """
+        Write several datagrams, as L{IUDPTransport.write} would.
+
+        @param datagrams: The datagrams to write.
+        @type datagrams: iterable of C{(packet, addr)} pairs, where C{addr} is
+            as for L{IUDPTransport.write}.
+
+        @raise twisted.internet.error.MessageLengthError: One of the datagrams
+            was too long.  The following ones were not written.
+        """
+
+
+
 class IUNIXDatagramTransport(Interface):
     """
     Transport for UDP PacketProtocols.
@@ -257,7 +257,7 @@ class KQueueReactor(posixbase.PosixReactorBase):
             else:
                 raise
 
-        _drdw = self._doWriteOrRead
+        _drdw = self._instrumented(self._doWriteOrRead)
         for event in events:
             fd = event.ident
             try:
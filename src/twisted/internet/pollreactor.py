@@ -158,7 +158,7 @@ class PollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
                 return
             else:
                 raise
-        _drdw = self._doReadOrWrite
+        _drdw = self._instrumented(self._doReadOrWrite)
         for fd, event in l:
             try:
                 selectable = self._selectables[fd]
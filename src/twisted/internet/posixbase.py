@@ -182,8 +182,66 @@ class _UnixWaker(_FDWaker):
 
 
 
+class _EventFDWaker(_FDWaker):
+    """
+    A waker using a Linux C{eventfd} rather than a pipe: a single file
+    descriptor holding a counter, which wakes up the reactor when it is
+    incremented and is reset by a single read however many times it was
+    incremented.
+    """
+
+    def __init__(self, reactor):
+        """
+        Initialize.
+        """
+        self.reactor = reactor
+        self.i = self.o = os.eventfd(0, os.EFD_CLOEXEC | os.EFD_NONBLOCK)
+        self.fileno = lambda: self.i
+
+
+    def wakeUp(self):
+        """
+        Increment the counter of the C{eventfd}.
+        """
+        if self.o is not None:
+            try:
+                util.untilConcludes(os.eventfd_write, self.o, 1)
+            except OSError as e:
+                # The counter is so high the reactor is being woken up.
+                if e.errno != errno.EAGAIN:
+                    raise
+
+
+    def doRead(self):
+        """
+        Reset the counter of the C{eventfd}.
+        """
+        try:
+            util.untilConcludes(os.eventfd_read, self.i)
+        except OSError as e:
+            if e.errno != errno.EAGAIN:
+                raise
+
+
+    def connectionLost(self, reason):
+        """
+        Close the C{eventfd}.
+        """
+        if self.i is None:
+            return
+        try:
+            os.close(self.i)
+        except OSError:
+            pass
+        self.i = self.o = None
+
+
+
 if platformType == 'posix':
-    _Waker = _UnixWaker
+    if getattr(os, "eventfd", None) is not None:
+        _Waker = _EventFDWaker
+    else:
+        _Waker = _UnixWaker
 else:
     # Primarily Windows and Jython.
     _Waker = _SocketWaker
@@ -267,8 +325,15 @@ class PosixReactorBase(_SignalReactorMixin, _DisconnectSelectableMixin,
 
     @ivar _childWaker: L{None} or a reference to the L{_SIGCHLDWaker}
         which is used to properly notice child process termination.
+
+    @ivar reusePortByDefault: Whether the TCP and UDP ports created by
+        L{listenTCP} and L{listenUDP} without a C{reusePort} argument listen
+        with C{SO_REUSEPORT}.
+    @type reusePortByDefault: L{bool}
     """
 
+    reusePortByDefault = False
+
     # Callable that creates a waker, overrideable so that subclasses can
     # substitute their own implementation:
     _wakerFactory = _Waker
@@ -360,12 +425,22 @@ class PosixReactorBase(_SignalReactorMixin, _DisconnectSelectableMixin,
 
     # IReactorUDP
 
-    def listenUDP(self, port, protocol, interface='', maxPacketSize=8192):
+    def listenUDP(self, port, protocol, interface='', maxPacketSize=8192,
+                  reusePort=None):
         """Connects a given L{DatagramProtocol} to the given numeric UDP port.
 
+        @param reusePort: Whether to set C{SO_REUSEPORT} on the socket, so
+            that other processes can receive datagrams sent to the same port.
+            By default, L{reusePortByDefault} is used, and then
+            L{udp.Port.reusePort}.
+        @type reusePort: L{bool} or L{None}
+
         @returns: object conforming to L{IListeningPort}.
         """
-        p = udp.Port(port, protocol, interface, maxPacketSize, self)
+        if reusePort is None and self.reusePortByDefault:
+            reusePort = True
+        p = udp.Port(port, protocol, interface, maxPacketSize, self,
+                     reusePort)
         p.startListening()
         return p
 
@@ -490,13 +565,40 @@ class PosixReactorBase(_SignalReactorMixin, _DisconnectSelectableMixin,
 
     # IReactorTCP
 
-    def listenTCP(self, port, factory, backlog=50, interface=''):
-        p = tcp.Port(port, factory, backlog, interface, self)
+    def listenTCP(self, port, factory, backlog=50, interface='',
+                  reusePort=None, socketOptions=None):
+        """
+        @see: L{twisted.internet.interfaces.IReactorTCP.listenTCP}
+
+        @param reusePort: Whether to set C{SO_REUSEPORT} on the listening
+            socket, so that other processes can listen on the same port.  By
+            default, L{reusePortByDefault} is used, and then
+            L{tcp.Port.reusePort}.
+        @type reusePort: L{bool} or L{None}
+
+        @param socketOptions: C{(level, option, value)} tuples of further
+            options to set on the listening socket.  By default,
+            L{tcp.Port.socketOptions} is used.
+        @type socketOptions: iterable of L{tuple} or L{None}
+        """
+        if reusePort is None and self.reusePortByDefault:
+            reusePort = True
+        p = tcp.Port(port, factory, backlog, interface, self, reusePort,
+                     socketOptions)
         p.startListening()
         return p
 
-    def connectTCP(self, host, port, factory, timeout=30, bindAddress=None):
-        c = tcp.Connector(host, port, factory, timeout, bindAddress, self)
+    def connectTCP(self, host, port, factory, timeout=30, bindAddress=None,
+                   socketOptions=()):
+        """
+        @see: L{twisted.internet.interfaces.IReactorTCP.connectTCP}
+
+        @param socketOptions: C{(level, option, value)} tuples of options to
+            set on the socket before connecting.
+        @type socketOptions: iterable of L{tuple}
+        """
+        c = tcp.Connector(host, port, factory, timeout, bindAddress, self,
+                          socketOptions)
         c.connect()
         return c
 
@@ -57,7 +57,16 @@ reapProcessHandlers = {}
 def reapAllProcesses():
     """
     Reap all registered processes.
+
+    On Linux, C{waitid} tells which children exited without reaping them, so
+    only those are reaped and the cost of a call is proportional to the
+    number of children which exited rather than to the number of registered
+    processes.  Every registered process is tried again as soon as an exited
+    child is not one of them, as it belongs to some other code (such as the
+    L{subprocess} module) which will reap it itself.
     """
+    if _reapExitedProcesses():
+        return
     # Coerce this to a list, as reaping the process changes the dictionary and
     # causes a "size changed during iteration" exception
     for process in list(reapProcessHandlers.values()):
@@ -65,6 +74,37 @@ def reapAllProcesses():
 
 
 
+def _reapExitedProcesses():
+    """
+    Reap the registered processes which exited, as told by C{waitid}.
+
+    @return: C{True} if all the children which exited were reaped, C{False}
+        if some children may not have been, because C{waitid} is not
+        available or because it told about a child which is not registered.
+    @rtype: L{bool}
+    """
+    waitid = getattr(os, "waitid", None)
+    if not platform.isLinux() or waitid is None:
+        return False
+    while True:
+        try:
+            result = waitid(
+                os.P_ALL, 0, os.WEXITED | os.WNOHANG | os.WNOWAIT)
+        except OSError as e:
+            # ECHILD: there are no children at all.
+            return e.errno == errno.ECHILD
+        if result is None:
+            return True
+        process = reapProcessHandlers.get(result.si_pid)
+        if process is None:
+            return False
+        process.reapProcess()
+        if reapProcessHandlers.get(result.si_pid) is process:
+            # It could not be reaped, and waitid would keep telling about it.
+            return False
+
+
+
 def registerReapProcessHandler(pid, process):
     """
     Register a process handler for the given pid, in case L{reapAllProcesses}
@@ -299,8 +339,8 @@ class ProcessReader(abstract.FileDescriptor):
         if self.connected and not self.disconnecting:
             self.disconnecting = 1
             self.stopReading()
-            self.reactor.callLater(0, self.connectionLost,
-                                   failure.Failure(CONNECTION_DONE))
+            self.reactor.callSoon(self.connectionLost,
+                                  failure.Failure(CONNECTION_DONE))
 
 
     def connectionLost(self, reason):
@@ -652,6 +692,122 @@ def _listOpenFDs():
 
 
 
+def _isCloseRangeSupported():
+    """
+    Tell whether C{os.closerange} closes a range of file descriptors with a
+    single C{close_range} system call, which needs Python 3.10 and Linux 5.9.
+
+    @rtype: L{bool}
+    """
+    if not platform.isLinux() or sys.version_info < (3, 10):
+        return False
+    release = os.uname()[2].split("-")[0].split(".")
+    try:
+        version = tuple(int(part) for part in release[:2])
+    except ValueError:
+        return False
+    return version >= (5, 9)
+
+
+
+_closeRangeSupported = _isCloseRangeSupported()
+
+
+
+def _closeFDsExcept(keep):
+    """
+    Close every file descriptor but some, with one C{os.closerange} call per
+    range of descriptors to close rather than one C{os.close} call per open
+    descriptor.
+
+    @param keep: The file descriptors to leave open.
+    @type keep: iterable of L{int}
+    """
+    low = 0
+    for fd in sorted(set(keep)):
+        if fd > low:
+            os.closerange(low, fd)
+        low = fd + 1
+    os.closerange(low, os.sysconf("SC_OPEN_MAX"))
+
+
+
+def _findExecutable(executable, environment):
+    """
+    Find the file C{os.execvpe} would run, searching the C{PATH} of the
+    environment of the child rather than the one of the parent.
+
+    @param executable: The executable to run.
+    @type executable: L{bytes} or L{unicode}
+
+    @param environment: The environment of the child.
+    @type environment: L{dict}
+
+    @return: The path of the file, or L{None} if it cannot be found.
+    @rtype: L{bytes} or L{unicode}
+    """
+    if os.path.dirname(executable):
+        return executable
+    for directory in os.get_exec_path(environment):
+        path = os.path.join(os.fsencode(directory), os.fsencode(executable))
+        if os.access(path, os.X_OK) and not os.path.isdir(path):
+            return path
+    return None
+
+
+
+def _spawnFileActions(fdmap):
+    """
+    Build the C{file_actions} of C{os.posix_spawn} which give the child the
+    file descriptors L{Process._setupChild} would give it after a fork.
+
+    Each descriptor is first copied above all the descriptors of C{fdmap}, so
+    that none is overwritten before it was copied to its place whatever the
+    mapping.  The descriptors of the parent which are not close-on-exec and
+    which the child should not get are closed.
+
+    @param fdmap: A mapping of the file descriptors of the child to the file
+        descriptors of the parent.
+    @type fdmap: L{dict}
+
+    @return: The actions.
+    @rtype: L{list} of L{tuple}
+    """
+    children = sorted(fdmap)
+    spare = max([-1] + children + list(fdmap.values())) + 1
+    actions = []
+    for offset, child in enumerate(children):
+        actions.append((os.POSIX_SPAWN_DUP2, fdmap[child], spare + offset))
+    for offset, child in enumerate(children):
+        actions.append((os.POSIX_SPAWN_DUP2, spare + offset, child))
+        actions.append((os.POSIX_SPAWN_CLOSE, spare + offset))
+    for fd in _listOpenFDs():
+        if fd in fdmap or spare <= fd < spare + len(children):
+            continue
+        try:
+            inheritable = os.get_inheritable(fd)
+        except OSError:
+            # It was the descriptor used to list the others.
+            continue
+        if inheritable:
+            actions.append((os.POSIX_SPAWN_CLOSE, fd))
+    return actions
+
+
+
+def _ignoredSignals():
+    """
+    Find the signals ignored by this process, which a child would otherwise
+    keep ignoring; see L{_BaseProcess._resetSignalDisposition}.
+
+    @return: The signal numbers.
+    @rtype: L{list} of L{int}
+    """
+    return [signalnum for signalnum in range(1, signal.NSIG)
+            if signal.getsignal(signalnum) == signal.SIG_IGN]
+
+
+
 @implementer(IProcessTransport)
 class Process(_BaseProcess):
     """
@@ -742,7 +898,7 @@ class Process(_BaseProcess):
             if debug: print("helpers", helpers)
             # the child only cares about fdmap.values()
 
-            self._fork(path, uid, gid, executable, args, environment, fdmap=fdmap)
+            self._spawn(path, uid, gid, executable, args, environment, fdmap)
         except:
             for pipe in _openedPipes:
                 os.close(pipe)
@@ -778,6 +934,44 @@ class Process(_BaseProcess):
         registerReapProcessHandler(self.pid, self)
 
 
+    def _spawn(self, path, uid, gid, executable, args, environment, fdmap):
+        """
+        Start the sub-process with C{os.posix_spawn} when possible, otherwise
+        with L{_fork}.
+
+        C{os.posix_spawn} does not copy the memory of the parent, which makes
+        it much faster than C{fork} for a big parent, but it can neither
+        change the working directory or the user of the child nor run an
+        override of L{_setupChild}.  If it fails, L{_fork} is tried, so that
+        the error is reported by the child as it always was.
+
+        @param fdmap: A mapping of the file descriptors of the child to the
+            file descriptors of the parent.
+        @type fdmap: L{dict}
+
+        @see: L{_fork} for the other parameters.
+        """
+        posixSpawn = getattr(os, "posix_spawn", None)
+        if (posixSpawn is not None and path is None and uid is None
+                and gid is None and environment is not None
+                and not self.debug_child
+                and type(self)._setupChild == Process._setupChild
+                and type(self)._execChild == Process._execChild):
+            executablePath = _findExecutable(executable, environment)
+            if executablePath is not None:
+                try:
+                    self.pid = posixSpawn(
+                        executablePath, args, environment,
+                        file_actions=_spawnFileActions(fdmap),
+                        setsigdef=_ignoredSignals())
+                except OSError:
+                    pass
+                else:
+                    self.status = -1
+                    return
+        self._fork(path, uid, gid, executable, args, environment, fdmap=fdmap)
+
+
     def _setupChild(self, fdmap):
         """
         fdmap[childFD] = parentFD
@@ -813,16 +1007,19 @@ class Process(_BaseProcess):
             errfd = sys.stderr
             errfd.write("starting _setupChild\n")
 
-        destList = fdmap.values()
-        for fd in _listOpenFDs():
-            if fd in destList:
-                continue
-            if debug and fd == errfd.fileno():
-                continue
-            try:
-                os.close(fd)
-            except:
-                pass
+        destList = list(fdmap.values())
+        if debug:
+            destList.append(errfd.fileno())
+        if _closeRangeSupported:
+            _closeFDsExcept(destList)
+        else:
+            for fd in _listOpenFDs():
+                if fd in destList:
+                    continue
+                try:
+                    os.close(fd)
+                except:
+                    pass
 
         # at this point, the only fds still open are the ones that need to
         # be moved to their appropriate positions in the child (the targets
@@ -0,0 +1,626 @@
+# -*- test-case-name: twisted.internet.test.test_processpool -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Run functions in a pool of worker processes.
+
+Threads cannot make CPU-bound Python code run in parallel.  A L{ProcessPool}
+runs such functions in child Python processes instead, started with
+L{IReactorProcess.spawnProcess
+<twisted.internet.interfaces.IReactorProcess.spawnProcess>}, which it sends
+the calls over their standard input and output with L{twisted.protocols.amp}.
+The functions, their arguments and their results are sent pickled, so the
+functions must be defined at the top level of a module the workers can
+import.
+
+L{deferToProcess} runs a function in a pool shared by the application,
+started and stopped with the global reactor.
+
+@since: 18.7
+"""
+
+from __future__ import division, absolute_import
+
+import os
+import pickle
+import sys
+from collections import deque
+
+from zope.interface import implementer
+
+from twisted.internet import defer, error
+from twisted.internet.interfaces import ITransport, IAddress
+from twisted.internet.protocol import ProcessProtocol
+from twisted.logger import Logger
+from twisted.protocols import amp
+from twisted.python.compat import intToBytes
+
+__all__ = ["ProcessPool", "WorkerCrashed", "RemoteCallError",
+           "deferToProcess"]
+
+
+
+class WorkerCrashed(Exception):
+    """
+    A worker process of a L{ProcessPool} exited while running a call.
+
+    The first argument is the reason the process ended, usually a
+    L{twisted.internet.error.ProcessTerminated}.
+    """
+
+
+
+class RemoteCallError(Exception):
+    """
+    A function run in a worker process raised an exception which could not
+    be sent back to the pool.
+
+    @ivar errorType: The fully-qualified name of the class of the exception.
+    @type errorType: L{str}
+
+    @ivar message: The string of the exception.
+    @type message: L{str}
+
+    @ivar traceback: The traceback of the exception, in the worker.
+    @type traceback: L{str}
+    """
+
+    def __init__(self, errorType, message, traceback):
+        Exception.__init__(self, errorType, message, traceback)
+        self.errorType = errorType
+        self.message = message
+        self.traceback = traceback
+
+
+    def __str__(self):
+        return "%s: %s" % (self.errorType, self.message)
+
+
+
+class _BigBytes(amp.Argument):
+    """
+    A L{bytes} argument of any length, split across as many values as
+    necessary since a single AMP value is limited to L{amp.MAX_VALUE_LENGTH}
+    bytes.  The value of the argument's own key is the number of values,
+    which use the keys C{name.0}, C{name.1} and so on.
+    """
+
+    def toBox(self, name, strings, objects, proto):
+        """
+        Split the argument into the values of C{strings}.
+        """
+        data = objects.pop(amp._wireNameToPythonIdentifier(name))
+        offsets = range(0, len(data), amp.MAX_VALUE_LENGTH)
+        strings[name] = intToBytes(len(offsets))
+        for i, offset in enumerate(offsets):
+            strings[name + b"." + intToBytes(i)] = (
+                data[offset:offset + amp.MAX_VALUE_LENGTH])
+
+
+    def fromBox(self, name, strings, objects, proto):
+        """
+        Join the values of C{strings} making up the argument.
+        """
+        count = int(strings.pop(name))
+        objects[amp._wireNameToPythonIdentifier(name)] = b"".join(
+            strings.pop(name + b"." + intToBytes(i)) for i in range(count))
+
+
+
+class _Call(amp.Command):
+    """
+    Run a function in a worker process.
+
+    C{call} is the pickle of the function and its positional and keyword
+    arguments.  C{outcome} is the pickle of C{(True, result)} if it
+    returned, or C{(False, exception)} if it raised an exception.
+    """
+
+    arguments = [(b"call", _BigBytes())]
+    response = [(b"outcome", _BigBytes())]
+
+
+
+@implementer(IAddress)
+class _ChildAddress(object):
+    """
+    The address of both ends of a L{_ChildTransport}, which has no
+    meaningful address.
+    """
+
+
+
+@implementer(ITransport)
+class _ChildTransport(object):
+    """
+    A transport writing to a pipe of a child process, so that a protocol
+    such as L{amp.AMP} can talk to it.
+
+    @ivar _transport: The transport of the process.
+    @type _transport: L{twisted.internet.interfaces.IProcessTransport}
+
+    @ivar _childFD: The file descriptor of the child to write to.
+    @type _childFD: L{int}
+    """
+
+    def __init__(self, transport, childFD=0):
+        self._transport = transport
+        self._childFD = childFD
+
+
+    def write(self, data):
+        """
+        Forward data to the pipe.
+        """
+        self._transport.writeToChild(self._childFD, data)
+
+
+    def writeSequence(self, sequence):
+        """
+        Emulate C{writeSequence} by iterating data in the C{sequence}.
+        """
+        for data in sequence:
+            self._transport.writeToChild(self._childFD, data)
+
+
+    def loseConnection(self):
+        """
+        Close the pipes to the process.
+        """
+        self._transport.loseConnection()
+
+
+    def getHost(self):
+        """
+        Return a L{_ChildAddress} instance.
+        """
+        return _ChildAddress()
+
+
+    def getPeer(self):
+        """
+        Return a L{_ChildAddress} instance.
+        """
+        return _ChildAddress()
+
+
+
+class _Worker(ProcessProtocol):
+    """
+    The protocol of a worker process of a L{ProcessPool}, which speaks AMP
+    over its standard input and output and logs its standard error.
+
+    @ivar amp: The protocol talking to the worker.
+    @type amp: L{amp.AMP}
+
+    @ivar calls: The number of calls the worker ran.
+    @type calls: L{int}
+
+    @ivar exited: Whether the process ended.
+    @type exited: L{bool}
+
+    @ivar ended: A L{defer.Deferred} which fires when the process ended.
+    """
+
+    _log = Logger()
+
+    def __init__(self, pool):
+        """
+        @param pool: The pool the worker belongs to.
+        @type pool: L{ProcessPool}
+        """
+        self._pool = pool
+        self.amp = amp.AMP()
+        self.calls = 0
+        self.exited = False
+        self.ended = defer.Deferred()
+
+
+    def connectionMade(self):
+        """
+        Connect the AMP protocol to the standard input of the process.
+        """
+        self.amp.makeConnection(_ChildTransport(self.transport))
+
+
+    def outReceived(self, data):
+        """
+        Give the standard output of the process to the AMP protocol.
+        """
+        self.amp.dataReceived(data)
+
+
+    def errReceived(self, data):
+        """
+        Log the standard error of the process.
+        """
+        self._log.info("Process pool worker {pid}: {output}",
+                       pid=self.transport.pid,
+                       output=data.decode("utf-8", "replace").rstrip())
+
+
+    def processEnded(self, reason):
+        """
+        Fail the call the worker was running, and tell the pool.
+        """
+        self.exited = True
+        self._pool._workerEnded(self)
+        self.amp.connectionLost(reason)
+        self.ended.callback(None)
+
+
+    def retire(self):
+        """
+        Make the worker process exit once it answered the calls it got.
+        """
+        self.transport.closeStdin()
+
+
+    def kill(self):
+        """
+        Kill the worker process.
+        """
+        try:
+            self.transport.signalProcess("KILL")
+        except error.ProcessExitedAlready:
+            pass
+
+
+
+def _cpuCount():
+    """
+    Count the processors of this computer.
+
+    @return: The number of processors, or 1 if it is unknown.
+    @rtype: L{int}
+    """
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except (ImportError, NotImplementedError):
+        return 1
+
+
+
+class _PendingCall(object):
+    """
+    A call made with L{ProcessPool.deferToProcess}.
+
+    @ivar data: The pickle of the function and its arguments, until it is
+        sent to a worker.
+    @type data: L{bytes} or L{None}
+
+    @ivar deferred: The L{defer.Deferred} returned for the call.
+
+    @ivar worker: The worker running the call, if any.
+    @type worker: L{_Worker} or L{None}
+    """
+
+    def __init__(self, data, cancel):
+        """
+        @param data: See L{_PendingCall.data}.
+
+        @param cancel: Called with the L{_PendingCall} when its C{deferred}
+            is cancelled.
+        """
+        self.data = data
+        self.worker = None
+        self.deferred = defer.Deferred(lambda d: cancel(self))
+
+
+
+class ProcessPool(object):
+    """
+    A pool of worker processes running Python functions.
+
+    Workers are started when calls need them, up to C{size} workers, and
+    each runs one call at a time.  The calls made while all of them are busy
+    wait in a queue, which holds at most C{maxPending} calls.
+
+    @ivar size: The maximum number of worker processes.
+    @type size: L{int}
+
+    @ivar maxTasksPerWorker: The number of calls after which a worker exits
+        and is replaced, to give back the memory a long-running process may
+        accumulate, or L{None} to keep workers until the pool stops.
+    @type maxTasksPerWorker: L{int} or L{None}
+
+    @ivar maxPending: The maximum number of calls waiting for a worker, or
+        L{None} for no limit.
+    @type maxPending: L{int} or L{None}
+
+    @ivar started: Whether the pool is running calls.
+    @type started: L{bool}
+
+    @ivar _reactor: The reactor spawning the workers.
+    @type _reactor: L{twisted.internet.interfaces.IReactorProcess}
+
+    @ivar _executable: The Python interpreter the workers run.
+    @type _executable: L{str}
+
+    @ivar _workers: All the worker processes which have not ended.
+    @type _workers: L{set} of L{_Worker}
+
+    @ivar _idle: The workers waiting for a call.
+    @type _idle: L{list} of L{_Worker}
+
+    @ivar _pending: The calls waiting for a worker.
+    @type _pending: L{collections.deque} of L{_PendingCall}
+
+    @ivar _notFull: The L{defer.Deferred}s returned by
+        L{ProcessPool.whenNotFull} which have not fired yet.
+    @type _notFull: L{list}
+    """
+
+    _log = Logger()
+
+    def __init__(self, size=None, maxTasksPerWorker=None, maxPending=None,
+                 reactor=None, executable=sys.executable):
+        """
+        @param size: See L{ProcessPool.size}, by default the number of
+            processors.
+
+        @param maxTasksPerWorker: See L{ProcessPool.maxTasksPerWorker}.
+
+        @param maxPending: See L{ProcessPool.maxPending}.
+
+        @param reactor: See L{ProcessPool._reactor}, by default the global
+            reactor.
+
+        @param executable: See L{ProcessPool._executable}.
+
+        @raise ValueError: If C{size} is lower than 1.
+        """
+        if size is None:
+            size = _cpuCount()
+        if size < 1:
+            raise ValueError("size must be at least 1, not %r" % (size,))
+        if reactor is None:
+            from twisted.internet import reactor
+        self.size = size
+        self.maxTasksPerWorker = maxTasksPerWorker
+        self.maxPending = maxPending
+        self.started = False
+        self._reactor = reactor
+        self._executable = executable
+        self._workers = set()
+        self._idle = []
+        self._pending = deque()
+        self._notFull = []
+
+
+    @property
+    def full(self):
+        """
+        Whether the queue of calls waiting for a worker is full, in which
+        case L{ProcessPool.deferToProcess} fails.
+
+        @rtype: L{bool}
+        """
+        return (self.maxPending is not None and
+                len(self._pending) >= self.maxPending)
+
+
+    def start(self):
+        """
+        Start running calls, including the ones made before.
+        """
+        self.started = True
+        self._dispatch()
+
+
+    def stop(self):
+        """
+        Stop the pool: fail the calls waiting for a worker with
+        L{defer.CancelledError}, and make the workers exit once they finished
+        their current call.
+
+        @return: A L{defer.Deferred} which fires when all the workers exited.
+        """
+        self.started = False
+        pending, self._pending = self._pending, deque()
+        for call in pending:
+            call.deferred.errback(defer.CancelledError())
+        ended = [worker.ended for worker in self._workers]
+        for worker in list(self._workers):
+            worker.retire()
+        return defer.gatherResults(ended).addCallback(lambda ignored: None)
+
+
+    def deferToProcess(self, f, *args, **kwargs):
+        """
+        Call a function in a worker process.
+
+        @param f: The function, which must be defined at the top level of a
+            module the workers can import.
+        @param args: The positional arguments to pass to C{f}, which must be
+            picklable.
+        @param kwargs: The keyword arguments to pass to C{f}, which must be
+            picklable.
+
+        @return: A L{defer.Deferred} which fires with the result of C{f}, or
+            fails with the exception it raised, with L{RemoteCallError} if
+            that exception cannot be pickled, with L{WorkerCrashed} if the
+            worker exited while running it, or with L{defer.QueueOverflow}
+            if the pool is L{full <ProcessPool.full>}.  Cancelling it
+            removes the call from the queue or, if it is running, kills its
+            worker.
+        """
+        if self.full:
+            return defer.fail(defer.QueueOverflow())
+        try:
+            data = pickle.dumps((f, args, kwargs), pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return defer.fail()
+        call = _PendingCall(data, self._cancel)
+        self._pending.append(call)
+        self._dispatch()
+        return call.deferred
+
+
+    def whenNotFull(self):
+        """
+        Wait until a call can be queued.
+
+        @return: A L{defer.Deferred} which fires with L{None} once the pool
+            is not L{full <ProcessPool.full>}, right away if it is not.
+        """
+        if not self.full:
+            return defer.succeed(None)
+        d = defer.Deferred()
+        self._notFull.append(d)
+        return d
+
+
+    def _dispatch(self):
+        """
+        Give the calls waiting for a worker to the idle workers, starting new
+        ones if possible.
+        """
+        while self.started and self._pending:
+            if self._idle:
+                worker = self._idle.pop()
+            elif len(self._workers) < self.size:
+                worker = self._spawn()
+            else:
+                break
+            self._run(worker, self._pending.popleft())
+        while self._notFull and not self.full:
+            self._notFull.pop(0).callback(None)
+
+
+    def _spawn(self):
+        """
+        Start a worker process.
+
+        @rtype: L{_Worker}
+        """
+        worker = _Worker(self)
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(sys.path)
+        self._reactor.spawnProcess(
+            worker, self._executable,
+            [self._executable, "-m", "twisted.internet._processworker"],
+            env=env)
+        self._workers.add(worker)
+        return worker
+
+
+    def _run(self, worker, call):
+        """
+        Run a call in a worker.
+
+        @param worker: An idle worker.
+        @type worker: L{_Worker}
+
+        @param call: The call.
+        @type call: L{_PendingCall}
+        """
+        call.worker = worker
+        running = worker.amp.callRemote(_Call, call=call.data)
+        call.data = None
+
+        def answered(response):
+            ok, value = pickle.loads(response["outcome"])
+            if ok:
+                return value
+            raise value
+
+        def failed(reason):
+            if worker.exited:
+                raise WorkerCrashed(reason.value)
+            return reason
+
+        def finished(result):
+            call.worker = None
+            worker.calls += 1
+            if not worker.exited:
+                if (self.started and (self.maxTasksPerWorker is None or
+                                      worker.calls < self.maxTasksPerWorker)):
+                    self._idle.append(worker)
+                else:
+                    worker.retire()
+            self._dispatch()
+            # Unless the call was cancelled.
+            if not call.deferred.called:
+                call.deferred.callback(result)
+
+        running.addCallbacks(answered, failed)
+        running.addBoth(finished)
+
+
+    def _cancel(self, call):
+        """
+        Cancel a call: forget it if it waits for a worker, or kill the worker
+        running it, which is the only way to stop it.
+
+        @type call: L{_PendingCall}
+        """
+        if call.worker is not None:
+            call.worker.kill()
+        else:
+            try:
+                self._pending.remove(call)
+            except ValueError:
+                pass
+
+
+    def _workerEnded(self, worker):
+        """
+        Forget a worker whose process ended, and start another one if calls
+        are waiting.
+
+        @type worker: L{_Worker}
+        """
+        self._workers.discard(worker)
+        if worker in self._idle:
+            self._idle.remove(worker)
+        self._dispatch()
+
+
+
+_pool = None
+
+def _defaultPool():
+    """
+    Get the pool used by L{deferToProcess}, creating it first if necessary.
+    It is started with the global reactor and stopped before it shuts down.
+
+    @rtype: L{ProcessPool}
+    """
+    global _pool
+    if _pool is None:
+        from twisted.internet import reactor
+        _pool = ProcessPool(reactor=reactor)
+        reactor.callWhenRunning(_pool.start)
+        reactor.addSystemEventTrigger("before", "shutdown", _stopDefaultPool)
+    return _pool
+
+
+
+def _stopDefaultPool():
+    """
+    Stop the pool used by L{deferToProcess}, and forget it.
+
+    @return: See L{ProcessPool.stop}.
+    """
+    global _pool
+    pool, _pool = _pool, None
+    return pool.stop()
+
+
+
+def deferToProcess(f, *args, **kwargs):
+    """
+    Call a function in a worker process of a pool shared by the application,
+    which has a worker per processor.
+
+    @param f: The function, which must be defined at the top level of a
+        module the workers can import.
+    @param args: The positional arguments to pass to C{f}.
+    @param kwargs: The keyword arguments to pass to C{f}.
+
+    @return: See L{ProcessPool.deferToProcess}.
+    """
+    return _defaultPool().deferToProcess(f, *args, **kwargs)
@@ -780,6 +780,29 @@ class AbstractDatagramProtocol:
         """
 
 
+    def datagramsReceived(self, datagrams):
+        """
+        Called when several datagrams are received at once.
+
+        Transports which receive datagrams in batches, such as
+        L{twisted.internet.udp.Port}, call this rather than
+        L{datagramReceived}; others keep calling L{datagramReceived} for each
+        datagram, so protocols overriding this should implement both.
+
+        The default implementation calls L{datagramReceived} for each
+        datagram, logging the exceptions it raises.
+
+        @param datagrams: the datagrams, as C{(datagram, addr)} pairs of the
+            arguments of L{datagramReceived}.
+        @type datagrams: L{list} of L{tuple}
+        """
+        for datagram, addr in datagrams:
+            try:
+                self.datagramReceived(datagram, addr)
+            except:
+                log.err()
+
+
 
 @implementer(interfaces.ILoggingContext)
 class DatagramProtocol(AbstractDatagramProtocol):
@@ -130,7 +130,7 @@ class SelectReactor(posixbase.PosixReactorBase, _extraBase):
                 # OK, I really don't know what's going on.  Blow up.
                 raise
 
-        _drdw = self._doReadOrWrite
+        _drdw = self._instrumented(self._doReadOrWrite)
         _logrun = log.callWithLogger
         for selectables, method, fdset in ((r, "doRead", self._reads),
                                            (w,"doWrite", self._writes)):
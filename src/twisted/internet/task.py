@@ -10,10 +10,14 @@ from __future__ import division, absolute_import
 
 __metaclass__ = type
 
+import math
+import random
 import sys
 import time
 import warnings
 
+from collections import OrderedDict
+
 from zope.interface import implementer
 
 from twisted.python import log
@@ -292,6 +296,203 @@ class LoopingCall:
 
 
 
+@implementer(IReactorTime)
+class LoopingCallGroup(object):
+    """
+    Run many L{LoopingCall}s with a few timers of the reactor.
+
+    Every L{LoopingCall} owns a timer of the reactor, which it schedules
+    again after each call.  A L{LoopingCallGroup} is a clock for them: the
+    calls scheduled with its C{callLater} are grouped by the slot of
+    C{resolution} seconds in which they are due, and each slot has a single
+    timer of the reactor.  Thousands of loops with the same interval, or
+    with any intervals, then share a timer per slot, the calls being made up
+    to C{resolution} seconds late.  Since the L{LoopingCall}s still compute
+    their own schedule, the counts of L{LoopingCall.withCount} are the same.
+
+    Loops are started with L{LoopingCallGroup.start}, which can spread the
+    first calls of loops started together over their first interval, so that
+    they do not all run in the same slot forever after.
+
+    @ivar clock: The provider of
+        L{IReactorTime<twisted.internet.interfaces.IReactorTime>} whose
+        timers are shared.
+
+    @ivar resolution: The length of a slot, in seconds.
+    @type resolution: L{float}
+
+    @ivar _slots: Maps the index of each slot, its end time divided by
+        C{resolution}, to a two-tuple of its timer and of an L{OrderedDict}
+        whose keys are the calls due in it, in the order they were
+        scheduled.
+    @type _slots: L{dict}
+
+    @ivar _locations: Maps each pending call to the index of its slot.
+    @type _locations: L{dict}
+
+    @ivar _random: Returns a random L{float} in [0, 1), to spread the first
+        calls of loops.
+    """
+
+    def __init__(self, resolution=0.1, clock=None):
+        """
+        @param resolution: See L{LoopingCallGroup.resolution}.
+        @type resolution: L{float}
+
+        @param clock: See L{LoopingCallGroup.clock}.  The default is
+            L{twisted.internet.reactor}.
+        """
+        if resolution <= 0:
+            raise ValueError("resolution must be > 0")
+        if clock is None:
+            from twisted.internet import reactor as clock
+        self.clock = clock
+        self.resolution = resolution
+        self._slots = {}
+        self._locations = {}
+        self._random = random.random
+
+
+    def start(self, call, interval, now=True, jitter=False):
+        """
+        Start a L{LoopingCall} with this group as its clock.
+
+        @param call: The L{LoopingCall} to start.
+        @type call: L{LoopingCall}
+
+        @param interval: See L{LoopingCall.start}.
+        @param now: See L{LoopingCall.start}.
+
+        @param jitter: If C{True}, the first call is made after a random
+            fraction of C{interval}, whatever C{now}, and the next ones every
+            C{interval} after it.
+        @type jitter: L{bool}
+
+        @return: See L{LoopingCall.start}.
+        """
+        call.clock = self
+        if not jitter or not interval:
+            return call.start(interval, now)
+        d = call.start(interval, now=False)
+        # Move the start back so that the end of the first interval comes
+        # at a random time, keeping the counts of withCount consistent.
+        call.call.cancel()
+        now = self.seconds()
+        call.starttime = now - interval * (1 - self._random())
+        call._scheduleFrom(now)
+        return d
+
+
+    def seconds(self):
+        """
+        See L{twisted.internet.interfaces.IReactorTime.seconds}.
+        """
+        return self.clock.seconds()
+
+
+    def callLater(self, delay, callable, *args, **kw):
+        """
+        See L{twisted.internet.interfaces.IReactorTime.callLater}.
+
+        Calls with no delay are scheduled with the clock directly, so that
+        loops with an interval of 0 still run as fast as possible.
+        """
+        if delay <= 0:
+            return self.clock.callLater(delay, callable, *args, **kw)
+        call = base.DelayedCall(self.seconds() + delay, callable, args, kw,
+                                self._cancelled, self._movedSooner,
+                                seconds=self.seconds)
+        self._add(call)
+        return call
+
+
+    def getDelayedCalls(self):
+        """
+        See L{twisted.internet.interfaces.IReactorTime.getDelayedCalls}.
+        """
+        return list(self._locations)
+
+
+    def _add(self, call):
+        """
+        Put a call in the slot in which it is due, scheduling a timer for the
+        slot if it has none.
+
+        @param call: The call.
+        @type call: L{twisted.internet.base.DelayedCall}
+        """
+        index = int(math.ceil(call.time / self.resolution))
+        slot = self._slots.get(index)
+        if slot is None:
+            delay = max(index * self.resolution - self.seconds(), 0)
+            slot = self._slots[index] = (
+                self.clock.callLater(delay, self._runSlot, index),
+                OrderedDict())
+        slot[1][call] = None
+        self._locations[call] = index
+
+
+    def _remove(self, call):
+        """
+        Take a call out of its slot, cancelling the timer of the slot if it
+        is left empty.
+
+        @param call: The call.
+        @type call: L{twisted.internet.base.DelayedCall}
+        """
+        index = self._locations.pop(call, None)
+        if index is None:
+            # Its slot is being run.
+            return
+        timer, calls = self._slots[index]
+        del calls[call]
+        if not calls:
+            del self._slots[index]
+            timer.cancel()
+
+
+    def _cancelled(self, call):
+        """
+        Forget a call being cancelled.
+        """
+        self._remove(call)
+
+
+    def _movedSooner(self, call):
+        """
+        Move a call to the slot of its new time.
+        """
+        self._remove(call)
+        self._add(call)
+
+
+    def _runSlot(self, index):
+        """
+        Run the calls of a slot whose time has come.
+
+        @param index: The index of the slot.
+        @type index: L{int}
+        """
+        timer, calls = self._slots.pop(index)
+        locations = self._locations
+        for call in calls:
+            del locations[call]
+        for call in calls:
+            if call.cancelled or call in locations:
+                # Cancelled or moved by one of the calls run before.
+                continue
+            if call.delayed_time:
+                call.activate_delay()
+                self._add(call)
+                continue
+            try:
+                call.called = 1
+                call.func(*call.args, **call.kw)
+            except:
+                log.deferr()
+
+
+
 class SchedulerError(Exception):
     """
     The operation could not be completed because the scheduler or one of its
@@ -350,12 +551,13 @@ class NotPaused(SchedulerError):
 
 class _Timer(object):
     MAX_SLICE = 0.01
-    def __init__(self):
-        self.end = time.time() + self.MAX_SLICE
+    def __init__(self, timeSlice=MAX_SLICE, clock=time.time):
+        self._clock = clock
+        self.end = clock() + timeSlice
 
 
     def __call__(self):
-        return time.time() >= self.end
+        return self._clock() >= self.end
 
 
 
@@ -399,13 +601,33 @@ class CooperativeTask(object):
         C{StopIteration}.
 
     @type _completionState: L{TaskFinished}
+
+    @ivar priority: The tasks of a L{Cooperator} are only given work when
+        none of the tasks with a higher priority can be.
+    @type priority: L{int}
+
+    @ivar weight: The number of units of work this task is given each time
+        the L{Cooperator} goes round the tasks of its priority.
+    @type weight: L{int}
+
+    @ivar steps: The number of units of work done by this task.
+    @type steps: L{int}
+
+    @ivar timeUsed: The time spent doing these units of work, in seconds.
+    @type timeUsed: L{float}
     """
 
-    def __init__(self, iterator, cooperator):
+    def __init__(self, iterator, cooperator, priority=0, weight=1):
         """
         A private constructor: to create a new L{CooperativeTask}, see
         L{Cooperator.cooperate}.
         """
+        if weight < 1:
+            raise ValueError("weight must be at least 1, not %r" % (weight,))
+        self.priority = priority
+        self.weight = weight
+        self.steps = 0
+        self.timeUsed = 0.0
         self._iterator = iterator
         self._cooperator = cooperator
         self._deferreds = []
@@ -560,8 +782,59 @@ class Cooperator(object):
 
     Multiple L{Cooperator}s do not cooperate with each other, so for most
     cases you should use the L{global cooperator<task.cooperate>}.
+
+    Tasks can be given a priority and a weight: at each step, the
+    L{Cooperator} goes round the tasks with the highest priority which are
+    not paused, giving each of them as many units of work as its weight,
+    until the step is over.  The tasks with a lower priority are only given
+    work when all those are paused or done, for instance while they wait for
+    a L{Deferred<defer.Deferred>}, so that a background job does not delay a
+    task serving a request.
+
+    With the default C{terminationPredicateFactory}, each step lasts at most
+    C{timeSlice} seconds.  With the default C{scheduler} too, this slice is
+    halved whenever the reactor is late to run the step by more than
+    C{lagThreshold} seconds, because it is busy with other work, down to
+    C{minimumTimeSlice}, and grows back by C{minimumTimeSlice} after each
+    step run on time, up to C{maximumTimeSlice}.  Other schedulers may delay
+    the steps on purpose, so their lag is not measured.
+
+    @ivar timeSlice: The current duration of a step, in seconds.
+    @type timeSlice: L{float}
+
+    @ivar lag: How late the last step was run, in seconds, if the default
+        scheduler is used.
+    @type lag: L{float}
+
+    @ivar ticks: The number of steps run.
+    @type ticks: L{int}
+
+    @ivar steps: The number of units of work done by all the tasks.  Together
+        with C{timeUsed} and the C{steps} and C{timeUsed} of each
+        L{CooperativeTask}, read at two different times, this gives the rate
+        at which work is done.
+    @type steps: L{int}
+
+    @ivar timeUsed: The time spent by all the tasks doing units of work, in
+        seconds.
+    @type timeUsed: L{float}
+
+    @ivar _clock: Returns the current time, in seconds.
+    @type _clock: 0-argument callable returning L{float}
+
+    @ivar _scheduledAt: The time at which the next step was scheduled, or
+        L{None}.
+    @type _scheduledAt: L{float}
+
+    @ivar _measureLag: Whether to measure the lag of the steps and adapt
+        C{timeSlice} to it, which is only done with the default scheduler.
+    @type _measureLag: L{bool}
     """
 
+    minimumTimeSlice = 0.001
+    maximumTimeSlice = _Timer.MAX_SLICE
+    lagThreshold = 0.01
+
     def __init__(self,
                  terminationPredicateFactory=_Timer,
                  scheduler=_defaultScheduler,
@@ -590,9 +863,17 @@ class Cooperator(object):
         self._delayedCall = None
         self._stopped = False
         self._started = started
+        self._clock = time.time
+        self._scheduledAt = None
+        self._measureLag = scheduler is _defaultScheduler
+        self.timeSlice = self.maximumTimeSlice
+        self.lag = 0.0
+        self.ticks = 0
+        self.steps = 0
+        self.timeUsed = 0.0
 
 
-    def coiterate(self, iterator, doneDeferred=None):
+    def coiterate(self, iterator, doneDeferred=None, priority=0, weight=1):
         """
         Add an iterator to the list of iterators this L{Cooperator} is
         currently running.
@@ -604,24 +885,36 @@ class Cooperator(object):
             the completion deferred.  It is suggested that you use the default,
             which creates a new Deferred for you.
 
+        @param priority: See L{CooperativeTask.priority}.
+        @param weight: See L{CooperativeTask.weight}.
+
         @return: a Deferred that will fire when the iterator finishes.
         """
         if doneDeferred is None:
             doneDeferred = defer.Deferred()
-        CooperativeTask(iterator, self).whenDone().chainDeferred(doneDeferred)
+        CooperativeTask(iterator, self, priority, weight
+                        ).whenDone().chainDeferred(doneDeferred)
         return doneDeferred
 
 
-    def cooperate(self, iterator):
+    def cooperate(self, iterator, priority=0, weight=1):
         """
         Start running the given iterator as a long-running cooperative task, by
         calling next() on it as a periodic timed event.
 
         @param iterator: the iterator to invoke.
 
+        @param priority: See L{CooperativeTask.priority}.
+        @type priority: L{int}
+
+        @param weight: See L{CooperativeTask.weight}.
+        @type weight: L{int}
+
         @return: a L{CooperativeTask} object representing this task.
+
+        @raise ValueError: If C{weight} is lower than 1.
         """
-        return CooperativeTask(iterator, self)
+        return CooperativeTask(iterator, self, priority, weight)
 
 
     def _addTask(self, task):
@@ -648,18 +941,56 @@ class Cooperator(object):
             self._delayedCall = None
 
 
+    def _round(self):
+        """
+        Determine the units of work to do in the next round of the tasks.
+
+        @return: The tasks with the highest priority, each repeated as many
+            times as its weight.
+        @rtype: L{list} of L{CooperativeTask}
+        """
+        tasks = self._tasks
+        if not tasks:
+            return []
+        top = max(t.priority for t in tasks)
+        return [t for t in tasks if t.priority == top
+                for i in range(t.weight)]
+
+
     def _tasksWhileNotStopped(self):
         """
         Yield all L{CooperativeTask} objects in a loop as long as this
         L{Cooperator}'s termination condition has not been met.
         """
-        terminator = self._terminationPredicateFactory()
+        if self._terminationPredicateFactory is _Timer:
+            terminator = _Timer(self.timeSlice, self._clock)
+        else:
+            terminator = self._terminationPredicateFactory()
         while self._tasks:
             for t in self._metarator:
+                if t._pauseCount or t._completionState is not None:
+                    # Removed from the tasks since the round started.
+                    continue
                 yield t
                 if terminator():
                     return
-            self._metarator = iter(self._tasks)
+            self._metarator = iter(self._round())
+
+
+    def _adapt(self, lag):
+        """
+        Adapt the duration of the steps to how late a step was run.
+
+        @param lag: The time between the scheduling of the step and its run,
+            in seconds.
+        @type lag: L{float}
+        """
+        self.lag = lag
+        if lag > self.lagThreshold:
+            self.timeSlice = max(self.minimumTimeSlice, self.timeSlice / 2)
+        else:
+            self.timeSlice = min(self.maximumTimeSlice,
+                                 self.timeSlice + self.minimumTimeSlice)
 
 
     def _tick(self):
@@ -667,8 +998,20 @@ class Cooperator(object):
         Run one scheduler tick.
         """
         self._delayedCall = None
+        clock = self._clock
+        start = clock()
+        if self._scheduledAt is not None:
+            self._adapt(start - self._scheduledAt)
+            self._scheduledAt = None
+        self.ticks += 1
         for taskObj in self._tasksWhileNotStopped():
             taskObj._oneWorkUnit()
+            now = clock()
+            taskObj.steps += 1
+            taskObj.timeUsed += now - start
+            self.steps += 1
+            self.timeUsed += now - start
+            start = now
         self._reschedule()
 
 
@@ -678,6 +1021,8 @@ class Cooperator(object):
             self._mustScheduleOnStart = True
             return
         if self._delayedCall is None and self._tasks:
+            if self._measureLag:
+                self._scheduledAt = self._clock()
             self._delayedCall = self._scheduler(self._tick)
 
 
@@ -721,7 +1066,7 @@ class Cooperator(object):
 
 _theCooperator = Cooperator()
 
-def coiterate(iterator):
+def coiterate(iterator, priority=0, weight=1):
     """
     Cooperatively iterate over the given iterator, dividing runtime between it
     and all other iterators which have been passed to this function and not yet
@@ -729,13 +1074,17 @@ def coiterate(iterator):
 
     @param iterator: the iterator to invoke.
 
+    @param priority: See L{CooperativeTask.priority}.
+    @param weight: See L{CooperativeTask.weight}.
+
     @return: a Deferred that will fire when the iterator finishes.
     """
-    return _theCooperator.coiterate(iterator)
+    return _theCooperator.coiterate(iterator, priority=priority,
+                                    weight=weight)
 
 
 
-def cooperate(iterator):
+def cooperate(iterator, priority=0, weight=1):
     """
     Start running the given iterator as a long-running cooperative task, by
     calling next() on it as a periodic timed event.
@@ -748,9 +1097,12 @@ def cooperate(iterator):
 
     @param iterator: the iterator to invoke.
 
+    @param priority: See L{CooperativeTask.priority}.
+    @param weight: See L{CooperativeTask.weight}.
+
     @return: a L{CooperativeTask} object representing this task.
     """
-    return _theCooperator.cooperate(iterator)
+    return _theCooperator.cooperate(iterator, priority, weight)
 
 
 
@@ -938,7 +1290,7 @@ def react(main, argv=(), _reactor=None):
 
 
 __all__ = [
-    'LoopingCall',
+    'LoopingCall', 'LoopingCallGroup',
 
     'Clock',
 
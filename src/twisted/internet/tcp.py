@@ -81,6 +81,7 @@ else:
     from os import strerror
 
 
+import errno
 from errno import errorcode
 
 # Twisted Imports
@@ -89,9 +90,45 @@ from twisted.internet.task import deferLater
 from twisted.python import log, failure, reflect
 from twisted.python.util import untilConcludes
 from twisted.internet.error import CannotListenError
-from twisted.internet import abstract, main, interfaces, error
+from twisted.internet import abstract, main, interfaces, error, _buffers
 from twisted.internet.protocol import Protocol
 
+# Not all platforms have, or support, this option.
+_SO_REUSEPORT = getattr(socket, "SO_REUSEPORT", None)
+
+# TCP tuning options; only Linux supports all of them, and the socket module
+# of older Pythons does not define some of them even there, so their Linux
+# values are used then.
+_TCP_DEFER_ACCEPT = getattr(socket, "TCP_DEFER_ACCEPT", None)
+_TCP_QUICKACK = getattr(socket, "TCP_QUICKACK", None)
+if sys.platform.startswith("linux"):
+    _TCP_FASTOPEN = getattr(socket, "TCP_FASTOPEN", 23)
+    _TCP_USER_TIMEOUT = getattr(socket, "TCP_USER_TIMEOUT", 18)
+    _TCP_FASTOPEN_CONNECT = getattr(socket, "TCP_FASTOPEN_CONNECT", 30)
+    _SO_BUSY_POLL = getattr(socket, "SO_BUSY_POLL", 46)
+else:
+    _TCP_FASTOPEN = getattr(socket, "TCP_FASTOPEN", None)
+    _TCP_USER_TIMEOUT = getattr(socket, "TCP_USER_TIMEOUT", None)
+    _TCP_FASTOPEN_CONNECT = None
+    _SO_BUSY_POLL = None
+
+# os.sendfile is not available on Python 2 nor on Windows.
+_sendfile = getattr(os, "sendfile", None)
+
+# The errors of os.sendfile which mean that it cannot be used for a given
+# file or socket, rather than that the connection was lost.
+_SENDFILE_UNSUPPORTED = set(
+    getattr(errno, name) for name in (
+        "EINVAL", "ENOSYS", "EOPNOTSUPP", "ENOTSOCK", "EOVERFLOW",
+        "ESPIPE", "EBADF") if hasattr(errno, name))
+
+# memoryview.release is not available on Python 2.
+_releaseView = hasattr(memoryview, "release")
+
+# The ports which are listening, so that twisted.web.metrics finds them
+# without inspecting every reader of the reactor.
+_listeningPorts = set()
+
 # Not all platforms have, or support, this flag.
 _AI_NUMERICSERV = getattr(socket, "AI_NUMERICSERV", 0)
 
@@ -100,6 +137,89 @@ _AI_NUMERICSERV = getattr(socket, "AI_NUMERICSERV", 0)
 _portNameType = (str, unicode)
 
 
+
+def _tcpSocketOptions(server, fastOpen=None, deferAccept=None,
+                      userTimeout=None, quickAck=False, busyPoll=None):
+    """
+    Convert TCP tuning parameters, as accepted by the TCP endpoints, to
+    socket options.
+
+    @param server: Whether the options are for a listening socket, rather
+        than for a socket connecting to a server.
+    @type server: L{bool}
+
+    @param fastOpen: For a listening socket, the number of pending TCP Fast
+        Open connections to allow (C{TCP_FASTOPEN}).  For a connecting socket,
+        whether the first data written should be sent with the I{SYN}
+        (C{TCP_FASTOPEN_CONNECT}).
+    @type fastOpen: L{int}, L{bool} or L{None}
+
+    @param deferAccept: The number of seconds to wait for data before
+        accepting a connection (C{TCP_DEFER_ACCEPT}).  Only for listening
+        sockets.
+    @type deferAccept: L{int} or L{None}
+
+    @param userTimeout: The number of seconds written data may stay
+        unacknowledged before the connection is dropped
+        (C{TCP_USER_TIMEOUT}).
+    @type userTimeout: L{float} or L{None}
+
+    @param quickAck: Whether to acknowledge received data right away rather
+        than delaying the acknowledgements (C{TCP_QUICKACK}).
+    @type quickAck: L{bool}
+
+    @param busyPoll: The number of microseconds to busy poll the device
+        queue for data when reading (C{SO_BUSY_POLL}).
+    @type busyPoll: L{int} or L{None}
+
+    @return: C{(level, option, value)} tuples for L{_setSocketOptions}.
+        C{option} is L{None} if the platform does not support the option.
+    @rtype: L{list} of L{tuple}
+    """
+    options = []
+    if fastOpen:
+        if server:
+            options.append((socket.IPPROTO_TCP, _TCP_FASTOPEN, int(fastOpen)))
+        else:
+            options.append((socket.IPPROTO_TCP, _TCP_FASTOPEN_CONNECT, 1))
+    if deferAccept is not None:
+        options.append(
+            (socket.IPPROTO_TCP, _TCP_DEFER_ACCEPT, int(deferAccept)))
+    if userTimeout is not None:
+        options.append(
+            (socket.IPPROTO_TCP, _TCP_USER_TIMEOUT, int(userTimeout * 1000)))
+    if quickAck:
+        options.append((socket.IPPROTO_TCP, _TCP_QUICKACK, 1))
+    if busyPoll is not None:
+        options.append((socket.SOL_SOCKET, _SO_BUSY_POLL, int(busyPoll)))
+    return options
+
+
+
+def _setSocketOptions(skt, options):
+    """
+    Set options on a socket, closing it if one of them cannot be set.
+
+    @param skt: The socket.
+    @type skt: L{socket.socket}
+
+    @param options: C{(level, option, value)} tuples.  An C{option} of
+        L{None} stands for an option which the platform does not support.
+    @type options: iterable of L{tuple}
+
+    @raise socket.error: If an option is not supported or cannot be set.
+    """
+    try:
+        for level, option, value in options:
+            if option is None:
+                raise socket.error(
+                    errno.ENOPROTOOPT, "Socket option is not supported")
+            skt.setsockopt(level, option, value)
+    except:
+        skt.close()
+        raise
+
+
 def _getrealname(addr):
     """
     Return a 2-tuple of socket IP and port for IPv4 and a 4-tuple of
@@ -192,12 +312,14 @@ class _AbortingMixin(object):
         self.stopWriting()
         self.doRead = lambda *args, **kwargs: None
         self.doWrite = lambda *args, **kwargs: None
-        self.reactor.callLater(0, self.connectionLost,
-                               failure.Failure(error.ConnectionAborted()))
+        self.reactor.callSoon(self.connectionLost,
+                              failure.Failure(error.ConnectionAborted()))
 
 
 
-@implementer(interfaces.ITCPTransport, interfaces.ISystemHandle)
+@implementer(interfaces.ITCPTransport, interfaces.ISystemHandle,
+             interfaces.ISendFileTransport,
+             interfaces._IEdgeTriggeredDescriptor)
 class Connection(_TLSConnectionMixin, abstract.FileDescriptor, _SocketCloser,
                  _AbortingMixin):
     """
@@ -208,8 +330,18 @@ class Connection(_TLSConnectionMixin, abstract.FileDescriptor, _SocketCloser,
 
     @ivar logstr: prefix used when logging events related to this connection.
     @type logstr: C{str}
+
+    @ivar _readSize: The size of the reads done with the C{receiveBufferPool}
+        of the reactor, created by the first of them.
+    @type _readSize: L{twisted.internet._buffers.AdaptiveReadSize} or L{None}
+
+    @ivar _readWouldBlock: See L{interfaces._IEdgeTriggeredDescriptor}.
+    @ivar _writeWouldBlock: See L{interfaces._IEdgeTriggeredDescriptor}.
     """
 
+    _readSize = None
+    _readWouldBlock = False
+    _writeWouldBlock = False
 
     def __init__(self, skt, protocol, reactor=None):
         abstract.FileDescriptor.__init__(self, reactor=reactor)
@@ -231,11 +363,18 @@ class Connection(_TLSConnectionMixin, abstract.FileDescriptor, _SocketCloser,
         calls self.dataReceived(data) to process it.  If the connection is not
         lost through an error in the physical recv(), this function will return
         the result of the dataReceived call.
+
+        If the reactor has a C{receiveBufferPool}, the data is read into a
+        buffer borrowed from it instead; see L{_doReadInto}.
         """
+        pool = getattr(self.reactor, "receiveBufferPool", None)
+        if pool is not None:
+            return self._doReadInto(pool)
         try:
             data = self.socket.recv(self.bufferSize)
         except socket.error as se:
             if se.args[0] == EWOULDBLOCK:
+                self._readWouldBlock = True
                 return
             else:
                 return main.CONNECTION_LOST
@@ -243,9 +382,57 @@ class Connection(_TLSConnectionMixin, abstract.FileDescriptor, _SocketCloser,
         return self._dataReceived(data)
 
 
+    def _doReadInto(self, pool):
+        """
+        Read available data with C{recv_into} into a buffer borrowed from
+        C{pool}, and give it to the protocol.
+
+        The number of bytes read is chosen by C{self._readSize}, which adapts
+        to the amount of data received recently.  Protocols providing
+        L{interfaces.IBufferReceiver} are given a L{memoryview} of the
+        buffer, which is released once C{dataReceived} returns; other
+        protocols are given a copy of the data.
+
+        @param pool: The pool to borrow the buffer from.
+        @type pool: L{twisted.internet._buffers.ReceiveBufferPool}
+
+        @return: See L{doRead}.
+        """
+        readSize = self._readSize
+        if readSize is None:
+            readSize = self._readSize = _buffers.AdaptiveReadSize(
+                pool.minimumSize, self.bufferSize)
+        size = readSize.size
+        buf = pool.acquire(size)
+        try:
+            try:
+                received = self.socket.recv_into(buf, size)
+            except socket.error as se:
+                if se.args[0] == EWOULDBLOCK:
+                    self._readWouldBlock = True
+                    return
+                else:
+                    return main.CONNECTION_LOST
+            readSize.record(received)
+            if not received:
+                return main.CONNECTION_DONE
+            view = memoryview(buf)[:received]
+            if not interfaces.IBufferReceiver.providedBy(self.protocol):
+                return self._dataReceived(view.tobytes())
+            try:
+                return self._dataReceived(view)
+            finally:
+                if _releaseView:
+                    view.release()
+        finally:
+            pool.release(buf)
+
+
     def _dataReceived(self, data):
         if not data:
             return main.CONNECTION_DONE
+        if self._statistics is not None:
+            self._statistics.bytesReceived += len(data)
         rval = self.protocol.dataReceived(data)
         if rval is not None:
             offender = self.protocol.dataReceived
@@ -275,11 +462,77 @@ class Connection(_TLSConnectionMixin, abstract.FileDescriptor, _SocketCloser,
             return untilConcludes(self.socket.send, limitedData)
         except socket.error as se:
             if se.args[0] in (EWOULDBLOCK, ENOBUFS):
+                # ENOBUFS is not followed by a notification that the socket
+                # became writable, so it is not reported as blocking.
+                self._writeWouldBlock = se.args[0] == EWOULDBLOCK
+                return 0
+            else:
+                return main.CONNECTION_LOST
+
+
+    if getattr(socket.socket, "sendmsg", None) is not None:
+        def doWrite(self):
+            """
+            Write the buffered data to the socket with C{sendmsg}, which
+            gathers the chunks given to C{write} and C{writeSequence} without
+            joining them first.
+
+            @see: L{abstract.FileDescriptor.doWrite}
+            """
+            return self._doWriteSequence(self._writeSomeDataSequence)
+
+
+    def _writeSomeDataSequence(self, chunks):
+        """
+        Write as much as possible of the given chunks of data to this TCP
+        connection with a single C{sendmsg} call.
+
+        @param chunks: The data to write.
+        @type chunks: L{list} of L{bytes}
+
+        @return: The number of bytes written, or an exception if the
+            connection is lost.
+        """
+        try:
+            return untilConcludes(self.socket.sendmsg, chunks)
+        except socket.error as se:
+            if se.args[0] in (EWOULDBLOCK, ENOBUFS):
+                self._writeWouldBlock = se.args[0] == EWOULDBLOCK
                 return 0
             else:
                 return main.CONNECTION_LOST
 
 
+    def _writeSomeFileData(self, fileObject, offset, count):
+        """
+        Write part of a file to this TCP connection with C{os.sendfile},
+        unless TLS has been started on it.
+
+        @see: L{abstract.FileDescriptor._writeSomeFileData}
+        """
+        if _sendfile is None or self.TLS:
+            return None
+        try:
+            fileno = fileObject.fileno()
+        except (AttributeError, IOError, ValueError):
+            return None
+        try:
+            sent = untilConcludes(
+                _sendfile, self.socket.fileno(), fileno, offset, count)
+        except (OSError, socket.error) as se:
+            if se.args[0] in (EWOULDBLOCK, EAGAIN, ENOBUFS):
+                self._writeWouldBlock = se.args[0] != ENOBUFS
+                return 0
+            elif se.args[0] in _SENDFILE_UNSUPPORTED:
+                return None
+            else:
+                return main.CONNECTION_LOST
+        if not sent:
+            # The file ended; let the caller find out.
+            return None
+        return sent
+
+
     def _closeWriteConnection(self):
         try:
             self.socket.shutdown(1)
@@ -714,7 +967,8 @@ class _BaseTCPClient(object):
 
     _addressType = address.IPv4Address
 
-    def __init__(self, host, port, bindAddress, connector, reactor=None):
+    def __init__(self, host, port, bindAddress, connector, reactor=None,
+                 socketOptions=()):
         # BaseClient.__init__ is invoked later
         self.connector = connector
         self.addr = (host, port)
@@ -734,6 +988,7 @@ class _BaseTCPClient(object):
             self._requiresResolution = True
         try:
             skt = self.createInternetSocket()
+            _setSocketOptions(skt, socketOptions)
         except socket.error as se:
             err = error.ConnectBindError(se.args[0], se.args[1])
             whenDone = None
@@ -816,6 +1071,9 @@ class Server(_TLSServerMixin, Connection):
         self.client = client
         self.sessionno = sessionno
         self.hostname = client[0]
+        if isinstance(server, Port):
+            self._statistics = server
+            server.connections += 1
 
         logPrefix = self._getLogPrefix(self.protocol)
         self.logstr = "%s,%s,%s" % (logPrefix,
@@ -1269,6 +1527,35 @@ class Port(base.BasePort, _SocketCloser):
         was created and initialized outside of the reactor and will be used to
         listen for connections (instead of a new socket being created by this
         L{Port}).
+
+    @ivar reusePort: Whether to set C{SO_REUSEPORT} on the listening socket,
+        so that several processes can listen on the same port and have the
+        kernel balance incoming connections between them.  Ports created
+        without an explicit C{reusePort} argument use this class attribute.
+    @type reusePort: L{bool}
+
+    @ivar socketOptions: C{(level, option, value)} tuples of further options
+        to set on the listening socket, which the accepted sockets inherit.
+    @type socketOptions: L{tuple} of L{tuple}
+
+    @ivar connectionsAccepted: The number of connections accepted so far.
+    @type connectionsAccepted: L{int}
+
+    @ivar connections: The number of connections accepted by this port which
+        are still open.
+    @type connections: L{int}
+
+    @ivar bytesReceived: The number of bytes received by the connections
+        accepted by this port.
+    @type bytesReceived: L{int}
+
+    @ivar bytesSent: The number of bytes written by the connections accepted
+        by this port.
+    @type bytesSent: L{int}
+
+    @ivar bufferedBytes: The number of bytes which the open connections
+        accepted by this port have buffered and not written yet.
+    @type bufferedBytes: L{int}
     """
 
     socketType = socket.SOCK_STREAM
@@ -1279,6 +1566,14 @@ class Port(base.BasePort, _SocketCloser):
     backlog = 50
 
     _type = 'TCP'
+    reusePort = False
+    socketOptions = ()
+
+    connectionsAccepted = 0
+    connections = 0
+    bytesReceived = 0
+    bytesSent = 0
+    bufferedBytes = 0
 
     # Actual port number being listened on, only set to a non-None
     # value when we are actually listening.
@@ -1292,13 +1587,24 @@ class Port(base.BasePort, _SocketCloser):
     _addressType = address.IPv4Address
     _logger = Logger()
 
-    def __init__(self, port, factory, backlog=50, interface='', reactor=None):
+    def __init__(self, port, factory, backlog=50, interface='', reactor=None,
+                 reusePort=None, socketOptions=None):
         """Initialize with a numeric port to listen on.
+
+        @param reusePort: If not L{None}, overrides L{Port.reusePort}.
+        @type reusePort: L{bool} or L{None}
+
+        @param socketOptions: If not L{None}, overrides L{Port.socketOptions}.
+        @type socketOptions: iterable of L{tuple} or L{None}
         """
         base.BasePort.__init__(self, reactor=reactor)
         self.port = port
         self.factory = factory
         self.backlog = backlog
+        if reusePort is not None:
+            self.reusePort = reusePort
+        if socketOptions is not None:
+            self.socketOptions = tuple(socketOptions)
         if abstract.isIPv6Address(interface):
             self.addressFamily = socket.AF_INET6
             self._addressType = address.IPv6Address
@@ -1340,6 +1646,13 @@ class Port(base.BasePort, _SocketCloser):
         s = base.BasePort.createInternetSocket(self)
         if platformType == "posix" and sys.platform != "cygwin":
             s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reusePort:
+            if _SO_REUSEPORT is None:
+                s.close()
+                raise socket.error(
+                    errno.ENOPROTOOPT, "SO_REUSEPORT is not supported")
+            s.setsockopt(socket.SOL_SOCKET, _SO_REUSEPORT, 1)
+        _setSocketOptions(s, self.socketOptions)
         return s
 
 
@@ -1385,6 +1698,7 @@ class Port(base.BasePort, _SocketCloser):
         self.numberAccepts = 100
 
         self.startReading()
+        _listeningPorts.add(self)
 
     def _buildAddr(self, address):
         return self._addressType('TCP', *address)
@@ -1413,6 +1727,7 @@ class Port(base.BasePort, _SocketCloser):
                                   _reservedFD)
 
                 for accepted, (skt, addr) in enumerate(clients, 1):
+                    self.connectionsAccepted += 1
                     fdesc._setCloseOnExec(skt.fileno())
 
                     if len(addr) == 4:
@@ -1484,6 +1799,7 @@ class Port(base.BasePort, _SocketCloser):
         """
         self._logConnectionLostMsg()
         self._realPortNumber = None
+        _listeningPorts.discard(self)
 
         base.BasePort.connectionLost(self, reason)
         self.connected = False
@@ -1525,7 +1841,13 @@ class Connector(base.BaseConnector):
     """
     _addressType = address.IPv4Address
 
-    def __init__(self, host, port, factory, timeout, bindAddress, reactor=None):
+    def __init__(self, host, port, factory, timeout, bindAddress, reactor=None,
+                 socketOptions=()):
+        """
+        @param socketOptions: C{(level, option, value)} tuples of options to
+            set on the sockets of the connection attempts.
+        @type socketOptions: iterable of L{tuple}
+        """
         if isinstance(port, _portNameType):
             try:
                 port = socket.getservbyname(port, 'tcp')
@@ -1535,6 +1857,7 @@ class Connector(base.BaseConnector):
         if abstract.isIPv6Address(host):
             self._addressType = address.IPv6Address
         self.bindAddress = bindAddress
+        self.socketOptions = tuple(socketOptions)
         base.BaseConnector.__init__(self, factory, timeout, reactor)
 
 
@@ -1545,7 +1868,8 @@ class Connector(base.BaseConnector):
         @return: a new L{Client}
         @rtype: L{Client}
         """
-        return Client(self.host, self.port, self.bindAddress, self, self.reactor)
+        return Client(self.host, self.port, self.bindAddress, self,
+                      self.reactor, self.socketOptions)
 
 
     def getDestination(self):
@@ -6,6 +6,8 @@ Tests for L{twisted.internet.base}.
 """
 
 import socket
+import threading
+from collections import deque
 try:
     from Queue import Queue
 except ImportError:
@@ -16,7 +18,8 @@ from zope.interface import implementer
 from twisted.python.threadpool import ThreadPool
 from twisted.internet.interfaces import (IReactorTime, IReactorThreads,
                                          IResolverSimple)
-from twisted.internet.error import DNSLookupError
+from twisted.internet.error import (
+    DNSLookupError, AlreadyCalled, AlreadyCancelled)
 from twisted.internet._resolver import FirstOneWins
 from twisted.internet.defer import Deferred
 from twisted.internet.base import ThreadedResolver, DelayedCall, ReactorBase
@@ -317,6 +320,16 @@ class DelayedCallMixin(object):
         self.assertFalse(self.one != self.one)
 
 
+    def test_noInstanceDictionary(self):
+        """
+        L{DelayedCall} instances have no instance dictionary, since a reactor
+        may hold very many of them.
+        """
+        if not isinstance(DelayedCall, type):
+            raise SkipTest("__slots__ has no effect on old-style classes")
+        self.assertFalse(hasattr(self.zero, '__dict__'))
+
+
 
 class DelayedCallNoDebugTests(DelayedCallMixin, TestCase):
     """
@@ -434,6 +447,219 @@ class ReactorBaseSignalTests(TestCase):
 
 
 
+class CallSoonTests(TestCase):
+    """
+    Tests for L{ReactorBase.callSoon}.
+    """
+
+    def setUp(self):
+        self.reactor = TestSpySignalCapturingReactor()
+
+
+    def test_callLaterOverridden(self):
+        """
+        L{ReactorBase.callSoon} uses C{callLater(0, ...)} on reactors which
+        override C{callLater} but not C{callSoon}, so that those driving
+        another event loop with C{callLater} wake up for the call.
+        """
+        scheduled = []
+
+        class CallLaterReactor(TestSpySignalCapturingReactor):
+            def callLater(self, _seconds, _f, *args, **kw):
+                scheduled.append((_seconds, _f, args, kw))
+                return TestSpySignalCapturingReactor.callLater(
+                    self, _seconds, _f, *args, **kw)
+
+        reactor = CallLaterReactor()
+        calls = []
+        reactor.callSoon(calls.append, "soon")
+        self.assertEqual(scheduled, [(0, calls.append, ("soon",), {})])
+        self.assertEqual(reactor._soonCalls, deque())
+        reactor.runUntilCurrent()
+        self.assertEqual(calls, ["soon"])
+
+
+    def test_callLaterAndCallSoonOverridden(self):
+        """
+        L{ReactorBase.callSoon} queues the call itself on reactors which
+        override both C{callLater} and C{callSoon}.
+        """
+        class BothReactor(TestSpySignalCapturingReactor):
+            def callLater(self, _seconds, _f, *args, **kw):
+                raise AssertionError("callLater was called")
+
+            def callSoon(self, _f, *args, **kw):
+                return TestSpySignalCapturingReactor.callSoon(
+                    self, _f, *args, **kw)
+
+        reactor = BothReactor()
+        calls = []
+        reactor.callSoon(calls.append, "soon")
+        reactor.runUntilCurrent()
+        self.assertEqual(calls, ["soon"])
+
+
+    def test_runUntilCurrent(self):
+        """
+        Calls made with L{ReactorBase.callSoon} are run by
+        L{ReactorBase.runUntilCurrent} in the order they were made, before
+        any delayed call.
+        """
+        calls = []
+        self.reactor.callLater(0, calls.append, "later")
+        self.reactor.callSoon(calls.append, "first")
+        self.reactor.callSoon(lambda: calls.append("second"))
+        self.reactor.runUntilCurrent()
+        self.assertEqual(calls, ["first", "second", "later"])
+
+
+    def test_timeout(self):
+        """
+        L{ReactorBase.timeout} is C{0} while calls made with
+        L{ReactorBase.callSoon} are waiting to run.
+        """
+        self.assertIsNone(self.reactor.timeout())
+        self.reactor.callSoon(lambda: None)
+        self.assertEqual(self.reactor.timeout(), 0)
+        self.reactor.runUntilCurrent()
+        self.assertIsNone(self.reactor.timeout())
+
+
+    def test_callSoonFromCall(self):
+        """
+        A call made with L{ReactorBase.callSoon} while running such calls is
+        run on the next iteration only.
+        """
+        calls = []
+        self.reactor.callSoon(
+            lambda: self.reactor.callSoon(calls.append, "again"))
+        self.reactor.runUntilCurrent()
+        self.assertEqual(calls, [])
+        self.reactor.runUntilCurrent()
+        self.assertEqual(calls, ["again"])
+
+
+    def test_cancel(self):
+        """
+        A cancelled call is not run, and cannot be cancelled again.
+        """
+        calls = []
+        call = self.reactor.callSoon(calls.append, "cancelled")
+        self.assertTrue(call.active())
+        call.cancel()
+        self.assertFalse(call.active())
+        self.assertRaises(AlreadyCancelled, call.cancel)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(calls, [])
+
+
+    def test_called(self):
+        """
+        A call which has been run is no longer active and cannot be
+        cancelled.
+        """
+        call = self.reactor.callSoon(lambda: None)
+        self.reactor.runUntilCurrent()
+        self.assertFalse(call.active())
+        self.assertRaises(AlreadyCalled, call.cancel)
+
+
+    def test_error(self):
+        """
+        An exception raised by a call is logged and does not prevent the
+        following calls from running.
+        """
+        calls = []
+        self.reactor.callSoon(lambda: 1 // 0)
+        self.reactor.callSoon(calls.append, "after")
+        self.reactor.runUntilCurrent()
+        self.assertEqual(calls, ["after"])
+        self.assertEqual(len(self.flushLoggedErrors(ZeroDivisionError)), 1)
+
+
+
+class CallFromThreadTests(TestCase):
+    """
+    Tests for L{ReactorBase.callFromThread}.
+    """
+
+    def setUp(self):
+        self.reactor = TestSpySignalCapturingReactor()
+        self.wakeUps = []
+        self.reactor.wakeUp = lambda: self.wakeUps.append(True)
+
+
+    def test_coalescedWakeUps(self):
+        """
+        L{ReactorBase.callFromThread} only wakes up the reactor when its
+        queue was empty, L{ReactorBase.runUntilCurrent} running all the calls
+        queued in order.
+        """
+        calls = []
+        for i in range(3):
+            self.reactor.callFromThread(calls.append, i)
+        self.assertEqual(len(self.wakeUps), 1)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(calls, [0, 1, 2])
+        self.reactor.callFromThread(calls.append, 3)
+        self.assertEqual(len(self.wakeUps), 2)
+        self.assertEqual(self.reactor.threadCallWakeUps, 2)
+        self.assertEqual(self.reactor.threadCalls, 3)
+
+
+    def test_queuedWhileRunning(self):
+        """
+        A call queued while L{ReactorBase.runUntilCurrent} runs the queue is
+        run on the next iteration, the reactor waking itself up for it.
+        """
+        calls = []
+        self.reactor.callFromThread(
+            lambda: self.reactor.callFromThread(calls.append, "again"))
+        self.reactor.callFromThread(calls.append, "first")
+        self.reactor.runUntilCurrent()
+        self.assertEqual(calls, ["first"])
+        self.assertEqual(len(self.wakeUps), 2)
+        self.assertEqual(self.reactor.threadCallWakeUps, 2)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(calls, ["first", "again"])
+        self.assertEqual(len(self.wakeUps), 2)
+        self.assertEqual(self.reactor.threadCalls, 3)
+
+
+    def test_concurrentCalls(self):
+        """
+        When two threads call L{ReactorBase.callFromThread} at once, so that
+        both queue their call before either checks whether to wake up the
+        reactor, the reactor is still woken up.
+        """
+        appended = []
+        bothAppended = threading.Event()
+
+        class RendezvousQueue(deque):
+            def append(self, call):
+                deque.append(self, call)
+                appended.append(call)
+                if len(appended) == 2:
+                    bothAppended.set()
+                bothAppended.wait(5)
+
+        self.reactor.threadCallQueue = RendezvousQueue()
+        calls = []
+        threads = [
+            threading.Thread(target=self.reactor.callFromThread,
+                             args=(calls.append, i))
+            for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(bothAppended.is_set())
+        self.assertTrue(self.wakeUps)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(sorted(calls), [0, 1])
+
+
+
 try:
     import signal
 except ImportError:
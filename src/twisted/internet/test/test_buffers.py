@@ -0,0 +1,112 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.internet._buffers}.
+"""
+
+from __future__ import division, absolute_import
+
+from twisted.internet._buffers import ReceiveBufferPool, AdaptiveReadSize
+from twisted.trial.unittest import SynchronousTestCase
+
+
+
+class ReceiveBufferPoolTests(SynchronousTestCase):
+    """
+    Tests for L{ReceiveBufferPool}.
+    """
+
+    def test_sizeClasses(self):
+        """
+        L{ReceiveBufferPool.acquire} returns buffers whose size is the
+        smallest power of two holding the requested size, and no smaller
+        than the minimum size.
+        """
+        pool = ReceiveBufferPool(minimumSize=1000)
+        self.assertEqual(pool.minimumSize, 1024)
+        self.assertEqual(len(pool.acquire(10)), 1024)
+        self.assertEqual(len(pool.acquire(1025)), 2048)
+        self.assertEqual(len(pool.acquire(4096)), 4096)
+        self.assertEqual(pool.allocated, 3)
+
+
+    def test_reuse(self):
+        """
+        A released buffer is handed out again for a request of the same size
+        class.
+        """
+        pool = ReceiveBufferPool()
+        buf = pool.acquire(4000)
+        pool.release(buf)
+        self.assertIs(pool.acquire(3000), buf)
+        self.assertIsNot(pool.acquire(3000), buf)
+        self.assertEqual((pool.allocated, pool.reused), (2, 1))
+
+
+    def test_maximumFree(self):
+        """
+        No more than C{maximumFree} unused buffers are kept per size class.
+        """
+        pool = ReceiveBufferPool(maximumFree=1)
+        first, second = pool.acquire(1), pool.acquire(1)
+        pool.release(first)
+        pool.release(second)
+        self.assertIs(pool.acquire(1), first)
+        self.assertIsNot(pool.acquire(1), second)
+
+
+
+class AdaptiveReadSizeTests(SynchronousTestCase):
+    """
+    Tests for L{AdaptiveReadSize}.
+    """
+
+    def test_initial(self):
+        """
+        The first read size is the minimum unless given, and is kept within
+        the limits.
+        """
+        self.assertEqual(AdaptiveReadSize(16, 1024).size, 16)
+        self.assertEqual(AdaptiveReadSize(16, 1024, 64).size, 64)
+        self.assertEqual(AdaptiveReadSize(16, 1024, 4096).size, 1024)
+
+
+    def test_grow(self):
+        """
+        The read size doubles after a read which filled it, up to the
+        maximum.
+        """
+        readSize = AdaptiveReadSize(16, 64)
+        readSize.record(16)
+        self.assertEqual(readSize.size, 32)
+        readSize.record(32)
+        readSize.record(64)
+        self.assertEqual(readSize.size, 64)
+
+
+    def test_shrink(self):
+        """
+        The read size halves after two consecutive reads which fit in half of
+        it, down to the minimum.
+        """
+        readSize = AdaptiveReadSize(16, 1024, 64)
+        readSize.record(10)
+        self.assertEqual(readSize.size, 64)
+        readSize.record(10)
+        self.assertEqual(readSize.size, 32)
+        for i in range(10):
+            readSize.record(1)
+        self.assertEqual(readSize.size, 16)
+
+
+    def test_shrinkInterrupted(self):
+        """
+        A read which does not fit in half of the read size prevents the next
+        small read from shrinking it.
+        """
+        readSize = AdaptiveReadSize(16, 1024, 64)
+        readSize.record(10)
+        readSize.record(40)
+        readSize.record(10)
+        self.assertEqual(readSize.size, 64)
@@ -0,0 +1,401 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.internet.connectionpool}.
+"""
+
+from __future__ import division, absolute_import
+
+from zope.interface import implementer
+
+from twisted.internet import defer, error
+from twisted.internet.connectionpool import ConnectionPool
+from twisted.internet.interfaces import IStreamClientEndpoint
+from twisted.internet.protocol import Factory, Protocol
+from twisted.internet.task import Clock
+from twisted.test.proto_helpers import StringTransportWithDisconnection
+from twisted.trial.unittest import SynchronousTestCase
+
+
+
+@implementer(IStreamClientEndpoint)
+class FakeEndpoint(object):
+    """
+    An endpoint whose connection attempts are completed by the test.
+
+    @ivar attempts: The factories and L{defer.Deferred}s of the connection
+        attempts not completed yet.
+    @type attempts: L{list} of L{tuple}
+    """
+
+    def __init__(self):
+        self.attempts = []
+
+
+    def connect(self, factory):
+        """
+        Start a connection attempt.
+
+        @see: L{IStreamClientEndpoint.connect}
+        """
+        d = defer.Deferred()
+        self.attempts.append((factory, d))
+        return d
+
+
+    def succeed(self):
+        """
+        Complete the first connection attempt.
+
+        @return: The transport of the connection.
+        @rtype: L{StringTransportWithDisconnection}
+        """
+        factory, d = self.attempts.pop(0)
+        protocol = factory.buildProtocol(None)
+        transport = StringTransportWithDisconnection()
+        transport.protocol = protocol
+        protocol.makeConnection(transport)
+        d.callback(protocol)
+        return transport
+
+
+    def fail(self):
+        """
+        Fail the first connection attempt.
+        """
+        factory, d = self.attempts.pop(0)
+        d.errback(error.ConnectionRefusedError())
+
+
+
+class ConnectionPoolTests(SynchronousTestCase):
+    """
+    Tests for L{ConnectionPool}.
+    """
+
+    def setUp(self):
+        self.clock = Clock()
+        self.endpoint = FakeEndpoint()
+
+
+    def createPool(self, **kwargs):
+        """
+        Create a L{ConnectionPool} of L{Protocol}s using the fake clock.
+
+        @return: The pool.
+        @rtype: L{ConnectionPool}
+        """
+        return ConnectionPool(Factory.forProtocol(Protocol), self.clock,
+                              **kwargs)
+
+
+    def test_invalidSize(self):
+        """
+        L{ConnectionPool} raises L{ValueError} if its maximum size is lower
+        than 1 or than its minimum size.
+        """
+        self.assertRaises(ValueError, self.createPool, maxSize=0)
+        self.assertRaises(ValueError, self.createPool, minSize=3, maxSize=2)
+
+
+    def test_reuse(self):
+        """
+        L{ConnectionPool.acquire} makes a connection to the endpoint, and
+        lends it out again once it was released.
+        """
+        pool = self.createPool()
+        d = pool.acquire(self.endpoint)
+        self.assertNoResult(d)
+        transport = self.endpoint.succeed()
+        protocol = self.successResultOf(d)
+        self.assertIsInstance(protocol, Protocol)
+        self.assertIs(protocol.transport.wrappedProtocol, protocol)
+        pool.release(protocol)
+        self.assertIs(self.successResultOf(pool.acquire(self.endpoint)),
+                      protocol)
+        self.assertEqual(self.endpoint.attempts, [])
+        self.assertTrue(transport.connected)
+        stats = pool.statistics()
+        self.assertEqual(
+            (stats["active"], stats["idle"], stats["connectionsMade"],
+             stats["reused"]),
+            (1, 0, 1, 1))
+        self.assertEqual(stats["waitTimes"]["count"], 2)
+
+
+    def test_keys(self):
+        """
+        Connections are shared by the calls to L{ConnectionPool.acquire}
+        with the same key.
+        """
+        pool = self.createPool()
+        other = FakeEndpoint()
+        d = pool.acquire(self.endpoint, key="backend")
+        self.endpoint.succeed()
+        protocol = self.successResultOf(d)
+        pool.release(protocol)
+        self.assertIs(
+            self.successResultOf(pool.acquire(other, key="backend")),
+            protocol)
+        pool.acquire(other)
+        self.assertEqual(len(other.attempts), 1)
+
+
+    def test_releaseTwice(self):
+        """
+        L{ConnectionPool.release} raises L{ValueError} if the connection is
+        not lent out.
+        """
+        pool = self.createPool()
+        d = pool.acquire(self.endpoint)
+        self.endpoint.succeed()
+        protocol = self.successResultOf(d)
+        pool.release(protocol)
+        self.assertRaises(ValueError, pool.release, protocol)
+
+
+    def test_releaseWithoutReuse(self):
+        """
+        A connection released with C{reuse=False} is closed.
+        """
+        pool = self.createPool()
+        d = pool.acquire(self.endpoint)
+        transport = self.endpoint.succeed()
+        pool.release(self.successResultOf(d), reuse=False)
+        self.assertFalse(transport.connected)
+        pool.acquire(self.endpoint)
+        self.assertEqual(len(self.endpoint.attempts), 1)
+
+
+    def test_lostWhileIdle(self):
+        """
+        An idle connection which is lost is not lent out.
+        """
+        pool = self.createPool()
+        d = pool.acquire(self.endpoint)
+        transport = self.endpoint.succeed()
+        pool.release(self.successResultOf(d))
+        transport.loseConnection()
+        self.assertEqual(pool.statistics()["idle"], 0)
+        d = pool.acquire(self.endpoint)
+        self.assertNoResult(d)
+        self.assertEqual(len(self.endpoint.attempts), 1)
+
+
+    def test_lostWhileActive(self):
+        """
+        Releasing a connection which was lost while lent out does nothing.
+        """
+        pool = self.createPool()
+        d = pool.acquire(self.endpoint)
+        transport = self.endpoint.succeed()
+        protocol = self.successResultOf(d)
+        transport.loseConnection()
+        pool.release(protocol)
+        stats = pool.statistics()
+        self.assertEqual((stats["active"], stats["idle"]), (0, 0))
+
+
+    def test_unusedKeysForgotten(self):
+        """
+        A key is forgotten once it has no connection and no call waiting for
+        one, so using fresh keys does not grow the pool.
+        """
+        pool = self.createPool()
+        for i in range(3):
+            endpoint = FakeEndpoint()
+            d = pool.acquire(endpoint)
+            endpoint.succeed()
+            pool.release(self.successResultOf(d), reuse=False)
+            self.assertEqual(pool._states, {})
+
+            endpoint = FakeEndpoint()
+            d = pool.acquire(endpoint)
+            transport = endpoint.succeed()
+            pool.release(self.successResultOf(d))
+            transport.loseConnection()
+            self.assertEqual(pool._states, {})
+
+            endpoint = FakeEndpoint()
+            d = pool.acquire(endpoint)
+            endpoint.fail()
+            self.failureResultOf(d, error.ConnectionRefusedError)
+            self.assertEqual(pool._states, {})
+
+            endpoint = FakeEndpoint()
+            d = pool.acquire(endpoint)
+            d.cancel()
+            self.failureResultOf(d, defer.CancelledError)
+            endpoint.succeed().loseConnection()
+            self.assertEqual(pool._states, {})
+
+
+    def test_maxSize(self):
+        """
+        Once C{maxSize} connections are made for a key, the calls to
+        L{ConnectionPool.acquire} wait for one to be released.
+        """
+        pool = self.createPool(maxSize=2)
+        calls = [pool.acquire(self.endpoint) for i in range(3)]
+        self.assertEqual(len(self.endpoint.attempts), 2)
+        self.endpoint.succeed()
+        self.endpoint.succeed()
+        first = self.successResultOf(calls[0])
+        self.successResultOf(calls[1])
+        self.assertNoResult(calls[2])
+        self.assertEqual(pool.statistics()["waiting"], 1)
+        self.clock.advance(3)
+        pool.release(first)
+        self.assertIs(self.successResultOf(calls[2]), first)
+        self.assertEqual(pool.waitTimes.snapshot()["maximum"], 3)
+
+
+    def test_maxWaiting(self):
+        """
+        L{ConnectionPool.acquire} fails with L{defer.QueueOverflow} if
+        C{maxWaiting} calls already wait for a connection.
+        """
+        pool = self.createPool(maxSize=1, maxWaiting=1)
+        pool.acquire(self.endpoint)
+        self.failureResultOf(pool.acquire(self.endpoint), defer.QueueOverflow)
+
+
+    def test_waitTimeout(self):
+        """
+        L{ConnectionPool.acquire} fails with L{defer.TimeoutError} if no
+        connection was available within C{waitTimeout} seconds, and leaves
+        the queue.
+        """
+        pool = self.createPool(waitTimeout=5)
+        d = pool.acquire(self.endpoint)
+        self.clock.advance(5)
+        self.failureResultOf(d, defer.TimeoutError)
+        self.assertEqual(pool.waitTimeouts, 1)
+        self.assertEqual(pool.statistics()["waiting"], 0)
+        self.endpoint.succeed()
+        self.assertEqual(pool.statistics()["idle"], 1)
+
+
+    def test_connectionFailed(self):
+        """
+        If a connection cannot be made, the call waiting for it fails with
+        the reason, and the next call makes another attempt.
+        """
+        pool = self.createPool(maxSize=1)
+        first = pool.acquire(self.endpoint)
+        second = pool.acquire(self.endpoint)
+        self.endpoint.fail()
+        self.failureResultOf(first, error.ConnectionRefusedError)
+        self.assertNoResult(second)
+        self.assertEqual(len(self.endpoint.attempts), 1)
+
+
+    def test_idleTimeout(self):
+        """
+        Connections which stay idle for C{idleTimeout} seconds are closed,
+        but C{minSize} of them are kept.
+        """
+        pool = self.createPool(minSize=1, idleTimeout=10)
+        calls = [pool.acquire(self.endpoint) for i in range(2)]
+        transports = [self.endpoint.succeed(), self.endpoint.succeed()]
+        for d in calls:
+            pool.release(self.successResultOf(d))
+        self.clock.advance(10)
+        self.assertEqual([t.connected for t in transports], [False, True])
+        self.assertEqual(pool.evicted, 1)
+        self.assertEqual(pool.statistics()["idle"], 1)
+
+
+    def test_minSize(self):
+        """
+        C{minSize} connections are made once a key is used, and remade when
+        they are lost.
+        """
+        pool = self.createPool(minSize=2)
+        pool.acquire(self.endpoint)
+        self.assertEqual(len(self.endpoint.attempts), 2)
+        self.endpoint.succeed()
+        transport = self.endpoint.succeed()
+        self.assertEqual(pool.statistics()["idle"], 1)
+        transport.loseConnection()
+        self.assertEqual(len(self.endpoint.attempts), 1)
+
+
+    def test_healthCheck(self):
+        """
+        Idle connections which C{healthCheck} rejects are closed rather than
+        lent out.
+        """
+        healthy = {}
+        pool = self.createPool(healthCheck=lambda p: healthy[p])
+        d = pool.acquire(self.endpoint)
+        transport = self.endpoint.succeed()
+        protocol = self.successResultOf(d)
+        pool.release(protocol)
+        healthy[protocol] = False
+        d = pool.acquire(self.endpoint)
+        self.assertFalse(transport.connected)
+        self.assertEqual(pool.healthCheckFailures, 1)
+        self.endpoint.succeed()
+        self.assertIsNot(self.successResultOf(d), protocol)
+
+
+    def test_asynchronousHealthCheck(self):
+        """
+        A connection waits for the L{defer.Deferred} returned by
+        C{healthCheck} before being lent out.
+        """
+        checks = []
+        def healthCheck(protocol):
+            checks.append(defer.Deferred())
+            return checks[-1]
+        pool = self.createPool(healthCheck=healthCheck)
+        d = pool.acquire(self.endpoint)
+        self.endpoint.succeed()
+        protocol = self.successResultOf(d)
+        pool.release(protocol)
+        d = pool.acquire(self.endpoint)
+        self.assertNoResult(d)
+        self.assertEqual(self.endpoint.attempts, [])
+        checks[0].callback(True)
+        self.assertIs(self.successResultOf(d), protocol)
+
+
+    def test_withConnection(self):
+        """
+        L{ConnectionPool.withConnection} calls a function with a connection,
+        releases it once the function returns, and closes it if the function
+        fails.
+        """
+        pool = self.createPool()
+        d = pool.withConnection(self.endpoint, lambda p, x: (p, x), 1)
+        transport = self.endpoint.succeed()
+        protocol, x = self.successResultOf(d)
+        self.assertEqual(x, 1)
+        self.assertEqual(pool.statistics()["idle"], 1)
+        d = pool.withConnection(self.endpoint, lambda p: 1 / 0)
+        self.failureResultOf(d, ZeroDivisionError)
+        self.assertFalse(transport.connected)
+
+
+    def test_close(self):
+        """
+        L{ConnectionPool.close} fails the waiting calls, closes the idle
+        connections, and the others once they are released.
+        """
+        pool = self.createPool(maxSize=2)
+        calls = [pool.acquire(self.endpoint) for i in range(3)]
+        transports = [self.endpoint.succeed(), self.endpoint.succeed()]
+        first, second = [self.successResultOf(d) for d in calls[:2]]
+        pool.release(first)
+        pool.release(second)
+        self.assertIs(self.successResultOf(calls[2]), first)
+        closed = pool.close()
+        self.assertEqual([t.connected for t in transports], [True, False])
+        self.assertNoResult(closed)
+        pool.release(first)
+        self.assertFalse(transports[0].connected)
+        self.assertIsNone(self.successResultOf(closed))
+        self.failureResultOf(pool.acquire(self.endpoint),
+                             defer.CancelledError)
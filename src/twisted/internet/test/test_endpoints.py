@@ -10,6 +10,7 @@ from __future__ import division, absolute_import
 
 from errno import EPERM
 from socket import AF_INET, AF_INET6, SOCK_STREAM, IPPROTO_TCP, gaierror
+from socket import SOL_SOCKET, SO_KEEPALIVE
 from unicodedata import normalize
 from types import FunctionType
 
@@ -24,7 +25,7 @@ from twisted.test.proto_helpers import StringTransportWithDisconnection
 
 from twisted import plugins
 from twisted.internet import error, interfaces, defer, endpoints, protocol
-from twisted.internet import reactor, threads, stdio
+from twisted.internet import reactor, threads, stdio, tcp
 from twisted.internet.address import IPv4Address, IPv6Address, UNIXAddress
 from twisted.internet.address import _ProcessAddress, HostnameAddress
 from twisted.internet.endpoints import StandardErrorBehavior
@@ -1414,6 +1415,138 @@ class TCP4EndpointsTests(EndpointTestCaseMixin, unittest.TestCase):
 
 
 
+class TCPServerEndpointReusePortTests(unittest.TestCase):
+    """
+    Tests for the C{reusePort} argument of L{endpoints.TCP4ServerEndpoint}
+    and L{endpoints.TCP6ServerEndpoint}.
+    """
+
+    def listenArguments(self, endpoint):
+        """
+        Listen with C{endpoint}, whose reactor must be C{self}.
+
+        @return: The keyword arguments given to C{listenTCP}.
+        @rtype: L{dict}
+        """
+        calls = []
+        self.listenTCP = lambda *args, **kwargs: calls.append(kwargs)
+        self.successResultOf(endpoint.listen(object()))
+        return calls[0]
+
+
+    def test_default(self):
+        """
+        By default, endpoints do not pass a C{reusePort} argument to
+        L{IReactorTCP.listenTCP}, which reactors without C{SO_REUSEPORT}
+        support do not accept.
+        """
+        self.assertNotIn(
+            "reusePort",
+            self.listenArguments(endpoints.TCP4ServerEndpoint(self, 80)))
+
+
+    def test_reusePort(self):
+        """
+        Endpoints created with C{reusePort} set pass it to
+        L{IReactorTCP.listenTCP}.
+        """
+        for endpointType in (endpoints.TCP4ServerEndpoint,
+                             endpoints.TCP6ServerEndpoint):
+            kwargs = self.listenArguments(
+                endpointType(self, 80, reusePort=True))
+            self.assertIs(kwargs["reusePort"], True)
+
+
+
+class TCPEndpointSocketOptionsTests(unittest.TestCase):
+    """
+    Tests for the socket tuning arguments of the TCP server and client
+    endpoints.
+    """
+
+    def listenArguments(self, endpoint):
+        """
+        Listen with C{endpoint}, whose reactor must be C{self}.
+
+        @return: The keyword arguments given to C{listenTCP}.
+        @rtype: L{dict}
+        """
+        calls = []
+        self.listenTCP = lambda *args, **kwargs: calls.append(kwargs)
+        self.successResultOf(endpoint.listen(object()))
+        return calls[0]
+
+
+    def connectArguments(self, endpoint):
+        """
+        Connect with C{endpoint}, whose reactor must be C{self}.
+
+        @return: The keyword arguments given to C{connectTCP}.
+        @rtype: L{dict}
+        """
+        calls = []
+        self.connectTCP = lambda *args, **kwargs: calls.append(kwargs)
+        endpoint.connect(object())
+        return calls[0]
+
+
+    def test_default(self):
+        """
+        By default, endpoints do not pass a C{socketOptions} argument to
+        L{IReactorTCP.listenTCP} or L{IReactorTCP.connectTCP}, which other
+        reactors do not accept.
+        """
+        self.assertNotIn(
+            "socketOptions",
+            self.listenArguments(endpoints.TCP4ServerEndpoint(self, 80)))
+        self.assertNotIn(
+            "socketOptions",
+            self.connectArguments(
+                endpoints.TCP4ClientEndpoint(self, "127.0.0.1", 80)))
+
+
+    def test_server(self):
+        """
+        The tuning arguments of L{endpoints.TCP4ServerEndpoint} and
+        L{endpoints.TCP6ServerEndpoint} are passed to
+        L{IReactorTCP.listenTCP} as socket options, after the explicit
+        C{socketOptions}.
+        """
+        for endpointType in (endpoints.TCP4ServerEndpoint,
+                             endpoints.TCP6ServerEndpoint):
+            kwargs = self.listenArguments(endpointType(
+                self, 80, fastOpen=16, deferAccept=5, userTimeout=1.5,
+                quickAck=True, busyPoll=50,
+                socketOptions=[(SOL_SOCKET, SO_KEEPALIVE, 1)]))
+            self.assertEqual(kwargs["socketOptions"], (
+                (SOL_SOCKET, SO_KEEPALIVE, 1),
+                (IPPROTO_TCP, tcp._TCP_FASTOPEN, 16),
+                (IPPROTO_TCP, tcp._TCP_DEFER_ACCEPT, 5),
+                (IPPROTO_TCP, tcp._TCP_USER_TIMEOUT, 1500),
+                (IPPROTO_TCP, tcp._TCP_QUICKACK, 1),
+                (SOL_SOCKET, tcp._SO_BUSY_POLL, 50)))
+
+
+    def test_client(self):
+        """
+        The tuning arguments of L{endpoints.TCP4ClientEndpoint} and
+        L{endpoints.TCP6ClientEndpoint} are passed to
+        L{IReactorTCP.connectTCP} as socket options, C{fastOpen} setting
+        C{TCP_FASTOPEN_CONNECT}.
+        """
+        for endpointType, host in ((endpoints.TCP4ClientEndpoint, "1.2.3.4"),
+                                   (endpoints.TCP6ClientEndpoint, "::1")):
+            kwargs = self.connectArguments(endpointType(
+                self, host, 80, fastOpen=True, userTimeout=2, quickAck=True,
+                busyPoll=50))
+            self.assertEqual(kwargs["socketOptions"], (
+                (IPPROTO_TCP, tcp._TCP_FASTOPEN_CONNECT, 1),
+                (IPPROTO_TCP, tcp._TCP_USER_TIMEOUT, 2000),
+                (IPPROTO_TCP, tcp._TCP_QUICKACK, 1),
+                (SOL_SOCKET, tcp._SO_BUSY_POLL, 50)))
+
+
+
 class TCP6EndpointsTests(EndpointTestCaseMixin, unittest.TestCase):
     """
     Tests for TCP IPv6 Endpoints.
@@ -3075,6 +3208,46 @@ class ServerStringTests(unittest.TestCase):
         self.assertEqual(server._port, 1234)
         self.assertEqual(server._backlog, 12)
         self.assertEqual(server._interface, "10.0.0.1")
+        self.assertFalse(server._reusePort)
+
+
+    def test_tcpReusePort(self):
+        """
+        When passed a TCP strports description with C{reusePort} set to C{1},
+        L{endpoints.serverFromString} returns a L{TCP4ServerEndpoint} which
+        listens with C{SO_REUSEPORT}.
+        """
+        server = endpoints.serverFromString(object(), "tcp:1234:reusePort=1")
+        self.assertTrue(server._reusePort)
+
+
+    def test_tcpSocketOptions(self):
+        """
+        When passed a TCP strports description with tuning options,
+        L{endpoints.serverFromString} returns a L{TCP4ServerEndpoint} which
+        sets the matching socket options.
+        """
+        server = endpoints.serverFromString(
+            object(), "tcp:1234:fastOpen=256:deferAccept=5:userTimeout=0.5:"
+                      "quickAck=1:busyPoll=20")
+        self.assertEqual(server._socketOptions, (
+            (IPPROTO_TCP, tcp._TCP_FASTOPEN, 256),
+            (IPPROTO_TCP, tcp._TCP_DEFER_ACCEPT, 5),
+            (IPPROTO_TCP, tcp._TCP_USER_TIMEOUT, 500),
+            (IPPROTO_TCP, tcp._TCP_QUICKACK, 1),
+            (SOL_SOCKET, tcp._SO_BUSY_POLL, 20)))
+        server = endpoints.serverFromString(object(), "tcp:1234:quickAck=0")
+        self.assertEqual(server._socketOptions, ())
+
+
+    def test_tcpUnknownOption(self):
+        """
+        L{endpoints.serverFromString} raises L{TypeError} when passed a TCP
+        strports description with an unknown option.
+        """
+        self.assertRaises(
+            TypeError, endpoints.serverFromString, object(),
+            "tcp:1234:fastClose=1")
 
 
     def test_ssl(self):
@@ -3321,6 +3494,26 @@ class ClientStringTests(unittest.TestCase):
         self.assertEqual(client._port, 1234)
         self.assertEqual(client._timeout, 7)
         self.assertEqual(client._bindAddress, ("10.0.0.2", 0))
+        self.assertEqual(client._socketOptions, ())
+
+
+    def test_tcpSocketOptions(self):
+        """
+        When passed a TCP strports description with tuning options,
+        L{endpoints.clientFromString} returns a L{TCP4ClientEndpoint} which
+        sets the matching socket options.
+        """
+        client = endpoints.clientFromString(
+            object(), "tcp:example.com:1234:fastOpen=1:userTimeout=3:"
+                      "quickAck=1:busyPoll=20")
+        self.assertEqual(client._socketOptions, (
+            (IPPROTO_TCP, tcp._TCP_FASTOPEN_CONNECT, 1),
+            (IPPROTO_TCP, tcp._TCP_USER_TIMEOUT, 3000),
+            (IPPROTO_TCP, tcp._TCP_QUICKACK, 1),
+            (SOL_SOCKET, tcp._SO_BUSY_POLL, 20)))
+        client = endpoints.clientFromString(
+            object(), "tcp:example.com:1234:fastOpen=0")
+        self.assertEqual(client._socketOptions, ())
 
 
     def test_tcpPositionalArgs(self):
@@ -3868,6 +4061,29 @@ class TCP6ServerEndpointPluginTests(unittest.TestCase):
         self.assertEqual(ep._port, 8080)
         self.assertEqual(ep._backlog, 12)
         self.assertEqual(ep._interface, '::1')
+        self.assertFalse(ep._reusePort)
+
+
+    def test_reusePort(self):
+        """
+        L{serverFromString} returns a L{TCP6ServerEndpoint} listening with
+        C{SO_REUSEPORT} when the description sets C{reusePort} to C{1}.
+        """
+        ep = endpoints.serverFromString(
+            MemoryReactor(), "tcp6:8080:reusePort=1")
+        self.assertTrue(ep._reusePort)
+
+
+    def test_socketOptions(self):
+        """
+        L{serverFromString} returns a L{TCP6ServerEndpoint} setting the
+        socket options matching the tuning options of the description.
+        """
+        ep = endpoints.serverFromString(
+            MemoryReactor(), "tcp6:8080:fastOpen=8:deferAccept=1")
+        self.assertEqual(ep._socketOptions, (
+            (IPPROTO_TCP, tcp._TCP_FASTOPEN, 8),
+            (IPPROTO_TCP, tcp._TCP_DEFER_ACCEPT, 1)))
 
 
 
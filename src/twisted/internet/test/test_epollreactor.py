@@ -7,13 +7,27 @@ Tests for L{twisted.internet.epollreactor}.
 
 from __future__ import division, absolute_import
 
+import socket
+
+from zope.interface import implementer
+
 from twisted.trial.unittest import TestCase
 try:
     from twisted.internet.epollreactor import _ContinuousPolling
 except ImportError:
     _ContinuousPolling = None
+try:
+    from twisted.internet.epollreactor import EPollReactor
+except ImportError:
+    EPollReactor = None
+from twisted.internet.interfaces import _IEdgeTriggeredDescriptor
 from twisted.internet.task import Clock
 from twisted.internet.error import ConnectionDone
+from twisted.test.proto_helpers import AccumulatingProtocol
+try:
+    from twisted.internet import unix
+except ImportError:
+    unix = None
 
 
 
@@ -246,3 +260,193 @@ class ContinuousPollingTests(TestCase):
 
     if _ContinuousPolling is None:
         skip = "epoll not supported in this environment."
+
+
+
+@implementer(_IEdgeTriggeredDescriptor)
+class EdgeTriggeredDescriptor(object):
+    """
+    Records reads and writes of one end of a socket pair, which would block
+    once C{readsBeforeBlocking} reads have been done.
+    """
+
+    readsBeforeBlocking = 1
+    _readWouldBlock = False
+    _writeWouldBlock = False
+
+    def __init__(self, skt):
+        self.socket = skt
+        self.events = []
+
+
+    def fileno(self):
+        return self.socket.fileno()
+
+
+    def logPrefix(self):
+        return "EdgeTriggeredDescriptor"
+
+
+    def doRead(self):
+        self.events.append("read")
+        self.readsBeforeBlocking -= 1
+        if self.readsBeforeBlocking < 0:
+            self._readWouldBlock = True
+
+
+    def doWrite(self):
+        self.events.append("write")
+        self._writeWouldBlock = True
+
+
+    def connectionLost(self, reason):
+        self.events.append("lost")
+
+
+
+class RecordingPoller(object):
+    """
+    Wraps an C{epoll} object, recording the timeouts given to C{poll}.
+    """
+
+    def __init__(self, poller):
+        self._poller = poller
+        self.timeouts = []
+
+
+    def poll(self, timeout, maxevents):
+        self.timeouts.append(timeout)
+        return self._poller.poll(timeout, maxevents)
+
+
+    def __getattr__(self, name):
+        return getattr(self._poller, name)
+
+
+
+class EdgeTriggeredTests(TestCase):
+    """
+    Tests for L{EPollReactor} with L{EPollReactor.edgeTriggered} set.
+    """
+
+    def setUp(self):
+        self.local, self.remote = socket.socketpair()
+        self.addCleanup(self.local.close)
+        self.addCleanup(self.remote.close)
+        self.local.setblocking(False)
+        self.reactor = EPollReactor(edgeTriggered=True)
+        self.addCleanup(self.reactor._poller.close)
+        self.addCleanup(self.reactor.removeAll)
+
+
+    def test_registeredOnce(self):
+        """
+        A descriptor providing L{_IEdgeTriggeredDescriptor} is registered
+        with C{epoll_ctl} when it is first added, and unregistered when it is
+        last removed, however often it starts and stops reading or writing
+        in between.
+        """
+        descriptor = EdgeTriggeredDescriptor(self.local)
+        calls = self.reactor.controlCalls
+        self.reactor.addReader(descriptor)
+        self.reactor.addWriter(descriptor)
+        self.reactor.removeWriter(descriptor)
+        self.reactor.addWriter(descriptor)
+        self.reactor.removeReader(descriptor)
+        self.assertEqual(self.reactor.controlCalls, calls + 1)
+        self.assertEqual(self.reactor.getWriters(), [descriptor])
+        self.reactor.removeWriter(descriptor)
+        self.assertEqual(self.reactor.controlCalls, calls + 2)
+        self.assertNotIn(descriptor.fileno(), self.reactor._edgeTriggeredFDs)
+
+
+    def test_levelTriggered(self):
+        """
+        Other descriptors are registered in level-triggered mode, which
+        needs an C{epoll_ctl} call whenever they start or stop reading or
+        writing.
+        """
+        descriptor = Descriptor()
+        descriptor.fileno = self.local.fileno
+        calls = self.reactor.controlCalls
+        self.reactor.addReader(descriptor)
+        self.reactor.addWriter(descriptor)
+        self.reactor.removeWriter(descriptor)
+        self.reactor.removeReader(descriptor)
+        self.assertEqual(self.reactor.controlCalls, calls + 4)
+        self.assertEqual(self.reactor._edgeTriggeredFDs, set())
+
+
+    def test_readUntilWouldBlock(self):
+        """
+        Once a descriptor is reported readable, C{doRead} is called once per
+        iteration, without waiting for another report, until it would block.
+        """
+        descriptor = EdgeTriggeredDescriptor(self.local)
+        descriptor.readsBeforeBlocking = 2
+        self.reactor.addReader(descriptor)
+        self.reactor._poller = poller = RecordingPoller(self.reactor._poller)
+        self.remote.send(b"x")
+
+        for i in range(4):
+            self.reactor.doPoll(0.01)
+        self.assertEqual(descriptor.events, ["read"] * 3)
+        self.assertEqual(poller.timeouts, [0.01, 0, 0, 0.01])
+
+
+    def test_writableUntilWouldBlock(self):
+        """
+        A descriptor reported writable stays writable, even if it stops and
+        starts writing, until C{doWrite} reports that it would block.
+        """
+        descriptor = EdgeTriggeredDescriptor(self.local)
+        self.reactor.addReader(descriptor)
+        self.reactor.doPoll(0)
+        self.assertEqual(descriptor.events, [])
+
+        self.reactor.addWriter(descriptor)
+        self.reactor.doPoll(0)
+        self.assertEqual(descriptor.events, ["write"])
+        self.reactor.doPoll(0)
+        self.assertEqual(descriptor.events, ["write"])
+
+
+    def test_writableWhileNotWriting(self):
+        """
+        Writability reported while a descriptor is not writing is
+        remembered for when it starts writing.
+        """
+        descriptor = EdgeTriggeredDescriptor(self.local)
+        self.reactor.addReader(descriptor)
+        self.reactor.doPoll(0)
+        self.reactor.addWriter(descriptor)
+        self.reactor.removeWriter(descriptor)
+        self.reactor.addWriter(descriptor)
+        self.reactor.doPoll(0)
+        self.assertEqual(descriptor.events, ["write"])
+
+
+    def test_unixReadUntilWouldBlock(self):
+        """
+        A UNIX socket connection reports when reading from it would block,
+        so that the reactor stops calling its C{doRead} and waits for the
+        next event once the data is read.
+        """
+        protocol = AccumulatingProtocol()
+        transport = unix.Server(self.local, protocol, None, None, 0,
+                                self.reactor)
+        protocol.makeConnection(transport)
+        self.assertIn(self.local.fileno(), self.reactor._edgeTriggeredFDs)
+        self.reactor._poller = poller = RecordingPoller(self.reactor._poller)
+        self.remote.send(b"x")
+
+        for i in range(3):
+            self.reactor.doPoll(0.01)
+        self.assertEqual(protocol.data, b"x")
+        self.assertEqual(poller.timeouts, [0.01, 0, 0.01])
+    if unix is None:
+        test_unixReadUntilWouldBlock.skip = (
+            "UNIX sockets not supported in this environment.")
+
+    if EPollReactor is None:
+        skip = "epoll not supported in this environment."
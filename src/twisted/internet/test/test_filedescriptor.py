@@ -7,10 +7,17 @@ Whitebox tests for L{twisted.internet.abstract.FileDescriptor}.
 
 from __future__ import division, absolute_import
 
+from zope.interface import implementer
 from zope.interface.verify import verifyClass
 
-from twisted.internet.abstract import FileDescriptor
-from twisted.internet.interfaces import IPushProducer
+from io import BytesIO
+
+from twisted.internet.abstract import FileDescriptor, _callAtIterationEnd
+from twisted.internet.error import ConnectionLost
+from twisted.internet.interfaces import (
+    ICorkableTransport, IPushProducer, IReactorCallSoon)
+from twisted.internet.task import Clock
+from twisted.python.failure import Failure
 from twisted.trial.unittest import SynchronousTestCase
 
 
@@ -41,6 +48,10 @@ class MemoryFile(FileDescriptor):
         pass
 
 
+    def stopReading(self):
+        pass
+
+
     def writeSomeData(self, data):
         """
         Copy at most C{self._freeSpace} bytes from C{data} into C{self._written}.
@@ -83,6 +94,14 @@ class FileDescriptorTests(SynchronousTestCase):
         self.assertTrue(verifyClass(IPushProducer, FileDescriptor))
 
 
+    def test_implementInterfaceICorkableTransport(self):
+        """
+        L{FileDescriptor} declares L{ICorkableTransport}, whose
+        L{ITransport} methods are left to its subclasses.
+        """
+        self.assertTrue(ICorkableTransport.implementedBy(FileDescriptor))
+
+
 
 class WriteDescriptorTests(SynchronousTestCase):
     """
@@ -97,3 +116,296 @@ class WriteDescriptorTests(SynchronousTestCase):
         descriptor = MemoryFile()
         descriptor.write(b"hello, world")
         self.assertIsNone(descriptor.doWrite())
+
+
+
+class MemorySequenceFile(MemoryFile):
+    """
+    A L{MemoryFile} which writes with L{FileDescriptor._doWriteSequence}.
+
+    @ivar _calls: A C{list} of the lists of chunks given to
+        C{_writeSomeDataSequence}.
+    """
+    def __init__(self):
+        MemoryFile.__init__(self)
+        self._calls = []
+
+
+    def doWrite(self):
+        return self._doWriteSequence(self._writeSomeDataSequence)
+
+
+    def _writeSomeDataSequence(self, chunks):
+        """
+        Record C{chunks} and write as much of their concatenation as
+        C{self._freeSpace} allows.
+        """
+        self._calls.append([bytes(chunk) for chunk in chunks])
+        return self.writeSomeData(b"".join(bytes(chunk) for chunk in chunks))
+
+
+
+class WriteSequenceDescriptorTests(SynchronousTestCase):
+    """
+    Tests for L{FileDescriptor._doWriteSequence}.
+    """
+    def test_chunksNotJoined(self):
+        """
+        The chunks given to C{writeSequence} are handed over separately.
+        """
+        descriptor = MemorySequenceFile()
+        descriptor._freeSpace = 100
+        descriptor.writeSequence([b"abc", b"de", b"f"])
+        self.assertIsNone(descriptor.doWrite())
+        self.assertEqual(descriptor._calls, [[b"abc", b"de", b"f"]])
+        self.assertEqual(b"".join(descriptor._written), b"abcdef")
+        self.assertEqual(descriptor._tempDataBuffer, [])
+        self.assertEqual(descriptor._tempDataLen, 0)
+
+
+    def test_partialWrite(self):
+        """
+        After a partial write, the rest of the data is written by the next
+        call, starting in the middle of the chunk where the first one
+        stopped.
+        """
+        descriptor = MemorySequenceFile()
+        descriptor._freeSpace = 4
+        descriptor.writeSequence([b"abc", b"de", b"f"])
+        self.assertIsNone(descriptor.doWrite())
+        self.assertEqual(descriptor._tempDataLen, 1)
+        descriptor._freeSpace = 100
+        descriptor.write(b"gh")
+        self.assertIsNone(descriptor.doWrite())
+        self.assertEqual(
+            descriptor._calls, [[b"abc", b"de", b"f"], [b"e", b"f", b"gh"]])
+        self.assertEqual(b"".join(descriptor._written), b"abcdefgh")
+        self.assertEqual(descriptor._tempDataLen, 0)
+
+
+    def test_sendLimit(self):
+        """
+        No more chunks are handed over once C{SEND_LIMIT} bytes have been
+        gathered.
+        """
+        descriptor = MemorySequenceFile()
+        descriptor.SEND_LIMIT = 4
+        descriptor._freeSpace = 100
+        descriptor.writeSequence([b"abc", b"de", b"f"])
+        descriptor.doWrite()
+        self.assertEqual(descriptor._calls, [[b"abc", b"de"]])
+        descriptor.doWrite()
+        self.assertEqual(descriptor._calls, [[b"abc", b"de"], [b"f"]])
+
+
+    def test_kernelBufferFull(self):
+        """
+        When nothing can be written, L{FileDescriptor._doWriteSequence}
+        returns L{None} and keeps the buffered data.
+        """
+        descriptor = MemorySequenceFile()
+        descriptor.write(b"hello, world")
+        self.assertIsNone(descriptor.doWrite())
+        self.assertEqual(descriptor._tempDataLen, 12)
+
+
+
+class SendFileTests(SynchronousTestCase):
+    """
+    Tests for L{FileDescriptor.sendFile} on a descriptor which cannot write
+    directly from files.
+    """
+    def setUp(self):
+        self.descriptor = MemoryFile()
+        self.descriptor.bufferSize = 4
+        self.descriptor._freeSpace = 100
+        self.fileObject = BytesIO(b"0123456789")
+
+
+    def flush(self):
+        """
+        Call C{doWrite} until the descriptor has nothing left to write.
+        """
+        for i in range(100):
+            self.descriptor.doWrite()
+
+
+    def test_afterBufferedData(self):
+        """
+        The requested part of the file is written after the data already
+        buffered, and the L{Deferred} fires once it has been.
+        """
+        self.descriptor.write(b"head:")
+        d = self.descriptor.sendFile(self.fileObject, 2, 7)
+        self.assertNoResult(d)
+        self.flush()
+        self.assertIsNone(self.successResultOf(d))
+        self.assertEqual(b"".join(self.descriptor._written), b"head:2345678")
+
+
+    def test_empty(self):
+        """
+        Sending no bytes succeeds immediately.
+        """
+        d = self.descriptor.sendFile(self.fileObject, 2, 0)
+        self.assertIsNone(self.successResultOf(d))
+
+
+    def test_fileEnded(self):
+        """
+        If the file is shorter than requested, the L{Deferred} fails with
+        L{EOFError} after the available bytes have been written.
+        """
+        d = self.descriptor.sendFile(self.fileObject, 8, 5)
+        self.flush()
+        self.failureResultOf(d, EOFError)
+        self.assertEqual(b"".join(self.descriptor._written), b"89")
+
+
+    def test_connectionLost(self):
+        """
+        If the connection is lost while a file is being sent, the
+        L{Deferred} fails with the reason.
+        """
+        d = self.descriptor.sendFile(self.fileObject, 0, 5)
+        self.descriptor.connectionLost(Failure(ConnectionLost()))
+        self.failureResultOf(d, ConnectionLost)
+
+
+    def test_notConnected(self):
+        """
+        Sending a file once the connection is lost fails immediately.
+        """
+        self.descriptor.connected = False
+        self.failureResultOf(
+            self.descriptor.sendFile(self.fileObject, 0, 5))
+
+
+    def test_onlyOne(self):
+        """
+        Only one file can be sent at a time.
+        """
+        self.descriptor.sendFile(self.fileObject, 0, 5)
+        self.assertRaises(
+            RuntimeError, self.descriptor.sendFile, self.fileObject, 0, 5)
+
+
+
+@implementer(IReactorCallSoon)
+class CorkingReactor(Clock):
+    """
+    A L{Clock} whose C{callSoon} calls are made by C{advance(0)}, standing
+    for the end of the reactor iteration.
+
+    @ivar soonCalls: The number of calls to C{callSoon}.
+    """
+    soonCalls = 0
+
+    def callSoon(self, f, *args, **kwargs):
+        self.soonCalls += 1
+        return self.callLater(0, f, *args, **kwargs)
+
+
+
+class CorkingFile(MemoryFile):
+    """
+    A L{MemoryFile} which records whether it is waiting to write.
+
+    @ivar writing: Whether C{startWriting} was called.
+    """
+    writing = False
+
+    def __init__(self):
+        MemoryFile.__init__(self)
+        self.reactor = CorkingReactor()
+
+
+    def startWriting(self):
+        self.writing = True
+
+
+
+class CorkTests(SynchronousTestCase):
+    """
+    Tests for L{FileDescriptor.cork} and L{FileDescriptor.uncork}.
+    """
+
+    def setUp(self):
+        self.descriptor = CorkingFile()
+
+
+    def test_uncork(self):
+        """
+        The data written while corked is only written once every call to
+        L{FileDescriptor.cork} has been undone.
+        """
+        self.descriptor.cork()
+        self.descriptor.cork()
+        self.descriptor.write(b"a")
+        self.descriptor.writeSequence([b"b", b"c"])
+        self.descriptor.uncork()
+        self.assertFalse(self.descriptor.writing)
+        self.descriptor.uncork()
+        self.assertTrue(self.descriptor.writing)
+        self.assertEqual(self.descriptor.reactor.getDelayedCalls(), [])
+        self.descriptor._freeSpace = 10
+        self.descriptor.doWrite()
+        self.assertEqual(self.descriptor._written, [b"abc"])
+
+
+    def test_endOfIteration(self):
+        """
+        The data written while corked is written at the end of the reactor
+        iteration even if L{FileDescriptor.uncork} is not called, and extra
+        calls to it do nothing.
+        """
+        self.descriptor.cork()
+        self.descriptor.write(b"a")
+        self.assertEqual(self.descriptor.reactor.soonCalls, 1)
+        self.descriptor.reactor.advance(0)
+        self.assertTrue(self.descriptor.writing)
+        self.descriptor.uncork()
+        self.descriptor.writing = False
+        self.descriptor.write(b"b")
+        self.assertTrue(self.descriptor.writing)
+
+
+    def test_endOfIterationWithoutCallSoon(self):
+        """
+        If the reactor does not provide L{IReactorCallSoon}, the data written
+        while corked is written after a C{callLater} of no delay.
+        """
+        self.descriptor.reactor = Clock()
+        self.descriptor.cork()
+        self.descriptor.write(b"a")
+        self.assertFalse(self.descriptor.writing)
+        self.descriptor.reactor.advance(0)
+        self.assertTrue(self.descriptor.writing)
+
+
+    def test_noReactor(self):
+        """
+        L{_callAtIterationEnd} does not call anything for a reactor which
+        provides neither L{IReactorCallSoon} nor
+        L{twisted.internet.interfaces.IReactorTime}.
+        """
+        self.assertIsNone(_callAtIterationEnd(object(), lambda: None))
+
+
+    def test_nothingWritten(self):
+        """
+        Uncorking does not start writing if nothing was written.
+        """
+        self.descriptor.cork()
+        self.descriptor.uncork()
+        self.assertFalse(self.descriptor.writing)
+
+
+    def test_connectionLost(self):
+        """
+        Losing the connection cancels the end of iteration call.
+        """
+        self.descriptor.cork()
+        self.descriptor.connectionLost(Failure(ConnectionLost()))
+        self.assertEqual(self.descriptor.reactor.getDelayedCalls(), [])
+        self.descriptor.uncork()
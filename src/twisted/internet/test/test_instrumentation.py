@@ -0,0 +1,362 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.internet._instrumentation} and its use by
+L{twisted.internet.base.ReactorBase}.
+"""
+
+from __future__ import division, absolute_import
+
+from twisted.internet._instrumentation import ReactorInstrumentation, describe
+from twisted.internet.abstract import FileDescriptor
+from twisted.internet.base import ReactorBase
+from twisted.internet.interfaces import IReactorFDSet
+from twisted.internet.test.reactormixins import ReactorBuilder
+from twisted.internet.test.test_fdset import socketpair
+from twisted.logger import globalLogPublisher
+from twisted.python._histogram import Histogram
+from twisted.trial.unittest import SynchronousTestCase
+
+
+
+class FakeClock(object):
+    """
+    A clock which only moves when told to.
+
+    @ivar now: The current time.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+
+    def __call__(self):
+        return self.now
+
+
+
+class InstrumentedReactor(ReactorBase):
+    """
+    A L{ReactorBase} without I/O, whose time is controlled by a
+    L{FakeClock}.
+    """
+
+    def __init__(self, clock):
+        self.seconds = clock
+        ReactorBase.__init__(self)
+
+
+    def installWaker(self):
+        """
+        Required method, unused.
+        """
+
+
+
+class DescribeTests(SynchronousTestCase):
+    """
+    Tests for L{describe}.
+    """
+
+    def test_logPrefix(self):
+        """
+        An object with a C{logPrefix} is described with it.
+        """
+        descriptor = FileDescriptor()
+        descriptor.logPrefix = lambda: "SomeProtocol,client"
+        self.assertTrue(
+            describe(descriptor).startswith("SomeProtocol,client (<"))
+
+
+    def test_callable(self):
+        """
+        A callable is described by its representation.
+        """
+        self.assertEqual(describe(len), repr(len))
+
+
+    def test_delayedCall(self):
+        """
+        A L{DelayedCall<twisted.internet.base.DelayedCall>} is described by
+        its string.
+        """
+        def f(x):
+            pass
+        reactor = InstrumentedReactor(FakeClock())
+        call = reactor.callLater(1, f, "x")
+        self.assertEqual(describe(call), str(call))
+
+
+
+class ReactorInstrumentationTests(SynchronousTestCase):
+    """
+    Tests for L{ReactorInstrumentation}.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.instrumentation = ReactorInstrumentation(
+            slowCallbackThreshold=1, bounds=(1, 2), clock=self.clock)
+        self.events = []
+        globalLogPublisher.addObserver(self.events.append)
+        self.addCleanup(globalLogPublisher.removeObserver, self.events.append)
+
+
+    def advance(self, seconds):
+        """
+        Move the clock forward.
+        """
+        self.clock.now += seconds
+
+
+    def test_run(self):
+        """
+        L{ReactorInstrumentation.run} calls the function with the given
+        arguments, returns its result and records its duration.
+        """
+        def f(a, b):
+            self.advance(0.5)
+            return a + b
+        self.assertEqual(self.instrumentation.run(f, f, 1, b=2), 3)
+        self.assertEqual(self.instrumentation.callbackTimes.counts, [1, 0, 0])
+        self.assertEqual(self.instrumentation.slowCallbacks, 0)
+        self.assertEqual(self.events, [])
+
+
+    def test_runRaises(self):
+        """
+        The duration of a function raising an exception is recorded, and the
+        exception is propagated.
+        """
+        def f():
+            self.advance(1.5)
+            1 // 0
+        self.assertRaises(
+            ZeroDivisionError, self.instrumentation.run, f, f)
+        self.assertEqual(self.instrumentation.callbackTimes.counts, [0, 1, 0])
+
+
+    def test_slowCallback(self):
+        """
+        A callback slower than the threshold is counted and logged with a
+        description of its subject.
+        """
+        self.instrumentation.run("subject", self.advance, 1.5)
+        self.assertEqual(self.instrumentation.slowCallbacks, 1)
+        self.assertEqual(len(self.events), 1)
+        self.assertEqual(self.events[0]["description"], "subject")
+        self.assertEqual(self.events[0]["duration"], 1.5)
+
+
+    def test_noThreshold(self):
+        """
+        If C{slowCallbackThreshold} is L{None}, slow callbacks are not
+        logged.
+        """
+        self.instrumentation.slowCallbackThreshold = None
+        self.instrumentation.run("subject", self.advance, 10)
+        self.assertEqual(self.instrumentation.slowCallbacks, 0)
+        self.assertEqual(self.events, [])
+
+
+    def test_iterations(self):
+        """
+        L{ReactorInstrumentation.iterationFinished} records the time spent
+        in callbacks since the previous iteration.
+        """
+        self.instrumentation.run(len, self.advance, 0.5)
+        self.instrumentation.run(len, self.advance, 1)
+        self.advance(10)
+        self.instrumentation.iterationFinished()
+        self.instrumentation.iterationFinished()
+        self.assertEqual(self.instrumentation.iterations, 2)
+        self.assertEqual(self.instrumentation.iterationTimes.counts, [1, 1, 0])
+        self.assertEqual(self.instrumentation.iterationTimes.total, 1.5)
+
+
+    def test_lag(self):
+        """
+        L{ReactorInstrumentation.delayedCallRun} records the lag, counting
+        calls run early as on time.
+        """
+        self.instrumentation.delayedCallRun(3)
+        self.instrumentation.delayedCallRun(-1)
+        self.assertEqual(self.instrumentation.lags.counts, [1, 0, 1])
+
+
+    def test_snapshotAndReset(self):
+        """
+        L{ReactorInstrumentation.snapshot} returns all the measurements,
+        which L{ReactorInstrumentation.reset} forgets.
+        """
+        self.instrumentation.run(len, self.advance, 2)
+        self.instrumentation.iterationFinished()
+        snapshot = self.instrumentation.snapshot()
+        self.assertEqual(snapshot["iterations"], 1)
+        self.assertEqual(snapshot["slowCallbacks"], 1)
+        self.assertEqual(snapshot["callbackTimes"]["count"], 1)
+        self.assertEqual(snapshot["iterationTimes"]["total"], 2)
+        self.assertEqual(snapshot["lags"]["count"], 0)
+        self.instrumentation.reset()
+        self.assertEqual(self.instrumentation.snapshot(), {
+            "iterations": 0,
+            "slowCallbacks": 0,
+            "iterationTimes": Histogram((1, 2)).snapshot(),
+            "lags": Histogram((1, 2)).snapshot(),
+            "callbackTimes": Histogram((1, 2)).snapshot(),
+        })
+
+
+
+class ReactorBaseInstrumentationTests(SynchronousTestCase):
+    """
+    Tests for L{ReactorBase.installInstrumentation}.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.reactor = InstrumentedReactor(self.clock)
+        self.instrumentation = ReactorInstrumentation(
+            slowCallbackThreshold=None, bounds=(1, 2), clock=self.clock)
+
+
+    def test_install(self):
+        """
+        L{ReactorBase.installInstrumentation} sets the instrumentation and
+        returns the previous one.
+        """
+        self.assertIsNone(self.reactor.instrumentation)
+        self.assertIsNone(
+            self.reactor.installInstrumentation(self.instrumentation))
+        self.assertIs(self.reactor.instrumentation, self.instrumentation)
+        self.assertIs(
+            self.reactor.installInstrumentation(None), self.instrumentation)
+        self.assertIsNone(self.reactor.instrumentation)
+
+
+    def test_delayedCalls(self):
+        """
+        The duration and the lag of delayed calls are recorded.
+        """
+        self.reactor.installInstrumentation(self.instrumentation)
+        self.reactor.callLater(1, self.clock.__setattr__, "now", 5)
+        self.clock.now = 3
+        self.reactor.runUntilCurrent()
+        self.assertEqual(self.instrumentation.lags.counts, [0, 1, 0])
+        self.assertEqual(self.instrumentation.lags.total, 2)
+        self.assertEqual(self.instrumentation.callbackTimes.counts, [0, 1, 0])
+
+
+    def test_soonAndThreadCalls(self):
+        """
+        The duration of calls made with C{callSoon} and C{callFromThread} is
+        recorded.
+        """
+        self.reactor.installInstrumentation(self.instrumentation)
+        calls = []
+        self.reactor.callSoon(calls.append, 1)
+        self.reactor.callFromThread(calls.append, 2)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(sorted(calls), [1, 2])
+        self.assertEqual(self.instrumentation.callbackTimes.count, 2)
+        self.assertEqual(self.instrumentation.lags.count, 0)
+
+
+    def test_keywordArguments(self):
+        """
+        Instrumented calls are given all their keyword arguments, including
+        those named like the parameters of L{ReactorInstrumentation.run}.
+        """
+        self.reactor.installInstrumentation(self.instrumentation)
+        calls = []
+
+        def record(**kwargs):
+            calls.append(kwargs)
+
+        self.reactor.callLater(0, record, f=1, subject=2)
+        self.reactor.callSoon(record, f=3, subject=4)
+        self.reactor.callFromThread(record, subject=5)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(
+            sorted(calls, key=lambda kwargs: kwargs["subject"]),
+            [{"f": 1, "subject": 2}, {"f": 3, "subject": 4},
+             {"subject": 5}])
+        self.assertEqual(self.instrumentation.callbackTimes.count, 3)
+
+
+    def test_errors(self):
+        """
+        Exceptions raised by instrumented calls are still logged.
+        """
+        self.reactor.installInstrumentation(self.instrumentation)
+        self.reactor.callLater(0, lambda: 1 // 0)
+        self.reactor.callSoon(lambda: 1 // 0)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(len(self.flushLoggedErrors(ZeroDivisionError)), 2)
+        self.assertEqual(self.instrumentation.callbackTimes.count, 2)
+
+
+    def test_iterate(self):
+        """
+        L{ReactorBase.iterate} records the end of an iteration.
+        """
+        self.reactor.doIteration = lambda delay: None
+        self.reactor.iterate()
+        self.reactor.installInstrumentation(self.instrumentation)
+        self.reactor.iterate()
+        self.assertEqual(self.instrumentation.iterations, 1)
+
+
+    def test_uninstrumented(self):
+        """
+        Without instrumentation, the function dispatching I/O events is used
+        as is.
+        """
+        dispatch = lambda selectable: None
+        self.assertIs(self.reactor._instrumented(dispatch), dispatch)
+
+
+
+class InstrumentedIOTestsBuilder(ReactorBuilder):
+    """
+    Tests for the instrumentation of the I/O callbacks of reactors.
+    """
+
+    requiredInterfaces = [IReactorFDSet]
+
+    _reactors = ["twisted.internet.selectreactor.SelectReactor",
+                 "twisted.internet.pollreactor.PollReactor",
+                 "twisted.internet.epollreactor.EPollReactor",
+                 "twisted.internet.kqreactor.KQueueReactor"]
+
+    def test_doRead(self):
+        """
+        The C{doRead} calls of an instrumented reactor are timed.
+        """
+        reactor = self.buildReactor()
+        instrumentation = ReactorInstrumentation(slowCallbackThreshold=None)
+        reactor.installInstrumentation(instrumentation)
+
+        client, server = socketpair()
+        self.addCleanup(client.close)
+        self.addCleanup(server.close)
+        descriptor = FileDescriptor(reactor)
+        descriptor.fileno = client.fileno
+        reads = []
+        def doRead():
+            reads.append(client.recv(1))
+            reactor.removeReader(descriptor)
+            reactor.stop()
+        descriptor.doRead = doRead
+        reactor.addReader(descriptor)
+        server.sendall(b"x")
+
+        self.runReactor(reactor)
+        self.assertEqual(reads, [b"x"])
+        self.assertGreaterEqual(instrumentation.callbackTimes.count, 1)
+        self.assertGreaterEqual(instrumentation.iterations, 1)
+
+
+
+globals().update(InstrumentedIOTestsBuilder.makeTestCaseClasses())
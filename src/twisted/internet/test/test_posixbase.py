@@ -7,9 +7,15 @@ Tests for L{twisted.internet.posixbase} and supporting code.
 
 from __future__ import division, absolute_import
 
+import errno
+import os
+import select
+
 from twisted.trial.unittest import TestCase
 from twisted.internet.defer import Deferred
-from twisted.internet.posixbase import PosixReactorBase, _Waker
+from twisted.internet import posixbase
+from twisted.internet.posixbase import (
+    PosixReactorBase, _Waker, _EventFDWaker)
 from twisted.internet.protocol import ServerFactory
 
 skipSockets = None
@@ -102,6 +108,182 @@ class PosixReactorBaseTests(TestCase):
 
 
 
+class FakeEventFDOS(object):
+    """
+    A fake of the C{eventfd} functions of the L{os} module, for
+    L{_EventFDWaker} to use where they are not available.
+
+    @ivar counter: The counter of the C{eventfd}.
+    @type counter: L{int}
+
+    @ivar flags: The flags the C{eventfd} was created with, or L{None} if it
+        was not.
+
+    @ivar closed: The file descriptors closed.
+    @type closed: L{list} of L{int}
+
+    @ivar writeErrno: If not L{None}, the C{errno} of the L{OSError} raised
+        by C{eventfd_write}.
+    """
+    EFD_CLOEXEC = 0o2000000
+    EFD_NONBLOCK = 0o4000
+
+    def __init__(self):
+        self.counter = 0
+        self.flags = None
+        self.closed = []
+        self.writeErrno = None
+
+
+    def eventfd(self, initval, flags=0):
+        self.counter = initval
+        self.flags = flags
+        return 42
+
+
+    def eventfd_write(self, fd, value):
+        if self.writeErrno is not None:
+            raise OSError(self.writeErrno, os.strerror(self.writeErrno))
+        self.counter += value
+
+
+    def eventfd_read(self, fd):
+        if not self.counter:
+            raise OSError(errno.EAGAIN, os.strerror(errno.EAGAIN))
+        value, self.counter = self.counter, 0
+        return value
+
+
+    def close(self, fd):
+        self.closed.append(fd)
+
+
+
+class FakeEventFDWakerTests(TestCase):
+    """
+    Tests for L{_EventFDWaker} with a fake L{os} module, so that they run on
+    any platform.
+    """
+
+    def setUp(self):
+        self.os = FakeEventFDOS()
+        self.patch(posixbase, "os", self.os)
+        self.waker = _EventFDWaker(None)
+
+
+    def test_nonBlocking(self):
+        """
+        L{_EventFDWaker} creates a non-blocking C{eventfd} closed on C{exec}
+        and uses it for both reading and writing.
+        """
+        self.assertEqual(
+            self.os.flags,
+            FakeEventFDOS.EFD_CLOEXEC | FakeEventFDOS.EFD_NONBLOCK)
+        self.assertEqual(self.waker.fileno(), 42)
+        self.assertEqual((self.waker.i, self.waker.o), (42, 42))
+
+
+    def test_wakeUp(self):
+        """
+        L{_EventFDWaker.wakeUp} increments the counter of the C{eventfd}, and
+        L{_EventFDWaker.doRead} resets it.
+        """
+        self.waker.wakeUp()
+        self.waker.wakeUp()
+        self.assertEqual(self.os.counter, 2)
+        self.waker.doRead()
+        self.assertEqual(self.os.counter, 0)
+
+
+    def test_doReadNotWoken(self):
+        """
+        L{_EventFDWaker.doRead} ignores the C{EAGAIN} error raised when the
+        counter is zero.
+        """
+        self.waker.doRead()
+        self.assertEqual(self.os.counter, 0)
+
+
+    def test_wakeUpOverflow(self):
+        """
+        L{_EventFDWaker.wakeUp} ignores the C{EAGAIN} error raised when the
+        counter cannot be incremented any more, the reactor being woken up
+        anyway.
+        """
+        self.os.writeErrno = errno.EAGAIN
+        self.waker.wakeUp()
+
+
+    def test_wakeUpError(self):
+        """
+        L{_EventFDWaker.wakeUp} raises the other errors.
+        """
+        self.os.writeErrno = errno.EBADF
+        error = self.assertRaises(OSError, self.waker.wakeUp)
+        self.assertEqual(error.errno, errno.EBADF)
+
+
+    def test_connectionLost(self):
+        """
+        L{_EventFDWaker.connectionLost} closes the C{eventfd} once, after which
+        L{_EventFDWaker.wakeUp} does nothing.
+        """
+        self.waker.connectionLost(None)
+        self.waker.connectionLost(None)
+        self.assertEqual(self.os.closed, [42])
+        self.assertIsNone(self.waker.fileno())
+        self.waker.wakeUp()
+        self.assertEqual(self.os.counter, 0)
+
+
+
+class EventFDWakerTests(TestCase):
+    """
+    Tests for L{_EventFDWaker} with a real C{eventfd}.
+    """
+
+    if getattr(os, "eventfd", None) is None:
+        skip = "eventfd is not available"
+
+    def setUp(self):
+        self.waker = _EventFDWaker(None)
+        self.addCleanup(self.waker.connectionLost, None)
+
+
+    def test_wakeUp(self):
+        """
+        L{_EventFDWaker.wakeUp} makes the file descriptor readable, and
+        L{_EventFDWaker.doRead} makes it unreadable, however many times it was
+        woken up.
+        """
+        self.assertFalse(select.select([self.waker], [], [], 0)[0])
+        self.waker.wakeUp()
+        self.waker.wakeUp()
+        self.assertTrue(select.select([self.waker], [], [], 0)[0])
+        self.waker.doRead()
+        self.assertFalse(select.select([self.waker], [], [], 0)[0])
+
+
+    def test_doReadNotWoken(self):
+        """
+        L{_EventFDWaker.doRead} does nothing if the waker was not woken up.
+        """
+        self.waker.doRead()
+
+
+    def test_connectionLost(self):
+        """
+        L{_EventFDWaker.connectionLost} closes the file descriptor, after
+        which L{_EventFDWaker.wakeUp} does nothing.
+        """
+        fd = self.waker.fileno()
+        self.waker.connectionLost(None)
+        self.assertRaises(OSError, os.fstat, fd)
+        self.assertIsNone(self.waker.fileno())
+        self.waker.wakeUp()
+
+
+
 class TCPPortTests(TestCase):
     """
     Tests for L{twisted.internet.tcp.Port}.
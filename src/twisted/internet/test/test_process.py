@@ -468,6 +468,9 @@ sys.stdout.flush()""".format(twistedRoot.path))
 
         self.patch(os, "execvpe", execvpe)
         self.patch(sys, "getfilesystemencoding", lambda: "ascii")
+        if getattr(os, "posix_spawn", None) is not None:
+            # The error is reported by a forked child.
+            self.patch(os, "posix_spawn", None)
 
         reactor = self.buildReactor()
         output = io.BytesIO()
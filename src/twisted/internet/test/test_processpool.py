@@ -0,0 +1,274 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.internet.processpool}.
+"""
+
+from __future__ import division, absolute_import
+
+import operator
+import os
+import time
+
+from twisted.internet import defer, reactor
+from twisted.internet.interfaces import IReactorProcess
+from twisted.internet.processpool import (
+    ProcessPool, RemoteCallError, WorkerCrashed, _BigBytes)
+from twisted.protocols.amp import MAX_VALUE_LENGTH
+from twisted.trial.unittest import SynchronousTestCase, TestCase
+
+
+
+class UnpicklableError(Exception):
+    """
+    An exception which can be pickled but not unpickled, because its
+    constructor takes more arguments than it gives to L{Exception}.
+    """
+
+    def __init__(self, first, second):
+        Exception.__init__(self, first)
+
+
+
+def raiseUnpicklable():
+    """
+    Raise an L{UnpicklableError}.
+    """
+    raise UnpicklableError("first", "second")
+
+
+
+class BigBytesTests(SynchronousTestCase):
+    """
+    Tests for L{_BigBytes}.
+    """
+
+    def roundTrip(self, data):
+        """
+        Encode and decode a value with L{_BigBytes}.
+
+        @param data: The value.
+        @type data: L{bytes}
+
+        @return: The encoded strings and the decoded value.
+        @rtype: L{tuple}
+        """
+        strings = {}
+        _BigBytes().toBox(b"data", strings, {"data": data}, None)
+        encoded = dict(strings)
+        objects = {}
+        _BigBytes().fromBox(b"data", strings, objects, None)
+        self.assertEqual(strings, {})
+        return encoded, objects["data"]
+
+
+    def test_split(self):
+        """
+        A value longer than L{MAX_VALUE_LENGTH} is split across several keys.
+        """
+        data = b"x" * (MAX_VALUE_LENGTH * 2 + 1)
+        encoded, decoded = self.roundTrip(data)
+        self.assertEqual(decoded, data)
+        self.assertEqual(encoded[b"data"], b"3")
+        self.assertEqual(
+            [len(encoded[b"data." + key]) for key in (b"0", b"1", b"2")],
+            [MAX_VALUE_LENGTH, MAX_VALUE_LENGTH, 1])
+
+
+    def test_empty(self):
+        """
+        An empty value uses no other key.
+        """
+        self.assertEqual(self.roundTrip(b""), ({b"data": b"0"}, b""))
+
+
+
+class ProcessPoolTests(TestCase):
+    """
+    Tests for L{ProcessPool}, running actual processes.
+    """
+
+    if not IReactorProcess.providedBy(reactor):
+        skip = "The reactor does not support processes."
+
+    def createPool(self, *args, **kwargs):
+        """
+        Create a started L{ProcessPool}, stopped at the end of the test.
+
+        @return: The pool.
+        @rtype: L{ProcessPool}
+        """
+        pool = ProcessPool(*args, **kwargs)
+        pool.start()
+        self.addCleanup(pool.stop)
+        return pool
+
+
+    def test_invalidSize(self):
+        """
+        L{ProcessPool} raises L{ValueError} if its size is lower than 1.
+        """
+        self.assertRaises(ValueError, ProcessPool, 0)
+
+
+    @defer.inlineCallbacks
+    def test_result(self):
+        """
+        L{ProcessPool.deferToProcess} returns a L{defer.Deferred} which fires
+        with the result of the function, run in another process.
+        """
+        pool = self.createPool(2)
+        results = yield defer.gatherResults(
+            [pool.deferToProcess(operator.add, i, 1) for i in range(3)])
+        self.assertEqual(results, [1, 2, 3])
+        pid = yield pool.deferToProcess(os.getpid)
+        self.assertNotEqual(pid, os.getpid())
+        self.assertEqual(len(pool._workers), 2)
+
+
+    @defer.inlineCallbacks
+    def test_bigValues(self):
+        """
+        The arguments and results of the functions may be bigger than an AMP
+        value.
+        """
+        pool = self.createPool(1)
+        result = yield pool.deferToProcess(
+            operator.add, b"x" * 100000, b"y" * 100000)
+        self.assertEqual(result, b"x" * 100000 + b"y" * 100000)
+
+
+    def test_exception(self):
+        """
+        The L{defer.Deferred} returned by L{ProcessPool.deferToProcess} fails
+        with the exception raised by the function.
+        """
+        pool = self.createPool(1)
+        return self.assertFailure(
+            pool.deferToProcess(operator.truediv, 1, 0), ZeroDivisionError)
+
+
+    @defer.inlineCallbacks
+    def test_unpicklableException(self):
+        """
+        If the exception raised by the function cannot be sent back, the
+        L{defer.Deferred} returned by L{ProcessPool.deferToProcess} fails with
+        L{RemoteCallError} describing it.
+        """
+        pool = self.createPool(1)
+        error = yield self.assertFailure(
+            pool.deferToProcess(raiseUnpicklable), RemoteCallError)
+        self.assertEqual(error.errorType, __name__ + ".UnpicklableError")
+        self.assertEqual(error.message, "first")
+        self.assertIn("raiseUnpicklable", error.traceback)
+
+
+    def test_unpicklableFunction(self):
+        """
+        If the function cannot be pickled, the L{defer.Deferred} returned by
+        L{ProcessPool.deferToProcess} fails right away.
+        """
+        pool = ProcessPool(1)
+        self.failureResultOf(pool.deferToProcess(lambda: None))
+        self.assertEqual(len(pool._pending), 0)
+
+
+    @defer.inlineCallbacks
+    def test_maxTasksPerWorker(self):
+        """
+        A worker exits after running C{maxTasksPerWorker} calls, and another
+        one runs the next calls.
+        """
+        pool = self.createPool(1, maxTasksPerWorker=2)
+        pids = []
+        for i in range(3):
+            pid = yield pool.deferToProcess(os.getpid)
+            pids.append(pid)
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+
+
+    @defer.inlineCallbacks
+    def test_crash(self):
+        """
+        If the worker running a call exits, the L{defer.Deferred} returned by
+        L{ProcessPool.deferToProcess} fails with L{WorkerCrashed}, and
+        another worker runs the next calls.
+        """
+        pool = self.createPool(1)
+        yield self.assertFailure(
+            pool.deferToProcess(os._exit, 3), WorkerCrashed)
+        self.assertEqual(len(pool._workers), 0)
+        result = yield pool.deferToProcess(operator.neg, 1)
+        self.assertEqual(result, -1)
+
+
+    def test_maxPending(self):
+        """
+        Once C{maxPending} calls wait for a worker, L{ProcessPool.full} is
+        true, L{ProcessPool.deferToProcess} fails with
+        L{defer.QueueOverflow}, and L{ProcessPool.whenNotFull} waits until a
+        call is given to a worker.
+        """
+        pool = ProcessPool(1, maxPending=1)
+        self.addCleanup(pool.stop)
+        self.successResultOf(pool.whenNotFull())
+        first = pool.deferToProcess(operator.neg, 1)
+        self.assertTrue(pool.full)
+        self.failureResultOf(
+            pool.deferToProcess(operator.neg, 2), defer.QueueOverflow)
+        notFull = pool.whenNotFull()
+        self.assertNoResult(notFull)
+        pool.start()
+        self.assertFalse(pool.full)
+        self.assertIsNone(self.successResultOf(notFull))
+        return first.addCallback(self.assertEqual, -1)
+
+
+    def test_cancelPending(self):
+        """
+        Cancelling a call waiting for a worker removes it from the queue.
+        """
+        pool = ProcessPool(1)
+        d = pool.deferToProcess(operator.neg, 1)
+        d.cancel()
+        self.failureResultOf(d, defer.CancelledError)
+        self.assertEqual(len(pool._pending), 0)
+
+
+    @defer.inlineCallbacks
+    def test_cancelRunning(self):
+        """
+        Cancelling a running call kills its worker.
+        """
+        pool = self.createPool(1)
+        d = pool.deferToProcess(time.sleep, 60)
+        worker, = pool._workers
+        d.cancel()
+        self.failureResultOf(d, defer.CancelledError)
+        yield worker.ended
+        self.assertEqual(len(pool._workers), 0)
+        result = yield pool.deferToProcess(operator.neg, 1)
+        self.assertEqual(result, -1)
+
+
+    @defer.inlineCallbacks
+    def test_stop(self):
+        """
+        L{ProcessPool.stop} fails the calls waiting for a worker with
+        L{defer.CancelledError}, lets the running calls finish, and returns a
+        L{defer.Deferred} which fires once the workers exited.
+        """
+        pool = ProcessPool(1)
+        pool.start()
+        running = pool.deferToProcess(operator.neg, 1)
+        waiting = pool.deferToProcess(operator.neg, 2)
+        worker, = pool._workers
+        stopped = pool.stop()
+        self.failureResultOf(waiting, defer.CancelledError)
+        result = yield running
+        self.assertEqual(result, -1)
+        yield stopped
+        self.assertTrue(worker.exited)
+        self.assertEqual(len(pool._workers), 0)
@@ -35,12 +35,14 @@ from twisted._threads import createMemoryWorker, Team, LockWorker
 
 from twisted.internet.address import IPv4Address, IPv6Address
 from twisted.internet._resolver import (
-    GAIResolver, SimpleResolverComplexifier, ComplexResolverSimplifier
+    GAIResolver, SimpleResolverComplexifier, ComplexResolverSimplifier,
+    CachingHostResolver
 )
 
 from twisted.internet.defer import Deferred
 from twisted.internet.error import DNSLookupError
 from twisted.internet.base import ReactorBase
+from twisted.internet.task import Clock
 
 
 class DeterministicThreadPool(ThreadPool, object):
@@ -538,6 +540,175 @@ class LegacyCompatibilityTests(UnitTest, object):
         self.assertEqual(receiver._ended, True)
 
 
+class CachingHostResolverTests(UnitTest, object):
+    """
+    Tests for L{CachingHostResolver}, wrapping a L{SimpleResolverComplexifier}.
+    """
+
+    def setUp(self):
+        """
+        Set up a L{CachingHostResolver} with a fake clock.
+        """
+        self.clock = Clock()
+        self.simple = SillyResolverSimple()
+        self.resolver = CachingHostResolver(
+            SimpleResolverComplexifier(self.simple), self.clock,
+            positiveTTL=60, negativeTTL=5, maxSize=2, refreshBefore=10)
+
+
+    def resolve(self, name=u"example.com", port=0):
+        """
+        Resolve a name with the L{CachingHostResolver}.
+
+        @return: The receiver of the resolution.
+        @rtype: L{ResultHolder}
+        """
+        receiver = ResultHolder(self)
+        resolution = self.resolver.resolveHostName(receiver, name, port)
+        self.assertIs(receiver._resolution, resolution)
+        self.assertEqual(resolution.name, name)
+        return receiver
+
+
+    def test_interface(self):
+        """
+        L{CachingHostResolver} provides L{IHostnameResolver}.
+        """
+        self.assertTrue(verifyObject(IHostnameResolver, self.resolver))
+
+
+    def test_invalidSize(self):
+        """
+        L{CachingHostResolver} raises L{ValueError} if its maximum size is
+        lower than 1.
+        """
+        self.assertRaises(ValueError, CachingHostResolver,
+                          SimpleResolverComplexifier(self.simple), self.clock,
+                          maxSize=0)
+
+
+    def test_hit(self):
+        """
+        The addresses found are remembered until the positive TTL expires.
+        """
+        first = self.resolve()
+        self.assertEqual(first._ended, False)
+        self.simple._requests[0].callback("192.168.1.1")
+        self.assertEqual(first._addresses,
+                         [IPv4Address('TCP', '192.168.1.1', 0)])
+        self.clock.advance(49)
+        second = self.resolve()
+        self.assertEqual(second._ended, True)
+        self.assertEqual(second._addresses, first._addresses)
+        self.assertEqual(len(self.simple._requests), 1)
+        self.assertEqual((self.resolver.hits, self.resolver.misses,
+                          self.resolver.lookups), (1, 1, 1))
+        self.clock.advance(11)
+        self.resolve()
+        self.assertEqual(len(self.simple._requests), 2)
+        self.assertEqual(self.resolver.misses, 2)
+
+
+    def test_keys(self):
+        """
+        Resolutions of another port number look the name up again.
+        """
+        self.resolve()
+        self.simple._requests[0].callback("192.168.1.1")
+        receiver = self.resolve(port=80)
+        self.assertEqual(len(self.simple._requests), 2)
+        self.simple._requests[1].callback("192.168.1.1")
+        self.assertEqual(receiver._addresses,
+                         [IPv4Address('TCP', '192.168.1.1', 80)])
+
+
+    def test_negative(self):
+        """
+        Failed lookups are remembered until the negative TTL expires.
+        """
+        self.resolve()
+        self.simple._requests[0].errback(DNSLookupError("nope"))
+        receiver = self.resolve()
+        self.assertEqual(receiver._ended, True)
+        self.assertEqual(receiver._addresses, [])
+        self.assertEqual(len(self.simple._requests), 1)
+        self.clock.advance(5)
+        self.resolve()
+        self.assertEqual(len(self.simple._requests), 2)
+
+
+    def test_coalescing(self):
+        """
+        Resolutions of a name being looked up wait for that lookup.
+        """
+        receivers = [self.resolve() for i in range(3)]
+        self.assertEqual(len(self.simple._requests), 1)
+        self.simple._requests[0].callback("192.168.1.1")
+        for receiver in receivers:
+            self.assertEqual(receiver._ended, True)
+            self.assertEqual(receiver._addresses,
+                             [IPv4Address('TCP', '192.168.1.1', 0)])
+        self.assertEqual(self.resolver.misses, 3)
+        self.assertEqual(self.resolver.lookups, 1)
+
+
+    def test_leastRecentlyUsed(self):
+        """
+        Once the cache is full, the least recently used entry is forgotten.
+        """
+        for name in (u"a.example.com", u"b.example.com"):
+            self.resolve(name)
+            self.simple._requests[-1].callback("192.168.1.1")
+        self.resolve(u"a.example.com")
+        self.resolve(u"c.example.com")
+        self.simple._requests[-1].callback("192.168.1.1")
+        self.assertEqual(len(self.simple._requests), 3)
+        self.resolve(u"a.example.com")
+        self.assertEqual(len(self.simple._requests), 3)
+        self.resolve(u"b.example.com")
+        self.assertEqual(len(self.simple._requests), 4)
+
+
+    def test_refresh(self):
+        """
+        An entry used shortly before it expires is looked up again in the
+        background, and the new addresses replace it.
+        """
+        self.resolve()
+        self.simple._requests[0].callback("192.168.1.1")
+        self.clock.advance(55)
+        receiver = self.resolve()
+        self.assertEqual(receiver._addresses,
+                         [IPv4Address('TCP', '192.168.1.1', 0)])
+        self.assertEqual(len(self.simple._requests), 2)
+        self.resolve()
+        self.assertEqual(len(self.simple._requests), 2)
+        self.simple._requests[1].callback("192.168.1.2")
+        self.clock.advance(30)
+        receiver = self.resolve()
+        self.assertEqual(receiver._addresses,
+                         [IPv4Address('TCP', '192.168.1.2', 0)])
+        self.assertEqual(self.resolver.hits, 3)
+
+
+    def test_failedRefresh(self):
+        """
+        A failed refresh leaves the entry as it was.
+        """
+        self.resolve()
+        self.simple._requests[0].callback("192.168.1.1")
+        self.clock.advance(55)
+        self.resolve()
+        self.simple._requests[1].errback(DNSLookupError("nope"))
+        receiver = self.resolve()
+        self.assertEqual(receiver._addresses,
+                         [IPv4Address('TCP', '192.168.1.1', 0)])
+        self.clock.advance(5)
+        self.resolve()
+        self.assertEqual(len(self.simple._requests), 3)
+
+
+
 class JustEnoughReactor(ReactorBase, object):
     """
     Just enough subclass implementation to be a valid L{ReactorBase} subclass.
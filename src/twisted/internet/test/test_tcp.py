@@ -33,7 +33,7 @@ from twisted.trial.unittest import SkipTest, SynchronousTestCase, TestCase
 from twisted.internet.error import (
     ConnectionLost, UserError, ConnectionRefusedError, ConnectionDone,
     ConnectionAborted, DNSLookupError, NoProtocol,
-    ConnectBindError, ConnectionClosed,
+    ConnectBindError, ConnectionClosed, CannotListenError,
 )
 from twisted.internet.test.connectionmixins import (
     LogObserverMixin, ConnectionTestsMixin, StreamClientTestsMixin,
@@ -50,10 +50,15 @@ from twisted.internet.defer import (
 from twisted.internet.endpoints import TCP4ServerEndpoint, TCP4ClientEndpoint
 from twisted.internet.protocol import ServerFactory, ClientFactory, Protocol
 from twisted.internet.interfaces import (
-    IPushProducer, IPullProducer, IHalfCloseableProtocol)
+    IPushProducer, IPullProducer, IHalfCloseableProtocol, IBufferReceiver,
+    ISendFileTransport)
+from twisted.internet._buffers import ReceiveBufferPool
+from twisted.internet.main import CONNECTION_DONE
+from twisted.internet import tcp
 from twisted.internet.tcp import (
     _BuffersLogs,
     Connection,
+    Port,
     _FileDescriptorReservation,
     _IFileDescriptorReservation,
     _NullFileDescriptorReservation,
@@ -159,6 +164,17 @@ class FakeSocket(object):
     def recv(self, size):
         return self.data
 
+
+    def recv_into(self, buffer, size):
+        """
+        Copy at most C{size} bytes of C{self.data} into C{buffer}.
+
+        @return: The number of bytes copied.
+        """
+        data = self.data[:size]
+        buffer[:len(data)] = data
+        return len(data)
+
     def send(self, bytes):
         """
         I{Send} all of C{bytes} by accumulating it into C{self.sendBuffer}.
@@ -405,6 +421,235 @@ class TCPConnectionTests(TestCase):
 
 
 
+class _ReceivingReactor(_FakeFDSetReactor):
+    """
+    A L{_FakeFDSetReactor} with a C{receiveBufferPool}.
+    """
+    def __init__(self):
+        _FakeFDSetReactor.__init__(self)
+        self.receiveBufferPool = ReceiveBufferPool(minimumSize=4)
+
+
+
+class _AccumulatingProtocol(Protocol):
+    """
+    A protocol which records the data it receives.
+
+    @ivar received: The arguments of C{dataReceived}.
+    @type received: L{list}
+    """
+    def __init__(self):
+        self.received = []
+
+
+    def dataReceived(self, data):
+        self.received.append(data)
+
+
+
+@implementer(IBufferReceiver)
+class _BufferReceivingProtocol(_AccumulatingProtocol):
+    """
+    An L{_AccumulatingProtocol} which accepts L{memoryview}s.
+    """
+    def dataReceived(self, data):
+        self.received.append((type(data), data.tobytes()))
+
+
+
+class TCPConnectionReceiveBufferTests(TestCase):
+    """
+    Whitebox tests for L{twisted.internet.tcp.Connection} reading into the
+    C{receiveBufferPool} of its reactor.
+    """
+    def test_bytes(self):
+        """
+        Protocols which do not provide L{IBufferReceiver} are given L{bytes},
+        read in chunks whose size adapts to the amount of data available.
+        """
+        skt = FakeSocket(b"someData")
+        protocol = _AccumulatingProtocol()
+        reactor = _ReceivingReactor()
+        conn = Connection(skt, protocol, reactor)
+        conn.doRead()
+        conn.doRead()
+        self.assertEqual(protocol.received, [b"some", b"someData"])
+        self.assertEqual(reactor.receiveBufferPool.allocated, 2)
+
+
+    def test_memoryview(self):
+        """
+        Protocols providing L{IBufferReceiver} are given a L{memoryview}.
+        """
+        protocol = _BufferReceivingProtocol()
+        conn = Connection(FakeSocket(b"abc"), protocol, _ReceivingReactor())
+        conn.doRead()
+        self.assertEqual(protocol.received, [(memoryview, b"abc")])
+
+
+    def test_bufferReused(self):
+        """
+        The buffer used by a read is given back to the pool once the protocol
+        has handled the data.
+        """
+        reactor = _ReceivingReactor()
+        conn = Connection(
+            FakeSocket(b"abc"), _AccumulatingProtocol(), reactor)
+        conn.doRead()
+        conn.doRead()
+        self.assertEqual(reactor.receiveBufferPool.allocated, 1)
+        self.assertEqual(reactor.receiveBufferPool.reused, 1)
+
+
+    def test_connectionDone(self):
+        """
+        When the peer closes the connection, L{Connection.doRead} returns
+        L{CONNECTION_DONE}.
+        """
+        conn = Connection(
+            FakeSocket(b""), _AccumulatingProtocol(), _ReceivingReactor())
+        self.assertIs(conn.doRead(), CONNECTION_DONE)
+
+
+
+class TCPConnectionWouldBlockTests(TestCase):
+    """
+    Tests for L{twisted.internet.tcp.Connection} reporting that its socket
+    would block, as L{_IEdgeTriggeredDescriptor} requires.
+    """
+
+    def setUp(self):
+        self.local, self.remote = socket.socketpair()
+        self.addCleanup(self.local.close)
+        self.addCleanup(self.remote.close)
+        self.conn = Connection(self.local, _AccumulatingProtocol())
+
+
+    def test_read(self):
+        """
+        L{Connection.doRead} sets C{_readWouldBlock} when there is no more
+        data to read.
+        """
+        self.remote.send(b"data")
+        self.conn.doRead()
+        self.assertFalse(self.conn._readWouldBlock)
+        self.conn.doRead()
+        self.assertTrue(self.conn._readWouldBlock)
+
+
+    def test_write(self):
+        """
+        L{Connection.writeSomeData} sets C{_writeWouldBlock} when the send
+        buffer of the socket is full.
+        """
+        while self.conn.writeSomeData(b"x" * 65536):
+            self.assertFalse(self.conn._writeWouldBlock)
+        self.assertTrue(self.conn._writeWouldBlock)
+
+
+
+class PortReusePortTests(SynchronousTestCase):
+    """
+    Tests for L{Port.reusePort}.
+    """
+
+    def test_default(self):
+        """
+        Ports created without a C{reusePort} argument use the class attribute
+        L{Port.reusePort}, which is L{False} by default.
+        """
+        self.assertFalse(Port(0, ServerFactory()).reusePort)
+        self.patch(Port, "reusePort", True)
+        self.assertTrue(Port(0, ServerFactory()).reusePort)
+        self.assertFalse(Port(0, ServerFactory(), reusePort=False).reusePort)
+
+
+    def test_unsupported(self):
+        """
+        Creating the socket of a port with C{reusePort} set fails with a
+        L{socket.error} if the platform does not support C{SO_REUSEPORT}.
+        """
+        self.patch(tcp, "_SO_REUSEPORT", None)
+        port = Port(0, ServerFactory(), reusePort=True)
+        exc = self.assertRaises(socket.error, port.createInternetSocket)
+        self.assertEqual(exc.args[0], errno.ENOPROTOOPT)
+
+
+
+class SocketOptionsTests(SynchronousTestCase):
+    """
+    Tests for the C{socketOptions} of L{Port} and L{tcp.Connector}, and for
+    L{tcp._tcpSocketOptions}.
+    """
+
+    def test_port(self):
+        """
+        The socket options given to L{Port} are set on its socket.
+        """
+        port = Port(0, ServerFactory(), socketOptions=[
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)])
+        skt = port.createInternetSocket()
+        self.addCleanup(skt.close)
+        self.assertTrue(
+            skt.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+
+
+    def test_client(self):
+        """
+        The socket options given to L{tcp.Connector} are set on the socket
+        of its L{tcp.Client}.
+        """
+        connector = tcp.Connector(
+            "127.0.0.1", 0, ClientFactory(), 30, None, object(),
+            [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)])
+        client = tcp.Client.__new__(tcp.Client)
+        sockets = []
+        client._finishInit = lambda whenDone, skt, err, reactor: (
+            sockets.append((skt, err)))
+        tcp.Client.__init__(
+            client, "127.0.0.1", 0, None, connector, None,
+            connector.socketOptions)
+        skt, err = sockets[0]
+        self.addCleanup(skt.close)
+        self.assertIsNone(err)
+        self.assertTrue(
+            skt.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+
+
+    def test_unsupported(self):
+        """
+        Creating the socket of a port with an option which the platform does
+        not support fails with a L{socket.error}.
+        """
+        port = Port(0, ServerFactory(), socketOptions=[
+            (socket.IPPROTO_TCP, None, 1)])
+        exc = self.assertRaises(socket.error, port.createInternetSocket)
+        self.assertEqual(exc.args[0], errno.ENOPROTOOPT)
+
+
+    def test_tcpSocketOptions(self):
+        """
+        L{tcp._tcpSocketOptions} converts the tuning options of the TCP
+        endpoints to socket options which can be set, only setting
+        C{TCP_FASTOPEN_CONNECT} for client sockets.
+        """
+        options = tcp._tcpSocketOptions(
+            True, fastOpen=5, deferAccept=3, userTimeout=0.25,
+            quickAck=True, busyPoll=0)
+        skt = socket.socket()
+        self.addCleanup(skt.close)
+        tcp._setSocketOptions(skt, options)
+        for level, option, value in options:
+            self.assertEqual(skt.getsockopt(level, option), value)
+        self.assertEqual(
+            tcp._tcpSocketOptions(False, fastOpen=True),
+            [(socket.IPPROTO_TCP, tcp._TCP_FASTOPEN_CONNECT, 1)])
+        self.assertEqual(tcp._tcpSocketOptions(True, fastOpen=False), [])
+    if not platform.isLinux():
+        test_tcpSocketOptions.skip = "Only Linux supports all the options."
+
+
+
 class TCPCreator(EndpointCreator):
     """
     Create IPv4 TCP endpoints for L{runProtocolsWithReactor}-based tests.
@@ -1831,7 +2076,91 @@ class TCPPortTestsMixin(object):
 class TCPPortTestsBuilder(ReactorBuilder, ListenTCPMixin, TCPPortTestsMixin,
                           ObjectModelIntegrationMixin,
                           StreamTransportTestsMixin):
-    pass
+
+    def test_reusePort(self):
+        """
+        Several ports created by L{IReactorTCP.listenTCP} with C{reusePort}
+        set can listen on the same port number.
+        """
+        reactor = self.buildReactor()
+        first = reactor.listenTCP(
+            0, ServerFactory(), interface="127.0.0.1", reusePort=True)
+        self.addCleanup(first.stopListening)
+        portNumber = first.getHost().port
+        second = reactor.listenTCP(
+            portNumber, ServerFactory(), interface="127.0.0.1",
+            reusePort=True)
+        self.addCleanup(second.stopListening)
+        self.assertEqual(second.getHost().port, portNumber)
+        self.assertRaises(
+            CannotListenError, reactor.listenTCP, portNumber, ServerFactory(),
+            interface="127.0.0.1")
+    if getattr(socket, "SO_REUSEPORT", None) is None:
+        test_reusePort.skip = "SO_REUSEPORT is not available on this platform."
+    test_reusePort.requiredInterfaces = (IReactorTCP,)
+
+
+    def test_reusePortByDefault(self):
+        """
+        Ports created by L{IReactorTCP.listenTCP} without a C{reusePort}
+        argument listen with C{SO_REUSEPORT} if the reactor's
+        C{reusePortByDefault} is set.
+        """
+        reactor = self.buildReactor()
+        if not hasattr(reactor, "reusePortByDefault"):
+            raise SkipTest("Reactor does not support reusePortByDefault")
+        reactor.reusePortByDefault = True
+        port = reactor.listenTCP(0, ServerFactory(), interface="127.0.0.1")
+        self.addCleanup(port.stopListening)
+        self.assertTrue(port.reusePort)
+        self.assertFalse(Port.reusePort)
+    if getattr(socket, "SO_REUSEPORT", None) is None:
+        test_reusePortByDefault.skip = (
+            "SO_REUSEPORT is not available on this platform.")
+    test_reusePortByDefault.requiredInterfaces = (IReactorTCP,)
+
+
+    def test_fastOpen(self):
+        """
+        A client connecting with TCP Fast Open to a port accepting it
+        delivers the data written once connected, and the accepted socket
+        inherits the options of the listening socket.
+        """
+        reactor = self.buildReactor()
+        received = []
+        accepted = []
+
+        class Receiver(Protocol):
+            def connectionMade(self):
+                accepted.append(self.transport.getHandle().getsockopt(
+                    socket.IPPROTO_TCP, tcp._TCP_USER_TIMEOUT))
+
+            def dataReceived(self, data):
+                received.append(data)
+                if b"".join(received) == b"hello":
+                    reactor.stop()
+
+        class Sender(Protocol):
+            def connectionMade(self):
+                self.transport.write(b"hello")
+
+        port = reactor.listenTCP(
+            0, ServerFactory.forProtocol(Receiver), interface="127.0.0.1",
+            socketOptions=tcp._tcpSocketOptions(
+                True, fastOpen=16, userTimeout=2))
+        self.addCleanup(port.stopListening)
+        connector = reactor.connectTCP(
+            "127.0.0.1", port.getHost().port,
+            ClientFactory.forProtocol(Sender),
+            socketOptions=tcp._tcpSocketOptions(False, fastOpen=True))
+        self.addCleanup(connector.disconnect)
+        self.runReactor(reactor)
+        self.assertEqual(b"".join(received), b"hello")
+        self.assertEqual(accepted, [2000])
+    if not platform.isLinux():
+        test_fastOpen.skip = "TCP Fast Open is only supported on Linux."
+    test_fastOpen.requiredInterfaces = (IReactorTCP,)
+
 
 
 
@@ -2016,6 +2345,81 @@ class TCPConnectionTestsBuilder(ReactorBuilder):
         self.runReactor(reactor)
 
 
+    def test_sendFile(self):
+        """
+        L{ISendFileTransport.sendFile} writes the requested part of a file
+        after the data written before it, and its result fires before the
+        data written after it is sent.
+        """
+        content = os.urandom(1024 * 1024 + 17)
+        path = self.mktemp()
+        with open(path, "wb") as f:
+            f.write(content)
+        fileObject = open(path, "rb")
+        self.addCleanup(fileObject.close)
+        results = []
+
+        class Sender(ConnectableProtocol):
+            def connectionMade(self):
+                if not ISendFileTransport.providedBy(self.transport):
+                    results.append("unsupported")
+                    self.transport.loseConnection()
+                    return
+                self.transport.write(b"head:")
+                d = self.transport.sendFile(fileObject, 7, len(content) - 8)
+                d.addCallback(results.append)
+                d.addCallback(lambda ignored: self.transport.write(b":tail"))
+                d.addCallback(lambda ignored: self.transport.loseConnection())
+
+        class Receiver(ConnectableProtocol):
+            def connectionMade(self):
+                self.received = []
+
+            def dataReceived(self, data):
+                self.received.append(data)
+
+        receiver = Receiver()
+        runProtocolsWithReactor(self, Sender(), receiver, TCPCreator())
+        if results == ["unsupported"]:
+            raise SkipTest("Transport does not provide ISendFileTransport")
+        self.assertEqual(results, [None])
+        self.assertEqual(b"".join(receiver.received),
+                         b"head:" + content[7:-1] + b":tail")
+
+
+    def test_portStatistics(self):
+        """
+        A L{Port} counts the connections it accepted, and the bytes its
+        connections received, sent and buffered.
+        """
+        statistics = []
+
+        class Server(ConnectableProtocol):
+            def connectionMade(self):
+                self.transport.write(b"hello")
+                port = self.transport.server
+                statistics.append((port.connections, port.bufferedBytes))
+
+            def dataReceived(self, data):
+                if data.endswith(b"!"):
+                    self.transport.loseConnection()
+
+            def connectionLost(self, reason):
+                port = self.transport.server
+                statistics.append(
+                    (port.connectionsAccepted, port.connections,
+                     port.bytesReceived, port.bytesSent, port.bufferedBytes))
+                ConnectableProtocol.connectionLost(self, reason)
+
+        class Client(ConnectableProtocol):
+            def connectionMade(self):
+                self.transport.write(b"abc")
+                self.transport.write(b"!")
+
+        runProtocolsWithReactor(self, Server(), Client(), TCPCreator())
+        self.assertEqual(statistics, [(1, 5), (1, 0, 4, 5, 0)])
+
+
     @oneTransportTest
     def test_resumeProducing(self, reactor, server):
         """
@@ -55,6 +55,40 @@ class ThreadTestsBuilder(ReactorBuilder):
             "Pool should be stopped after reactor.run returns")
 
 
+    def test_getNamedThreadPool(self):
+        """
+        C{reactor.getThreadPool(name)} returns a L{ThreadPool} with that name,
+        the same one each time, which is separate from the reactor threadpool
+        and from the pools with other names, and which starts when
+        C{reactor.run()} is called and stops before it returns.
+        """
+        state = []
+        reactor = self.buildReactor()
+
+        pool = reactor.getThreadPool("database")
+        self.assertIsInstance(pool, ThreadPool)
+        self.assertEqual(pool.name, "database")
+        self.assertIs(reactor.getThreadPool("database"), pool)
+        self.assertIsNot(reactor.getThreadPool(), pool)
+        self.assertIsNot(reactor.getThreadPool("resolver"), pool)
+        self.assertEqual(
+            reactor.getThreadPools(),
+            {None: reactor.getThreadPool(), "database": pool,
+             "resolver": reactor.getThreadPool("resolver")})
+        self.assertFalse(pool.started)
+
+        def f():
+            state.append(pool.started)
+            reactor.stop()
+
+        reactor.callWhenRunning(f)
+        self.runReactor(reactor, 2)
+
+        self.assertEqual(state, [True])
+        self.assertTrue(pool.joined)
+        self.assertEqual(reactor.getThreadPools(), {})
+
+
     def test_suggestThreadPoolSize(self):
         """
         C{reactor.suggestThreadPoolSize()} sets the maximum size of the reactor
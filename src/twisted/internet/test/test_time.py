@@ -7,12 +7,15 @@ Tests for implementations of L{IReactorTime}.
 
 __metaclass__ = type
 
+import socket
+
 from twisted.python.log import msg
 from twisted.python.runtime import platform
 
 from twisted.trial.unittest import SkipTest
 from twisted.internet.test.reactormixins import ReactorBuilder
-from twisted.internet.interfaces import IReactorTime, IReactorThreads
+from twisted.internet.interfaces import (
+    IReactorTime, IReactorThreads, IReactorCallSoon, IReactorFDSet)
 
 
 class TimeTestsBuilder(ReactorBuilder):
@@ -30,6 +33,61 @@ class TimeTestsBuilder(ReactorBuilder):
         reactor.run()
 
 
+    def test_callSoon(self):
+        """
+        Calls made with C{callSoon} are run on the next iteration of the
+        reactor, in the order they were made.
+        """
+        reactor = self.buildReactor()
+        if not IReactorCallSoon.providedBy(reactor):
+            raise SkipTest("Reactor does not support callSoon")
+        calls = []
+        reactor.callSoon(calls.append, 1)
+        reactor.callSoon(calls.append, 2)
+        reactor.callSoon(reactor.stop)
+        reactor.run()
+        self.assertEqual(calls, [1, 2])
+
+
+    def test_callSoonFromReader(self):
+        """
+        A call made with C{callSoon} while the reactor is dispatching I/O
+        events runs without waiting for any other event.
+        """
+        reactor = self.buildReactor()
+        if not IReactorCallSoon.providedBy(reactor):
+            raise SkipTest("Reactor does not support callSoon")
+        if not IReactorFDSet.providedBy(reactor):
+            raise SkipTest("Reactor does not support file descriptors")
+        if getattr(socket, "socketpair", None) is None:
+            raise SkipTest("socket.socketpair is not available")
+
+        server, client = socket.socketpair()
+        self.addCleanup(server.close)
+        self.addCleanup(client.close)
+
+        class Reader(object):
+            def fileno(self):
+                return server.fileno()
+
+            def logPrefix(self):
+                return "Reader"
+
+            def doRead(self):
+                server.recv(1)
+                reactor.removeReader(self)
+                reactor.callSoon(reactor.stop)
+
+            def connectionLost(self, reason):
+                pass
+
+        # Without this timer, a reactor would have no reason to wait.
+        reactor.callLater(60, lambda: None)
+        reactor.addReader(Reader())
+        client.send(b"x")
+        self.runReactor(reactor, timeout=10)
+
+
     def test_distantDelayedCall(self):
         """
         Scheduling a delayed call at a point in the extreme future does not
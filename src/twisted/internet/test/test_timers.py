@@ -0,0 +1,281 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.internet.timers}.
+"""
+
+from __future__ import division, absolute_import
+
+from zope.interface.verify import verifyObject
+
+from twisted.internet.timers import (
+    ITimerQueue, HeapTimerQueue, TimingWheelTimerQueue)
+from twisted.internet.base import DelayedCall, ReactorBase
+from twisted.trial.unittest import SynchronousTestCase
+
+
+
+class TimerQueueTestsMixin(object):
+    """
+    Tests for L{ITimerQueue} implementations.
+
+    Subclasses must define C{createQueue}, returning a new queue.
+    """
+
+    def setUp(self):
+        self.now = 1000.0
+        self.queue = self.createQueue()
+
+
+    def schedule(self, delay, name=None):
+        """
+        Create a L{DelayedCall} wired to C{self.queue} and add it.
+
+        @param delay: The number of seconds from C{self.now} at which the call
+            is scheduled.
+
+        @param name: The argument of the call.
+
+        @return: The call.
+        @rtype: L{DelayedCall}
+        """
+        call = DelayedCall(self.now + delay, lambda name: None, (name,), {},
+                           self.queue.cancelled, self.queue.movedSooner,
+                           seconds=lambda: self.now)
+        self.queue.add(call)
+        return call
+
+
+    def expire(self, now):
+        """
+        Advance the queue to C{now} and pop every due call.
+
+        @return: The arguments of the calls, in the order they were popped.
+        @rtype: L{list}
+        """
+        self.now = now
+        self.queue.advance(now)
+        names = []
+        while True:
+            call = self.queue.popDue(now)
+            if call is None:
+                return names
+            call.called = 1
+            names.append(call.args[0])
+
+
+    def test_interface(self):
+        """
+        The queue provides L{ITimerQueue}.
+        """
+        self.assertTrue(verifyObject(ITimerQueue, self.queue))
+
+
+    def test_empty(self):
+        """
+        An empty queue has no next time and no due calls.
+        """
+        self.assertIsNone(self.queue.nextTime())
+        self.assertEqual(self.expire(2000.0), [])
+        self.assertEqual(self.queue.getDelayedCalls(), [])
+
+
+    def test_order(self):
+        """
+        Calls are popped in the order of their time, only once that time has
+        come.
+        """
+        self.schedule(3, "c")
+        self.schedule(1, "a")
+        self.schedule(2, "b")
+        self.assertEqual(self.expire(1000.5), [])
+        self.assertEqual(self.expire(1002.0), ["a", "b"])
+        self.assertEqual(self.expire(1010.0), ["c"])
+
+
+    def test_nextTime(self):
+        """
+        L{ITimerQueue.nextTime} is never later than the earliest call.
+        """
+        self.schedule(30)
+        self.schedule(7.5)
+        nextTime = self.queue.nextTime()
+        self.assertTrue(nextTime <= 1007.5, nextTime)
+
+
+    def test_addedDuringExpiry(self):
+        """
+        A call added after L{ITimerQueue.advance} is not popped before the
+        next C{advance}, even if its time has come.
+        """
+        self.schedule(0, "a")
+        self.queue.advance(self.now)
+        self.schedule(0, "b")
+        self.assertEqual(self.queue.popDue(self.now).args, ("a",))
+        self.assertIsNone(self.queue.popDue(self.now))
+        self.assertEqual(self.expire(self.now), ["b"])
+
+
+    def test_cancel(self):
+        """
+        Cancelled calls are neither popped nor returned by
+        L{ITimerQueue.getDelayedCalls}.
+        """
+        first = self.schedule(1, "a")
+        second = self.schedule(2, "b")
+        first.cancel()
+        self.assertEqual(self.queue.getDelayedCalls(), [second])
+        self.assertEqual(self.expire(1005.0), ["b"])
+
+
+    def test_resetSooner(self):
+        """
+        A call reset to an earlier time is popped at that time.
+        """
+        self.schedule(5, "a")
+        call = self.schedule(100, "b")
+        self.expire(1000.0)
+        call.reset(1)
+        self.assertEqual(self.expire(1001.0), ["b"])
+        self.assertEqual(self.expire(1005.0), ["a"])
+
+
+    def test_resetLater(self):
+        """
+        A call reset to a later time is popped at that time.
+        """
+        call = self.schedule(1, "a")
+        self.expire(1000.0)
+        call.reset(10)
+        self.assertEqual(self.expire(1001.0), [])
+        self.assertEqual(self.expire(1010.0), ["a"])
+
+
+    def test_distant(self):
+        """
+        Calls scheduled very far in the future are kept.
+        """
+        call = self.schedule(2 ** 40, "a")
+        self.assertEqual(self.expire(1000.0 + 2 ** 20), [])
+        self.assertEqual(self.queue.getDelayedCalls(), [call])
+        self.assertEqual(self.expire(1000.0 + 2 ** 40), ["a"])
+
+
+    def test_many(self):
+        """
+        Many calls spread over a long period are all popped in order.
+        """
+        delays = [(i * 7919) % 10007 / 10.0 for i in range(2000)]
+        for delay in delays:
+            self.schedule(delay, delay)
+        popped = []
+        for step in range(1, 1002):
+            popped.extend(self.expire(1000.0 + step))
+        self.assertEqual(popped, sorted(delays))
+
+
+
+class HeapTimerQueueTests(TimerQueueTestsMixin, SynchronousTestCase):
+    """
+    Tests for L{HeapTimerQueue}.
+    """
+
+    def createQueue(self):
+        return HeapTimerQueue()
+
+
+
+class TimingWheelTimerQueueTests(TimerQueueTestsMixin, SynchronousTestCase):
+    """
+    Tests for L{TimingWheelTimerQueue}.
+    """
+
+    def createQueue(self):
+        # Use a small wheel so that calls are redistributed between levels.
+        return TimingWheelTimerQueue(resolution=0.1, slotBits=3, levels=3)
+
+
+    def test_cancelRemoves(self):
+        """
+        A cancelled call is removed from the wheel immediately.
+        """
+        call = self.schedule(50)
+        call.cancel()
+        self.assertEqual(self.queue._locations, {})
+        self.assertEqual(self.queue._counts, [0, 0, 0])
+
+
+    def test_nextTimeAfterIdle(self):
+        """
+        After a long time without calls, L{ITimerQueue.nextTime} still
+        reports a newly added call.
+        """
+        self.schedule(1)
+        self.expire(5000.0)
+        self.schedule(3)
+        nextTime = self.queue.nextTime()
+        self.assertTrue(nextTime <= 5003.0, nextTime)
+
+
+
+class _TestReactor(ReactorBase):
+    """
+    A L{ReactorBase} which does not need a waker.
+    """
+
+    def installWaker(self):
+        """
+        Required method, unused.
+        """
+
+
+
+class InstallTimerQueueTests(SynchronousTestCase):
+    """
+    Tests for L{ReactorBase.installTimerQueue}.
+    """
+
+    def test_default(self):
+        """
+        Reactors use a L{HeapTimerQueue} by default.
+        """
+        self.assertIsInstance(_TestReactor().timerQueue, HeapTimerQueue)
+
+
+    def test_install(self):
+        """
+        L{ReactorBase.installTimerQueue} sets the timer queue used by
+        C{callLater}, moves the calls already scheduled to it, and returns the
+        previous queue.
+        """
+        reactor = _TestReactor()
+        first = reactor.callLater(10, lambda: None)
+        queue = TimingWheelTimerQueue()
+        previous = reactor.installTimerQueue(queue)
+        second = reactor.callLater(20, lambda: None)
+        self.assertIsInstance(previous, HeapTimerQueue)
+        self.assertIs(reactor.timerQueue, queue)
+        self.assertEqual(
+            set(queue.getDelayedCalls()), set([first, second]))
+
+
+    def test_runUntilCurrent(self):
+        """
+        Calls kept in a L{TimingWheelTimerQueue} are run by
+        L{ReactorBase.runUntilCurrent} once their time has come.
+        """
+        now = [100.0]
+        reactor = _TestReactor()
+        reactor.seconds = lambda: now[0]
+        reactor.installTimerQueue(TimingWheelTimerQueue())
+        called = []
+        reactor.callLater(1, called.append, "a")
+        reactor.callLater(3, called.append, "b").cancel()
+        reactor.runUntilCurrent()
+        self.assertEqual(called, [])
+        self.assertTrue(0 <= reactor.timeout() <= 1)
+        now[0] = 104.0
+        reactor.runUntilCurrent()
+        self.assertEqual(called, ["a"])
+        self.assertIsNone(reactor.timeout())
@@ -455,6 +455,51 @@ class UDPServerTestsBuilder(ReactorBuilder,
                                  maxPacketSize=maxPacketSize)
 
 
+    def test_reusePort(self):
+        """
+        Several ports created by L{IReactorUDP.listenUDP} with C{reusePort}
+        set can bind the same port number.
+        """
+        reactor = self.buildReactor()
+        first = reactor.listenUDP(
+            0, DatagramProtocol(), interface="127.0.0.1", reusePort=True)
+        self.addCleanup(first.stopListening)
+        portNumber = first.getHost().port
+        second = reactor.listenUDP(
+            portNumber, DatagramProtocol(), interface="127.0.0.1",
+            reusePort=True)
+        self.addCleanup(second.stopListening)
+        self.assertEqual(second.getHost().port, portNumber)
+        self.assertRaises(
+            error.CannotListenError, reactor.listenUDP, portNumber,
+            DatagramProtocol(), interface="127.0.0.1")
+    if getattr(socket, "SO_REUSEPORT", None) is None:
+        test_reusePort.skip = "SO_REUSEPORT is not available on this platform."
+
+
+    def test_reusePortByDefault(self):
+        """
+        Ports created by L{IReactorUDP.listenUDP} without a C{reusePort}
+        argument listen with C{SO_REUSEPORT} if the reactor's
+        C{reusePortByDefault} is set.
+        """
+        reactor = self.buildReactor()
+        if not hasattr(reactor, "reusePortByDefault"):
+            raise SkipTest("Reactor does not support reusePortByDefault")
+        reactor.reusePortByDefault = True
+        first = reactor.listenUDP(
+            0, DatagramProtocol(), interface="127.0.0.1")
+        self.addCleanup(first.stopListening)
+        self.assertTrue(first.reusePort)
+        second = reactor.listenUDP(
+            first.getHost().port, DatagramProtocol(), interface="127.0.0.1")
+        self.addCleanup(second.stopListening)
+        self.assertTrue(second.reusePort)
+    if getattr(socket, "SO_REUSEPORT", None) is None:
+        test_reusePortByDefault.skip = (
+            "SO_REUSEPORT is not available on this platform.")
+
+
 
 class UDPFDServerTestsBuilder(ReactorBuilder,
                               UDPPortTestsMixin, DatagramTransportTestsMixin):
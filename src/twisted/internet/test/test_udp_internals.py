@@ -7,11 +7,14 @@ Tests for the internal implementation details of L{twisted.internet.udp}.
 
 from __future__ import division, absolute_import
 
+import ctypes
+import errno
 import socket
+import struct
 
 from twisted.trial import unittest
 from twisted.internet.protocol import DatagramProtocol
-from twisted.internet import udp
+from twisted.internet import error, udp
 from twisted.python.runtime import platformType
 
 if platformType == 'win32':
@@ -70,6 +73,14 @@ class ErrorsTests(unittest.SynchronousTestCase):
     Error handling tests for C{udp.Port}.
     """
 
+    def setUp(self):
+        """
+        Read from the fake sockets with C{recvfrom}, rather than with
+        C{recvmmsg}.
+        """
+        self.patch(udp, "_mmsg", None)
+
+
     def test_socketReadNormal(self):
         """
         Socket reads with some good data followed by a socket error which can
@@ -163,3 +174,248 @@ class ErrorsTests(unittest.SynchronousTestCase):
         port.socket = StringUDPSocket([b"good", socket.error(-1337)])
         self.assertRaises(socket.error, port.doRead)
         self.assertEqual(protocol.reads, [b"good"])
+
+
+
+class KeepBatches(DatagramProtocol):
+    """
+    Accumulate batches of reads in a list.
+    """
+
+    def __init__(self):
+        self.batches = []
+
+
+    def datagramsReceived(self, datagrams):
+        self.batches.append(datagrams)
+
+
+
+class BatchTests(unittest.SynchronousTestCase):
+    """
+    Tests for C{udp.Port} receiving and writing several datagrams at once.
+    """
+
+    def setUp(self):
+        self.protocol = KeepBatches()
+        self.port = udp.Port(0, self.protocol, interface="127.0.0.1")
+        self.port.socket = self.port.createInternetSocket()
+        self.port.socket.bind(("127.0.0.1", 0))
+        self.addCleanup(self.port.socket.close)
+        self.address = self.port.socket.getsockname()
+        self.sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sender.bind(("127.0.0.1", 0))
+        self.addCleanup(self.sender.close)
+
+
+    def receiveAll(self):
+        """
+        Read from the port until no more datagrams are waiting.
+
+        @return: The batches given to the protocol.
+        @rtype: L{list}
+        """
+        self.port.doRead()
+        return self.protocol.batches
+
+
+    def test_batches(self):
+        """
+        L{udp.Port.doRead} gives the protocol's C{datagramsReceived} the
+        waiting datagrams in batches of at most C{batchSize}.
+        """
+        self.port.batchSize = 2
+        for data in (b"a", b"bc", b"def"):
+            self.sender.sendto(data, self.address)
+        source = self.sender.getsockname()
+        self.assertEqual(
+            self.receiveAll(),
+            [[(b"a", source), (b"bc", source)], [(b"def", source)]])
+
+
+    def test_batchesWithoutRecvmmsg(self):
+        """
+        Without C{recvmmsg}, L{udp.Port.doRead} receives the datagrams of a
+        batch one C{recvfrom} call at a time.
+        """
+        self.patch(udp, "_mmsg", None)
+        self.test_batches()
+
+
+    def test_batchesOnlyForInternetPorts(self):
+        """
+        Ports whose address family is neither IPv4 nor IPv6 never use
+        C{recvmmsg} and C{sendmmsg}, whose addresses L{_mmsg} cannot decode
+        and encode.
+        """
+        self.assertEqual(self.port._canBatch(), udp._mmsg is not None)
+        self.port.addressFamily = socket.AF_UNIX
+        self.assertFalse(self.port._canBatch())
+
+
+    def test_defaultDatagramsReceived(self):
+        """
+        L{DatagramProtocol.datagramsReceived} calls C{datagramReceived} for
+        each datagram, logging the exceptions it raises.
+        """
+        received = []
+
+        class Protocol(DatagramProtocol):
+            def datagramReceived(self, datagram, addr):
+                received.append((datagram, addr))
+                if datagram == b"bad":
+                    raise ZeroDivisionError()
+
+        Protocol().datagramsReceived(
+            [(b"bad", ("1.2.3.4", 5)), (b"good", ("1.2.3.4", 6))])
+        self.assertEqual(
+            received, [(b"bad", ("1.2.3.4", 5)), (b"good", ("1.2.3.4", 6))])
+        self.assertEqual(len(self.flushLoggedErrors(ZeroDivisionError)), 1)
+
+
+    def test_onlyDatagramReceived(self):
+        """
+        L{udp.Port.doRead} gives each datagram to the C{datagramReceived} of
+        a protocol which does not define C{datagramsReceived}, logging the
+        exceptions it raises.
+        """
+        received = []
+
+        class Protocol(object):
+            def datagramReceived(self, datagram, addr):
+                received.append(datagram)
+                if datagram == b"bad":
+                    raise ZeroDivisionError()
+
+        self.port.protocol = Protocol()
+        for data in (b"bad", b"good"):
+            self.sender.sendto(data, self.address)
+        self.port.doRead()
+        self.assertEqual(received, [b"bad", b"good"])
+        self.assertEqual(len(self.flushLoggedErrors(ZeroDivisionError)), 1)
+
+
+    def test_onlyDatagramReceivedWithoutRecvmmsg(self):
+        """
+        Without C{recvmmsg}, L{udp.Port.doRead} also gives each datagram to
+        the C{datagramReceived} of a protocol which does not define
+        C{datagramsReceived}.
+        """
+        self.patch(udp, "_mmsg", None)
+        self.test_onlyDatagramReceived()
+
+
+    def test_writeMany(self):
+        """
+        L{udp.Port.writeMany} writes each datagram to its address.
+        """
+        self.sender.setblocking(False)
+        other = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        other.bind(("127.0.0.1", 0))
+        self.addCleanup(other.close)
+        self.port.writeMany([
+            (b"a", self.sender.getsockname()),
+            (b"b", other.getsockname()),
+            (b"c", self.sender.getsockname()),
+        ])
+        self.assertEqual(
+            [self.sender.recv(10), self.sender.recv(10), other.recv(10)],
+            [b"a", b"c", b"b"])
+
+
+    def test_writeManyWithoutSendmmsg(self):
+        """
+        Without C{sendmmsg}, L{udp.Port.writeMany} writes each datagram with
+        L{udp.Port.write}.
+        """
+        self.patch(udp, "_mmsg", None)
+        self.test_writeMany()
+
+
+    def test_writeManyConnected(self):
+        """
+        L{udp.Port.writeMany} writes to the connected address when the port is
+        connected.
+        """
+        self.port.connect(*self.sender.getsockname())
+        self.port.writeMany([(b"a", None), (b"b", None)])
+        self.assertEqual(
+            [self.sender.recv(10), self.sender.recv(10)], [b"a", b"b"])
+
+
+    def test_writeManyErrors(self):
+        """
+        L{udp.Port.writeMany} reports errors for a datagram as
+        L{udp.Port.write} would, and does not write the following ones.
+        """
+        self.assertRaises(
+            error.InvalidAddressError, self.port.writeMany,
+            [(b"a", ("localhost", 80))])
+        self.sender.setblocking(False)
+        self.assertRaises(
+            error.MessageLengthError, self.port.writeMany,
+            [(b"a", self.sender.getsockname()),
+             (b"b" * 70000, self.sender.getsockname()),
+             (b"c", self.sender.getsockname())])
+        self.assertEqual(self.sender.recv(10), b"a")
+        self.assertRaises(socket.error, self.sender.recv, 10)
+
+
+
+class PortReusePortTests(unittest.SynchronousTestCase):
+    """
+    Tests for L{udp.Port.reusePort}.
+    """
+
+    def test_default(self):
+        """
+        Ports created without a C{reusePort} argument use the class attribute
+        L{udp.Port.reusePort}, which is L{False} by default.
+        """
+        self.assertFalse(udp.Port(0, DatagramProtocol()).reusePort)
+        self.patch(udp.Port, "reusePort", True)
+        self.assertTrue(udp.Port(0, DatagramProtocol()).reusePort)
+        self.assertFalse(
+            udp.Port(0, DatagramProtocol(), reusePort=False).reusePort)
+
+
+    def test_unsupported(self):
+        """
+        Creating the socket of a port with C{reusePort} set fails with a
+        L{socket.error} if the platform does not support C{SO_REUSEPORT}.
+        """
+        self.patch(udp, "_SO_REUSEPORT", None)
+        port = udp.Port(0, DatagramProtocol(), reusePort=True)
+        exc = self.assertRaises(socket.error, port.createInternetSocket)
+        self.assertEqual(exc.args[0], errno.ENOPROTOOPT)
+
+
+
+class MMsgStructuresTests(unittest.SynchronousTestCase):
+    """
+    Tests for the L{struct} layouts of L{twisted.internet._mmsg}.
+    """
+
+    def test_sizes(self):
+        """
+        The structures packed for C{recvmmsg(2)} and C{sendmmsg(2)} have the
+        sizes of the corresponding C structures.
+        """
+        _mmsg = udp._mmsg
+        self.assertEqual(_mmsg._iovec.size, ctypes.sizeof(_mmsg._IOVec))
+        self.assertEqual(_mmsg._mmsghdr.size, ctypes.sizeof(_mmsg._MMsgHdr))
+
+
+    def test_unsignedFormat(self):
+        """
+        L{_mmsg._unsignedFormat} finds a native format for integers of the
+        size of C{size_t}, and raises L{ImportError} when there is none.
+        """
+        _mmsg = udp._mmsg
+        size = ctypes.sizeof(ctypes.c_size_t)
+        self.assertEqual(
+            struct.calcsize("@" + _mmsg._unsignedFormat(size)), size)
+        self.assertRaises(ImportError, _mmsg._unsignedFormat, 3)
+
+    if udp._mmsg is None:
+        skip = "recvmmsg and sendmmsg are not available."
@@ -0,0 +1,580 @@
+# -*- test-case-name: twisted.internet.test.test_timers -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Storage for the timed calls of a reactor.
+
+A reactor keeps every L{DelayedCall <twisted.internet.base.DelayedCall>}
+created by C{callLater} in a timer queue, which it asks for the calls that
+are due on each iteration and for the time at which the next call must run.
+
+@see: L{twisted.internet.base.ReactorBase.installTimerQueue}
+"""
+
+from __future__ import division, absolute_import
+
+from heapq import heappush, heappop, heapify
+from itertools import chain
+
+from zope.interface import Interface, implementer
+
+
+
+class ITimerQueue(Interface):
+    """
+    A collection of L{DelayedCall <twisted.internet.base.DelayedCall>}s
+    ordered by the time at which they should run.
+
+    A timer queue never runs calls itself; it only hands them out to the
+    reactor.  Calls are first L{added <ITimerQueue.add>}, then made available
+    to L{popDue <ITimerQueue.popDue>} by L{advance <ITimerQueue.advance>}.
+    Calls added after the last C{advance} must not be returned by C{popDue},
+    so that a timed call which schedules another call for "now" cannot starve
+    the reactor.
+    """
+
+    def add(call):
+        """
+        Add a newly scheduled call.
+
+        @param call: The call to add.
+        @type call: L{twisted.internet.base.DelayedCall}
+        """
+
+
+    def cancelled(call):
+        """
+        Notification that a call previously added is being cancelled.  The
+        queue may forget about it immediately or discard it later.
+
+        @param call: The call being cancelled.
+        @type call: L{twisted.internet.base.DelayedCall}
+        """
+
+
+    def movedSooner(call):
+        """
+        Notification that the C{time} of a call previously added has been
+        moved earlier.
+
+        @param call: The call whose time changed.
+        @type call: L{twisted.internet.base.DelayedCall}
+        """
+
+
+    def advance(now):
+        """
+        Make every call added so far which is scheduled at or before C{now}
+        available to L{popDue <ITimerQueue.popDue>}.
+
+        @param now: The current time, in seconds since the epoch.
+        @type now: L{float}
+        """
+
+
+    def popDue(now):
+        """
+        Remove and return the earliest call made available by the last
+        L{advance <ITimerQueue.advance>} which is scheduled at or before
+        C{now}.  Cancelled calls are discarded and calls which were delayed
+        are rescheduled instead of being returned.
+
+        @param now: The current time, in seconds since the epoch.
+        @type now: L{float}
+
+        @return: The call, or L{None} if no call is due.
+        @rtype: L{twisted.internet.base.DelayedCall} or L{None}
+        """
+
+
+    def nextTime():
+        """
+        Determine when the earliest call must run.  The result may be earlier
+        than the time of any call, but never later.
+
+        @return: The time in seconds since the epoch, or L{None} if there are
+            no calls.
+        @rtype: L{float} or L{None}
+        """
+
+
+    def getDelayedCalls():
+        """
+        Get every call which has not been cancelled.
+
+        @return: The calls, in no particular order.
+        @rtype: L{list} of L{twisted.internet.base.DelayedCall}
+        """
+
+
+
+@implementer(ITimerQueue)
+class HeapTimerQueue(object):
+    """
+    A timer queue keeping calls in a binary heap.
+
+    Adding and removing calls costs O(log n).  Cancelled calls stay in the
+    heap until they reach its top, or until they make up more than half of
+    it, at which point the heap is rebuilt.
+
+    @ivar _pendingTimedCalls: A heap of the calls made available by
+        L{advance}.
+    @type _pendingTimedCalls: L{list}
+
+    @ivar _newTimedCalls: The calls added since the last L{advance}.
+    @type _newTimedCalls: L{list}
+
+    @ivar _cancellations: The number of cancelled calls still stored.
+    @type _cancellations: L{int}
+    """
+
+    def __init__(self):
+        self._pendingTimedCalls = []
+        self._newTimedCalls = []
+        self._cancellations = 0
+
+
+    def add(self, call):
+        """
+        See L{ITimerQueue.add}.
+        """
+        self._newTimedCalls.append(call)
+
+
+    def cancelled(self, call):
+        """
+        See L{ITimerQueue.cancelled}.
+        """
+        self._cancellations += 1
+
+
+    def movedSooner(self, call):
+        """
+        See L{ITimerQueue.movedSooner}.
+        """
+        # Linear time find: slow.
+        heap = self._pendingTimedCalls
+        try:
+            pos = heap.index(call)
+
+            # Move elt up the heap until it rests at the right place.
+            elt = heap[pos]
+            while pos != 0:
+                parent = (pos-1) // 2
+                if heap[parent] <= elt:
+                    break
+                # move parent down
+                heap[pos] = heap[parent]
+                pos = parent
+            heap[pos] = elt
+        except ValueError:
+            # element was not found in heap - oh well...
+            pass
+
+
+    def _insertNewDelayedCalls(self):
+        """
+        Move the calls added since the last L{advance} into the heap.
+        """
+        for call in self._newTimedCalls:
+            if call.cancelled:
+                self._cancellations -= 1
+            else:
+                call.activate_delay()
+                heappush(self._pendingTimedCalls, call)
+        self._newTimedCalls = []
+
+
+    def advance(self, now):
+        """
+        See L{ITimerQueue.advance}.
+        """
+        self._insertNewDelayedCalls()
+
+
+    def popDue(self, now):
+        """
+        See L{ITimerQueue.popDue}.
+        """
+        heap = self._pendingTimedCalls
+        while heap and heap[0].time <= now:
+            call = heappop(heap)
+            if call.cancelled:
+                self._cancellations -= 1
+                continue
+
+            if call.delayed_time > 0:
+                call.activate_delay()
+                heappush(heap, call)
+                continue
+
+            return call
+
+        if (self._cancellations > 50 and
+                self._cancellations > len(heap) >> 1):
+            self._cancellations = 0
+            self._pendingTimedCalls = [x for x in heap if not x.cancelled]
+            heapify(self._pendingTimedCalls)
+        return None
+
+
+    def nextTime(self):
+        """
+        See L{ITimerQueue.nextTime}.
+        """
+        # insert new delayed calls to make sure to include them in the result
+        self._insertNewDelayedCalls()
+        if not self._pendingTimedCalls:
+            return None
+        return self._pendingTimedCalls[0].time
+
+
+    def getDelayedCalls(self):
+        """
+        See L{ITimerQueue.getDelayedCalls}.
+        """
+        return [x for x in (self._pendingTimedCalls + self._newTimedCalls)
+                if not x.cancelled]
+
+
+
+@implementer(ITimerQueue)
+class TimingWheelTimerQueue(object):
+    """
+    A timer queue keeping calls in a hierarchical timing wheel.
+
+    Time is divided into ticks of C{resolution} seconds.  The lowest level
+    of the wheel has one slot per tick for the next C{2 ** slotBits} ticks;
+    each higher level has one slot per span of the level below it.  When the
+    current tick reaches the start of a span, the calls stored in the slot
+    for that span are redistributed to the lower levels.  Adding and
+    cancelling calls costs O(1), regardless of the number of pending calls.
+
+    Calls are never run early or late because of the resolution: the calls
+    of each expired tick are moved to a small heap, from which they are only
+    returned once their exact time has come.
+
+    @ivar _resolution: The length of a tick, in seconds.
+    @type _resolution: L{float}
+
+    @ivar _bits: The base 2 logarithm of the number of slots per level.
+    @type _bits: L{int}
+
+    @ivar _mask: The number of slots per level minus one.
+    @type _mask: L{int}
+
+    @ivar _levels: The number of levels.
+    @type _levels: L{int}
+
+    @ivar _wheels: One L{list} of slots per level.  Each slot is either
+        L{None} or a L{dict} whose keys are the calls stored in it, so that
+        calls are redistributed in the order they were added.
+    @type _wheels: L{list} of L{list}
+
+    @ivar _counts: The number of calls stored at each level.
+    @type _counts: L{list} of L{int}
+
+    @ivar _locations: Maps each call stored in a slot to a two-tuple of its
+        level and slot index.
+    @type _locations: L{dict}
+
+    @ivar _currentTick: The earliest tick whose slot has not been expired
+        yet, or L{None} before the first call is added.
+    @type _currentTick: L{int} or L{None}
+
+    @ivar _due: A heap of the calls from expired ticks.
+    @type _due: L{list}
+
+    @ivar _late: Calls added since the last L{advance} whose tick has already
+        expired.
+    @type _late: L{list}
+    """
+
+    def __init__(self, resolution=0.01, slotBits=8, levels=4):
+        """
+        @param resolution: The length of a tick, in seconds.
+        @type resolution: L{float}
+
+        @param slotBits: The base 2 logarithm of the number of slots per
+            level.
+        @type slotBits: L{int}
+
+        @param levels: The number of levels.  Calls further in the future
+            than C{resolution * 2 ** (slotBits * levels)} seconds are
+            supported, but are redistributed more than once.
+        @type levels: L{int}
+        """
+        self._resolution = resolution
+        self._bits = slotBits
+        self._mask = (1 << slotBits) - 1
+        self._levels = levels
+        self._wheels = [[None] * (1 << slotBits) for _ in range(levels)]
+        self._counts = [0] * levels
+        self._locations = {}
+        self._currentTick = None
+        self._due = []
+        self._late = []
+
+
+    def _tick(self, when):
+        """
+        Get the tick containing the given time.
+
+        @param when: A time in seconds since the epoch.
+        @type when: L{float}
+
+        @rtype: L{int}
+        """
+        return int(when // self._resolution)
+
+
+    def _place(self, call, tick):
+        """
+        Store a call in the slot for its tick.
+
+        @param call: The call to store.
+        @type call: L{twisted.internet.base.DelayedCall}
+
+        @param tick: The tick of C{call}, which must not have expired.
+        @type tick: L{int}
+        """
+        bits = self._bits
+        # The lowest level whose slots cover the distance to the tick.
+        level = (max(tick - self._currentTick, 1).bit_length() - 1) // bits
+        if level >= self._levels:
+            # Too far in the future: park it in the slot farthest away and
+            # place it again when that slot is redistributed.
+            level = self._levels - 1
+            tick = self._currentTick + (1 << (bits * self._levels)) - 1
+        index = (tick >> (bits * level)) & self._mask
+        wheel = self._wheels[level]
+        slot = wheel[index]
+        if slot is None:
+            slot = wheel[index] = {}
+        slot[call] = None
+        self._counts[level] += 1
+        self._locations[call] = (level, index)
+
+
+    def _remove(self, call):
+        """
+        Remove a call from its slot, if it is stored in one.
+
+        @param call: The call to remove.
+        @type call: L{twisted.internet.base.DelayedCall}
+
+        @return: C{True} if the call was removed from a slot, C{False} if it
+            is not stored in one.
+        @rtype: L{bool}
+        """
+        location = self._locations.pop(call, None)
+        if location is None:
+            return False
+        level, index = location
+        wheel = self._wheels[level]
+        slot = wheel[index]
+        del slot[call]
+        if not slot:
+            wheel[index] = None
+        self._counts[level] -= 1
+        return True
+
+
+    def _reschedule(self, call):
+        """
+        Store a call again after its time changed.
+
+        @param call: The call to store.
+        @type call: L{twisted.internet.base.DelayedCall}
+        """
+        tick = self._tick(call.time)
+        if tick < self._currentTick:
+            heappush(self._due, call)
+        else:
+            self._place(call, tick)
+
+
+    def _takeSlot(self, level, index):
+        """
+        Empty a slot.
+
+        @param level: The level of the slot.
+        @type level: L{int}
+
+        @param index: The index of the slot.
+        @type index: L{int}
+
+        @return: The calls which were stored in the slot.
+        @rtype: iterable of L{twisted.internet.base.DelayedCall}
+        """
+        wheel = self._wheels[level]
+        slot = wheel[index]
+        if slot is None:
+            return ()
+        wheel[index] = None
+        self._counts[level] -= len(slot)
+        locations = self._locations
+        for call in slot:
+            del locations[call]
+        return slot
+
+
+    def add(self, call):
+        """
+        See L{ITimerQueue.add}.
+        """
+        tick = self._tick(call.time)
+        if self._currentTick is None:
+            self._currentTick = tick
+        if tick < self._currentTick:
+            self._late.append(call)
+        else:
+            self._place(call, tick)
+
+
+    def cancelled(self, call):
+        """
+        See L{ITimerQueue.cancelled}.
+        """
+        # Calls which are not in a slot are discarded by popDue.
+        self._remove(call)
+
+
+    def movedSooner(self, call):
+        """
+        See L{ITimerQueue.movedSooner}.
+        """
+        if self._remove(call):
+            self._reschedule(call)
+        else:
+            heapify(self._due)
+
+
+    def _insertLateCalls(self):
+        """
+        Move the calls added for already expired ticks to the heap of due
+        calls.
+        """
+        due = self._due
+        for call in self._late:
+            if not call.cancelled:
+                heappush(due, call)
+        self._late = []
+
+
+    def advance(self, now):
+        """
+        See L{ITimerQueue.advance}.
+        """
+        if self._late:
+            self._insertLateCalls()
+        current = self._currentTick
+        if current is None:
+            return
+        nowTick = self._tick(now)
+        bits, mask, levels = self._bits, self._mask, self._levels
+        counts = self._counts
+        due = self._due
+        while current <= nowTick:
+            if not self._locations:
+                current = nowTick + 1
+                break
+            self._currentTick = current
+
+            # Redistribute the higher level slots whose span starts now,
+            # highest first, so that calls fall through every level.
+            top = 1
+            while top < levels and not current & ((1 << (bits * top)) - 1):
+                top += 1
+            for level in range(top - 1, 0, -1):
+                index = (current >> (bits * level)) & mask
+                for call in self._takeSlot(level, index):
+                    self._reschedule(call)
+
+            for call in self._takeSlot(0, current & mask):
+                heappush(due, call)
+
+            # Skip over the ticks of empty levels.
+            step = 1
+            for level in range(levels):
+                if counts[level]:
+                    break
+                step = 1 << (bits * (level + 1))
+            current = min((current | (step - 1)) + 1, nowTick + 1)
+        self._currentTick = current
+
+
+    def popDue(self, now):
+        """
+        See L{ITimerQueue.popDue}.
+        """
+        due = self._due
+        while due and due[0].time <= now:
+            call = heappop(due)
+            if call.cancelled:
+                continue
+
+            if call.delayed_time > 0:
+                call.activate_delay()
+                self._reschedule(call)
+                continue
+
+            return call
+        return None
+
+
+    def nextTime(self):
+        """
+        See L{ITimerQueue.nextTime}.
+        """
+        if self._late:
+            self._insertLateCalls()
+        due = self._due
+        while due and due[0].cancelled:
+            heappop(due)
+        best = due[0].time if due else None
+        if not self._locations:
+            return best
+
+        resolution = self._resolution
+        current = self._currentTick
+        bits, mask = self._bits, self._mask
+        for level in range(self._levels):
+            if not self._counts[level]:
+                continue
+            shift = bits * level
+            # No call stored at this level is earlier than the first span
+            # starting at or after the current tick.
+            first = (current + (1 << shift) - 1) >> shift
+            if best is not None and (first << shift) * resolution >= best:
+                break
+            wheel = self._wheels[level]
+            for span in range(first, first + mask + 1):
+                slot = wheel[span & mask]
+                if slot is None:
+                    continue
+                if level:
+                    when = (span << shift) * resolution
+                else:
+                    # A call parked too far in the future may be the only
+                    # one in the slot; the calls of later slots are not
+                    # earlier than the end of this one.
+                    when = min(min(call.time for call in slot),
+                               (span + 1) * resolution)
+                if best is None or when < best:
+                    best = when
+                break
+        return best
+
+
+    def getDelayedCalls(self):
+        """
+        See L{ITimerQueue.getDelayedCalls}.
+        """
+        return [x for x in chain(self._locations, self._due, self._late)
+                if not x.cancelled]
+
+
+
+__all__ = ["ITimerQueue", "HeapTimerQueue", "TimingWheelTimerQueue"]
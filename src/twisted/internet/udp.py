@@ -55,11 +55,21 @@ from twisted.python import log, failure
 from twisted.python._oldstyle import _oldStyle
 from twisted.internet import abstract, error, interfaces
 
+try:
+    from twisted.internet import _mmsg
+except Exception:
+    # Besides ImportError where the system calls are missing, ctypes or
+    # struct may fail to describe the structures on unusual platforms:
+    # datagrams are then received and sent one at a time.
+    _mmsg = None
+
+_SO_REUSEPORT = getattr(socket, "SO_REUSEPORT", None)
+
 
 
 @implementer(
     interfaces.IListeningPort, interfaces.IUDPTransport,
-    interfaces.ISystemHandle)
+    interfaces.IBatchUDPTransport, interfaces.ISystemHandle)
 class Port(base.BasePort):
     """
     UDP port, listening for packets.
@@ -67,9 +77,20 @@ class Port(base.BasePort):
     @ivar maxThroughput: Maximum number of bytes read in one event
         loop iteration.
 
+    @ivar batchSize: Maximum number of datagrams received at once, with a
+        single C{recvmmsg(2)} call where available, and given to the
+        protocol's C{datagramsReceived} together.
+    @type batchSize: L{int}
+
     @ivar addressFamily: L{socket.AF_INET} or L{socket.AF_INET6}, depending on
         whether this port is listening on an IPv4 address or an IPv6 address.
 
+    @ivar reusePort: Whether to set C{SO_REUSEPORT} on the socket, so that
+        several processes can bind the same port and have the kernel balance
+        incoming datagrams between them.  Ports created without an explicit
+        C{reusePort} argument use this class attribute.
+    @type reusePort: L{bool}
+
     @ivar _realPortNumber: Actual port number being listened on. The
         value will be L{None} until this L{Port} is listening.
 
@@ -77,16 +98,23 @@ class Port(base.BasePort):
         was created and initialized outside of the reactor and will be used to
         listen for connections (instead of a new socket being created by this
         L{Port}).
+
+    @ivar _receiver: The L{_mmsg.Receiver} used to receive datagrams, created
+        by the first read if C{recvmmsg(2)} is available.
     """
 
     addressFamily = socket.AF_INET
     socketType = socket.SOCK_DGRAM
     maxThroughput = 256 * 1024
+    batchSize = 32
+    reusePort = False
 
     _realPortNumber = None
     _preexistingSocket = None
+    _receiver = None
 
-    def __init__(self, port, proto, interface='', maxPacketSize=8192, reactor=None):
+    def __init__(self, port, proto, interface='', maxPacketSize=8192,
+                 reactor=None, reusePort=None):
         """
         @param port: A port number on which to listen.
         @type port: L{int}
@@ -106,12 +134,17 @@ class Port(base.BasePort):
             its socket is ready for reading or writing. Defaults to
             L{None}, ie the default global reactor.
         @type reactor: L{interfaces.IReactorFDSet}
+
+        @param reusePort: If not L{None}, overrides L{Port.reusePort}.
+        @type reusePort: L{bool} or L{None}
         """
         base.BasePort.__init__(self, reactor)
         self.port = port
         self.protocol = proto
         self.maxPacketSize = maxPacketSize
         self.interface = interface
+        if reusePort is not None:
+            self.reusePort = reusePort
         self.setLogStr()
         self._connectedAddr = None
         self._setAddressFamily()
@@ -168,6 +201,18 @@ class Port(base.BasePort):
         """
         return self.socket
 
+
+    def createInternetSocket(self):
+        skt = base.BasePort.createInternetSocket(self)
+        if self.reusePort:
+            if _SO_REUSEPORT is None:
+                skt.close()
+                raise socket.error(
+                    ENOPROTOOPT, "SO_REUSEPORT is not supported")
+            skt.setsockopt(socket.SOL_SOCKET, _SO_REUSEPORT, 1)
+        return skt
+
+
     def startListening(self):
         """
         Create and bind my socket, and begin listening on it.
@@ -221,12 +266,18 @@ class Port(base.BasePort):
     def doRead(self):
         """
         Called when my socket is ready for reading.
+
+        Datagrams are received in batches of up to C{self.batchSize}, which
+        are given to the protocol's C{datagramsReceived}.
         """
         read = 0
         while read < self.maxThroughput:
+            datagrams = []
             try:
-                data, addr = self.socket.recvfrom(self.maxPacketSize)
+                self._receiveBatch(datagrams)
             except socket.error as se:
+                # Deliver the datagrams received before the error first.
+                self._deliverBatch(datagrams)
                 no = se.args[0]
                 if no in _sockErrReadIgnore:
                     return
@@ -235,20 +286,89 @@ class Port(base.BasePort):
                         self.protocol.connectionRefused()
                     return
                 raise
-            else:
-                read += len(data)
-                if self.addressFamily == socket.AF_INET6:
-                    # Remove the flow and scope ID from the address tuple,
-                    # reducing it to a tuple of just (host, port).
-                    #
-                    # TODO: This should be amended to return an object that can
-                    # unpack to (host, port) but also includes the flow info
-                    # and scope ID. See http://tm.tl/6826
-                    addr = addr[:2]
+            read += self._deliverBatch(datagrams)
+            if len(datagrams) < self.batchSize:
+                # No more datagrams were waiting.
+                return
+
+
+    def _deliverBatch(self, datagrams):
+        """
+        Give received datagrams to the protocol, logging any exception it
+        raises.  Protocols which do not define C{datagramsReceived}, because
+        they are not derived from C{AbstractDatagramProtocol}, get each
+        datagram with C{datagramReceived}.
+
+        @param datagrams: The received datagrams, as C{(datagram, (host,
+            port))} pairs.
+        @type datagrams: L{list} of L{tuple}
+
+        @return: The number of bytes delivered.
+        @rtype: L{int}
+        """
+        if not datagrams:
+            return 0
+        datagramsReceived = getattr(self.protocol, "datagramsReceived", None)
+        if datagramsReceived is None:
+            for datagram, addr in datagrams:
                 try:
-                    self.protocol.datagramReceived(data, addr)
+                    self.protocol.datagramReceived(datagram, addr)
                 except:
                     log.err()
+        else:
+            try:
+                datagramsReceived(datagrams)
+            except:
+                log.err()
+        return sum([len(data) for data, addr in datagrams])
+
+
+    def _canBatch(self):
+        """
+        Determine whether C{recvmmsg(2)} and C{sendmmsg(2)} can be used by
+        this port: they must be available, and the port must be an IPv4 or
+        IPv6 one, whose addresses L{_mmsg} can encode and decode.
+
+        @rtype: L{bool}
+        """
+        return _mmsg is not None and self.addressFamily in (
+            socket.AF_INET, socket.AF_INET6)
+
+
+    def _receiveBatch(self, datagrams):
+        """
+        Receive up to C{self.batchSize} datagrams, with a single
+        C{recvmmsg(2)} call if possible, or one C{recvfrom(2)} call at a time
+        otherwise.
+
+        @param datagrams: The list to which the received datagrams are
+            appended, as C{(datagram, (host, port))} pairs.  It holds the
+            datagrams received before an error, if one is raised.
+        @type datagrams: L{list}
+
+        @raise socket.error: If receiving a datagram failed, including
+            because no more datagrams were waiting.
+        """
+        if self._canBatch():
+            receiver = self._receiver
+            if (receiver is None or receiver.count != self.batchSize or
+                    receiver.size != self.maxPacketSize):
+                receiver = self._receiver = _mmsg.Receiver(
+                    self.batchSize, self.maxPacketSize)
+            datagrams.extend(receiver.receive(self.socket.fileno()))
+            return
+
+        while len(datagrams) < self.batchSize:
+            data, addr = self.socket.recvfrom(self.maxPacketSize)
+            if self.addressFamily == socket.AF_INET6:
+                # Remove the flow and scope ID from the address tuple,
+                # reducing it to a tuple of just (host, port).
+                #
+                # TODO: This should be amended to return an object that can
+                # unpack to (host, port) but also includes the flow info
+                # and scope ID. See http://tm.tl/6826
+                addr = addr[:2]
+            datagrams.append((data, addr))
 
 
     def write(self, datagram, addr=None):
@@ -278,22 +398,7 @@ class Port(base.BasePort):
                 else:
                     raise
         else:
-            assert addr != None
-            if (not abstract.isIPAddress(addr[0])
-                    and not abstract.isIPv6Address(addr[0])
-                    and addr[0] != "<broadcast>"):
-                raise error.InvalidAddressError(
-                    addr[0],
-                    "write() only accepts IP addresses, not hostnames")
-            if ((abstract.isIPAddress(addr[0]) or addr[0] == "<broadcast>")
-                    and self.addressFamily == socket.AF_INET6):
-                raise error.InvalidAddressError(
-                    addr[0],
-                    "IPv6 port write() called with IPv4 or broadcast address")
-            if (abstract.isIPv6Address(addr[0])
-                    and self.addressFamily == socket.AF_INET):
-                raise error.InvalidAddressError(
-                    addr[0], "IPv4 port write() called with IPv6 address")
+            self._checkAddress(addr)
             try:
                 return self.socket.sendto(datagram, addr)
             except socket.error as se:
@@ -311,6 +416,103 @@ class Port(base.BasePort):
                     raise
 
 
+    def _checkAddress(self, addr):
+        """
+        Check that datagrams can be written to an address in non-connected
+        mode.
+
+        @param addr: See L{write}.
+
+        @raise error.InvalidAddressError: If C{addr} is not an IP address of
+            the address family of this port.
+        """
+        assert addr != None
+        if (not abstract.isIPAddress(addr[0])
+                and not abstract.isIPv6Address(addr[0])
+                and addr[0] != "<broadcast>"):
+            raise error.InvalidAddressError(
+                addr[0],
+                "write() only accepts IP addresses, not hostnames")
+        if ((abstract.isIPAddress(addr[0]) or addr[0] == "<broadcast>")
+                and self.addressFamily == socket.AF_INET6):
+            raise error.InvalidAddressError(
+                addr[0],
+                "IPv6 port write() called with IPv4 or broadcast address")
+        if (abstract.isIPv6Address(addr[0])
+                and self.addressFamily == socket.AF_INET):
+            raise error.InvalidAddressError(
+                addr[0], "IPv4 port write() called with IPv6 address")
+
+
+    def writeMany(self, datagrams):
+        """
+        Write several datagrams, with as few C{sendmmsg(2)} calls as
+        possible where it is available.
+
+        Datagrams which C{sendmmsg} fails to send, or whose address it
+        cannot be given, are written with L{write}, which handles (or raises)
+        the error as usual.  If it raises, the following datagrams are not
+        written.
+
+        @param datagrams: The datagrams to write.
+        @type datagrams: iterable of C{(datagram, addr)} pairs, where
+            C{addr} is as for L{write}.
+        """
+        if not self._canBatch():
+            for datagram, addr in datagrams:
+                self.write(datagram, addr)
+            return
+
+        batch = []
+        # Consecutive datagrams are often written to the same address, which
+        # is then only checked and encoded once.
+        lastAddr = name = None
+        for datagram, addr in datagrams:
+            if self._connectedAddr:
+                assert addr in (None, self._connectedAddr)
+                batch.append((datagram, None, addr))
+                continue
+            if name is not None and addr == lastAddr:
+                batch.append((datagram, name, addr))
+                continue
+            self._checkAddress(addr)
+            lastAddr = addr
+            try:
+                name = _mmsg.encodeAddress(self.addressFamily, addr)
+            except ValueError:
+                name = None
+                self._sendBatch(batch)
+                batch = []
+                self.write(datagram, addr)
+            else:
+                batch.append((datagram, name, addr))
+        self._sendBatch(batch)
+
+
+    def _sendBatch(self, batch):
+        """
+        Send datagrams with C{sendmmsg(2)}, using L{write} for those it
+        fails to send.
+
+        @param batch: The datagrams to send.
+        @type batch: L{list} of C{(datagram, name, addr)} tuples, where
+            C{name} is C{addr} encoded by L{_mmsg.encodeAddress}, or L{None}
+            in connected mode.
+        """
+        fileno = self.socket.fileno()
+        start = 0
+        while start < len(batch):
+            try:
+                start += _mmsg.send(fileno, [
+                    (datagram, name) for (datagram, name, addr)
+                    in batch[start:]])
+            except socket.error:
+                # Let write send this datagram, or report why it cannot.
+                datagram, name, addr = batch[start]
+                self.write(datagram, addr)
+                start += 1
+
+
     def writeSequence(self, seq, addr):
         """
         Write a datagram constructed from an iterable of L{bytes}.
@@ -343,7 +545,7 @@ class Port(base.BasePort):
     def _loseConnection(self):
         self.stopReading()
         if self.connected: # actually means if we are *listening*
-            self.reactor.callLater(0, self.connectionLost)
+            self.reactor.callSoon(self.connectionLost)
 
 
     def stopListening(self):
@@ -23,7 +23,7 @@ from zope.interface import implementer, implementer_only, implementedBy
 if not hasattr(socket, 'AF_UNIX'):
     raise ImportError("UNIX sockets not supported on this platform")
 
-from twisted.internet import main, base, tcp, udp, error, interfaces
+from twisted.internet import main, base, tcp, udp, error, interfaces, abstract
 from twisted.internet import protocol, address
 from twisted.python import lockfile, log, reflect, failure
 from twisted.python.filepath import _coerceToFilesystemEncoding
@@ -134,6 +134,7 @@ class _SendmsgMixin(object):
                         _ancillaryDescriptor(fd))
                 except socket.error as se:
                     if se.args[0] in (EWOULDBLOCK, ENOBUFS):
+                        self._writeWouldBlock = se.args[0] == EWOULDBLOCK
                         return index
                     else:
                         return main.CONNECTION_LOST
@@ -152,6 +153,16 @@ class _SendmsgMixin(object):
             return result
 
 
+    def doWrite(self):
+        """
+        Write the buffered data, using the base implementation of C{doWrite}
+        unless file descriptors are waiting to be sent along with it.
+        """
+        if self._sendmsgQueue:
+            return abstract.FileDescriptor.doWrite(self)
+        return self._writeSomeDataBase.doWrite(self)
+
+
     def doRead(self):
         """
         Calls {IProtocol.dataReceived} with all available data and
@@ -168,6 +179,7 @@ class _SendmsgMixin(object):
                 sendmsg.recvmsg, self.socket, self.bufferSize)
         except socket.error as se:
             if se.args[0] == EWOULDBLOCK:
+                self._readWouldBlock = True
                 return
             else:
                 return main.CONNECTION_LOST
@@ -406,6 +418,7 @@ class Port(_UNIXPort, tcp.Port):
             self.fileno = self.socket.fileno
             self.numberAccepts = 100
             self.startReading()
+            tcp._listeningPorts.add(self)
 
 
     def _logConnectionLostMsg(self):
@@ -608,6 +608,8 @@ class IMAP4Server(basic.LineReceiver, policies.TimeoutMixin):
     # Number of seconds before idle timeout
     # Initially 1 minute.  Raised to 30 minutes after login.
     timeOut = 60
+    # Data resets the timeout often, so only record the new deadline.
+    lazyTimeout = True
 
     POSTAUTH_TIMEOUT = 60 * 30
 
@@ -2542,6 +2544,8 @@ class IMAP4Client(basic.LineReceiver, policies.TimeoutMixin):
     # Number of seconds to wait before timing out a connection.
     # If the number is <= 0 no timeout checking will be performed.
     timeout = 0
+    # Data resets the timeout often, so only record the new deadline.
+    lazyTimeout = True
 
     # Capabilities are not allowed to change during the session
     # So cache the first response and use that for all later
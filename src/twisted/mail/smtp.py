@@ -362,6 +362,8 @@ class SMTP(basic.LineOnlyReceiver, policies.TimeoutMixin):
 
     timeout = 600
     portal = None
+    # Data resets the timeout often, so only record the new deadline.
+    lazyTimeout = True
 
     # Control whether we log SMTP events
     noisy = True
@@ -918,6 +920,8 @@ class SMTPClient(basic.LineReceiver, policies.TimeoutMixin):
     # Number of seconds to wait before timing out a connection.  If
     # None, perform no timeout checking.
     timeout = None
+    # Data resets the timeout often, so only record the new deadline.
+    lazyTimeout = True
 
     def __init__(self, identity, logsize=10):
         if isinstance(identity, unicode):
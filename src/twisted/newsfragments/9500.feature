@@ -0,0 +1,3 @@
+twisted.internet.base.ReactorBase.installTimerQueue replaces the queue holding
+the reactor's delayed calls; twisted.internet.timers.TimingWheelTimerQueue
+adds and cancels delayed calls in constant time.
@@ -0,0 +1,3 @@
+twisted.protocols.policies.TimeoutMixin.lazyTimeout makes resetTimeout record
+the new deadline without rescheduling its delayed call; HTTP, IMAP4, SMTP and
+memcache protocols enable it.
@@ -0,0 +1,2 @@
+Reactors now have a callSoon method which runs a function during the next
+reactor iteration at a lower cost than callLater(0, ...).
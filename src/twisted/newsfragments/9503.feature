@@ -0,0 +1,2 @@
+TCP transports now write their buffered data with a single scatter-gather
+sendmsg call instead of joining it first.
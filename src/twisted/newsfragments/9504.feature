@@ -0,0 +1,3 @@
+twisted.internet._buffers.ReceiveBufferPool lets TCP connections read into
+pooled, adaptively sized buffers, and protocols providing
+twisted.internet.interfaces.IBufferReceiver receive a memoryview of them.
@@ -0,0 +1,3 @@
+twisted.internet.interfaces.ISendFileTransport.sendFile writes part of a file
+to a transport, with os.sendfile where available; twisted.web.static.File uses
+it.
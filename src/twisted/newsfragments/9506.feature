@@ -0,0 +1,3 @@
+TCP and UDP ports and the tcp: server endpoint description accept reusePort,
+and twist and twistd accept --workers to run several processes listening with
+SO_REUSEPORT.
@@ -0,0 +1,3 @@
+twisted.internet.epollreactor.EPollReactor accepts edgeTriggered=True to
+register TCP connections once in edge-triggered mode, and counts its epoll_ctl
+calls in controlCalls.
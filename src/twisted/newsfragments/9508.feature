@@ -0,0 +1,4 @@
+UDP ports now receive datagrams in batches, with recvmmsg on Linux, and hand
+them to the new DatagramProtocol.datagramsReceived;
+twisted.internet.interfaces.IBatchUDPTransport.writeMany sends several
+datagrams at once.
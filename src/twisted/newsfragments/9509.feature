@@ -0,0 +1,2 @@
+twisted.internet.base.ReactorBase.installInstrumentation records reactor loop
+lag, callback durations and slow callbacks.
@@ -0,0 +1,2 @@
+Adding callbacks to and firing twisted.internet.defer.Deferred is now faster,
+and long callback chains no longer take quadratic time.
@@ -0,0 +1,2 @@
+twisted.internet.defer.Deferred.fromCoroutine runs a coroutine with a lighter
+driver than inlineCallbacks; ensureDeferred uses it.
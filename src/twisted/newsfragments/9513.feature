@@ -0,0 +1,2 @@
+twisted.internet.defer.setDebugging accepts a sampleInterval to only debug some
+Deferreds, and twisted.python.failure.Failure now computes its frames lazily.
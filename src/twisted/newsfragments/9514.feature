@@ -0,0 +1,2 @@
+twisted.internet.defer.concurrentMap maps a function over an iterable with a
+bounded number of calls in progress.
@@ -0,0 +1,2 @@
+twisted.internet.task.Cooperator now supports task priorities and weights, and
+adapts its time slice to reactor lag.
@@ -0,0 +1,2 @@
+twisted.internet.task.LoopingCallGroup runs many LoopingCalls on a few reactor
+timers.
@@ -0,0 +1,3 @@
+twisted.python.threadpool.ThreadPool now retires idle threads and records call
+latency histograms, and reactor.getThreadPool accepts a name to get a separate
+pool.
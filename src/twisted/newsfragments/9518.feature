@@ -0,0 +1 @@
+callFromThread now only wakes up the reactor once for calls queued together.
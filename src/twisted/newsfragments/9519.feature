@@ -0,0 +1,2 @@
+twisted.internet.processpool.deferToProcess runs functions in a pool of child
+Python processes.
@@ -0,0 +1,2 @@
+Processes are now spawned with os.posix_spawn where possible, and on Linux only
+the children which exited are reaped.
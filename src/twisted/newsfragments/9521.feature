@@ -0,0 +1 @@
+twisted.internet._resolver.CachingHostResolver caches hostname resolutions.
@@ -0,0 +1,2 @@
+twisted.internet.connectionpool.ConnectionPool pools client connections made
+through any stream client endpoint.
@@ -0,0 +1,2 @@
+TCP endpoints and their description strings accept TCP Fast Open, deferAccept,
+userTimeout, quickAck, busyPoll and arbitrary socket options.
@@ -0,0 +1,2 @@
+Transports providing twisted.internet.interfaces.ICorkableTransport can hold
+back writes with cork and uncork, so that TLS sends them in a single record.
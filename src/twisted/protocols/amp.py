@@ -215,6 +215,7 @@ from twisted.python._tzhelper import (
 
 from twisted.python import log, filepath
 
+from twisted.internet.interfaces import ICorkableTransport, ISSLTransport
 from twisted.internet.interfaces import IFileDescriptorReceiver
 from twisted.internet.main import CONNECTION_LOST
 from twisted.internet.error import PeerVerifyError, ConnectionLost
@@ -2408,7 +2409,18 @@ class BinaryBoxProtocol(StatefulStringProtocol, Int16StringReceiver,
         if self.innerProtocol is not None:
             self.innerProtocol.dataReceived(data)
             return
-        return Int16StringReceiver.dataReceived(self, data)
+        # The answers to the boxes received together are encrypted together.
+        # Only a TLS layer gains from it: a connection without TLS already
+        # buffers the writes until the reactor flushes them.
+        transport = self.transport
+        if not (ICorkableTransport.providedBy(transport) and
+                ISSLTransport.providedBy(transport)):
+            return Int16StringReceiver.dataReceived(self, data)
+        transport.cork()
+        try:
+            return Int16StringReceiver.dataReceived(self, data)
+        finally:
+            transport.uncork()
 
 
     def connectionLost(self, reason):
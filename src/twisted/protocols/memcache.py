@@ -134,6 +134,8 @@ class MemCacheProtocol(LineReceiver, TimeoutMixin):
     """
     MAX_KEY_LENGTH = 250
     _disconnected = False
+    # Data resets the timeout often, so only record the new deadline.
+    lazyTimeout = True
 
     def __init__(self, timeOut=60):
         """
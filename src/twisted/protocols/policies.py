@@ -682,10 +682,19 @@ class TimeoutMixin:
     default, closes the connection.
 
     @cvar timeOut: The number of seconds after which to timeout the connection.
+
+    @cvar lazyTimeout: If C{True}, L{resetTimeout} only records the time at
+        which the connection should now time out, instead of rescheduling the
+        timeout call.  When the call runs before that time, it schedules
+        itself again for the remaining time.  This makes resetting the
+        timeout much cheaper for protocols which reset it for every chunk of
+        data received.
     """
     timeOut = None
+    lazyTimeout = False
 
     __timeoutCall = None
+    __timeoutDeadline = None
 
     def callLater(self, period, func):
         """
@@ -710,7 +719,11 @@ class TimeoutMixin:
         some data, they're still there, reset the timeout".
         """
         if self.__timeoutCall is not None and self.timeOut is not None:
-            self.__timeoutCall.reset(self.timeOut)
+            if self.lazyTimeout:
+                self.__timeoutDeadline = (
+                    self.__timeoutCall.seconds() + self.timeOut)
+            else:
+                self.__timeoutCall.reset(self.timeOut)
 
     def setTimeout(self, period):
         """
@@ -722,6 +735,7 @@ class TimeoutMixin:
         """
         prev = self.timeOut
         self.timeOut = period
+        self.__timeoutDeadline = None
 
         if self.__timeoutCall is not None:
             if period is None:
@@ -739,6 +753,12 @@ class TimeoutMixin:
         return prev
 
     def __timedOut(self):
+        if self.__timeoutDeadline is not None:
+            remaining = self.__timeoutDeadline - self.__timeoutCall.seconds()
+            self.__timeoutDeadline = None
+            if remaining > 0:
+                self.__timeoutCall = self.callLater(remaining, self.__timedOut)
+                return
         self.__timeoutCall = None
         self.timeoutConnection()
 
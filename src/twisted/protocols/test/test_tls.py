@@ -39,7 +39,8 @@ from twisted.python import log
 from twisted.internet.interfaces import (
     ISystemHandle, ISSLTransport,
     IPushProducer, IProtocolNegotiationFactory, IHandshakeListener,
-    IOpenSSLServerConnectionCreator, IOpenSSLClientConnectionCreator
+    IOpenSSLServerConnectionCreator, IOpenSSLClientConnectionCreator,
+    ICorkableTransport
 )
 
 from twisted.internet.error import ConnectionDone, ConnectionLost
@@ -50,7 +51,7 @@ from twisted.internet.protocol import (
     Protocol,
     ServerFactory,
     )
-from twisted.internet.task import TaskStopped
+from twisted.internet.task import Clock, TaskStopped
 from twisted.protocols.loopback import loopbackAsync, collapsingPumpPolicy
 from twisted.trial.unittest import TestCase, SynchronousTestCase
 from twisted.test.test_tcp import ConnectionLostNotifyingProtocol
@@ -319,6 +320,63 @@ class DeterministicTLSMemoryBIOTests(SynchronousTestCase):
         self.assertEqual(wrappedServerProtocol.received, [])
 
 
+    def test_cork(self):
+        """
+        The application data written while L{TLSMemoryBIOProtocol} is corked
+        is encrypted together once it is uncorked.
+        """
+        client, server, pump = handshakingClientAndServer()
+        pump.flush()
+        self.assertTrue(ICorkableTransport.providedBy(client))
+        client.cork()
+        client.write(b"a")
+        client.writeSequence([b"b", b"c"])
+        pump.flush()
+        self.assertEqual(server.wrappedProtocol.received, [])
+        client.uncork()
+        pump.flush()
+        self.assertEqual(server.wrappedProtocol.received, [b"abc"])
+        client.write(b"d")
+        pump.flush()
+        self.assertEqual(server.wrappedProtocol.received, [b"abc", b"d"])
+
+
+    def test_corkEndOfIteration(self):
+        """
+        The application data written while L{TLSMemoryBIOProtocol} is corked
+        is sent at the end of the reactor iteration of the underlying
+        transport if it is not uncorked before.
+        """
+        client, server, pump = handshakingClientAndServer()
+        pump.flush()
+        clock = Clock()
+        client.transport.reactor = clock
+        client.cork()
+        client.write(b"a")
+        client.write(b"b")
+        clock.advance(0)
+        client.uncork()
+        pump.flush()
+        self.assertEqual(server.wrappedProtocol.received, [b"ab"])
+
+
+    def test_corkLoseConnection(self):
+        """
+        The application data written while L{TLSMemoryBIOProtocol} is corked
+        is sent before the TLS shutdown started by C{loseConnection}.
+        """
+        client, server, pump = handshakingClientAndServer()
+        pump.flush()
+        # The server forgets its application protocol once the connection is
+        # lost.
+        app = server.wrappedProtocol
+        client.cork()
+        client.write(b"a")
+        client.loseConnection()
+        pump.flush()
+        self.assertEqual(app.received, [b"a"])
+
+
 
 class TLSMemoryBIOTests(TestCase):
     """
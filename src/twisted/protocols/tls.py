@@ -55,8 +55,9 @@ from twisted.python.failure import Failure
 from twisted.internet.interfaces import (
     ISystemHandle, INegotiated, IPushProducer, ILoggingContext,
     IOpenSSLServerConnectionCreator, IOpenSSLClientConnectionCreator,
-    IProtocolNegotiationFactory, IHandshakeListener
+    IProtocolNegotiationFactory, IHandshakeListener, ICorkableTransport
 )
+from twisted.internet.abstract import _callAtIterationEnd
 from twisted.internet.main import CONNECTION_LOST
 from twisted.internet._producer_helpers import _PullToPush
 from twisted.internet.protocol import Protocol
@@ -111,7 +112,7 @@ class _ProducerMembrane(object):
         self._producer.stopProducing()
 
 
-@implementer(ISystemHandle, INegotiated)
+@implementer(ISystemHandle, INegotiated, ICorkableTransport)
 class TLSMemoryBIOProtocol(ProtocolWrapper):
     """
     L{TLSMemoryBIOProtocol} is a protocol wrapper which uses OpenSSL via a
@@ -165,6 +166,16 @@ class TLSMemoryBIOProtocol(ProtocolWrapper):
     @ivar _aborted: C{abortConnection} has been called.  No further data will
         be received to the wrapped protocol's C{dataReceived}.
     @type _aborted: L{bool}
+
+    @ivar _corked: How many more times L{uncork} must be called before the
+        application data held back in C{_corkedWrites} is encrypted.
+    @type _corked: L{int}
+
+    @ivar _corkedWrites: Application data written while corked.
+    @type _corkedWrites: L{list} of L{bytes}
+
+    @ivar _uncorkCall: The call releasing C{_corkedWrites} at the end of the
+        reactor iteration, or L{None}.
     """
 
     _reason = None
@@ -172,6 +183,8 @@ class TLSMemoryBIOProtocol(ProtocolWrapper):
     _lostTLSConnection = False
     _producer = None
     _aborted = False
+    _corked = 0
+    _uncorkCall = None
 
     def __init__(self, factory, wrappedProtocol, _connectWrapped=True):
         ProtocolWrapper.__init__(self, factory, wrappedProtocol)
@@ -198,6 +211,7 @@ class TLSMemoryBIOProtocol(ProtocolWrapper):
         """
         self._tlsConnection = self.factory._createConnection(self)
         self._appSendBuffer = []
+        self._corkedWrites = []
 
         # Add interfaces provided by the transport we are wrapping:
         for interface in providedBy(transport):
@@ -400,6 +414,11 @@ class TLSMemoryBIOProtocol(ProtocolWrapper):
         reason = self._reason or reason
         self._reason = None
         self.connected = False
+        self._corked = 0
+        self._corkedWrites = []
+        if self._uncorkCall is not None:
+            self._uncorkCall.cancel()
+            self._uncorkCall = None
         ProtocolWrapper.connectionLost(self, reason)
 
         # Breaking reference cycle between self._tlsConnection and self.
@@ -412,6 +431,10 @@ class TLSMemoryBIOProtocol(ProtocolWrapper):
         """
         if self.disconnecting or not self.connected:
             return
+        if self._corked:
+            if self._uncorkCall is not None:
+                self._uncorkCall.cancel()
+            self._releaseCorked()
         # If connection setup has not finished, OpenSSL 1.0.2f+ will not shut
         # down the connection until we write some data to the connection which
         # allows the handshake to complete. However, since no data should be
@@ -432,6 +455,7 @@ class TLSMemoryBIOProtocol(ProtocolWrapper):
         """
         self._aborted = True
         self.disconnecting = True
+        self._corkedWrites = []
         self._shutdownTLS()
         self.transport.abortConnection()
 
@@ -464,9 +488,53 @@ class TLSMemoryBIOProtocol(ProtocolWrapper):
         # is unregistered:
         if self.disconnecting and self._producer is None:
             return
+        if self._corked and not self.disconnecting:
+            self._corkedWrites.append(bytes)
+            return
         self._write(bytes)
 
 
+    def cork(self):
+        """
+        Hold back the application data written from now on, so that it is
+        encrypted into as few TLS records as possible once released.
+
+        @see: L{twisted.internet.interfaces.ICorkableTransport.cork}
+        """
+        self._corked += 1
+        if self._uncorkCall is None:
+            self._uncorkCall = _callAtIterationEnd(
+                getattr(self.transport, "reactor", None), self._releaseCorked)
+
+
+    def uncork(self):
+        """
+        Undo one call to L{cork}, and encrypt the application data held back
+        once all of them are undone.
+
+        @see: L{twisted.internet.interfaces.ICorkableTransport.uncork}
+        """
+        if self._corked:
+            self._corked -= 1
+            if not self._corked:
+                if self._uncorkCall is not None:
+                    self._uncorkCall.cancel()
+                self._releaseCorked()
+
+
+    def _releaseCorked(self):
+        """
+        Encrypt and send the application data held back by L{cork}, either
+        because it was undone or because the reactor iteration in which it
+        was called ended.
+        """
+        self._corked = 0
+        self._uncorkCall = None
+        writes, self._corkedWrites = self._corkedWrites, []
+        if writes:
+            self._write(b"".join(writes))
+
+
     def _bufferedWrite(self, octets):
         """
         Put the given octets into L{TLSMemoryBIOProtocol._appSendBuffer}, and
@@ -0,0 +1,94 @@
+# -*- test-case-name: twisted.python.test.test_histogram -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Fixed-size histograms of durations, cheap enough to keep updating in
+production and to export for monitoring.
+"""
+
+from __future__ import division, absolute_import
+
+from bisect import bisect_left
+
+
+
+# From a tenth of a millisecond to ten seconds.
+DEFAULT_BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                  0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+
+class Histogram(object):
+    """
+    A histogram of durations, counted in buckets with fixed upper bounds.
+
+    @ivar bounds: The inclusive upper bounds of the buckets, in increasing
+        order.  A last bucket counts the values greater than all of them.
+    @type bounds: L{tuple} of L{float}
+
+    @ivar counts: The number of values in each bucket.
+    @type counts: L{list} of L{int}
+
+    @ivar count: The number of values recorded.
+    @type count: L{int}
+
+    @ivar total: The sum of the values recorded.
+    @type total: L{float}
+
+    @ivar maximum: The largest value recorded.
+    @type maximum: L{float}
+    """
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        """
+        @param bounds: See L{Histogram.bounds}.
+        """
+        self.bounds = tuple(bounds)
+        self.reset()
+
+
+    def reset(self):
+        """
+        Forget all the values recorded.
+        """
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+
+    def add(self, value):
+        """
+        Record a value.
+
+        @type value: L{float}
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+
+
+    def snapshot(self):
+        """
+        Get the values recorded so far.
+
+        @return: A L{dict} with the C{count}, C{total} and C{maximum} of the
+            values, and their C{buckets}: a L{list} of C{(bound, count)}
+            pairs where C{count} is the number of values lower than or equal
+            to C{bound}, the last bound being C{float("inf")}.
+        @rtype: L{dict}
+        """
+        buckets = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        return {
+            "count": self.count,
+            "total": self.total,
+            "maximum": self.maximum,
+            "buckets": buckets,
+        }
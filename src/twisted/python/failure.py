@@ -200,7 +200,6 @@ class Failure(BaseException):
     """
 
     pickled = 0
-    stack = None
 
     # The opcode of "yield" in Python bytecode. We need this in
     # _findFailure in order to identify whether an exception was
@@ -294,82 +293,24 @@ class Failure(BaseException):
                 # Python 3
                 tb = self.value.__traceback__
 
-        frames = self.frames = []
-        stack = self.stack = []
-
         # Added 2003-06-23 by Chris Armstrong. Yes, I actually have a
         # use case where I need this traceback object, and I've made
         # sure that it'll be cleaned up.
         self.tb = tb
 
-        if tb:
-            f = tb.tb_frame
-        elif not isinstance(self.value, Failure):
-            # We don't do frame introspection since it's expensive,
-            # and if we were passed a plain exception with no
-            # traceback, it's not useful anyway
-            f = stackOffset = None
-
-        while stackOffset and f:
-            # This excludes this Failure.__init__ frame from the
-            # stack, leaving it to start with our caller instead.
-            f = f.f_back
-            stackOffset -= 1
-
-        # Keeps the *full* stack.  Formerly in spread.pb.print_excFullStack:
-        #
-        #   The need for this function arises from the fact that several
-        #   PB classes have the peculiar habit of discarding exceptions
-        #   with bareword "except:"s.  This premature exception
-        #   catching means tracebacks generated here don't tend to show
-        #   what called upon the PB object.
-
-        while f:
-            if captureVars:
-                localz = f.f_locals.copy()
-                if f.f_locals is f.f_globals:
-                    globalz = {}
-                else:
-                    globalz = f.f_globals.copy()
-                for d in globalz, localz:
-                    if "__builtins__" in d:
-                        del d["__builtins__"]
-                localz = localz.items()
-                globalz = globalz.items()
-            else:
-                localz = globalz = ()
-            stack.insert(0, (
-                f.f_code.co_name,
-                f.f_code.co_filename,
-                f.f_lineno,
-                localz,
-                globalz,
-                ))
-            f = f.f_back
+        if tb is None:
+            self.frames = []
+            self.stack = []
+        elif captureVars:
+            # The variables have to be copied before the frames change them.
+            self.frames = _tracebackFrames(tb, captureVars)
+            self.stack = _callerFrames(tb, stackOffset, captureVars)
+        else:
+            # Walking the frames is much more expensive than raising the
+            # exception: it is left to __getattr__, for the failures which
+            # are formatted, pickled or cleaned.
+            self._stackOffset = stackOffset
 
-        while tb is not None:
-            f = tb.tb_frame
-            if captureVars:
-                localz = f.f_locals.copy()
-                if f.f_locals is f.f_globals:
-                    globalz = {}
-                else:
-                    globalz = f.f_globals.copy()
-                for d in globalz, localz:
-                    if "__builtins__" in d:
-                        del d["__builtins__"]
-                localz = list(localz.items())
-                globalz = list(globalz.items())
-            else:
-                localz = globalz = ()
-            frames.append((
-                f.f_code.co_name,
-                f.f_code.co_filename,
-                tb.tb_lineno,
-                localz,
-                globalz,
-                ))
-            tb = tb.tb_next
         if inspect.isclass(self.type) and issubclass(self.type, Exception):
             parentCs = getmro(self.type)
             self.parents = list(map(reflect.qual, parentCs))
@@ -377,6 +318,33 @@ class Failure(BaseException):
             self.parents = [self.type]
 
 
+    def __getattr__(self, name):
+        """
+        Compute the C{frames} and C{stack} of a L{Failure} created without
+        C{captureVars} the first time they are used.
+
+        The line numbers of the frames of C{stack} are those of the callers
+        at that time, which may have moved on since the L{Failure} was
+        created; L{Failure.cleanFailure} and pickling compute them.
+        """
+        state = self.__dict__
+        if name in ("frames", "stack") and "_stackOffset" in state:
+            if name == "frames":
+                value = _tracebackFrames(state["tb"], False)
+            else:
+                value = _callerFrames(state["tb"], state["_stackOffset"],
+                                      False)
+            state[name] = value
+            if "frames" in state and "stack" in state:
+                del state["_stackOffset"]
+            return value
+        if name == "stack":
+            # Some failures are built from a dictionary without a stack.
+            return None
+        raise AttributeError(
+            "%r object has no attribute %r" % (self.__class__.__name__, name))
+
+
     def _extrapolate(self, otherFailure):
         """
         Extrapolate from one failure into another, copying its stack frames.
@@ -577,6 +545,7 @@ class Failure(BaseException):
 
         # Added 2003-06-23. See comment above in __init__
         c['tb'] = None
+        c.pop('_stackOffset', None)
 
         if self.stack is not None:
             # XXX: This is a band-aid.  I can't figure out where these
@@ -731,6 +700,107 @@ class Failure(BaseException):
 
 
 
+def _frameVars(frame):
+    """
+    Copy the local and global variables of a frame.
+
+    @return: The items of the locals and of the globals of C{frame}, without
+        C{__builtins__}.  The globals are empty for a module frame, whose
+        locals are the globals.
+    @rtype: L{tuple} of two L{dict} views
+    """
+    localz = frame.f_locals.copy()
+    if frame.f_locals is frame.f_globals:
+        globalz = {}
+    else:
+        globalz = frame.f_globals.copy()
+    for d in globalz, localz:
+        if "__builtins__" in d:
+            del d["__builtins__"]
+    return localz.items(), globalz.items()
+
+
+
+def _tracebackFrames(tb, captureVars):
+    """
+    Describe the frames of a traceback, for L{Failure.frames}.
+
+    @param tb: The traceback, or L{None}.
+    @param captureVars: Whether to copy the variables of the frames.
+
+    @return: A C{(funcName, fileName, lineNumber, localsItems,
+        globalsItems)} tuple for each frame, innermost last.
+    @rtype: L{list}
+    """
+    frames = []
+    while tb is not None:
+        f = tb.tb_frame
+        if captureVars:
+            localz, globalz = _frameVars(f)
+            localz = list(localz)
+            globalz = list(globalz)
+        else:
+            localz = globalz = ()
+        frames.append((
+            f.f_code.co_name,
+            f.f_code.co_filename,
+            tb.tb_lineno,
+            localz,
+            globalz,
+            ))
+        tb = tb.tb_next
+    return frames
+
+
+
+def _callerFrames(tb, stackOffset, captureVars):
+    """
+    Describe the callers of the first frame of a traceback, for
+    L{Failure.stack}.
+
+    Keeps the *full* stack.  Formerly in spread.pb.print_excFullStack:
+
+      The need for this function arises from the fact that several PB
+      classes have the peculiar habit of discarding exceptions with
+      bareword "except:"s.  This premature exception catching means
+      tracebacks generated here don't tend to show what called upon the PB
+      object.
+
+    @param tb: The traceback, or L{None}.
+    @param stackOffset: The number of frames to skip, from the first frame
+        of the traceback.
+    @param captureVars: Whether to copy the variables of the frames.
+
+    @return: Tuples like those of L{_tracebackFrames}, innermost last.
+    @rtype: L{list}
+    """
+    if tb is None:
+        return []
+    f = tb.tb_frame
+    while stackOffset and f:
+        # This excludes the Failure.__init__ frame from the stack, leaving it
+        # to start with its caller instead.
+        f = f.f_back
+        stackOffset -= 1
+    stack = []
+    while f:
+        if captureVars:
+            localz, globalz = _frameVars(f)
+        else:
+            localz = globalz = ()
+        stack.append((
+            f.f_code.co_name,
+            f.f_code.co_filename,
+            f.f_lineno,
+            localz,
+            globalz,
+            ))
+        f = f.f_back
+    stack.reverse()
+    return stack
+
+
+
 def _safeReprVars(varsDictItems):
     """
     Convert a list of (name, object) pairs into (name, repr) pairs.
@@ -0,0 +1,60 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.python._histogram}.
+"""
+
+from __future__ import division, absolute_import
+
+from twisted.python._histogram import Histogram
+from twisted.trial.unittest import SynchronousTestCase
+
+
+
+class HistogramTests(SynchronousTestCase):
+    """
+    Tests for L{Histogram}.
+    """
+
+    def test_add(self):
+        """
+        L{Histogram.add} counts a value in the first bucket whose bound is
+        greater than or equal to it, and in the totals.
+        """
+        histogram = Histogram((1, 2))
+        for value in (0.5, 1, 1.5, 3):
+            histogram.add(value)
+        self.assertEqual(histogram.counts, [2, 1, 1])
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.total, 6)
+        self.assertEqual(histogram.maximum, 3)
+
+
+    def test_snapshot(self):
+        """
+        L{Histogram.snapshot} returns cumulative bucket counts, ending with
+        an infinite bound.
+        """
+        histogram = Histogram((1, 2))
+        histogram.add(0.5)
+        histogram.add(3)
+        self.assertEqual(histogram.snapshot(), {
+            "count": 2,
+            "total": 3.5,
+            "maximum": 3,
+            "buckets": [(1, 1), (2, 1), (float("inf"), 2)],
+        })
+
+
+    def test_reset(self):
+        """
+        L{Histogram.reset} forgets the values recorded.
+        """
+        histogram = Histogram((1,))
+        histogram.add(2)
+        histogram.reset()
+        self.assertEqual(
+            (histogram.counts, histogram.count, histogram.total,
+             histogram.maximum),
+            ([0, 0], 0, 0, 0))
@@ -6,7 +6,9 @@
 twisted.python.threadpool: a pool of threads to which we dispatch tasks.
 
 In most cases you can just use C{reactor.callInThread} and friends
-instead of creating a thread pool directly.
+instead of creating a thread pool directly, or a separate pool returned by
+C{reactor.getThreadPool(name)} for work which should not compete for
+threads with the rest of the application.
 """
 
 from __future__ import division, absolute_import
@@ -15,6 +17,8 @@ import threading
 
 from twisted._threads import pool as _pool
 from twisted.python import log, context
+from twisted.python._histogram import Histogram
+from twisted.python.runtime import seconds as runtimeSeconds
 from twisted.python.failure import Failure
 from twisted.python._oldstyle import _oldStyle
 
@@ -31,14 +35,40 @@ class ThreadPool:
 
     L{callInThread} and L{stop} should only be called from a single thread.
 
+    The size of the pool follows its load: a thread is started whenever work
+    would otherwise have to wait, up to C{max} threads, and, if
+    C{idleTimeout} is set, a thread which had nothing to do for that long
+    stops, down to C{min} threads.  How long work waited for a thread and
+    how long it ran are recorded in the histograms C{queueLatencies} and
+    C{runTimes}, which are returned by L{ThreadPool.statistics}.
+
     @ivar started: Whether or not the thread pool is currently running.
     @type started: L{bool}
 
     @ivar threads: List of workers currently running in this thread pool.
     @type threads: L{list}
 
+    @ivar idleTimeout: How long, in seconds, a thread may stay idle before
+        it stops, if the pool has more than C{min} threads, or L{None} to
+        keep idle threads until the pool is stopped or resized.
+    @type idleTimeout: L{float} or L{None}
+
+    @ivar queueLatencies: How long each call waited for a thread, from the
+        call to L{ThreadPool.callInThreadWithCallback} to the start of its
+        function.
+    @type queueLatencies: L{twisted.python._histogram.Histogram}
+
+    @ivar runTimes: How long the function of each call ran.
+    @type runTimes: L{twisted.python._histogram.Histogram}
+
+    @ivar _statisticsLock: Protects C{queueLatencies} and C{runTimes}, which
+        are updated by the threads of the pool; L{None} in the subclasses
+        which do not call L{ThreadPool.__init__}, which record nothing.
+
     @ivar _pool: A hook for testing.
     @type _pool: callable compatible with L{_pool}
+
+    @ivar _clock: Returns the current time, in seconds; a hook for testing.
     """
     min = 5
     max = 20
@@ -46,12 +76,18 @@ class ThreadPool:
     started = False
     workers = 0
     name = None
+    idleTimeout = None
+    queueLatencies = None
+    runTimes = None
+    _statisticsLock = None
 
     threadFactory = threading.Thread
     currentThread = staticmethod(threading.currentThread)
     _pool = staticmethod(_pool)
+    _clock = staticmethod(runtimeSeconds)
 
-    def __init__(self, minthreads=5, maxthreads=20, name=None):
+    def __init__(self, minthreads=5, maxthreads=20, name=None,
+                 idleTimeout=None):
         """
         Create a new threadpool.
 
@@ -63,15 +99,25 @@ class ThreadPool:
 
         @param name: The name to give this threadpool; visible in log messages.
         @type name: native L{str}
+
+        @param idleTimeout: See L{ThreadPool.idleTimeout}.
+        @type idleTimeout: L{float} or L{None}
         """
         assert minthreads >= 0, 'minimum is negative'
         assert minthreads <= maxthreads, 'minimum is greater than maximum'
         self.min = minthreads
         self.max = maxthreads
         self.name = name
+        self.idleTimeout = idleTimeout
         self.threads = []
+        self.queueLatencies = Histogram()
+        self.runTimes = Histogram()
+        self._statisticsLock = threading.Lock()
 
         def trackingThreadFactory(*a, **kw):
+            # Forget the threads which stopped because they were idle.
+            self.threads = [thread for thread in self.threads
+                            if thread.is_alive()]
             thread = self.threadFactory(*a, name=self._generateName(), **kw)
             self.threads.append(thread)
             return thread
@@ -81,7 +127,9 @@ class ThreadPool:
                 return 0
             return self.max
 
-        self._team = self._pool(currentLimit, trackingThreadFactory)
+        self._team = self._pool(currentLimit, trackingThreadFactory,
+                                idleTimeout=lambda: self.idleTimeout,
+                                currentMinimum=lambda: self.min)
 
 
     @property
@@ -188,13 +236,16 @@ class ThreadPool:
 
     def __setstate__(self, state):
         setattr(self, "__dict__", state)
-        ThreadPool.__init__(self, self.min, self.max)
+        ThreadPool.__init__(self, self.min, self.max,
+                            idleTimeout=self.idleTimeout)
 
 
     def __getstate__(self):
         state = {}
         state['min'] = self.min
         state['max'] = self.max
+        if self.idleTimeout is not None:
+            state['idleTimeout'] = self.idleTimeout
         return state
 
 
@@ -244,8 +295,10 @@ class ThreadPool:
         if self.joined:
             return
         ctx = context.theContextTracker.currentContext().contexts[-1]
+        clock = self._clock
 
         def inContext():
+            started = clock()
             try:
                 result = inContext.theWork()
                 ok = True
@@ -253,6 +306,7 @@ class ThreadPool:
                 result = Failure()
                 ok = False
 
+            self._recordCall(started - inContext.queued, clock() - started)
             inContext.theWork = None
             if inContext.onResult is not None:
                 inContext.onResult(ok, result)
@@ -265,10 +319,56 @@ class ThreadPool:
         # test_threadCreationArgumentsCallInThreadWithCallback.
         inContext.theWork = lambda: context.call(ctx, func, *args, **kw)
         inContext.onResult = onResult
+        inContext.queued = clock()
 
         self._team.do(inContext)
 
 
+    def _recordCall(self, latency, runTime):
+        """
+        Record how long a call waited for a thread and ran.
+
+        @param latency: The time it waited, in seconds.
+        @type latency: L{float}
+
+        @param runTime: The time its function ran, in seconds.
+        @type runTime: L{float}
+        """
+        if self._statisticsLock is None:
+            return
+        with self._statisticsLock:
+            self.queueLatencies.add(latency)
+            self.runTimes.add(runTime)
+
+
+    def statistics(self):
+        """
+        Describe the current activity of this pool, and how long the calls
+        made so far waited for a thread and ran.
+
+        @return: A L{dict} with the numbers of C{idleWorkers} and
+            C{busyWorkers}, the number of calls waiting for a thread as
+            C{backlog}, and the L{Histogram.snapshot
+            <twisted.python._histogram.Histogram.snapshot>} of
+            C{queueLatencies} and C{runTimes}.
+        @rtype: L{dict}
+        """
+        stats = self._team.statistics()
+        if self._statisticsLock is None:
+            queueLatencies = runTimes = Histogram().snapshot()
+        else:
+            with self._statisticsLock:
+                queueLatencies = self.queueLatencies.snapshot()
+                runTimes = self.runTimes.snapshot()
+        return {
+            "idleWorkers": stats.idleWorkerCount,
+            "busyWorkers": stats.busyWorkerCount,
+            "backlog": stats.backloggedWorkCount,
+            "queueLatencies": queueLatencies,
+            "runTimes": runTimes,
+        }
+
+
     def stop(self):
         """
         Shutdown the threads in the threadpool.
@@ -15,6 +15,7 @@ from twisted.python.compat import (intToBytes, _bytesRepr, _PY3)
 from twisted.python.util import (
     switchUID, uidFromString, gidFromString, untilConcludes)
 from twisted.application import app, service
+from twisted.application.runner._workers import workerID
 from twisted.internet.interfaces import IReactorDaemonize
 from twisted import copyright, logger
 from twisted.python.runtime import platformType
@@ -82,6 +83,12 @@ class ServerOptions(app.ServerOptions):
 
     def postOptions(self):
         app.ServerOptions.postOptions(self)
+        if workerID() is not None:
+            # Workers are supervised by the twistd which started them, which
+            # also relays their output to its log.
+            self['nodaemon'] = True
+            self['pidfile'] = ''
+            self['logfile'] = '-'
         if self['pidfile']:
             self['pidfile'] = os.path.abspath(self['pidfile'])
 
@@ -1069,6 +1069,58 @@ class BinaryProtocolTests(unittest.TestCase):
         self.assertEqual(b''.join(self.data), aBox.serialize())
 
 
+    def test_corkedWhileReceiving(self):
+        """
+        When its transport is a TLS layer providing L{ICorkableTransport}, a
+        binary box protocol corks it while handling the data received, so
+        that the boxes sent in response to several boxes are encrypted
+        together.
+        """
+        events = []
+
+        @implementer(interfaces.ICorkableTransport, interfaces.ISSLTransport)
+        class CorkingTransport(StringTransport):
+            def cork(self):
+                events.append("cork")
+
+            def uncork(self):
+                events.append("uncork")
+
+            def write(self, data):
+                events.append(data)
+
+        self.ampBoxReceived = lambda box: self._boxSender.sendBox(box)
+        a = amp.BinaryBoxProtocol(self)
+        a.makeConnection(CorkingTransport())
+        first = amp.Box({b"n": b"1"}).serialize()
+        second = amp.Box({b"n": b"2"}).serialize()
+        a.dataReceived(first + second)
+        self.assertEqual(events, ["cork", first, second, "uncork"])
+
+
+    def test_notCorkedWithoutTLS(self):
+        """
+        A binary box protocol does not cork a transport providing
+        L{ICorkableTransport} which is not a TLS layer, since it already
+        buffers the data written.
+        """
+        corked = []
+
+        @implementer(interfaces.ICorkableTransport)
+        class CorkingTransport(StringTransport):
+            def cork(self):
+                corked.append(True)
+
+        self.ampBoxReceived = lambda box: self._boxSender.sendBox(box)
+        a = amp.BinaryBoxProtocol(self)
+        transport = CorkingTransport()
+        a.makeConnection(transport)
+        box = amp.Box({b"n": b"1"}).serialize()
+        a.dataReceived(box)
+        self.assertEqual(corked, [])
+        self.assertEqual(transport.value(), box)
+
+
     def test_connectionLostStopSendingBoxes(self):
         """
         When a binary box protocol loses its connection, it should notify its
@@ -709,3 +709,172 @@ class RunStateTests(unittest.TestCase):
 
 
 
+
+
+
+class FakeClock(object):
+    """
+    A clock which only moves when told to.
+
+    @ivar now: The current time.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+
+    def __call__(self):
+        return self.now
+
+
+
+class SchedulingTests(unittest.TestCase):
+    """
+    Tests for the priorities and weights of L{task.CooperativeTask}s, the
+    time slices of L{task.Cooperator} and its statistics.
+    """
+
+    def setUp(self):
+        """
+        Create a cooperator with a fake scheduler and clock.
+        """
+        self.scheduler = FakeScheduler()
+        self.clock = FakeClock()
+        self.cooperator = task.Cooperator(scheduler=self.scheduler)
+        self.cooperator._clock = self.clock
+        self.work = []
+
+
+    def worker(self, name, steps=10, duration=0.0):
+        """
+        An iterator recording its units of work in C{self.work}.
+
+        @param name: The name recorded for each unit of work.
+        @param steps: The number of units of work.
+        @param duration: How long each unit of work takes, in seconds.
+        """
+        for i in range(steps):
+            self.work.append(name)
+            self.clock.now += duration
+            yield None
+
+
+    def test_priority(self):
+        """
+        Tasks are only given work when the tasks with a higher priority are
+        done or paused.
+        """
+        self.cooperator.cooperate(self.worker("low", 2), priority=-1)
+        high = self.cooperator.cooperate(self.worker("high", 3), priority=1)
+        self.cooperator.cooperate(self.worker("normal", 2))
+        high.pause()
+        self.scheduler.pump()
+        high.resume()
+        self.scheduler.pump()
+        self.assertEqual(
+            self.work,
+            ["normal", "normal", "low", "low", "high", "high", "high"])
+
+
+    def test_weight(self):
+        """
+        Each task with the highest priority is given as many units of work
+        as its weight each time the cooperator goes round them.
+        """
+        self.cooperator = task.Cooperator(
+            scheduler=self.scheduler,
+            terminationPredicateFactory=lambda: lambda: len(self.work) >= 6)
+        self.cooperator.cooperate(self.worker("a"), weight=2)
+        self.cooperator.cooperate(self.worker("b"))
+        self.scheduler.pump()
+        self.assertEqual(self.work, ["a", "a", "b", "a", "a", "b"])
+
+
+    def test_invalidWeight(self):
+        """
+        L{task.Cooperator.cooperate} raises L{ValueError} if the weight is
+        lower than 1.
+        """
+        self.assertRaises(ValueError, self.cooperator.cooperate,
+                          self.worker("a"), weight=0)
+        self.assertEqual(self.cooperator._tasks, [])
+
+
+    def test_timeSlice(self):
+        """
+        With the default termination predicate, a step lasts C{timeSlice}
+        seconds.
+        """
+        self.cooperator.timeSlice = 0.005
+        self.cooperator.cooperate(self.worker("a", duration=0.002))
+        self.scheduler.pump()
+        self.assertEqual(len(self.work), 3)
+
+
+    def test_adaptiveTimeSlice(self):
+        """
+        The time slice is halved when a step runs late by more than
+        C{lagThreshold}, down to C{minimumTimeSlice}, and grows back after
+        steps run on time, up to C{maximumTimeSlice}.
+        """
+        cooperator = self.cooperator
+        cooperator._measureLag = True
+        cooperator.minimumTimeSlice = 0.001
+        cooperator.maximumTimeSlice = 0.004
+        cooperator.lagThreshold = 0.01
+        cooperator.timeSlice = 0.004
+        cooperator.cooperate(self.worker("a", steps=100, duration=0.001))
+        slices = []
+        for lag in [0.02, 0.02, 0.02, 0.0, 0.0, 0.0, 0.0, 0.0]:
+            self.clock.now += lag
+            self.scheduler.pump()
+            slices.append(cooperator.timeSlice)
+        self.assertEqual(cooperator.lag, 0.0)
+        self.assertEqual(
+            slices, [0.002, 0.001, 0.001, 0.002, 0.003, 0.004, 0.004, 0.004])
+
+
+    def test_customSchedulerLag(self):
+        """
+        The lag of the steps is only measured with the default scheduler:
+        other schedulers may delay the steps on purpose.
+        """
+        self.assertTrue(task.Cooperator()._measureLag)
+        cooperator = self.cooperator
+        cooperator.timeSlice = 0.004
+        cooperator.cooperate(self.worker("a", steps=100, duration=0.001))
+        for i in range(3):
+            self.clock.now += 1
+            self.scheduler.pump()
+        self.assertEqual((cooperator.lag, cooperator.timeSlice), (0.0, 0.004))
+
+
+    def test_customTerminationPredicate(self):
+        """
+        A custom termination predicate is used as is, whatever the lag.
+        """
+        self.cooperator = task.Cooperator(
+            scheduler=self.scheduler,
+            terminationPredicateFactory=lambda: lambda: True)
+        self.cooperator._clock = self.clock
+        self.cooperator.cooperate(self.worker("a"))
+        self.clock.now += 1
+        self.scheduler.pump()
+        self.assertEqual(self.work, ["a"])
+
+
+    def test_statistics(self):
+        """
+        The cooperator and each task count the units of work done, including
+        the one finding the iterator exhausted, and the time they took, and
+        the cooperator counts its steps.
+        """
+        a = self.cooperator.cooperate(self.worker("a", 2, duration=0.001))
+        b = self.cooperator.cooperate(self.worker("b", 1, duration=0.003))
+        self.scheduler.pump()
+        self.assertEqual((a.steps, b.steps), (3, 2))
+        self.assertAlmostEqual(a.timeUsed, 0.002)
+        self.assertAlmostEqual(b.timeUsed, 0.003)
+        self.assertEqual(self.cooperator.steps, 5)
+        self.assertAlmostEqual(self.cooperator.timeUsed, 0.005)
+        self.assertEqual(self.cooperator.ticks, 1)
@@ -1430,6 +1430,134 @@ class DeferredTests(unittest.SynchronousTestCase, ImmediateFailureMixin):
         self.assertEqual('f.raiseException()', tb[0][3])
 
 
+    def test_instanceAttributes(self):
+        """
+        Other attributes than those of L{defer.Deferred} can be set on its
+        instances.
+        """
+        d = defer.Deferred()
+        d.tag = "some tag"
+        self.assertEqual(d.tag, "some tag")
+
+
+    def test_classDebugAssignment(self):
+        """
+        Assigning C{Deferred.debug} directly, as code written for older
+        versions of Twisted does, enables or disables debugging until
+        L{defer.setDebugging} is called.
+        """
+        defer.setDebugging(False)
+        self.addCleanup(defer.setDebugging, False)
+        defer.Deferred.debug = True
+        self.assertTrue(defer.getDebugging())
+        d = defer.Deferred()
+        self.assertTrue(d.debug)
+        self.assertIsNotNone(d._debugInfo.creator)
+
+        defer.Deferred.debug = False
+        self.assertFalse(defer.getDebugging())
+        self.assertFalse(defer.Deferred().debug)
+
+        defer.Deferred.debug = True
+        defer.setDebugging(False)
+        self.assertFalse(defer.getDebugging())
+        d = defer.Deferred()
+        self.assertFalse(d.debug)
+        self.assertIsNone(d._debugInfo)
+
+
+    def test_debugOverride(self):
+        """
+        Setting C{debug} on a L{defer.Deferred} overrides the value set by
+        L{defer.setDebugging} for this L{defer.Deferred} only.
+        """
+        defer.setDebugging(False)
+        overridden = defer.Deferred()
+        overridden.debug = True
+        other = defer.Deferred()
+        self.assertEqual((overridden.debug, other.debug), (True, False))
+        defer.setDebugging(True)
+        overridden.debug = False
+        self.assertEqual((overridden.debug, other.debug), (False, True))
+        self.assertTrue(defer.Deferred.debug)
+
+
+    def test_debugSampling(self):
+        """
+        With a C{sampleInterval}, L{defer.setDebugging} only enables
+        debugging for one L{defer.Deferred} out of that number; the others do
+        not record their creator nor capture the variables of their
+        failures.
+        """
+        defer.setDebugging(True, sampleInterval=3)
+        deferreds = [defer.Deferred() for i in range(6)]
+        self.assertEqual([d.debug for d in deferreds],
+                         [False, False, True, False, False, True])
+        self.assertIsNone(deferreds[0]._debugInfo)
+        self.assertIsNotNone(deferreds[2]._debugInfo.creator)
+
+        def raiseError(ignored):
+            raise GenericError("Bang")
+        failures = []
+        for d in deferreds[1:3]:
+            d.addCallback(raiseError)
+            d.addErrback(failures.append)
+            d.callback(None)
+        self.assertEqual(failures[0].frames[0][-2:], ((), ()))
+        self.assertNotEqual(failures[1].frames[0][-1], [])
+
+
+    def test_debugSamplingInvalidInterval(self):
+        """
+        L{defer.setDebugging} raises L{ValueError} if C{sampleInterval} is
+        lower than 1, without changing the debugging flag.
+        """
+        defer.setDebugging(False)
+        self.assertRaises(ValueError, defer.setDebugging, True, 0)
+        self.assertFalse(defer.getDebugging())
+
+
+    def test_callbacksConsumed(self):
+        """
+        The callbacks of a L{defer.Deferred}, including the ones added by
+        other callbacks while it runs them, are run in order and removed
+        once run, whether they were added with or without arguments and
+        errbacks.
+        """
+        called = []
+        def record(result, *args, **kwargs):
+            called.append((result, args, kwargs))
+            return result + 1
+        def addMore(result):
+            d.addCallback(record, "added")
+            d.addErrback(record)
+            d.addCallback(record)
+            return result
+        d = defer.Deferred()
+        d.addCallback(record)
+        d.addBoth(record, keyword=1)
+        d.addCallback(addMore)
+        d.addCallbacks(record, record, callbackArgs=(2,))
+        d.callback(0)
+        self.assertEqual(called, [
+            (0, (), {}), (1, (), {"keyword": 1}), (2, (2,), {}),
+            (3, ("added",), {}), (4, (), {})])
+        self.assertEqual(d.callbacks, [])
+        self.assertEqual(self.successResultOf(d), 5)
+
+
+    def test_failureSkipsCallbacks(self):
+        """
+        A failure skips the callbacks added without an errback, and is
+        handled by the next errback.
+        """
+        d = defer.fail(ZeroDivisionError())
+        d.addCallback(lambda result: self.fail("Callback called."))
+        d.addCallback(lambda result, extra: self.fail("Callback called."), 1)
+        d.addErrback(lambda failure: failure.trap(ZeroDivisionError))
+        self.assertIs(self.successResultOf(d), ZeroDivisionError)
+
+
 
 class FirstErrorTests(unittest.SynchronousTestCase):
     """
@@ -1965,9 +2093,8 @@ class LogTests(unittest.SynchronousTestCase):
         Same as L{test_errorLogWithInnerFrameRef}, plus create a cycle.
         """
         def _subErrorLogWithInnerFrameCycle():
-            d = defer.Deferred()
+            d = defer.Deferred(lambda ignored: d)
             d.addCallback(lambda x, d=d: 1 // 0)
-            d._d = d
             d.callback(1)
 
         _subErrorLogWithInnerFrameCycle()
@@ -2325,6 +2452,235 @@ class OtherPrimitivesTests(unittest.SynchronousTestCase, ImmediateFailureMixin):
 
 
 
+class ConcurrentMapTests(unittest.SynchronousTestCase):
+    """
+    Tests for L{defer.concurrentMap} and L{defer.ConcurrentMap}.
+    """
+
+    def setUp(self):
+        """
+        Create a L{task.Cooperator} whose steps are run by L{runSteps}, and
+        record the calls of the mapped function.
+        """
+        from twisted.internet import task
+        self.steps = []
+        self.cooperator = task.Cooperator(scheduler=self.steps.append)
+        self.calls = {}
+
+
+    def runSteps(self):
+        """
+        Run the steps of the cooperator until it has no more work to do.
+        """
+        while self.steps:
+            self.steps.pop(0)()
+
+
+    def call(self, item):
+        """
+        The mapped function, returning a L{defer.Deferred} kept in C{calls}.
+        """
+        d = self.calls[item] = defer.Deferred()
+        return d
+
+
+    def concurrentMap(self, f, iterable, limit, ordered=True):
+        """
+        Call L{defer.concurrentMap} with the test cooperator.
+        """
+        return defer.concurrentMap(f, iterable, limit, ordered,
+                                   self.cooperator)
+
+
+    def consume(self, results):
+        """
+        Consume all the results available, running the steps of the
+        cooperator when none is.
+
+        @return: The results, the last one being C{"end"} if the
+            L{defer.ConcurrentMap} is exhausted.
+        """
+        consumed = []
+        while True:
+            d = results.get()
+            self.runSteps()
+            if not d.called:
+                d.cancel()
+                self.failureResultOf(d, defer.CancelledError)
+                return consumed
+            if isinstance(d.result, failure.Failure) and d.result.check(
+                    StopIteration):
+                self.failureResultOf(d)
+                consumed.append("end")
+                return consumed
+            consumed.append(self.successResultOf(d))
+
+
+    def test_invalidLimit(self):
+        """
+        L{defer.concurrentMap} raises L{ValueError} if the limit is lower
+        than 1.
+        """
+        self.assertRaises(ValueError, self.concurrentMap, self.call, [1], 0)
+
+
+    def test_lazy(self):
+        """
+        The items of the iterable are taken as results are consumed, at most
+        C{limit} results being waited for or not consumed.
+        """
+        taken = []
+        def items():
+            for i in range(5):
+                taken.append(i)
+                yield i
+        results = self.concurrentMap(self.call, items(), 2)
+        self.runSteps()
+        self.assertEqual((taken, sorted(self.calls)), ([0, 1], [0, 1]))
+        self.calls[0].callback("a")
+        self.runSteps()
+        self.assertEqual(taken, [0, 1])
+        self.assertEqual(self.consume(results), ["a"])
+        self.assertEqual(taken, [0, 1, 2])
+
+
+    def test_ordered(self):
+        """
+        By default, the results are given in the order of the items.
+        """
+        results = self.concurrentMap(self.call, [0, 1, 2], 3)
+        self.runSteps()
+        self.calls[2].callback("c")
+        self.calls[1].callback("b")
+        self.assertEqual(self.consume(results), [])
+        self.calls[0].callback("a")
+        self.assertEqual(self.consume(results), ["a", "b", "c", "end"])
+
+
+    def test_unordered(self):
+        """
+        If C{ordered} is C{False}, the results are given as they are ready.
+        """
+        results = self.concurrentMap(self.call, [0, 1, 2], 3, ordered=False)
+        self.runSteps()
+        self.calls[2].callback("c")
+        self.calls[0].callback("a")
+        self.assertEqual(self.consume(results), ["c", "a"])
+        self.calls[1].callback("b")
+        self.assertEqual(self.consume(results), ["b", "end"])
+
+
+    def test_waitingGet(self):
+        """
+        The L{defer.Deferred} returned by L{defer.ConcurrentMap.get} before a
+        result is ready fires with it once it is.
+        """
+        results = self.concurrentMap(self.call, [0], 1)
+        d = results.get()
+        self.runSteps()
+        self.assertNoResult(d)
+        self.calls[0].callback("a")
+        self.assertEqual(self.successResultOf(d), "a")
+        self.assertEqual(self.consume(results), ["end"])
+
+
+    def test_synchronousResults(self):
+        """
+        The function may return results rather than L{defer.Deferred}s.
+        """
+        results = self.concurrentMap(lambda item: item * 2, range(5), 2)
+        consumed = []
+        while consumed[-1:] != ["end"]:
+            self.runSteps()
+            consumed.extend(self.consume(results))
+        self.assertEqual(consumed, [0, 2, 4, 6, 8, "end"])
+
+
+    def test_errors(self):
+        """
+        The exceptions raised by the function are given in place of its
+        results, and the iterable goes on.
+        """
+        results = self.concurrentMap(lambda item: 1 // item, [0, 1], 2)
+        self.runSteps()
+        self.failureResultOf(results.get(), ZeroDivisionError)
+        self.assertEqual(self.consume(results), [1, "end"])
+
+
+    def test_iterableError(self):
+        """
+        An exception raised by the iterable is given after the results of the
+        items taken before it.
+        """
+        def items():
+            yield 1
+            raise GenericError()
+        results = self.concurrentMap(lambda item: item, items(), 2)
+        self.runSteps()
+        self.assertEqual(self.successResultOf(results.get()), 1)
+        self.failureResultOf(results.get(), GenericError)
+        self.assertEqual(self.consume(results), ["end"])
+
+
+    def test_stop(self):
+        """
+        After L{defer.ConcurrentMap.stop}, no more items are taken, and the
+        results of the calls already made are still given.
+        """
+        results = self.concurrentMap(self.call, range(10), 2)
+        self.runSteps()
+        results.stop()
+        self.calls[0].callback("a")
+        self.calls[1].callback("b")
+        self.runSteps()
+        self.assertEqual(sorted(self.calls), [0, 1])
+        self.assertEqual(self.consume(results), ["a", "b", "end"])
+        results.stop()
+
+
+    def test_cooperatorStopped(self):
+        """
+        If the cooperator is stopped, the results of the calls already made
+        are given, and then a L{task.SchedulerStopped} failure.
+        """
+        from twisted.internet.task import SchedulerStopped
+        results = self.concurrentMap(self.call, range(10), 1)
+        self.runSteps()
+        self.cooperator.stop()
+        self.calls[0].callback("a")
+        self.assertEqual(self.successResultOf(results.get()), "a")
+        self.failureResultOf(results.get(), SchedulerStopped)
+        self.assertEqual(self.consume(results), ["end"])
+
+
+    def test_cancelGet(self):
+        """
+        Cancelling the L{defer.Deferred} returned by
+        L{defer.ConcurrentMap.get} leaves the result to the next one.
+        """
+        results = self.concurrentMap(self.call, [0], 1)
+        self.runSteps()
+        d = results.get()
+        d.cancel()
+        self.failureResultOf(d, defer.CancelledError)
+        self.calls[0].callback("a")
+        self.assertEqual(self.consume(results), ["a", "end"])
+
+
+    def test_defaultCooperator(self):
+        """
+        By default, the calls are made by the global cooperator.
+        """
+        from twisted.internet import task
+        self.patch(task, "_theCooperator", self.cooperator)
+        results = defer.concurrentMap(self.call, [0], 1)
+        self.runSteps()
+        self.assertEqual(list(self.calls), [0])
+        self.calls[0].callback("a")
+        self.assertEqual(self.consume(results), ["a", "end"])
+
+
+
 class DeferredFilesystemLockTests(unittest.TestCase):
     """
     Test the behavior of L{DeferredFilesystemLock}
@@ -565,6 +565,56 @@ class FailureTests(SynchronousTestCase):
             '%s: division by zero>' % (typeName,))
 
 
+    def test_lazyFrames(self):
+        """
+        The C{frames} and C{stack} of a L{failure.Failure} created without
+        C{captureVars} are only computed when used, with the same result as
+        if they had been computed by the constructor.
+        """
+        f = getDivisionFailure()
+        self.assertNotIn("frames", f.__dict__)
+        self.assertNotIn("stack", f.__dict__)
+        expected = getDivisionFailure(captureVars=True)
+        self.assertEqual([frame[:2] for frame in f.frames],
+                         [frame[:2] for frame in expected.frames])
+        self.assertEqual([frame[:2] for frame in f.stack],
+                         [frame[:2] for frame in expected.stack])
+        self.assertIs(f.__dict__["frames"], f.frames)
+        self.assertNotIn("_stackOffset", f.__dict__)
+
+
+    def test_cleanFailureComputesFrames(self):
+        """
+        L{failure.Failure.cleanFailure} computes the C{frames} and C{stack}
+        before dropping the traceback they come from.
+        """
+        f = getDivisionFailure()
+        f.cleanFailure()
+        self.assertIsNone(f.tb)
+        self.assertEqual(f.frames[-1][0], "getDivisionFailure")
+        self.assertEqual(f.stack[-1][0], "test_cleanFailureComputesFrames")
+
+
+    def test_picklingComputesFrames(self):
+        """
+        The state of a pickled L{failure.Failure} includes its C{frames} and
+        its C{stack}.
+        """
+        state = getDivisionFailure().__getstate__()
+        self.assertEqual(state["frames"][-1][0], "getDivisionFailure")
+        self.assertEqual(state["stack"][-1][0], "test_picklingComputesFrames")
+        self.assertNotIn("_stackOffset", state)
+
+
+    def test_unknownAttribute(self):
+        """
+        Looking up an attribute a L{failure.Failure} does not have raises
+        L{AttributeError}.
+        """
+        f = getDivisionFailure()
+        self.assertRaises(AttributeError, getattr, f, "noSuchAttribute")
+
+
 
 class BrokenStr(Exception):
     """
@@ -871,6 +871,54 @@ class TimeoutMixinTests(unittest.TestCase):
         self.assertIsNone(self.proto.timeOut)
 
 
+    def test_lazyNoTimeout(self):
+        """
+        With C{lazyTimeout} set, receiving data delays the timeout of the
+        connection without rescheduling the timeout call.
+        """
+        self.proto.lazyTimeout = True
+        self.proto.makeConnection(StringTransport())
+        [call] = self.clock.getDelayedCalls()
+
+        self.clock.pump([0, 0.5, 1.0, 1.0])
+        self.proto.dataReceived(b'hello there')
+        self.assertEqual(call.getTime(), 3)
+        self.clock.pump([0, 1.0, 1.0, 0.5])
+        self.assertFalse(self.proto.timedOut)
+        self.clock.pump([0, 1.0])
+        self.assertTrue(self.proto.timedOut)
+
+
+    def test_lazyTimeout(self):
+        """
+        With C{lazyTimeout} set, the protocol times out at the time specified
+        by its C{timeOut} attribute if no data is received.
+        """
+        self.proto.lazyTimeout = True
+        self.proto.makeConnection(StringTransport())
+
+        self.clock.pump([0, 0.5, 1.0, 1.0])
+        self.assertFalse(self.proto.timedOut)
+        self.clock.pump([0, 1.0])
+        self.assertTrue(self.proto.timedOut)
+
+
+    def test_lazySetTimeout(self):
+        """
+        With C{lazyTimeout} set, L{policies.TimeoutMixin.setTimeout} discards
+        the time recorded by the last
+        L{policies.TimeoutMixin.resetTimeout}.
+        """
+        self.proto.lazyTimeout = True
+        self.proto.makeConnection(StringTransport())
+
+        self.clock.advance(2)
+        self.proto.dataReceived(b'hello there')
+        self.proto.setTimeout(1)
+        self.clock.advance(1)
+        self.assertTrue(self.proto.timedOut)
+
+
 
 class LimitTotalConnectionsFactoryTests(unittest.TestCase):
     """Tests for policies.LimitTotalConnectionsFactory"""
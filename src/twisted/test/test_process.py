@@ -920,6 +920,37 @@ class FDTests(unittest.TestCase):
         return d
 
 
+    def test_FDSpawned(self):
+        """
+        When possible, the child is started with C{os.posix_spawn} rather
+        than forked, and gets the file descriptors of C{childFDs} all the
+        same.
+        """
+        def fork(*args, **kwargs):
+            raise RuntimeError("The child should not be forked.")
+        self.patch(process.Process, "_fork", fork)
+        return self.test_FD()
+
+    if process is None or getattr(os, "posix_spawn", None) is None:
+        test_FDSpawned.skip = "os.posix_spawn is not available."
+
+
+    def test_FDForked(self):
+        """
+        A child which runs in another directory is forked, and gets the file
+        descriptors of C{childFDs} all the same.
+        """
+        scriptPath = b"twisted.test.process_fds"
+        d = defer.Deferred()
+        p = FDChecker(d)
+        reactor.spawnProcess(p, pyExe, [pyExe, b"-u", b"-m", scriptPath],
+                             env=properEnv, path=os.getcwd(),
+                             childFDs={0:"w", 1:"r", 2:2,
+                                       3:"w", 4:"r", 5:"w"})
+        d.addCallback(lambda x : self.assertFalse(p.failed, p.failed))
+        return d
+
+
     def test_linger(self):
         # See what happens when all the pipes close before the process
         # actually stops. This test *requires* SIGCHLD catching to work,
@@ -1678,6 +1709,8 @@ class MockProcessTests(unittest.TestCase):
         self.patch(process.Process, "processReaderFactory", DumbProcessReader)
         self.patch(process.Process, "processWriterFactory", DumbProcessWriter)
         self.patch(process, "pty", self.mockos)
+        # MockOS records the descriptors closed one at a time.
+        self.patch(process, "_closeRangeSupported", False)
 
         self.mocksig = MockSignal()
         self.patch(process, "signal", self.mocksig)
@@ -2096,6 +2129,189 @@ class MockProcessTests(unittest.TestCase):
 
 
 
+class FakeWaitIDResult(object):
+    """
+    A fake result of C{os.waitid}.
+
+    @ivar si_pid: The pid of the child.
+    @type si_pid: L{int}
+    """
+
+    def __init__(self, pid):
+        self.si_pid = pid
+
+
+
+class FakeReapedProcess(object):
+    """
+    A registered process which records when it is reaped.
+
+    @ivar pid: The pid of the process.
+    @type pid: L{int}
+
+    @ivar reaped: The pids of the processes reaped so far.
+    @type reaped: L{list} of L{int}
+    """
+
+    def __init__(self, pid, reaped):
+        self.pid = pid
+        self.reaped = reaped
+
+
+    def reapProcess(self):
+        """
+        Record the call, and unregister the process.
+        """
+        self.reaped.append(self.pid)
+        process.unregisterReapProcessHandler(self.pid, self)
+
+
+
+class ReapAllProcessesTests(unittest.SynchronousTestCase):
+    """
+    Tests for L{process.reapAllProcesses}.
+    """
+    if process is None or not runtime.platform.isLinux():
+        skip = "Exited children are only found with waitid on Linux."
+    elif getattr(os, "waitid", None) is None:
+        skip = "os.waitid is not available."
+
+    def setUp(self):
+        self.reaped = []
+        self.patch(process, "reapProcessHandlers", {})
+        for pid in (1001, 1002, 1003):
+            process.reapProcessHandlers[pid] = FakeReapedProcess(
+                pid, self.reaped)
+
+
+    def fakeWaitID(self, *results):
+        """
+        Replace C{os.waitid} with a fake.
+
+        @param results: The results of the successive calls, after which it
+            returns L{None}.  An exception is raised instead of returned.
+
+        @return: The options given to each call.
+        @rtype: L{list} of L{int}
+        """
+        results = list(results)
+        options = []
+        def waitid(idtype, id, flags):
+            options.append(flags)
+            if not results:
+                return None
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        self.patch(os, "waitid", waitid)
+        return options
+
+
+    def test_onlyExited(self):
+        """
+        Only the processes C{waitid} reports as exited are reaped, and
+        C{waitid} leaves them to be reaped by L{process._BaseProcess.reapProcess}.
+        """
+        options = self.fakeWaitID(FakeWaitIDResult(1002))
+        process.reapAllProcesses()
+        self.assertEqual(self.reaped, [1002])
+        self.assertEqual(sorted(process.reapProcessHandlers), [1001, 1003])
+        self.assertTrue(options[0] & os.WNOWAIT)
+        self.assertTrue(options[0] & os.WNOHANG)
+
+
+    def test_unknownChild(self):
+        """
+        If C{waitid} reports a child which is not registered, every registered
+        process is tried.
+        """
+        self.fakeWaitID(FakeWaitIDResult(1002), FakeWaitIDResult(2000))
+        process.reapAllProcesses()
+        self.assertEqual(sorted(self.reaped), [1001, 1002, 1003])
+
+
+    def test_noChildren(self):
+        """
+        If C{waitid} fails with C{ECHILD}, there are no children to reap.
+        """
+        self.fakeWaitID(OSError(errno.ECHILD, "No child processes"))
+        process.reapAllProcesses()
+        self.assertEqual(self.reaped, [])
+
+
+    def test_error(self):
+        """
+        If C{waitid} fails otherwise, every registered process is tried.
+        """
+        self.fakeWaitID(OSError(errno.EINVAL, "Invalid argument"))
+        process.reapAllProcesses()
+        self.assertEqual(sorted(self.reaped), [1001, 1002, 1003])
+
+
+
+class SpawnHelpersTests(unittest.SynchronousTestCase):
+    """
+    Tests for the helpers L{process.Process} uses to start children.
+    """
+    if process is None:
+        skip = "twisted.internet.process is never used on Windows"
+
+    def test_closeFDsExcept(self):
+        """
+        L{process._closeFDsExcept} closes the ranges of file descriptors
+        around the ones to keep.
+        """
+        calls = []
+        self.patch(os, "closerange", lambda *args: calls.append(args))
+        self.patch(os, "sysconf", lambda name: 1024)
+        process._closeFDsExcept([5, 1, 2, 5])
+        self.assertEqual(calls, [(0, 1), (3, 5), (6, 1024)])
+
+
+    def test_spawnFileActions(self):
+        """
+        L{process._spawnFileActions} copies every descriptor out of the way
+        before moving it to its place, so that swapped descriptors are not
+        overwritten, and closes the other inheritable descriptors.
+        """
+        self.patch(process, "_listOpenFDs", lambda: [0, 1, 2, 3, 7])
+        self.patch(os, "get_inheritable", lambda fd: fd != 3)
+        DUP2 = os.POSIX_SPAWN_DUP2
+        CLOSE = os.POSIX_SPAWN_CLOSE
+        self.assertEqual(
+            process._spawnFileActions({0: 1, 1: 0}),
+            [(DUP2, 1, 2), (DUP2, 0, 3),
+             (DUP2, 2, 0), (CLOSE, 2), (DUP2, 3, 1), (CLOSE, 3),
+             (CLOSE, 7)])
+
+    if getattr(os, "posix_spawn", None) is None:
+        test_spawnFileActions.skip = "os.posix_spawn is not available."
+
+
+    def test_findExecutable(self):
+        """
+        L{process._findExecutable} searches the C{PATH} of the environment of
+        the child.
+        """
+        directory = FilePath(self.mktemp())
+        directory.makedirs()
+        executable = directory.child("program")
+        executable.setContent(b"")
+        executable.chmod(0o755)
+        environment = {b"PATH": directory.asBytesMode().path}
+        self.assertEqual(
+            process._findExecutable(b"program", environment),
+            executable.asBytesMode().path)
+        self.assertIsNone(process._findExecutable(b"missing", environment))
+        self.assertEqual(
+            process._findExecutable(b"./missing", environment), b"./missing")
+
+    if process is None or not _PY3:
+        test_findExecutable.skip = "Children are only spawned on Python 3."
+
+
+
 class PosixProcessTests(unittest.TestCase, PosixProcessBase):
     # add two non-pty test cases
 
@@ -878,6 +878,163 @@ class ReactorLoopTests(unittest.TestCase):
 
 
 
+class LoopingCallGroupTests(unittest.TestCase):
+    """
+    Tests for L{task.LoopingCallGroup}.
+    """
+
+    def setUp(self):
+        self.clock = task.Clock()
+        self.group = task.LoopingCallGroup(resolution=0.25, clock=self.clock)
+
+
+    def test_providesIReactorTime(self):
+        """
+        L{task.LoopingCallGroup} provides L{interfaces.IReactorTime}.
+        """
+        self.assertTrue(interfaces.IReactorTime.providedBy(self.group))
+
+
+    def test_invalidResolution(self):
+        """
+        L{task.LoopingCallGroup} raises L{ValueError} if the resolution is
+        not positive.
+        """
+        self.assertRaises(ValueError, task.LoopingCallGroup, 0, self.clock)
+
+
+    def test_sharedTimer(self):
+        """
+        Loops due in the same slot share a timer of the clock, and are run
+        at the end of the slot.
+        """
+        times = []
+        for start in (0.0625, 0.125, 0.1875):
+            self.clock.advance(start - self.clock.seconds())
+            self.group.start(
+                task.LoopingCall(lambda: times.append(self.clock.seconds())),
+                1, now=False)
+        self.assertEqual(len(self.clock.getDelayedCalls()), 1)
+        self.assertEqual(len(self.group.getDelayedCalls()), 3)
+        self.clock.advance(0.8125)
+        self.assertEqual(times, [])
+        self.clock.advance(0.25)
+        self.assertEqual(times, [1.25, 1.25, 1.25])
+        self.assertEqual(len(self.clock.getDelayedCalls()), 1)
+
+
+    def test_withCount(self):
+        """
+        The counts given by L{task.LoopingCall.withCount} are not changed by
+        the grouping.
+        """
+        counts = []
+        self.group.start(task.LoopingCall.withCount(counts.append), 1)
+        ungroupedCounts = []
+        ungrouped = task.LoopingCall.withCount(ungroupedCounts.append)
+        ungrouped.clock = task.Clock()
+        ungrouped.start(1)
+        for clock in self.clock, ungrouped.clock:
+            clock.pump([0.1, 1, 2.5, 1])
+        self.assertEqual(counts, ungroupedCounts)
+        self.assertEqual(counts, [1, 1, 2, 1])
+
+
+    def test_stop(self):
+        """
+        Once the loops of a slot are stopped, its timer is cancelled.
+        """
+        loops = [task.LoopingCall(lambda: None) for i in range(2)]
+        for loop in loops:
+            self.group.start(loop, 1)
+        for loop in loops:
+            loop.stop()
+        self.assertEqual(self.clock.getDelayedCalls(), [])
+        self.assertEqual(self.group.getDelayedCalls(), [])
+
+
+    def test_stopDuringSlot(self):
+        """
+        A loop stopped by another loop of the same slot is not run.
+        """
+        called = []
+        second = task.LoopingCall(called.append, "second")
+        first = task.LoopingCall(second.stop)
+        self.group.start(first, 1, now=False)
+        self.group.start(second, 1, now=False)
+        self.clock.advance(1)
+        self.assertEqual(called, [])
+        self.assertFalse(second.running)
+        self.assertTrue(first.running)
+
+
+    def test_reset(self):
+        """
+        The calls scheduled with L{task.LoopingCallGroup.callLater} can be
+        moved earlier or later.
+        """
+        called = []
+        sooner = self.group.callLater(2, called.append, "sooner")
+        later = self.group.callLater(1, called.append, "later")
+        sooner.reset(0.5)
+        later.delay(1)
+        self.clock.advance(1)
+        self.assertEqual(called, ["sooner"])
+        self.clock.advance(1)
+        self.assertEqual(called, ["sooner", "later"])
+        self.assertEqual(self.clock.getDelayedCalls(), [])
+
+
+    def test_errors(self):
+        """
+        An exception raised by a call is logged, and the other calls of its
+        slot are still made.
+        """
+        called = []
+        self.group.callLater(1, lambda: 1 // 0)
+        self.group.callLater(1, called.append, "after")
+        self.clock.advance(1)
+        self.assertEqual(called, ["after"])
+        self.assertEqual(len(self.flushLoggedErrors(ZeroDivisionError)), 1)
+
+
+    def test_noDelay(self):
+        """
+        Calls without a delay are scheduled with the clock directly, so that
+        loops with an interval of 0 are not slowed down.
+        """
+        call = self.group.callLater(0, lambda: None)
+        self.assertEqual(self.clock.getDelayedCalls(), [call])
+        self.assertEqual(self.group.getDelayedCalls(), [])
+
+
+    def test_jitter(self):
+        """
+        With C{jitter}, the first call of a loop is made after a random
+        fraction of its interval, and the next ones every interval after it,
+        with consistent counts.
+        """
+        self.group._random = lambda: 0.5
+        counts = []
+        times = []
+        def counted(count):
+            counts.append(count)
+            times.append(self.clock.seconds())
+        self.group.start(task.LoopingCall.withCount(counted), 2, jitter=True)
+        self.assertEqual(counts, [])
+        self.clock.pump([1, 2, 2])
+        self.assertEqual(times, [1, 3, 5])
+        self.assertEqual(counts, [1, 1, 1])
+
+
+    def test_defaultClock(self):
+        """
+        The clock of a L{task.LoopingCallGroup} is the reactor by default.
+        """
+        self.assertIs(task.LoopingCallGroup().clock, reactor)
+
+
+
 class DeferLaterTests(unittest.TestCase):
     """
     Tests for L{task.deferLater}.
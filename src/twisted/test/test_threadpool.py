@@ -255,6 +255,70 @@ class ThreadPoolTests(unittest.SynchronousTestCase):
 
         self.assertEqual(copy.min, 7)
         self.assertEqual(copy.max, 20)
+        self.assertIsNone(copy.idleTimeout)
+
+        pool.idleTimeout = 30
+        copy = pickle.loads(pickle.dumps(pool))
+        self.assertEqual(copy.idleTimeout, 30)
+
+
+    def _waitForWorkers(self, pool, workers):
+        """
+        Wait until a pool has the given number of threads.
+
+        @param pool: The pool.
+        @type pool: L{threadpool.ThreadPool}
+
+        @param workers: The number of threads.
+        @type workers: L{int}
+        """
+        deadline = time.time() + self.getTimeout()
+        while pool.workers != workers:
+            if time.time() > deadline:
+                self.fail("The pool has %d threads instead of %d" % (
+                    pool.workers, workers))
+            time.sleep(1e-3)
+
+
+    def test_idleTimeout(self):
+        """
+        A thread of a L{ThreadPool} with an C{idleTimeout} stops once it
+        had nothing to do for that long, and is forgotten when another
+        thread starts.
+        """
+        pool = threadpool.ThreadPool(0, 5, idleTimeout=0.01)
+        pool.start()
+        self.addCleanup(pool.stop)
+        pool.callInThread(lambda: None)
+        self._waitForWorkers(pool, 0)
+        stopped = pool.threads[0]
+        stopped.join(self.getTimeout())
+
+        pool.callInThread(lambda: None)
+        self.assertNotIn(stopped, pool.threads)
+        self.assertEqual(len(pool.threads), 1)
+
+
+    def test_idleTimeoutKeepsMinimum(self):
+        """
+        The threads of a L{ThreadPool} with an C{idleTimeout} only stop while
+        it has more than C{min} threads.
+        """
+        pool = threadpool.ThreadPool(1, 5, idleTimeout=0.01)
+        pool.start()
+        self.addCleanup(pool.stop)
+        running = threading.Semaphore(0)
+        release = threading.Event()
+        for i in range(3):
+            pool.callInThread(
+                lambda: (running.release(), release.wait(self.getTimeout())))
+        for i in range(3):
+            running.acquire()
+        self.assertEqual(pool.workers, 3)
+        release.set()
+        self._waitForWorkers(pool, 1)
+        time.sleep(0.05)
+        self.assertEqual(pool.workers, 1)
 
 
     def _threadpoolTest(self, method):
@@ -616,7 +680,8 @@ class MemoryPool(threadpool.ThreadPool):
         threadpool.ThreadPool.__init__(self, *args, **kwargs)
 
 
-    def _pool(self, currentLimit, threadFactory):
+    def _pool(self, currentLimit, threadFactory, idleTimeout=None,
+              currentMinimum=None):
         """
         Override testing hook to create a deterministic threadpool.
 
@@ -626,6 +691,10 @@ class MemoryPool(threadpool.ThreadPool):
         @param threadFactory: ignored in this invocation; a 0-argument callable
             that would produce a thread.
 
+        @param idleTimeout: ignored in this invocation.
+
+        @param currentMinimum: ignored in this invocation.
+
         @return: a L{Team} backed by the coordinator and worker passed to
             L{MemoryPool.__init__}.
         """
@@ -732,3 +801,37 @@ class MemoryBackedTests(unittest.SynchronousTestCase):
         helper.threadpool.start()
         helper.performAllCoordination()
         self.assertEqual(len(helper.workers), helper.threadpool.max)
+
+
+    def test_statistics(self):
+        """
+        L{ThreadPool.statistics} describes the threads of the pool, the work
+        waiting for one, and records how long each call waited for a thread
+        and ran.
+        """
+        helper = PoolHelper(self, 0, 1)
+        times = [1.0, 1.5, 3.0, 3.5, 4.0, 4.5]
+        helper.threadpool._clock = lambda: times.pop(0)
+        helper.threadpool.callInThread(lambda: None)
+        helper.threadpool.callInThread(lambda: None)
+        helper.threadpool.start()
+        helper.performAllCoordination()
+        statistics = helper.threadpool.statistics()
+        self.assertEqual(statistics["busyWorkers"], 1)
+        self.assertEqual(statistics["idleWorkers"], 0)
+        self.assertEqual(statistics["backlog"], 1)
+        self.assertEqual(statistics["queueLatencies"]["count"], 0)
+
+        worker, performWork = helper.workers[0]
+        performWork()
+        helper.performAllCoordination()
+        performWork()
+        helper.performAllCoordination()
+        statistics = helper.threadpool.statistics()
+        self.assertEqual(statistics["busyWorkers"], 0)
+        self.assertEqual(statistics["idleWorkers"], 1)
+        self.assertEqual(statistics["backlog"], 0)
+        self.assertEqual(statistics["queueLatencies"]["count"], 2)
+        self.assertEqual(statistics["queueLatencies"]["total"], 4.5)
+        self.assertEqual(statistics["runTimes"]["count"], 2)
+        self.assertEqual(statistics["runTimes"]["total"], 1.0)
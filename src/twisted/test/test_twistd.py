@@ -329,6 +329,35 @@ class ServerOptionsTests(unittest.TestCase):
         test_defaultUmask.skip = test_umask.skip = test_invalidUmask.skip = msg
 
 
+    def test_workers(self):
+        """
+        The value given for the C{workers} option is parsed as a positive
+        integer.
+        """
+        config = twistd.ServerOptions()
+        self.assertIsNone(config['workers'])
+        config.parseOptions(['--workers', '4'])
+        self.assertEqual(config['workers'], 4)
+        self.assertRaises(UsageError, config.parseOptions, ['--workers', '0'])
+
+
+    def test_postOptionsWorker(self):
+        """
+        In a worker process, postOptions disables daemonization and the PID
+        file, and logs to standard output, which the supervising twistd
+        relays.
+        """
+        self.patch(_twistd_unix, 'workerID', lambda: 0)
+        config = twistd.ServerOptions()
+        config.parseOptions(['--workers', '2', '--pidfile', 'my.pid'])
+        self.assertTrue(config['nodaemon'])
+        self.assertEqual(config['pidfile'], '')
+        self.assertEqual(config['logfile'], '-')
+
+    if _twistd_unix is None:
+        test_postOptionsWorker.skip = "twistd unix not available"
+
+
     def test_unimportableConfiguredLogObserver(self):
         """
         C{--logger} with an unimportable module raises a L{UsageError}.
@@ -566,6 +595,38 @@ class ApplicationRunnerTests(unittest.TestCase):
             "of the Application.")
 
 
+    def test_workersApplication(self):
+        """
+        With the C{workers} option set, the application runs that many
+        worker processes instead of the plugin's service.
+        """
+        self.config['workers'] = 2
+        self.patch(app, 'workerID', lambda: None)
+        application = app.ApplicationRunner(self.config
+                                            ).createOrGetApplication()
+        [monitor] = service.IService(application)
+        self.assertEqual(sorted(monitor._processes), ['worker-0', 'worker-1'])
+        self.assertFalse(hasattr(self.serviceMaker, 'service'))
+
+
+    def test_workerApplication(self):
+        """
+        In a worker process, the application is created from the plugin and
+        the ports of the reactor listen with C{SO_REUSEPORT}.
+        """
+        self.config['workers'] = 2
+        self.patch(app, 'workerID', lambda: 1)
+        becameWorker = []
+        self.patch(app, 'becomeWorker', becameWorker.append)
+        reactor = MemoryReactor()
+        with AlternateReactor(reactor):
+            application = app.ApplicationRunner(self.config
+                                                ).createOrGetApplication()
+        self.assertIs(self.serviceMaker.service,
+                      service.IService(application).services[0])
+        self.assertEqual(becameWorker, [reactor])
+
+
     def test_preAndPostApplication(self):
         """
         Test thet preApplication and postApplication methods are
@@ -11,11 +11,9 @@ This module implements the worker classes.
 
 import os
 
-from zope.interface import implementer
-
 from twisted.internet.protocol import ProcessProtocol
-from twisted.internet.interfaces import ITransport, IAddress
 from twisted.internet.defer import Deferred
+from twisted.internet.processpool import _ChildAddress, _ChildTransport
 from twisted.protocols.amp import AMP
 from twisted.python.failure import Failure
 from twisted.python.reflect import namedObject
@@ -191,8 +189,7 @@ class LocalWorkerAMP(AMP):
 
 
 
-@implementer(IAddress)
-class LocalWorkerAddress(object):
+class LocalWorkerAddress(_ChildAddress):
     """
     A L{IAddress} implementation meant to provide stub addresses for
     L{ITransport.getPeer} and L{ITransport.getHost}.
@@ -200,37 +197,14 @@ class LocalWorkerAddress(object):
 
 
 
-@implementer(ITransport)
-class LocalWorkerTransport(object):
+class LocalWorkerTransport(_ChildTransport):
     """
     A stub transport implementation used to support L{AMP} over a
     L{ProcessProtocol} transport.
     """
 
     def __init__(self, transport):
-        self._transport = transport
-
-
-    def write(self, data):
-        """
-        Forward data to transport.
-        """
-        self._transport.writeToChild(_WORKER_AMP_STDIN, data)
-
-
-    def writeSequence(self, sequence):
-        """
-        Emulate C{writeSequence} by iterating data in the C{sequence}.
-        """
-        for data in sequence:
-            self._transport.writeToChild(_WORKER_AMP_STDIN, data)
-
-
-    def loseConnection(self):
-        """
-        Closes the transport.
-        """
-        self._transport.loseConnection()
+        _ChildTransport.__init__(self, transport, _WORKER_AMP_STDIN)
 
 
     def getHost(self):
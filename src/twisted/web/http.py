@@ -2001,6 +2001,8 @@ class HTTPChannel(basic.LineReceiver, policies.TimeoutMixin):
     maxHeaders = 500
     totalHeadersSize = 16384
     abortTimeout = 15
+    # Data resets the timeout often, so only record the new deadline.
+    lazyTimeout = True
 
     length = 0
     persistent = 1
@@ -2208,7 +2210,19 @@ class HTTPChannel(basic.LineReceiver, policies.TimeoutMixin):
                 # ready.  See docstring for _optimisticEagerReadSize above.
                 self._networkProducer.pauseProducing()
             return
-        return basic.LineReceiver.dataReceived(self, data)
+        # Responses written while the data is handled, such as those of
+        # resources which render synchronously, are encrypted together.  Only
+        # a TLS layer gains from it: a connection without TLS already
+        # buffers the writes until the reactor flushes them.
+        transport = self.transport
+        if not (interfaces.ICorkableTransport.providedBy(transport) and
+                interfaces.ISSLTransport.providedBy(transport)):
+            return basic.LineReceiver.dataReceived(self, data)
+        transport.cork()
+        try:
+            return basic.LineReceiver.dataReceived(self, data)
+        finally:
+            transport.uncork()
 
 
     def rawDataReceived(self, data):
@@ -0,0 +1,325 @@
+# -*- test-case-name: twisted.web.test.test_metrics -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Export statistics about a reactor in the text format scraped by Prometheus.
+
+The numbers exported are counters kept up to date by the reactor and its
+transports as they work, so that producing them does not require inspecting
+every connection:
+
+  - the number of readers and writers, and of pending delayed calls;
+  - the number of functions run for C{callFromThread}, and how many times
+    it had to wake up the reactor for them;
+  - the idle and busy threads, and the backlog, of the reactor thread pool
+    and of the pools returned by C{reactor.getThreadPool(name)}, labelled
+    with their name, and how long the work they were given waited for a
+    thread and ran;
+  - for each listening L{twisted.internet.tcp.Port}, the connections it
+    accepted, how many of them are open, the bytes they received and sent,
+    and the bytes they have buffered;
+  - the measurements of the
+    L{twisted.internet._instrumentation.ReactorInstrumentation} installed
+    in the reactor, if any.
+
+@see: U{https://prometheus.io/docs/instrumenting/exposition_formats/}
+"""
+
+from __future__ import division, absolute_import
+
+from twisted.internet import tcp
+from twisted.internet.address import UNIXAddress
+from twisted.python.compat import intToBytes, nativeString
+from twisted.web import resource
+
+__all__ = ["MetricsResource", "collectMetrics"]
+
+
+
+def _formatValue(value):
+    """
+    Format a sample value.
+
+    @type value: L{int} or L{float}
+    @rtype: L{str}
+    """
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+
+def _formatLabels(labels):
+    """
+    Format the labels of a sample.
+
+    @param labels: The names and values of the labels.
+    @type labels: L{list} of L{tuple} of L{str}
+
+    @rtype: L{str}
+    """
+    if not labels:
+        return ""
+    return "{%s}" % (",".join(
+        '%s="%s"' % (name, value.replace("\\", "\\\\").replace(
+            "\n", "\\n").replace('"', '\\"'))
+        for name, value in labels),)
+
+
+
+class _MetricsWriter(object):
+    """
+    Accumulate the lines of a Prometheus text exposition.
+
+    @ivar lines: The lines written so far.
+    @type lines: L{list} of L{str}
+    """
+
+    def __init__(self):
+        self.lines = []
+
+
+    def declare(self, name, metricType, help):
+        """
+        Write the C{HELP} and C{TYPE} lines of a metric.
+        """
+        self.lines.append("# HELP %s %s" % (name, help))
+        self.lines.append("# TYPE %s %s" % (name, metricType))
+
+
+    def sample(self, name, value, labels=()):
+        """
+        Write a sample of a metric.
+        """
+        self.lines.append(
+            "%s%s %s" % (name, _formatLabels(labels), _formatValue(value)))
+
+
+    def metric(self, name, metricType, help, value):
+        """
+        Write a metric which has a single sample.
+        """
+        self.declare(name, metricType, help)
+        self.sample(name, value)
+
+
+    def histogram(self, name, help, snapshot):
+        """
+        Write a histogram.
+
+        @param snapshot: The L{Histogram.snapshot
+            <twisted.python._histogram.Histogram.snapshot>} to write.
+        @type snapshot: L{dict}
+        """
+        self.declare(name, "histogram", help)
+        self.histogramSamples(name, snapshot)
+
+
+    def histogramSamples(self, name, snapshot, labels=()):
+        """
+        Write the samples of a histogram declared with C{declare}.
+
+        @param snapshot: See L{_MetricsWriter.histogram}.
+        """
+        labels = list(labels)
+        for bound, count in snapshot["buckets"]:
+            self.sample(name + "_bucket", count,
+                        labels + [("le", _formatValue(bound))])
+        self.sample(name + "_sum", snapshot["total"], labels)
+        self.sample(name + "_count", snapshot["count"], labels)
+
+
+
+def _listeningPorts(reactor):
+    """
+    Find the listening ports of a reactor, whether they are reading or not.
+
+    @rtype: L{list} of L{twisted.internet.tcp.Port}
+    """
+    return [port for port in tcp._listeningPorts if port.reactor is reactor]
+
+
+
+def _portLabels(port):
+    """
+    Get the labels identifying a listening port.
+
+    @type port: L{twisted.internet.tcp.Port}
+    @rtype: L{list} of L{tuple} of L{str}
+    """
+    address = port.getHost()
+    if isinstance(address, UNIXAddress):
+        return [("type", "UNIX"),
+                ("address", nativeString(address.name or b""))]
+    return [("type", port._type),
+            ("address", "%s:%d" % (address.host, address.port))]
+
+
+
+def _threadPools(reactor):
+    """
+    Find the thread pools of a reactor.
+
+    @return: The names of the pools, L{None} for the one used by
+        C{callInThread}, and the pools, sorted by name.
+    @rtype: L{list} of L{tuple}
+    """
+    pools = {}
+    getThreadPools = getattr(reactor, "getThreadPools", None)
+    if getThreadPools is not None:
+        pools.update(getThreadPools())
+    threadpool = getattr(reactor, "threadpool", None)
+    if threadpool is not None:
+        pools[None] = threadpool
+    return sorted(pools.items(), key=lambda item: (item[0] is not None,
+                                                   item[0] or ""))
+
+
+
+_THREADPOOL_METRICS = [
+    ("idleWorkers", "twisted_threadpool_idle_workers",
+     "Idle threads of the thread pool."),
+    ("busyWorkers", "twisted_threadpool_busy_workers",
+     "Busy threads of the thread pool."),
+    ("backlog", "twisted_threadpool_backlog",
+     "Work items waiting for a thread of the thread pool."),
+]
+
+
+
+_THREADPOOL_HISTOGRAMS = [
+    ("queueLatencies", "twisted_threadpool_queue_latency_seconds",
+     "How long work waited for a thread of the thread pool."),
+    ("runTimes", "twisted_threadpool_run_seconds",
+     "How long work ran in a thread of the thread pool."),
+]
+
+
+
+_PORT_METRICS = [
+    ("connectionsAccepted", "twisted_tcp_port_accepted_connections_total",
+     "counter", "Connections accepted by the port."),
+    ("connections", "twisted_tcp_port_connections",
+     "gauge", "Open connections accepted by the port."),
+    ("bytesReceived", "twisted_tcp_port_received_bytes_total",
+     "counter", "Bytes received by the connections of the port."),
+    ("bytesSent", "twisted_tcp_port_sent_bytes_total",
+     "counter", "Bytes sent by the connections of the port."),
+    ("bufferedBytes", "twisted_tcp_port_buffered_bytes",
+     "gauge", "Bytes buffered and not yet sent by the connections of the "
+     "port."),
+]
+
+
+
+def collectMetrics(reactor):
+    """
+    Describe the current state of a reactor in the Prometheus text format.
+
+    @param reactor: The reactor to describe, which should provide
+        L{IReactorFDSet<twisted.internet.interfaces.IReactorFDSet>} and
+        L{IReactorTime<twisted.internet.interfaces.IReactorTime>}.
+
+    @return: The metrics, one per line.
+    @rtype: L{str}
+    """
+    writer = _MetricsWriter()
+    writer.metric("twisted_reactor_readers", "gauge",
+                  "File descriptors watched for reading.",
+                  len(reactor.getReaders()))
+    writer.metric("twisted_reactor_writers", "gauge",
+                  "File descriptors watched for writing.",
+                  len(reactor.getWriters()))
+    writer.metric("twisted_reactor_delayed_calls", "gauge",
+                  "Delayed calls waiting to run.",
+                  len(reactor.getDelayedCalls()))
+    threadCalls = getattr(reactor, "threadCalls", None)
+    if threadCalls is not None:
+        writer.metric("twisted_reactor_thread_calls_total", "counter",
+                      "Functions passed to callFromThread which were run.",
+                      threadCalls)
+        writer.metric("twisted_reactor_thread_call_wakeups_total", "counter",
+                      "Times callFromThread woke up the reactor.",
+                      reactor.threadCallWakeUps)
+
+    pools = _threadPools(reactor)
+    if pools:
+        statistics = [([] if name is None else [("pool", name)],
+                       pool.statistics())
+                      for name, pool in pools]
+        for key, name, help in _THREADPOOL_METRICS:
+            writer.declare(name, "gauge", help)
+            for labels, poolStatistics in statistics:
+                writer.sample(name, poolStatistics[key], labels)
+        for key, name, help in _THREADPOOL_HISTOGRAMS:
+            writer.declare(name, "histogram", help)
+            for labels, poolStatistics in statistics:
+                writer.histogramSamples(name, poolStatistics[key], labels)
+
+    ports = _listeningPorts(reactor)
+    if ports:
+        portLabels = dict((port, _portLabels(port)) for port in ports)
+        ports.sort(key=portLabels.get)
+        for attribute, name, metricType, help in _PORT_METRICS:
+            writer.declare(name, metricType, help)
+            for port in ports:
+                writer.sample(
+                    name, getattr(port, attribute), portLabels[port])
+
+    instrumentation = getattr(reactor, "instrumentation", None)
+    if instrumentation is not None:
+        snapshot = instrumentation.snapshot()
+        writer.metric("twisted_reactor_iterations_total", "counter",
+                      "Reactor iterations.", snapshot["iterations"])
+        writer.metric("twisted_reactor_slow_callbacks_total", "counter",
+                      "Callbacks slower than the threshold.",
+                      snapshot["slowCallbacks"])
+        writer.histogram("twisted_reactor_iteration_seconds",
+                         "Time spent in callbacks by each reactor iteration.",
+                         snapshot["iterationTimes"])
+        writer.histogram("twisted_reactor_lag_seconds",
+                         "How late delayed calls run.", snapshot["lags"])
+        writer.histogram("twisted_reactor_callback_seconds",
+                         "Duration of the callbacks run by the reactor.",
+                         snapshot["callbackTimes"])
+
+    return "\n".join(writer.lines) + "\n"
+
+
+
+class MetricsResource(resource.Resource):
+    """
+    A resource rendering the metrics of a reactor, as given by
+    L{collectMetrics}, for Prometheus to scrape.
+
+    @ivar reactor: The reactor described.
+    """
+
+    isLeaf = True
+    contentType = b"text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, reactor=None):
+        """
+        @param reactor: The reactor to describe, the global one by default.
+        """
+        resource.Resource.__init__(self)
+        if reactor is None:
+            from twisted.internet import reactor
+        self.reactor = reactor
+
+
+    def render_GET(self, request):
+        """
+        Render the metrics.
+        """
+        body = collectMetrics(self.reactor).encode("utf-8")
+        request.setHeader(b"content-type", self.contentType)
+        request.setHeader(b"content-length", intToBytes(len(body)))
+        if request.method == b"HEAD":
+            return b""
+        return body
+
+    render_HEAD = render_GET
@@ -0,0 +1,3 @@
+twisted.web.metrics.MetricsResource exports reactor, thread pool and port
+statistics in the Prometheus text format, and twist web accepts --metrics to
+serve it.
@@ -28,6 +28,8 @@ from twisted.python.compat import escape
 
 from twisted.python import components, filepath, log
 from twisted.internet import abstract, interfaces
+from twisted.internet.defer import succeed
+from twisted.internet.error import ConnectionDone, ConnectionLost
 from twisted.python.util import InsensitiveDict
 from twisted.python.runtime import platformType
 from twisted.python.url import URL
@@ -720,6 +722,10 @@ class StaticProducer(object):
     """
     Superclass for classes that implement the business of producing.
 
+    When the transport of the request provides
+    L{interfaces.ISendFileTransport}, the contents of the file are written to
+    it directly, so that they need not be copied through this process.
+
     @ivar request: The L{IRequest} to write the contents of the file to.
     @ivar fileObject: The file the contents of which to write to the request.
     """
@@ -739,6 +745,65 @@ class StaticProducer(object):
         raise NotImplementedError(self.start)
 
 
+    def _sendFileTransport(self):
+        """
+        Find the transport to which the response body may be written directly
+        from the file, with L{interfaces.ISendFileTransport.sendFile}.
+
+        This is only possible when the body is written unmodified, so not if
+        it is chunked or encoded.
+
+        @return: The transport, or L{None} if the body must be written
+            through the request.
+        @rtype: L{interfaces.ISendFileTransport} provider or L{None}
+        """
+        request = self.request
+        transport = getattr(getattr(request, 'channel', None), 'transport',
+                            None)
+        if not interfaces.ISendFileTransport.providedBy(transport):
+            return None
+        if getattr(request, '_encoder', None) is not None:
+            return None
+        if not request.responseHeaders.hasHeader(b'content-length'):
+            return None
+        return transport
+
+
+    def _sendRanges(self, transport, rangeInfo):
+        """
+        Write the response headers, then each range of the file directly to
+        the transport, and finish the request.
+
+        @param transport: The transport returned by L{_sendFileTransport}.
+        @param rangeInfo: A list of tuples C{[(boundary, offset, size)]}, as
+            given to L{MultipleRangeStaticProducer}.
+        """
+        request = self.request
+        request.write(b'')
+        ranges = iter(rangeInfo)
+
+        def sendNextRange(ignored):
+            for boundary, offset, size in ranges:
+                if boundary:
+                    request.write(boundary)
+                request.sentLength += size
+                return transport.sendFile(
+                    self.fileObject, offset, size).addCallback(sendNextRange)
+            request.finish()
+            self.stopProducing()
+
+        def failed(reason):
+            if not reason.check(ConnectionDone, ConnectionLost):
+                log.err(reason, "Failed to send %r" % (self.fileObject,))
+                # The response is short of the promised Content-Length.
+                transport.loseConnection()
+            self.stopProducing()
+
+        d = succeed(None)
+        d.addCallback(sendNextRange)
+        d.addErrback(failed)
+
+
     def resumeProducing(self):
         raise NotImplementedError(self.resumeProducing)
 
@@ -762,6 +827,13 @@ class NoRangeStaticProducer(StaticProducer):
     """
 
     def start(self):
+        transport = self._sendFileTransport()
+        if transport is not None:
+            size = int(self.request.responseHeaders.getRawHeaders(
+                b'content-length')[0])
+            self._sendRanges(
+                transport, [(None, self.fileObject.tell(), size)])
+            return
         self.request.registerProducer(self, False)
 
 
@@ -800,6 +872,10 @@ class SingleRangeStaticProducer(StaticProducer):
 
 
     def start(self):
+        transport = self._sendFileTransport()
+        if transport is not None:
+            self._sendRanges(transport, [(None, self.offset, self.size)])
+            return
         self.fileObject.seek(self.offset)
         self.bytesWritten = 0
         self.request.registerProducer(self, 0)
@@ -846,6 +922,10 @@ class MultipleRangeStaticProducer(StaticProducer):
     def start(self):
         self.rangeIter = iter(self.rangeInfo)
         self._nextRange()
+        transport = self._sendFileTransport()
+        if transport is not None:
+            self._sendRanges(transport, self.rangeInfo)
+            return
         self.request.registerProducer(self, 0)
 
 
@@ -18,7 +18,7 @@ from twisted.internet import interfaces, reactor
 from twisted.python import usage, reflect, threadpool, deprecate
 from twisted.spread import pb
 from twisted.web import distrib
-from twisted.web import resource, server, static, script, demo, wsgi
+from twisted.web import metrics, resource, server, static, script, demo, wsgi
 from twisted.web import twcgi
 
 class Options(usage.Options):
@@ -66,6 +66,7 @@ demo webserver that has the Test class from twisted.web.demo in it."""
         self['root'] = None
         self['extraHeaders'] = []
         self['ports'] = []
+        self['metricsPorts'] = []
         self['port'] = self['https'] = None
 
 
@@ -100,6 +101,14 @@ demo webserver that has the Test class from twisted.web.demo in it."""
         self['ports'].append(port)
 
 
+    def opt_metrics(self, port):
+        """
+        Add an strports description of port to serve the metrics of the
+        reactor on, in the Prometheus text format.
+        """
+        self['metricsPorts'].append(port)
+
+
     def opt_index(self, indexName):
         """
         Add the name of a file used to check for directory indexes.
@@ -302,4 +311,9 @@ def makeService(config):
     for port in config['ports']:
         svc = strports.service(port, site)
         svc.setServiceParent(s)
+    if config['metricsPorts']:
+        metricsSite = server.Site(metrics.MetricsResource())
+        for port in config['metricsPorts']:
+            svc = strports.service(port, metricsSite)
+            svc.setServiceParent(s)
     return s
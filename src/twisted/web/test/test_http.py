@@ -15,7 +15,7 @@ except ImportError:
     from urllib.parse import urlparse, urlunsplit, clear_cache
 
 from io import BytesIO
-from zope.interface import provider
+from zope.interface import implementer, provider
 from zope.interface.verify import verifyObject
 
 from twisted.python.compat import (_PY3, iterbytes, long, networkString,
@@ -30,6 +30,7 @@ from twisted.web.http import _IdentityTransferDecoder
 from twisted.internet import address
 from twisted.internet.task import Clock
 from twisted.internet.error import ConnectionLost, ConnectionDone
+from twisted.internet.interfaces import ICorkableTransport, ISSLTransport
 from twisted.protocols import loopback
 from twisted.test.proto_helpers import (StringTransport, NonStreamingProducer,
                                         EventLoggingObserver)
@@ -295,6 +296,28 @@ class HTTP1_0Tests(unittest.TestCase, ResponseTestMixin):
         self.assertEqual(len(protocol.requests), 1)
 
 
+    def test_lazyTimeoutReset(self):
+        """
+        L{HTTPChannel} resets its timeout lazily: data received only records
+        the new deadline, the timeout call being rescheduled when it runs.
+        """
+        clock = Clock()
+        transport = StringTransport()
+        protocol = http.HTTPChannel()
+        protocol.timeOut = 100
+        protocol.callLater = clock.callLater
+        protocol.makeConnection(transport)
+        [call] = clock.getDelayedCalls()
+        clock.advance(50)
+        protocol.dataReceived(b'POST / HTTP/1.0\r\n')
+        self.assertEqual(clock.getDelayedCalls(), [call])
+        self.assertEqual(call.getTime(), 100)
+        clock.advance(50)
+        self.assertFalse(transport.disconnecting)
+        clock.advance(50)
+        self.assertTrue(transport.disconnecting)
+
+
     def test_requestBodyDefaultTimeout(self):
         """
         L{HTTPChannel}'s default timeout is 60 seconds.
@@ -564,6 +587,69 @@ class HTTP0_9Tests(HTTP1_0Tests):
 
 
 
+class CorkingTests(unittest.TestCase):
+    """
+    Tests for the use of L{ICorkableTransport} by L{HTTPChannel}.
+    """
+
+    def test_corkedWhileReceiving(self):
+        """
+        When its transport is a TLS layer providing L{ICorkableTransport},
+        L{HTTPChannel} corks it while handling the data received, so that the
+        responses written synchronously are encrypted together.
+        """
+        events = []
+
+        @implementer(ICorkableTransport, ISSLTransport)
+        class CorkingTransport(StringTransport):
+            def cork(self):
+                events.append("cork")
+
+            def uncork(self):
+                events.append("uncork")
+
+            def write(self, data):
+                events.append("write")
+                StringTransport.write(self, data)
+
+            def writeSequence(self, data):
+                events.append("write")
+                StringTransport.writeSequence(self, data)
+
+        transport = CorkingTransport()
+        channel = http.HTTPChannel()
+        channel.requestFactory = DummyHTTPHandlerProxy
+        channel.makeConnection(transport)
+        channel.dataReceived(b"GET / HTTP/1.1\r\n\r\n")
+        self.assertEqual(events[0], "cork")
+        self.assertEqual(events[-1], "uncork")
+        self.assertEqual(set(events[1:-1]), set(["write"]))
+        self.assertTrue(transport.value().startswith(b"HTTP/1.1 200 OK\r\n"))
+
+
+    def test_notCorkedWithoutTLS(self):
+        """
+        L{HTTPChannel} does not cork a transport providing
+        L{ICorkableTransport} which is not a TLS layer, since it already
+        buffers the data written.
+        """
+        corked = []
+
+        @implementer(ICorkableTransport)
+        class CorkingTransport(StringTransport):
+            def cork(self):
+                corked.append(True)
+
+        transport = CorkingTransport()
+        channel = http.HTTPChannel()
+        channel.requestFactory = DummyHTTPHandlerProxy
+        channel.makeConnection(transport)
+        channel.dataReceived(b"GET / HTTP/1.1\r\n\r\n")
+        self.assertEqual(corked, [])
+        self.assertTrue(transport.value().startswith(b"HTTP/1.1 200 OK\r\n"))
+
+
+
 class PipeliningBodyTests(unittest.TestCase, ResponseTestMixin):
     """
     Tests that multiple pipelined requests with bodies are correctly buffered.
@@ -0,0 +1,276 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.web.metrics}.
+"""
+
+from __future__ import absolute_import, division
+
+from twisted.internet import reactor, tcp
+from twisted.internet._instrumentation import ReactorInstrumentation
+from twisted.internet.protocol import Factory
+from twisted.internet.task import Clock
+from twisted.python.threadpool import ThreadPool
+from twisted.trial.unittest import TestCase
+from twisted.web.metrics import MetricsResource, collectMetrics
+from twisted.web.test.requesthelper import DummyRequest
+from twisted.web.test._util import _render
+
+
+
+class FakeReactor(Clock):
+    """
+    A reactor with the APIs used by L{collectMetrics}.
+
+    @ivar readers: The readers returned by C{getReaders}.
+    @ivar writers: The writers returned by C{getWriters}.
+    """
+
+    threadpool = None
+    instrumentation = None
+
+    def __init__(self):
+        Clock.__init__(self)
+        self.readers = []
+        self.writers = []
+
+
+    def addReader(self, reader):
+        self.readers.append(reader)
+
+
+    def removeReader(self, reader):
+        if reader in self.readers:
+            self.readers.remove(reader)
+
+
+    def removeWriter(self, writer):
+        if writer in self.writers:
+            self.writers.remove(writer)
+
+
+    def getReaders(self):
+        return list(self.readers)
+
+
+    def getWriters(self):
+        return list(self.writers)
+
+
+
+class CollectMetricsTests(TestCase):
+    """
+    Tests for L{collectMetrics}.
+    """
+
+    def setUp(self):
+        self.reactor = FakeReactor()
+
+
+    def samples(self):
+        """
+        Collect the metrics of C{self.reactor}, without the comments.
+
+        @return: The lines of the samples.
+        @rtype: L{list} of L{str}
+        """
+        return [line for line in collectMetrics(self.reactor).splitlines()
+                if not line.startswith("#")]
+
+
+    def test_reactor(self):
+        """
+        The numbers of readers, writers and delayed calls are exported as
+        gauges.
+        """
+        self.reactor.readers = [object(), object()]
+        self.reactor.writers = [object()]
+        self.reactor.callLater(1, lambda: None)
+        metrics = collectMetrics(self.reactor)
+        self.assertIn("# TYPE twisted_reactor_readers gauge\n", metrics)
+        self.assertEqual(self.samples(), [
+            "twisted_reactor_readers 2",
+            "twisted_reactor_writers 1",
+            "twisted_reactor_delayed_calls 1",
+        ])
+
+
+    def test_threadCalls(self):
+        """
+        The number of functions run for C{callFromThread} and of the times
+        it woke up the reactor are exported as counters.
+        """
+        self.reactor.threadCalls = 10
+        self.reactor.threadCallWakeUps = 2
+        samples = self.samples()
+        self.assertIn("twisted_reactor_thread_calls_total 10", samples)
+        self.assertIn("twisted_reactor_thread_call_wakeups_total 2", samples)
+
+
+    def test_threadPool(self):
+        """
+        The statistics of the reactor thread pool are exported, if it has
+        one.
+        """
+        self.reactor.threadpool = ThreadPool(0, 1)
+        self.reactor.threadpool.callInThread(lambda: None)
+        samples = self.samples()
+        self.assertIn("twisted_threadpool_idle_workers 0", samples)
+        self.assertIn("twisted_threadpool_busy_workers 0", samples)
+        self.assertIn("twisted_threadpool_backlog 1", samples)
+        self.assertIn('twisted_threadpool_queue_latency_seconds_bucket'
+                      '{le="+Inf"} 0', samples)
+        self.assertIn("twisted_threadpool_run_seconds_count 0", samples)
+
+
+    def test_namedThreadPools(self):
+        """
+        The statistics of the thread pools returned by C{getThreadPool(name)}
+        are exported, labelled with their name.
+        """
+        pool = ThreadPool(0, 1)
+        pool.callInThread(lambda: None)
+        pool.callInThread(lambda: None)
+        self.reactor.getThreadPools = lambda: {"database": pool}
+        samples = self.samples()
+        self.assertIn('twisted_threadpool_backlog{pool="database"} 2',
+                      samples)
+        self.assertIn('twisted_threadpool_run_seconds_bucket'
+                      '{pool="database",le="+Inf"} 0', samples)
+        self.assertIn('twisted_threadpool_run_seconds_sum'
+                      '{pool="database"} 0.0', samples)
+
+
+    def listen(self, portReactor):
+        """
+        Listen on a TCP port of the loopback interface.
+
+        @param portReactor: The reactor of the port.
+        @type portReactor: L{FakeReactor}
+
+        @return: The listening port.
+        @rtype: L{tcp.Port}
+        """
+        port = tcp.Port(
+            0, Factory(), interface="127.0.0.1", reactor=portReactor)
+        port.startListening()
+
+        def stop():
+            if port.connected:
+                port.stopListening()
+                portReactor.advance(0)
+        self.addCleanup(stop)
+        return port
+
+
+    def test_ports(self):
+        """
+        The counters of each listening TCP port are exported, labelled with
+        the address of the port.
+        """
+        port = self.listen(self.reactor)
+        port.connectionsAccepted = 3
+        port.connections = 2
+        port.bytesReceived = 10
+        port.bytesSent = 20
+        port.bufferedBytes = 5
+        labels = '{type="TCP",address="127.0.0.1:%d"}' % (
+            port.getHost().port,)
+        samples = self.samples()
+        for name, value in [
+                ("twisted_tcp_port_accepted_connections_total", 3),
+                ("twisted_tcp_port_connections", 2),
+                ("twisted_tcp_port_received_bytes_total", 10),
+                ("twisted_tcp_port_sent_bytes_total", 20),
+                ("twisted_tcp_port_buffered_bytes", 5)]:
+            self.assertIn("%s%s %d" % (name, labels, value), samples)
+
+
+    def test_portNotReading(self):
+        """
+        A listening port is exported even while it is not reading.
+        """
+        port = self.listen(self.reactor)
+        port.connectionsAccepted = 3
+        port.stopReading()
+        self.assertEqual(self.reactor.readers, [])
+        self.assertIn(
+            'twisted_tcp_port_accepted_connections_total'
+            '{type="TCP",address="127.0.0.1:%d"} 3' % (port.getHost().port,),
+            self.samples())
+
+
+    def test_portStopped(self):
+        """
+        A port is no longer exported once it has stopped listening.
+        """
+        port = self.listen(self.reactor)
+        port.stopListening()
+        self.reactor.advance(0)
+        self.assertNotIn(port, tcp._listeningPorts)
+        self.assertEqual(
+            [sample for sample in self.samples()
+             if sample.startswith("twisted_tcp_port_")], [])
+
+
+    def test_otherReactorPorts(self):
+        """
+        The ports of other reactors are not exported.
+        """
+        self.listen(FakeReactor())
+        self.assertEqual(
+            [sample for sample in self.samples()
+             if sample.startswith("twisted_tcp_port_")], [])
+
+
+    def test_instrumentation(self):
+        """
+        The measurements of the reactor instrumentation are exported, with
+        histograms of durations.
+        """
+        instrumentation = ReactorInstrumentation(bounds=(0.5,))
+        instrumentation.delayedCallRun(1.0)
+        instrumentation.iterationFinished()
+        self.reactor.instrumentation = instrumentation
+        samples = self.samples()
+        self.assertIn("twisted_reactor_iterations_total 1", samples)
+        self.assertIn("twisted_reactor_slow_callbacks_total 0", samples)
+        self.assertIn('twisted_reactor_lag_seconds_bucket{le="0.5"} 0',
+                      samples)
+        self.assertIn('twisted_reactor_lag_seconds_bucket{le="+Inf"} 1',
+                      samples)
+        self.assertIn("twisted_reactor_lag_seconds_sum 1.0", samples)
+        self.assertIn("twisted_reactor_lag_seconds_count 1", samples)
+
+
+
+class MetricsResourceTests(TestCase):
+    """
+    Tests for L{MetricsResource}.
+    """
+
+    def test_render(self):
+        """
+        L{MetricsResource} renders the metrics of its reactor as Prometheus
+        text.
+        """
+        fakeReactor = FakeReactor()
+        request = DummyRequest([b""])
+        d = _render(MetricsResource(fakeReactor), request)
+        def rendered(ignored):
+            body = b"".join(request.written)
+            self.assertEqual(
+                body, collectMetrics(fakeReactor).encode("utf-8"))
+            self.assertEqual(
+                request.responseHeaders.getRawHeaders(b"content-type"),
+                [b"text/plain; version=0.0.4; charset=utf-8"])
+        d.addCallback(rendered)
+        return d
+
+
+    def test_defaultReactor(self):
+        """
+        L{MetricsResource} describes the global reactor by default.
+        """
+        self.assertIs(MetricsResource().reactor, reactor)
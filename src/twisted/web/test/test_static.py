@@ -15,9 +15,13 @@ import warnings
 
 from io import BytesIO as StringIO
 
+from zope.interface import implementer
 from zope.interface.verify import verifyObject
 
 from twisted.internet import abstract, interfaces
+from twisted.internet.defer import fail, succeed
+from twisted.internet.task import Clock
+from twisted.test.proto_helpers import StringTransport
 from twisted.python.runtime import platform
 from twisted.python.filepath import FilePath
 from twisted.python import compat, log
@@ -1124,6 +1128,122 @@ class MultipleRangeStaticProducerTests(TestCase):
 
 
 
+@implementer(interfaces.ISendFileTransport)
+class SendFileTransport(StringTransport):
+    """
+    A L{StringTransport} which provides L{interfaces.ISendFileTransport}.
+
+    @ivar sentFiles: The C{(offset, count)} arguments of the calls to
+        L{sendFile}.
+    """
+    def __init__(self):
+        StringTransport.__init__(self)
+        self.sentFiles = []
+
+
+    def sendFile(self, fileObject, offset, count):
+        self.sentFiles.append((offset, count))
+        fileObject.seek(offset)
+        data = fileObject.read(count)
+        self.write(data)
+        if len(data) < count:
+            return fail(EOFError())
+        return succeed(None)
+
+
+
+class SendFileStaticProducerTests(TestCase):
+    """
+    Tests for L{StaticProducer}s writing to a transport which provides
+    L{interfaces.ISendFileTransport}.
+    """
+    def setUp(self):
+        self.transport = SendFileTransport()
+        channel = http.HTTPChannel()
+        channel.callLater = Clock().callLater
+        channel.makeConnection(self.transport)
+        self.request = http.Request(channel)
+        channel.requests.append(self.request)
+        self.request.method = b'GET'
+        self.request.clientproto = b'HTTP/1.1'
+        self.finished = []
+        self.request.notifyFinish().addCallback(self.finished.append)
+
+
+    def body(self):
+        """
+        Get the body of the response written to C{self.transport}.
+        """
+        return self.transport.value().split(b'\r\n\r\n', 1)[1]
+
+
+    def test_noRange(self):
+        """
+        L{NoRangeStaticProducer} sends the whole file with
+        L{interfaces.ISendFileTransport.sendFile} and finishes the request.
+        """
+        self.request.setHeader(b'content-length', b'6')
+        fileObject = StringIO(b'abcdef')
+        static.NoRangeStaticProducer(self.request, fileObject).start()
+        self.assertEqual(self.transport.sentFiles, [(0, 6)])
+        self.assertEqual(self.body(), b'abcdef')
+        self.assertEqual(self.request.sentLength, 6)
+        self.assertEqual(self.finished, [None])
+        self.assertTrue(fileObject.closed)
+
+
+    def test_singleRange(self):
+        """
+        L{SingleRangeStaticProducer} sends its range of the file with
+        L{interfaces.ISendFileTransport.sendFile}.
+        """
+        self.request.setHeader(b'content-length', b'3')
+        static.SingleRangeStaticProducer(
+            self.request, StringIO(b'abcdef'), 1, 3).start()
+        self.assertEqual(self.transport.sentFiles, [(1, 3)])
+        self.assertEqual(self.body(), b'bcd')
+        self.assertEqual(self.finished, [None])
+
+
+    def test_multipleRanges(self):
+        """
+        L{MultipleRangeStaticProducer} writes each boundary followed by its
+        range of the file, sent with
+        L{interfaces.ISendFileTransport.sendFile}.
+        """
+        self.request.setHeader(b'content-length', b'7')
+        static.MultipleRangeStaticProducer(
+            self.request, StringIO(b'abcdef'),
+            [(b'1', 1, 3), (b'2', 5, 1), (b'3', 0, 0)]).start()
+        self.assertEqual(self.transport.sentFiles, [(1, 3), (5, 1), (0, 0)])
+        self.assertEqual(self.body(), b'1bcd2f3')
+        self.assertEqual(self.finished, [None])
+
+
+    def test_fileEnded(self):
+        """
+        If the file is shorter than the response, the connection is closed
+        instead of finishing the request.
+        """
+        self.request.setHeader(b'content-length', b'10')
+        static.SingleRangeStaticProducer(
+            self.request, StringIO(b'abcdef'), 0, 10).start()
+        self.assertEqual(self.finished, [])
+        self.assertTrue(self.transport.disconnecting)
+        self.assertEqual(len(self.flushLoggedErrors(EOFError)), 1)
+
+
+    def test_chunked(self):
+        """
+        The file is not sent with L{interfaces.ISendFileTransport.sendFile}
+        if the response has no I{Content-Length}, so that it is chunked.
+        """
+        producer = static.NoRangeStaticProducer(
+            self.request, StringIO(b'abcdef'))
+        self.assertIsNone(producer._sendFileTransport())
+
+
+
 class RangeTests(TestCase):
     """
     Tests for I{Range-Header} support in L{twisted.web.static.File}.
@@ -20,6 +20,7 @@ from twisted.spread.pb import PBServerFactory
 from twisted.trial.unittest import TestCase
 from twisted.web import demo
 from twisted.web.distrib import ResourcePublisher, UserDirectory
+from twisted.web.metrics import MetricsResource
 from twisted.web.script import PythonScript
 from twisted.web.server import Site
 from twisted.web.static import Data, File
@@ -197,6 +198,20 @@ class ServiceTests(TestCase):
         self.assertIn('8002', options['ports'][1])
 
 
+    def test_metrics(self):
+        """
+        The I{--metrics} option adds listeners serving a
+        L{MetricsResource}, besides the listeners of the web server.
+        """
+        options = Options()
+        options.parseOptions(['--listen', 'tcp:8001', '--metrics', 'tcp:9100'])
+        service = makeService(options)
+        self.assertEqual(len(service.services), 2)
+        self.assertIsInstance(service.services[0].factory.resource, demo.Test)
+        self.assertIsInstance(
+            service.services[1].factory.resource, MetricsResource)
+
+
     def test_wsgi(self):
         """
         The I{--wsgi} option takes the fully-qualifed Python name of a WSGI